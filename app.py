@@ -102,11 +102,13 @@ from bmi_core import bmi_category
 #     wht_ratio,
 # )
 # Add import for export functions
+from core.data_registry import get_data_registry
 from core.exports import to_csv_day, to_csv_week, to_pdf_day, to_pdf_week
 from core.food_apis.scheduler import (
     start_background_updates,
     stop_background_updates,
 )
+from core.food_apis.transport import close_shared_http_client
 
 # Import routers
 try:
@@ -166,9 +168,27 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Failed to start background updates: {e}")
 
+    # Drop the cached menu food DB whenever a source database is updated
+    try:
+        if invalidate_default_food_db is not None:
+            manager = (await get_update_scheduler()).update_manager
+            if invalidate_default_food_db not in manager.update_callbacks:
+                manager.add_update_callback(invalidate_default_food_db)
+    except Exception as e:
+        logger.error(f"Failed to register food DB invalidation: {e}")
+
+    try:
+        await get_data_registry().start()
+        logger.info("Loaded FoodDB/RecipeDB snapshot")
+    except Exception as e:
+        logger.error(f"Failed to load data registry: {e}")
+
     yield
 
     # Shutdown
+    with suppress(Exception):
+        await get_data_registry().stop()
+
     try:
         import sys as _sys
 
@@ -184,6 +204,10 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Error stopping background updates: {e}")
 
+    # The food API clients share one process-wide connection pool
+    with suppress(Exception):
+        await close_shared_http_client()
+
 
 app = FastAPI(title="PulsePlate", lifespan=lifespan)
 
@@ -886,7 +910,9 @@ async def insight_v1(req: InsightReq):
 
 try:
     from core.menu_engine import (
+        aget_default_food_db,
         analyze_nutrient_gaps,
+        invalidate_default_food_db,
         make_daily_menu,
         make_weekly_menu,
         repair_week_plan,
@@ -903,6 +929,8 @@ except ImportError:
         analyze_nutrient_gaps = _analyze_ng  # type: ignore
     except Exception:
         analyze_nutrient_gaps = None  # type: ignore
+    aget_default_food_db = None
+    invalidate_default_food_db = None
     make_daily_menu = None
     make_weekly_menu = None
     repair_week_plan = None
@@ -1415,8 +1443,9 @@ async def api_weekly_menu(req: WHOTargetsRequest) -> WeeklyMenuResponse:
             life_stage=req.life_stage,
         )
 
-        # Generate weekly menu via core.menu_engine
-        week_menu = _make_weekly_menu(profile)
+        # Generate weekly menu via core.menu_engine (food DB from the cached snapshot)
+        food_db = await aget_default_food_db() if aget_default_food_db else None
+        week_menu = _make_weekly_menu(profile, food_db)
 
         return WeeklyMenuResponse(
             week_summary={
@@ -1582,6 +1611,8 @@ async def get_database_status():
         logger.debug(f"get_database_status using getter: {_getter!r}")
         scheduler = await _getter()
         status = scheduler.get_status()
+        if isinstance(status, dict):
+            status["data_registry"] = get_data_registry().status()
         return JSONResponse(content=status)
     except Exception as e:
         raise HTTPException(
@@ -1636,6 +1667,28 @@ async def force_database_update(source: Optional[str] = None):
         ) from e
 
 
+@app.post("/api/v1/admin/reload-data", dependencies=[Depends(get_api_key)])
+async def reload_data_registry(force: bool = True):
+    """
+    RU: Перезагрузить снимок FoodDB/RecipeDB без перезапуска.
+    EN: Reload the FoodDB/RecipeDB snapshot without a restart.
+
+    Args:
+        force: Rebuild even if the source files are unchanged
+
+    Returns:
+        Data registry status after the swap
+    """
+    try:
+        registry = get_data_registry()
+        await registry.areload(force=force)
+        return JSONResponse(content=registry.status())
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Data reload failed: {str(e)}"
+        ) from e
+
+
 @app.post("/api/v1/admin/check-updates", dependencies=[Depends(get_api_key)])
 async def check_for_updates():
     """
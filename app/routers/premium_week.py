@@ -10,11 +10,13 @@ from typing import Dict, List, Optional
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field, confloat, conint
 
+from core.data_registry import get_data_registry
 from core.food_db_new import FoodDB
 from core.meal_i18n import Language
 from core.recipe_db_new import RecipeDB
 from core.recommendations import build_nutrition_targets
 from core.targets import UserProfile
+from core.week_cache import get_week_cache, plan_request_key, rng_for_key
 from core.weekly_plan_new import build_week
 
 router = APIRouter(prefix="/api/v1/premium/plan", tags=["premium"])
@@ -89,9 +91,10 @@ def estimate_targets_minimal(
 
 @router.post("/week", response_model=WeekPlanResponse)
 async def generate_week_plan(req: WeekPlanRequest):
-    # 0) Загрузка БД (можно держать как синглтоны)
-    fooddb = FoodDB("data/food_db_new.csv")
-    recipedb = RecipeDB("data/recipes_new.csv", fooddb)
+    # 0) БД из реестра: загружаются один раз, обновляются атомарным снимком
+    snapshot = get_data_registry().snapshot
+    fooddb: FoodDB = snapshot.fooddb
+    recipedb: RecipeDB = snapshot.recipedb
 
     # 1) Получить targets
     if req.targets:
@@ -112,6 +115,17 @@ async def generate_week_plan(req: WeekPlanRequest):
         if not targets:
             raise HTTPException(status_code=400, detail="Unable to derive targets")
 
-    # 2) Построить неделю
-    week = build_week(targets, req.diet_flags, req.lang, fooddb, recipedb)
-    return WeekPlanResponse(**week)
+    # 2) Готовая неделя для того же запроса и той же версии данных
+    cache = get_week_cache()
+    key = plan_request_key(targets, req.diet_flags, req.lang, snapshot.version)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    # 3) Построить неделю (RNG детерминирован ключом запроса)
+    week = build_week(
+        targets, req.diet_flags, req.lang, fooddb, recipedb, rng=rng_for_key(key)
+    )
+    response = WeekPlanResponse(**week)
+    cache.put(key, response)
+    return response
@@ -7,6 +7,9 @@ import sqlite3
 from pathlib import Path
 from typing import Dict, List, Optional
 
+from core import sqlite_pool
+from core.food_bulk import fetch_foods, sum_nutrients
+
 DB_PATH = Path("data/food.sqlite")
 
 ALIASES = {
@@ -29,9 +32,8 @@ def expand_query(q: str) -> List[str]:
 
 
 def _connect() -> sqlite3.Connection:
-    con = sqlite3.connect(DB_PATH)
-    con.row_factory = sqlite3.Row
-    return con
+    # Built offline and swapped in with os.replace, never written in place
+    return sqlite_pool.reader(DB_PATH, immutable=True)
 
 
 def search_foods(query: str, limit: int = 20, offset: int = 0) -> List[Dict]:
@@ -65,28 +67,15 @@ def get_food(food_id: str) -> Optional[Dict]:
     return dict(row) if row else None
 
 
+def get_foods(food_ids: List[str]) -> Dict[str, Dict]:
+    """RU: Пакетная выборка; EN: fetch many foods in one query."""
+    if not food_ids:
+        return {}
+    with _connect() as con:
+        return fetch_foods(con, food_ids)
+
+
 def nutrients_for(ings: List[Dict]) -> Dict[str, float]:
-    """RU: Наивный сумматор нутриентов; EN: naive aggregator."""
-    keys = [
-        "kcal",
-        "protein_g",
-        "fat_g",
-        "carbs_g",
-        "Fe_mg",
-        "Ca_mg",
-        "K_mg",
-        "Mg_mg",
-        "VitD_IU",
-        "B12_ug",
-        "Folate_ug",
-        "Iodine_ug",
-    ]
-    total = {k: 0.0 for k in keys}
-    for ing in ings:
-        food = get_food(ing["food_id"])
-        if not food:
-            continue
-        ratio = float(ing["grams"]) / float(food.get("per_g", 100.0))
-        for k in keys:
-            total[k] += float(food.get(k, 0.0)) * ratio
-    return total
+    """RU: Сумматор нутриентов одним запросом; EN: single-query aggregator."""
+    foods = get_foods([ing["food_id"] for ing in ings])
+    return sum_nutrients(ings, foods)
@@ -7,13 +7,14 @@ import sqlite3
 from pathlib import Path
 from typing import Dict, List, Optional
 
+from core import sqlite_pool
+
 DB = Path("data/recipes.sqlite")
 
 
-def _con():
-    con = sqlite3.connect(DB)
-    con.row_factory = sqlite3.Row
-    return con
+def _con() -> sqlite3.Connection:
+    # Built offline by scripts/build_recipe_db.py and swapped in atomically
+    return sqlite_pool.reader(DB, immutable=True)
 
 
 def search_recipes(query: str, limit: int = 20, offset: int = 0) -> List[Dict]:
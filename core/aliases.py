@@ -1,7 +1,20 @@
 import csv
 import os
 import re
-from typing import Dict
+import threading
+import time
+from functools import lru_cache
+from typing import Callable, Dict, Optional, Tuple
+
+_DEFAULT_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "data", "food_aliases.csv"
+)
+
+_PUNCT_RE = re.compile(r"[^\w\s-]")
+_SEP_RE = re.compile(r"[-\s]+")
+
+# How often (seconds) the cached alias table re-checks the file mtime
+MTIME_CHECK_INTERVAL = 1.0
 
 
 def _load_aliases(path: str = None) -> Dict[str, str]:
@@ -17,7 +30,7 @@ def _load_aliases(path: str = None) -> Dict[str, str]:
     """
     if path is None:
         # Default path relative to project root
-        path = os.path.join(os.path.dirname(__file__), "..", "data", "food_aliases.csv")
+        path = _DEFAULT_PATH
 
     table = {}
     try:
@@ -32,6 +45,91 @@ def _load_aliases(path: str = None) -> Dict[str, str]:
     return table
 
 
+def _file_signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class _AliasIndex:
+    """
+    RU: Процессный кеш таблицы синонимов с инвалидацией по mtime.
+    EN: Process-wide alias table cache invalidated by file mtime.
+    """
+
+    def __init__(
+        self,
+        path: str = _DEFAULT_PATH,
+        loader: Callable[[str], Dict[str, str]] = _load_aliases,
+    ):
+        self.path = path
+        self.loader = loader
+        self.table: Dict[str, str] = {}
+        self.signature: Optional[Tuple[int, int]] = None
+        self.loaded = False
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+
+    def get(self) -> Dict[str, str]:
+        now = time.monotonic()
+        # Reload if never loaded or if the file changed since the last
+        # periodic check.
+        if not self.loaded or now - self.checked_at >= MTIME_CHECK_INTERVAL:
+            with self.lock:
+                sig = _file_signature(self.path)
+                if not self.loaded or sig != self.signature:
+                    self.table = self.loader(self.path)
+                    self.signature = sig
+                    self.loaded = True
+                self.checked_at = now
+        return self.table
+
+    def add(
+        self, alias: str, canonical: str, old_sig: Optional[Tuple[int, int]]
+    ) -> None:
+        with self.lock:
+            if not self.loaded:
+                return
+            new_sig = _file_signature(self.path)
+            if self.signature == old_sig and new_sig != old_sig:
+                # Our append is the only change: patch the table in place
+                table = dict(self.table)
+                table[alias] = canonical
+                self.table = table
+                self.signature = new_sig
+            else:
+                self.loaded = False
+
+    def invalidate(self) -> None:
+        with self.lock:
+            self.loaded = False
+
+
+_index = _AliasIndex()
+
+
+def invalidate_alias_cache() -> None:
+    """
+    RU: Сбросить кеш синонимов (перечитать CSV при следующем вызове).
+    EN: Drop the cached alias table so the CSV is re-read on next use.
+    """
+    _index.invalidate()
+    _snake_case.cache_clear()
+
+
+@lru_cache(maxsize=65536)
+def _snake_case(key: str) -> str:
+    # Remove punctuation except spaces and hyphens
+    canonical = _PUNCT_RE.sub("", key)
+    # Convert spaces and hyphens to underscores
+    canonical = _SEP_RE.sub("_", canonical)
+    # Remove leading/trailing underscores
+    canonical = canonical.strip("_")
+    return canonical or "unknown"
+
+
 def map_to_canonical(raw_name: str, locale: str = "en") -> str:
     """
     RU: Преобразовать сырое имя в каноническое.
@@ -48,20 +146,12 @@ def map_to_canonical(raw_name: str, locale: str = "en") -> str:
     if not key:
         return "unknown"
 
-    table = _load_aliases()
+    table = _index.get()
     if key in table:
         return table[key]
 
     # Fallback: convert to snake_case, handling special characters
-    # Remove extra whitespace and special characters, then convert to snake_case
-    canonical = re.sub(
-        r"[^\w\s-]", "", key
-    )  # Remove punctuation except spaces and hyphens
-    canonical = re.sub(
-        r"[-\s]+", "_", canonical
-    )  # Convert spaces and hyphens to underscores
-    canonical = canonical.strip("_")  # Remove leading/trailing underscores
-    return canonical or "unknown"
+    return _snake_case(key)
 
 
 def add_alias(alias: str, canonical: str, path: str = None):
@@ -75,13 +165,18 @@ def add_alias(alias: str, canonical: str, path: str = None):
         path: Path to aliases CSV file
     """
     if path is None:
-        path = os.path.join(os.path.dirname(__file__), "..", "data", "food_aliases.csv")
+        path = _DEFAULT_PATH
 
     # Check if file exists, create with header if not
     file_exists = os.path.exists(path)
+    is_indexed = os.path.abspath(path) == os.path.abspath(_index.path)
+    old_sig = _file_signature(path) if is_indexed else None
 
     with open(path, "a", newline="", encoding="utf-8") as f:
         writer = csv.writer(f)
         if not file_exists:
             writer.writerow(["alias", "canonical"])
         writer.writerow([alias.strip().lower(), canonical.strip()])
+
+    if is_indexed:
+        _index.add(alias.strip().lower(), canonical.strip(), old_sig)
@@ -0,0 +1,141 @@
+"""
+Booster Index
+
+RU: Предвычисленный рейтинг продуктов-бустеров по микронутриентам.
+EN: Precomputed booster food ranking per micronutrient.
+
+For every micronutrient × diet-flag mask the index holds food names sorted
+by nutrient density per kcal and per unit of cost, so booster selection and
+top-k queries are tuple slices instead of a scan-and-sort per request.
+Build it once per database snapshot; a lazy index (``eager=False``) for a
+one-off lookup ranks only the micros and masks it is asked for.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, Mapping, Optional, Sequence, Set, Tuple
+
+from .diet_index import EAGER_MAX_FLAGS, DietFlagIndex, Predicate
+
+# (name, nutrients per 100 g, kcal per 100 g, price per 100 g, flags)
+BoosterFood = Tuple[str, Mapping[str, float], float, float, object]
+
+ORDERS = ("kcal", "cost")
+
+
+def _always_compatible(food_flags: object, diet_flags: Set[str]) -> bool:
+    return True
+
+
+class BoosterIndex:
+    """
+    RU: Рейтинг бустеров: (микро, маска флагов, порядок) -> продукты.
+    EN: Booster ranking keyed by (micro, diet-flag mask, order).
+    """
+
+    def __init__(
+        self,
+        foods: Iterable[BoosterFood],
+        micros: Optional[Sequence[str]] = None,
+        vocabulary: Sequence[str] = (),
+        compatible: Predicate = _always_compatible,
+        other: Optional[str] = None,
+        eager: bool = True,
+    ) -> None:
+        """
+        Args:
+            foods: Foods in catalogue order (ties keep this order)
+            micros: Nutrients to rank (default: every key seen in foods)
+            vocabulary: Diet flags that affect compatibility
+            compatible: compatible(food_flags, diet_flags) -> bool
+            other: See DietFlagIndex
+            eager: Rank every micro and mask up front; if False, each is
+                ranked on first use
+        """
+        foods = list(foods)
+        if micros is None:
+            micros = sorted({k for _, nutrients, _, _, _ in foods for k in nutrients})
+        self.micros = tuple(micros)
+        self.flags = DietFlagIndex(
+            vocabulary,
+            ((None, i, flags) for i, (_, _, _, _, flags) in enumerate(foods)),
+            compatible,
+            other=other,
+            eager=eager,
+        )
+        self._foods = foods
+        self._names = [f[0] for f in foods]
+        self._orders: Dict[Tuple[str, str], Tuple[int, ...]] = {}
+        self._ranked: Dict[Tuple[str, int, str], Tuple[str, ...]] = {}
+
+        if eager:
+            for micro in self.micros:
+                self._rank(micro)
+            if len(self.flags.bits) <= EAGER_MAX_FLAGS:
+                for mask in range(1 << len(self.flags.bits)):
+                    self._build(mask, self.micros)
+
+    def _rank(self, micro: str) -> None:
+        foods = self._foods
+        rich = [
+            (i, amount)
+            for i, (_, nutrients, _, _, _) in enumerate(foods)
+            if (amount := float(nutrients.get(micro, 0.0) or 0.0)) > 0
+        ]
+        per_kcal = sorted(rich, key=lambda r: -r[1] / max(foods[r[0]][2], 1.0))
+        # Foods without a known price go last, in per-kcal order
+        priced = [r for r in per_kcal if foods[r[0]][3] > 0]
+        unpriced = [r for r in per_kcal if foods[r[0]][3] <= 0]
+        per_cost = sorted(priced, key=lambda r: -r[1] / foods[r[0]][3]) + unpriced
+        self._orders[(micro, "kcal")] = tuple(i for i, _ in per_kcal)
+        self._orders[(micro, "cost")] = tuple(i for i, _ in per_cost)
+
+    def _build(self, mask: int, micros: Iterable[str]) -> None:
+        # Ranked once per micro; filtering per mask keeps that order
+        allowed = set(self.flags.candidates(self.flags.flags_for(mask)))
+        for micro in micros:
+            for order in ORDERS:
+                self._ranked[(micro, mask, order)] = tuple(
+                    self._names[i] for i in self._orders[(micro, order)] if i in allowed
+                )
+
+    def ranked(
+        self, micro: str, diet_flags: Iterable[str] = (), by: str = "kcal"
+    ) -> Tuple[str, ...]:
+        """
+        RU: Все подходящие продукты по убыванию плотности нутриента.
+        EN: All compatible foods, densest first.
+
+        Args:
+            micro: Nutrient key
+            diet_flags: User diet flags
+            by: "kcal" (density per kcal) or "cost" (density per price unit)
+        """
+        if by not in ORDERS:
+            raise ValueError(f"Unknown booster order: {by}")
+        if micro not in self.micros:
+            return ()
+        if (micro, by) not in self._orders:
+            self._rank(micro)
+        mask = self.flags.mask(diet_flags)
+        key = (micro, mask, by)
+        if key not in self._ranked:
+            self._build(mask, (micro,))
+        return self._ranked[key]
+
+    def top(
+        self,
+        micro: str,
+        diet_flags: Iterable[str] = (),
+        k: int = 1,
+        by: str = "kcal",
+    ) -> Tuple[str, ...]:
+        """RU: Топ-k бустеров. EN: Top-k booster food names."""
+        return self.ranked(micro, diet_flags, by)[:k]
+
+    def best(
+        self, micro: str, diet_flags: Iterable[str] = (), by: str = "kcal"
+    ) -> Optional[str]:
+        """RU: Лучший бустер или None. EN: Best booster name, or None."""
+        ranked = self.ranked(micro, diet_flags, by)
+        return ranked[0] if ranked else None
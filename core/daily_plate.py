@@ -15,11 +15,15 @@ from typing import Dict, List, Set, Tuple
 from .food_db import FoodItem, parse_food_db, pick_booster_for
 from .recipe_db import (
     Recipe,
+    RecipeCatalog,
     calculate_recipe_nutrients,
     parse_recipe_db,
     scale_recipe_to_kcal,
 )
 
+# Diet flags that change the outcome of is_compatible_with_flags
+_DIET_FLAGS = ("VEG", "GF")
+
 
 def create_daily_plate(
     kcal_total: int,
@@ -139,6 +143,11 @@ def find_recipe_for_meal(
                 return recipe
 
     # If no specific recipe found, return any compatible recipe
+    if isinstance(recipe_db, RecipeCatalog):
+        index = recipe_db.flag_index(_DIET_FLAGS, is_compatible_with_flags)
+        compatible = index.candidates(diet_flags)
+        return recipe_db[compatible[0]] if compatible else None
+
     for recipe in recipe_db.values():
         if is_compatible_with_flags(recipe.flags, diet_flags):
             return recipe
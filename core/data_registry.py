@@ -0,0 +1,216 @@
+"""
+Data Registry
+
+RU: Реестр данных приложения: FoodDB/RecipeDB как неизменяемые снимки
+    с горячей перезагрузкой.
+EN: Application data registry: FoodDB/RecipeDB as immutable snapshots
+    with hot reload.
+
+Snapshots are built off the event loop and swapped in with a single
+attribute assignment, so request handlers never block on CSV parsing and
+never observe a half-loaded database.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from .food_db_new import FoodDB
+from .recipe_db_new import RecipeDB
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FOOD_PATH = "data/food_db_new.csv"
+DEFAULT_RECIPE_PATH = "data/recipes_new.csv"
+DEFAULT_WATCH_INTERVAL = float(os.getenv("DATA_WATCH_INTERVAL_SEC", "30"))
+
+
+@dataclass(frozen=True)
+class DataSnapshot:
+    """
+    RU: Неизменяемый снимок загруженных баз.
+    EN: Immutable snapshot of the loaded databases.
+    """
+
+    fooddb: FoodDB
+    recipedb: RecipeDB
+    version: str  # content fingerprint of the source files
+    generation: int  # increments on every swap in this process
+    loaded_at: str
+    load_seconds: float
+    sources: Dict[str, Tuple[int, int]]  # path -> (mtime_ns, size)
+
+
+def _signature(path: str) -> Tuple[int, int]:
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+class DataRegistry:
+    """
+    RU: Загружает базы один раз и атомарно подменяет снимок при изменениях.
+    EN: Loads databases once and atomically swaps snapshots on change.
+    """
+
+    def __init__(
+        self,
+        food_path: str = DEFAULT_FOOD_PATH,
+        recipe_path: str = DEFAULT_RECIPE_PATH,
+    ) -> None:
+        self.food_path = food_path
+        self.recipe_path = recipe_path
+        self.last_error: Optional[str] = None
+        self._snapshot: Optional[DataSnapshot] = None
+        self._generation = 0
+        self._load_lock = threading.Lock()
+        self._watch_task: Optional[asyncio.Task] = None
+
+    @property
+    def snapshot(self) -> DataSnapshot:
+        """
+        RU: Текущий снимок (загружается при первом обращении).
+        EN: Current snapshot (loaded on first access if startup did not).
+        """
+        snap = self._snapshot
+        if snap is None:
+            snap = self.reload(force=False)
+        return snap
+
+    def _paths(self) -> Tuple[str, str]:
+        return (self.food_path, self.recipe_path)
+
+    def has_changed(self) -> bool:
+        """RU: Изменились ли файлы-источники. EN: Whether source files changed."""
+        snap = self._snapshot
+        if snap is None:
+            return True
+        return any(_signature(p) != snap.sources.get(p) for p in self._paths())
+
+    def _fingerprint(self) -> str:
+        digest = hashlib.sha256()
+        for path in self._paths():
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        return digest.hexdigest()[:16]
+
+    def reload(self, force: bool = True) -> DataSnapshot:
+        """
+        RU: Построить новый снимок и подменить текущий.
+        EN: Build a new snapshot and swap it in.
+
+        Args:
+            force: Rebuild even if the source files are unchanged
+
+        Returns:
+            The snapshot now being served. On failure the previous snapshot
+            stays in place and the error is re-raised.
+        """
+        with self._load_lock:
+            if not force and self._snapshot is not None and not self.has_changed():
+                return self._snapshot
+            t0 = time.perf_counter()
+            try:
+                sources = {p: _signature(p) for p in self._paths()}
+                fooddb = FoodDB(self.food_path)
+                recipedb = RecipeDB(self.recipe_path, fooddb)
+                # warm derived indexes before publishing
+                _ = fooddb.matrix
+                _ = fooddb.booster_index
+                version = self._fingerprint()
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Data registry reload failed: {e}")
+                raise
+            self._generation += 1
+            snap = DataSnapshot(
+                fooddb=fooddb,
+                recipedb=recipedb,
+                version=version,
+                generation=self._generation,
+                loaded_at=datetime.now().isoformat(),
+                load_seconds=round(time.perf_counter() - t0, 4),
+                sources=sources,
+            )
+            self._snapshot = snap
+            self.last_error = None
+            logger.info(
+                f"Data registry loaded snapshot {snap.version} (gen {snap.generation})"
+            )
+            return snap
+
+    async def areload(self, force: bool = True) -> DataSnapshot:
+        """RU: reload() вне event loop. EN: reload() off the event loop."""
+        return await asyncio.to_thread(self.reload, force)
+
+    async def start(self, watch_interval: float = DEFAULT_WATCH_INTERVAL) -> None:
+        """
+        RU: Загрузить снимок и запустить наблюдение за файлами.
+        EN: Load the snapshot and start the mtime watcher.
+
+        Args:
+            watch_interval: Seconds between mtime checks (<= 0 disables watching)
+        """
+        await self.areload(force=False)
+        if watch_interval > 0 and self._watch_task is None:
+            self._watch_task = asyncio.create_task(self._watch(watch_interval))
+
+    async def stop(self) -> None:
+        """RU: Остановить наблюдение. EN: Stop the watcher."""
+        task, self._watch_task = self._watch_task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _watch(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if self.has_changed():
+                    await self.areload(force=False)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Data registry watcher error: {e}")
+
+    def status(self) -> Dict[str, Any]:
+        """
+        RU: Статус реестра для /api/v1/admin/db-status.
+        EN: Registry status for /api/v1/admin/db-status.
+        """
+        snap = self._snapshot
+        return {
+            "loaded": snap is not None,
+            "version": snap.version if snap else None,
+            "generation": snap.generation if snap else 0,
+            "loaded_at": snap.loaded_at if snap else None,
+            "load_seconds": snap.load_seconds if snap else None,
+            "sources": list(self._paths()),
+            "watching": self._watch_task is not None,
+            "last_error": self.last_error,
+        }
+
+
+_registry: Optional[DataRegistry] = None
+
+
+def get_data_registry() -> DataRegistry:
+    """
+    RU: Глобальный реестр данных.
+    EN: Get the global data registry.
+    """
+    global _registry
+    if _registry is None:
+        _registry = DataRegistry()
+    return _registry
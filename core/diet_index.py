@@ -0,0 +1,144 @@
+"""
+Diet Flag Index
+
+RU: Индекс совместимости рецептов с диетическими флагами (битовые маски).
+EN: Recipe/diet-flag compatibility index keyed by integer bitmasks.
+
+Only a handful of diet flags change compatibility, so every combination of
+them (``2 ** len(vocabulary)`` masks) is evaluated once at load time with
+the existing compatibility predicate. Selection is then a dict lookup;
+candidate order matches the catalogue order, so picks with a given RNG are
+identical to a linear scan.
+"""
+
+from __future__ import annotations
+
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+T = TypeVar("T")
+
+# Vocabularies up to this size are indexed for every mask at build time
+EAGER_MAX_FLAGS = 6
+
+# (slot, id, recipe flags) entries; slot None means "any slot"
+Entry = Tuple[Optional[str], Hashable, object]
+Predicate = Callable[[object, Set[str]], bool]
+
+
+class DietFlagIndex:
+    """
+    RU: Предвычисленные кортежи совместимых рецептов по (слот, маска).
+    EN: Precomputed compatible recipe ids per (slot, diet-flag mask).
+    """
+
+    def __init__(
+        self,
+        vocabulary: Sequence[str],
+        entries: Iterable[Entry],
+        compatible: Predicate,
+        other: Optional[str] = None,
+        eager: bool = True,
+    ) -> None:
+        """
+        Args:
+            vocabulary: Diet flags that affect compatibility (others are ignored)
+            entries: (slot, id, recipe_flags) in catalogue order
+            compatible: compatible(recipe_flags, diet_flags) -> bool
+            other: Vocabulary entry standing in for any flag outside the
+                vocabulary (for predicates where unknown flags matter)
+            eager: Index every mask of a small vocabulary up front; if False,
+                masks are indexed on first use
+        """
+        self.bits: Dict[str, int] = {f: 1 << i for i, f in enumerate(vocabulary)}
+        self.other_bit = self.bits.get(other, 0) if other is not None else 0
+        self._entries = list(entries)
+        self._compatible = compatible
+        self._slots = {slot for slot, _, _ in self._entries}
+        self.count = len(self._entries)
+        self._index: Dict[Tuple[Optional[str], int], Tuple[Hashable, ...]] = {}
+        if eager and len(self.bits) <= EAGER_MAX_FLAGS:
+            for mask in range(1 << len(self.bits)):
+                self._build(mask)
+
+    def _build(self, mask: int) -> None:
+        diet = self.flags_for(mask)
+        ok = [
+            (slot, rid)
+            for slot, rid, flags in self._entries
+            if self._compatible(flags, diet)
+        ]
+        for slot in self._slots:
+            self._index[(slot, mask)] = tuple(rid for s, rid in ok if s == slot)
+        # written last: its presence marks the mask as built
+        self._index[(None, mask)] = tuple(rid for _, rid in ok)
+
+    def mask(self, diet_flags: Iterable[str]) -> int:
+        """RU: Маска для набора флагов. EN: Bitmask for a set of diet flags."""
+        m = 0
+        for flag in diet_flags or ():
+            m |= self.bits.get(flag, self.other_bit)
+        return m
+
+    def flags_for(self, mask: int) -> Set[str]:
+        """RU: Флаги по маске. EN: Diet flags encoded in a mask."""
+        return {f for f, bit in self.bits.items() if mask & bit}
+
+    def candidates(
+        self, diet_flags: Iterable[str], slot: Optional[str] = None
+    ) -> Tuple[Hashable, ...]:
+        """
+        RU: Совместимые рецепты для слота (None - любой слот).
+        EN: Compatible recipe ids for a meal slot (None: any slot).
+        """
+        mask = self.mask(diet_flags)
+        if (None, mask) not in self._index:
+            # large vocabularies are indexed lazily, one mask at a time
+            self._build(mask)
+        return self._index.get((slot, mask), ())
+
+
+class IndexedDict(Dict[Any, Any]):
+    """
+    RU: Словарь с кешем производных индексов, сбрасываемым при изменении.
+    EN: Dict that caches derived indexes and drops them on any mutation.
+    """
+
+    def cached_index(self, key: Hashable, build: Callable[[], T]) -> T:
+        """
+        RU: Вернуть индекс из кеша или построить его.
+        EN: Return the cached index for key, building it on first use.
+        """
+        # Stored in __dict__ directly: unpickling sets items before state
+        indexes = self.__dict__.setdefault("_indexes", {})
+        index = indexes.get(key)
+        if index is None:
+            index = indexes[key] = build()
+        return index
+
+    def _mutated(method):  # noqa: N805 - decorator used in class body
+        def wrapper(self, *args, **kwargs):
+            self.__dict__.pop("_indexes", None)
+            return method(self, *args, **kwargs)
+
+        wrapper.__name__ = method.__name__
+        return wrapper
+
+    __setitem__ = _mutated(dict.__setitem__)
+    __delitem__ = _mutated(dict.__delitem__)
+    clear = _mutated(dict.clear)
+    pop = _mutated(dict.pop)
+    popitem = _mutated(dict.popitem)
+    setdefault = _mutated(dict.setdefault)
+    update = _mutated(dict.update)
+    del _mutated
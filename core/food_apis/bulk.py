@@ -0,0 +1,115 @@
+"""
+Bulk Fetching
+
+RU: Потоковая загрузка больших списков продуктов порциями.
+EN: Streams large id lists through an API in bounded, concurrent chunks.
+
+Ids are consumed lazily and split into provider-sized chunks; at most
+`concurrency` chunk requests are in flight at once, so memory stays flat
+no matter how many ids are fed in. Parsed items are yielded as soon as
+their chunk completes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from collections import deque
+from itertools import islice
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Iterable,
+    Iterator,
+    List,
+    Sequence,
+    TypeVar,
+)
+
+K = TypeVar("K")
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+# Chunk requests in flight at once during bulk fetches
+BULK_CONCURRENCY = int(os.getenv("FOOD_API_BULK_CONCURRENCY", "4"))
+
+
+def chunked(ids: Iterable[K], size: int) -> Iterator[List[K]]:
+    """
+    RU: Разбить последовательность на порции размера size.
+    EN: Lazily split ids into lists of at most `size` items.
+    """
+    if size < 1:
+        raise ValueError("chunk size must be positive")
+    it = iter(ids)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+async def stream_chunks(
+    fetch: Callable[[List[K]], Awaitable[Sequence[T]]],
+    ids: Iterable[K],
+    chunk_size: int,
+    concurrency: int = BULK_CONCURRENCY,
+    ordered: bool = False,
+    raise_errors: bool = False,
+) -> AsyncIterator[T]:
+    """
+    RU: Загрузить ids порциями с ограниченной параллельностью.
+    EN: Fetch ids chunk by chunk with bounded concurrency, yielding items.
+
+    Args:
+        fetch: Coroutine function returning the items for one chunk
+        ids: Ids to fetch (any iterable; consumed lazily)
+        chunk_size: Maximum ids per request
+        concurrency: Maximum chunk requests in flight
+        ordered: Yield chunks in input order instead of completion order
+        raise_errors: Re-raise a failed chunk instead of logging and skipping it
+
+    Yields:
+        Items returned by fetch
+    """
+    chunks = chunked(ids, chunk_size)
+    pending: Deque["asyncio.Task[Sequence[T]]"] = deque()
+
+    def fill() -> None:
+        while len(pending) < max(1, concurrency):
+            chunk = next(chunks, None)
+            if chunk is None:
+                return
+            pending.append(asyncio.ensure_future(fetch(chunk)))
+
+    try:
+        fill()
+        while pending:
+            if ordered:
+                task = pending[0]
+                await asyncio.wait([task])
+            else:
+                done, _ = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                task = next(t for t in pending if t in done)
+            pending.remove(task)
+            fill()
+
+            try:
+                items = task.result()
+            except Exception as e:
+                if raise_errors:
+                    raise
+                logger.error(f"Error fetching chunk: {e}")
+                continue
+            for item in items:
+                yield item
+    finally:
+        # Consumer stopped early or a chunk failed: drop the rest
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,473 @@
+"""
+Food Cache Store
+
+RU: Хранилище кэша продуктов: SQLite с поштучной записью и ленивой загрузкой.
+EN: Persistent food cache backends with per-key upserts and lazy loading.
+
+``UnifiedFoodDatabase`` used to rewrite one JSON file with every cached item
+after each API miss and parse all of it at start-up. The SQLite backend keeps
+one row per cache key instead: misses become batched upserts, items are read
+on first access, and ``compact()`` prunes old rows and reclaims free pages.
+JSON stays available as an import/export format.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional, Tuple, Union
+
+from core import sqlite_pool
+
+try:
+    from prometheus_client import Counter
+except ImportError:
+    Counter = None
+
+logger = logging.getLogger(__name__)
+
+PathLike = Union[str, Path]
+
+# Tunables (overridable via environment)
+FLUSH_BATCH_SIZE = int(os.getenv("FOOD_CACHE_FLUSH_BATCH", "32"))
+FLUSH_INTERVAL_SEC = float(os.getenv("FOOD_CACHE_FLUSH_INTERVAL_SEC", "5"))
+MAX_ENTRIES = int(os.getenv("FOOD_CACHE_MAX_ENTRIES", "0"))  # 0 = unlimited
+# In-memory bounds: positive entries (items, search result lists) and
+# negative entries (lookups that found nothing upstream)
+MEMORY_MAX_ENTRIES = int(os.getenv("FOOD_CACHE_MEMORY_SIZE", "2048"))
+POSITIVE_TTL_SEC = float(os.getenv("FOOD_CACHE_TTL_SEC", str(7 * 24 * 3600)))
+NEGATIVE_MAX_ENTRIES = int(os.getenv("FOOD_CACHE_NEGATIVE_SIZE", "1024"))
+NEGATIVE_TTL_SEC = float(os.getenv("FOOD_CACHE_NEGATIVE_TTL_SEC", "300"))
+# Free-page share above which compact() runs VACUUM
+VACUUM_FREE_RATIO = float(os.getenv("FOOD_CACHE_VACUUM_FREE_RATIO", "0.25"))
+
+if Counter is not None:
+    CACHE_EVENTS = Counter(
+        "unified_food_cache_events_total",
+        "Unified food cache events by entry kind and event "
+        "(hit/load/miss/eviction/expiration)",
+        ["kind", "event"],
+    )
+else:
+    CACHE_EVENTS = None
+
+_MISSING = object()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS food_cache (
+    key TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+class FoodCacheBackend:
+    """
+    RU: Базовый интерфейс хранилища кэша (ключ -> словарь полей продукта).
+    EN: Cache backend interface mapping keys to JSON-serialisable dicts.
+    """
+
+    def get(
+        self, key: str, max_age: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        RU: Запись по ключу или None.
+        EN: Record for key, or None if missing or older than max_age seconds.
+        """
+        raise NotImplementedError
+
+    def put_many(self, records: Mapping[str, Dict[str, Any]]) -> None:
+        """RU: Вставить/обновить записи. EN: Upsert records in one batch."""
+        raise NotImplementedError
+
+    def keys(self) -> Iterator[str]:
+        """RU: Все ключи. EN: Iterate over stored keys."""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def compact(self, max_entries: Optional[int] = None) -> int:
+        """
+        RU: Удалить старые записи сверх лимита и освободить место.
+        EN: Drop the oldest records beyond max_entries and reclaim space.
+
+        Returns:
+            Number of records removed
+        """
+        return 0
+
+    def close(self) -> None:
+        """RU: Освободить ресурсы. EN: Release resources."""
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self.get(key) is not None
+
+    def import_json(self, path: PathLike) -> int:
+        """
+        RU: Импортировать записи из JSON-файла формата {ключ: запись}.
+        EN: Import records from a {key: record} JSON file.
+
+        Returns:
+            Number of records imported
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            records = json.load(f)
+        self.put_many(records)
+        return len(records)
+
+    def export_json(self, path: PathLike) -> int:
+        """
+        RU: Выгрузить все записи в JSON-файл.
+        EN: Export every record to a {key: record} JSON file.
+
+        Returns:
+            Number of records exported
+        """
+        records = {key: self.get(key) for key in self.keys()}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(records, f, indent=2, ensure_ascii=False)
+        return len(records)
+
+
+class MemoryFoodCache(FoodCacheBackend):
+    """
+    RU: Кэш в памяти без сохранения на диск (для тестов и временных сессий).
+    EN: Non-persistent in-memory backend (tests, throwaway sessions).
+    """
+
+    def __init__(self) -> None:
+        # key -> (record, updated_at)
+        self._records: Dict[str, Tuple[Dict[str, Any], float]] = {}
+
+    def get(
+        self, key: str, max_age: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        entry = self._records.get(key)
+        if entry is None or (max_age is not None and time.time() - entry[1] > max_age):
+            return None
+        return entry[0]
+
+    def put_many(self, records: Mapping[str, Dict[str, Any]]) -> None:
+        # re-inserting moves a key to the end, so dict order is update order
+        now = time.time()
+        for key, record in records.items():
+            self._records.pop(key, None)
+            self._records[key] = (record, now)
+
+    def keys(self) -> Iterator[str]:
+        return iter(list(self._records))
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def compact(self, max_entries: Optional[int] = None) -> int:
+        limit = MAX_ENTRIES if max_entries is None else max_entries
+        excess = len(self._records) - limit if limit > 0 else 0
+        for key in list(self._records)[: max(excess, 0)]:
+            del self._records[key]
+        return max(excess, 0)
+
+
+class SQLiteFoodCache(FoodCacheBackend):
+    """
+    RU: Кэш продуктов в SQLite: одна строка на ключ.
+    EN: SQLite-backed food cache with one row per key.
+
+    The file stays in WAL mode. Flushes are short transactions on the
+    file's long-lived write connection (``sqlite_pool.writer``), so they
+    neither block nor reopen the pooled readers of other requests, threads
+    or processes.
+    """
+
+    def __init__(self, path: PathLike) -> None:
+        """
+        Args:
+            path: Database file (created with its schema if missing)
+        """
+        self.path = Path(path)
+        with sqlite_pool.writer(self.path) as con:
+            con.execute(_SCHEMA)
+            con.execute(
+                "CREATE INDEX IF NOT EXISTS food_cache_updated "
+                "ON food_cache(updated_at)"
+            )
+
+    def get(
+        self, key: str, max_age: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        cutoff = time.time() - max_age if max_age is not None else float("-inf")
+        row = (
+            sqlite_pool.reader(self.path)
+            .execute(
+                "SELECT data FROM food_cache WHERE key = ? AND updated_at >= ?",
+                (key, cutoff),
+            )
+            .fetchone()
+        )
+        return json.loads(row[0]) if row else None
+
+    def put_many(self, records: Mapping[str, Dict[str, Any]]) -> None:
+        if not records:
+            return
+        now = time.time()
+        rows = [
+            (key, json.dumps(record, ensure_ascii=False), now)
+            for key, record in records.items()
+        ]
+        with sqlite_pool.writer(self.path) as con:
+            con.executemany(
+                "INSERT INTO food_cache(key, data, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET "
+                "data = excluded.data, updated_at = excluded.updated_at",
+                rows,
+            )
+
+    def keys(self) -> Iterator[str]:
+        rows = (
+            sqlite_pool.reader(self.path)
+            .execute("SELECT key FROM food_cache ORDER BY updated_at, rowid")
+            .fetchall()
+        )
+        return iter([row[0] for row in rows])
+
+    def __len__(self) -> int:
+        con = sqlite_pool.reader(self.path)
+        return con.execute("SELECT COUNT(*) FROM food_cache").fetchone()[0]
+
+    def compact(self, max_entries: Optional[int] = None) -> int:
+        limit = MAX_ENTRIES if max_entries is None else max_entries
+        with sqlite_pool.writer(self.path) as con:
+            removed = 0
+            if limit > 0:
+                removed = con.execute(
+                    "DELETE FROM food_cache WHERE rowid NOT IN ("
+                    "SELECT rowid FROM food_cache "
+                    "ORDER BY updated_at DESC, rowid DESC LIMIT ?)",
+                    (limit,),
+                ).rowcount
+            pages = con.execute("PRAGMA page_count").fetchone()[0]
+            free = con.execute("PRAGMA freelist_count").fetchone()[0]
+        if pages and free / pages > VACUUM_FREE_RATIO:
+            # VACUUM cannot run in a transaction; a separate autocommit
+            # connection keeps it off the shared writer
+            vacuum = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            try:
+                vacuum.execute("VACUUM")
+            finally:
+                vacuum.close()
+        logger.info(f"Compacted food cache: {removed} records removed")
+        return removed
+
+
+class LazyItemCache(Dict[str, Any]):
+    """
+    RU: Ограниченный LRU/TTL-кэш над хранилищем с негативными записями.
+    EN: Bounded LRU/TTL dict over a backend, with separate negative entries.
+
+    Items are loaded from the backend on first access and the least recently
+    used ones are evicted beyond ``max_entries``; entries older than
+    ``ttl_seconds`` (in memory or in the store) count as missing. Lookups
+    that found nothing upstream are remembered in a smaller negative cache
+    with a shorter TTL. Writes are encoded on ``__setitem__`` and kept
+    pending until ``flush()`` upserts them in one batch (write-behind), so
+    evicting an unflushed entry loses nothing.
+    """
+
+    def __init__(
+        self,
+        backend: FoodCacheBackend,
+        decode: Callable[[Dict[str, Any]], Any],
+        encode: Callable[[Any], Dict[str, Any]],
+        max_entries: int = MEMORY_MAX_ENTRIES,
+        ttl_seconds: float = POSITIVE_TTL_SEC,
+        negative_max_entries: int = NEGATIVE_MAX_ENTRIES,
+        negative_ttl_seconds: float = NEGATIVE_TTL_SEC,
+    ) -> None:
+        super().__init__()
+        self.backend = backend
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.negative_max_entries = negative_max_entries
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._decode = decode
+        self._encode = encode
+        self._expires: Dict[str, float] = {}
+        self._negative: "OrderedDict[str, float]" = OrderedDict()
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self.last_flush = time.monotonic()
+
+    def _count(self, kind: str, event: str) -> None:
+        name = f"{kind}_{event}"
+        self._counts[name] = self._counts.get(name, 0) + 1
+        if CACHE_EVENTS is not None:
+            CACHE_EVENTS.labels(kind=kind, event=event).inc()
+
+    def _insert(self, key: str, value: Any, now: float) -> None:
+        dict.pop(self, key, None)
+        dict.__setitem__(self, key, value)
+        self._expires[key] = now + self.ttl_seconds
+        while dict.__len__(self) > max(self.max_entries, 1):
+            oldest = next(iter(dict.keys(self)))
+            dict.__delitem__(self, oldest)
+            self._expires.pop(oldest, None)
+            self._count("positive", "eviction")
+
+    def _lookup(self, key: object, load: bool = True) -> Any:
+        if not isinstance(key, str):
+            return _MISSING
+        now = time.monotonic()
+        with self._lock:
+            if dict.__contains__(self, key):
+                if self._expires.get(key, now) > now:
+                    value = dict.pop(self, key)
+                    dict.__setitem__(self, key, value)  # most recently used
+                    self._count("positive", "hit")
+                    return value
+                dict.__delitem__(self, key)
+                self._expires.pop(key, None)
+                self._count("positive", "expiration")
+            record = self._pending.get(key)
+        if record is None and not load:
+            return _MISSING
+        if record is None:
+            try:
+                record = self.backend.get(key, max_age=self.ttl_seconds)
+            except Exception as e:
+                logger.error(f"Error reading cache key {key}: {e}")
+        if record is None:
+            self._count("positive", "miss")
+            return _MISSING
+        value = self._decode(record)
+        with self._lock:
+            self._insert(key, value, now)
+            self._count("positive", "load")
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return self._lookup(key) is not _MISSING
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._lookup(key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    async def aget(self, key: str, default: Any = None) -> Any:
+        """
+        RU: Асинхронный get: чтение хранилища выполняется в потоке.
+        EN: Async get: memory hits stay on the loop, store reads run in a thread.
+        """
+        value = self._lookup(key, load=False)
+        if value is _MISSING:
+            value = await asyncio.to_thread(self._lookup, key)
+        return default if value is _MISSING else value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        record = self._encode(value)
+        with self._lock:
+            self._insert(key, value, time.monotonic())
+            self._pending[key] = record
+            self._negative.pop(key, None)
+
+    def clear(self) -> None:
+        """RU: Очистить память (не хранилище). EN: Drop in-memory entries."""
+        with self._lock:
+            dict.clear(self)
+            self._expires.clear()
+            self._negative.clear()
+
+    def put_negative(self, key: str) -> None:
+        """
+        RU: Запомнить, что по ключу ничего не найдено.
+        EN: Remember that an upstream lookup for key found nothing.
+        """
+        if self.negative_max_entries <= 0 or self.negative_ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._negative[key] = time.monotonic() + self.negative_ttl_seconds
+            self._negative.move_to_end(key)
+            while len(self._negative) > self.negative_max_entries:
+                self._negative.popitem(last=False)
+                self._count("negative", "eviction")
+
+    def is_negative(self, key: str) -> bool:
+        """
+        RU: Есть ли действующая негативная запись для ключа.
+        EN: Whether key has a live negative entry.
+        """
+        with self._lock:
+            expires = self._negative.get(key)
+            if expires is not None and expires > time.monotonic():
+                self._negative.move_to_end(key)
+                self._count("negative", "hit")
+                return True
+            if expires is not None:
+                del self._negative[key]
+                self._count("negative", "expiration")
+            self._count("negative", "miss")
+            return False
+
+    @property
+    def pending(self) -> int:
+        """RU: Число несохраненных ключей. EN: Number of unflushed keys."""
+        return len(self._pending)
+
+    def flush_due(self) -> bool:
+        """
+        RU: Пора ли сбросить накопленные изменения.
+        EN: Whether the pending batch is full or old enough to flush.
+        """
+        return bool(self._pending) and (
+            len(self._pending) >= FLUSH_BATCH_SIZE
+            or time.monotonic() - self.last_flush >= FLUSH_INTERVAL_SEC
+        )
+
+    def flush(self) -> int:
+        """
+        RU: Записать измененные элементы в хранилище одним пакетом.
+        EN: Upsert pending items into the backend in one batch.
+
+        Items stay pending if the write fails, so the next flush retries them.
+
+        Returns:
+            Number of items written
+        """
+        with self._lock:
+            records, self._pending = self._pending, {}
+        try:
+            self.backend.put_many(records)
+        except BaseException:
+            with self._lock:
+                for key, record in records.items():
+                    self._pending.setdefault(key, record)
+            raise
+        self.last_flush = time.monotonic()
+        return len(records)
+
+    def stats(self) -> Dict[str, Any]:
+        """RU: Статистика кэша. EN: Cache statistics."""
+        return {
+            "entries": dict.__len__(self),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "negative_entries": len(self._negative),
+            "negative_max_entries": self.negative_max_entries,
+            "negative_ttl_seconds": self.negative_ttl_seconds,
+            "pending": len(self._pending),
+            **self._counts,
+        }
@@ -0,0 +1,238 @@
+"""
+Conditional HTTP Cache
+
+RU: Постоянный HTTP-кэш с валидаторами (ETag/Last-Modified) для API продуктов.
+EN: Persistent validator-based HTTP cache for the food API clients.
+
+GET responses carrying an ``ETag`` or ``Last-Modified`` header are stored
+in SQLite together with their validators. The next request for the same URL
+sends ``If-None-Match``/``If-Modified-Since``; a ``304 Not Modified`` is
+answered from the stored body, so unchanged upstream data costs a tiny
+round trip instead of a full download. ``track_changes()`` tells callers
+whether any response in a block of work actually changed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple, Union
+from urllib.parse import urlencode
+
+import httpx
+
+from core import sqlite_pool
+
+logger = logging.getLogger(__name__)
+
+PathLike = Union[str, Path]
+
+# Query parameters left out of cache keys (credentials)
+_UNKEYED_PARAMS = {"api_key"}
+# Stored response headers; content-encoding/length describe the raw body
+_KEPT_HEADERS = ("content-type", "etag", "last-modified", "cache-control")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS http_cache (
+    key TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+@dataclass
+class ChangeTracker:
+    """
+    RU: Счетчики ответов внутри track_changes().
+    EN: Response counts collected inside track_changes().
+    """
+
+    changed: int = 0
+    not_modified: int = 0
+
+    @property
+    def unchanged(self) -> bool:
+        """True if requests were made and none of them returned new data."""
+        return self.changed == 0 and self.not_modified > 0
+
+
+_tracker: ContextVar[Optional[ChangeTracker]] = ContextVar(
+    "_http_cache_tracker", default=None
+)
+
+
+@contextmanager
+def track_changes() -> Iterator[ChangeTracker]:
+    """
+    RU: Считать измененные и неизмененные ответы в блоке.
+    EN: Count changed and not-modified responses made in the block.
+    """
+    tracker = ChangeTracker()
+    token = _tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _tracker.reset(token)
+
+
+def _record(changed: bool) -> None:
+    tracker = _tracker.get()
+    if tracker is None:
+        return
+    if changed:
+        tracker.changed += 1
+    else:
+        tracker.not_modified += 1
+
+
+def cache_key(request: httpx.Request) -> str:
+    """Cache key for a request: method and URL without credentials."""
+    params = [
+        (k, v) for k, v in request.url.params.multi_items() if k not in _UNKEYED_PARAMS
+    ]
+    url = request.url.copy_with(query=urlencode(sorted(params)).encode() or None)
+    return f"{request.method} {url}"
+
+
+class HTTPResponseCache:
+    """
+    RU: SQLite-хранилище ответов с валидаторами.
+    EN: SQLite store of response bodies and their validators.
+    """
+
+    def __init__(self, path: PathLike) -> None:
+        """
+        Args:
+            path: Database file (created with its schema if missing)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with sqlite_pool.writer(self.path) as con:
+            con.execute(_SCHEMA)
+
+    def get(
+        self, key: str
+    ) -> Optional[Tuple[Optional[str], Optional[str], Dict[str, str], bytes]]:
+        """Return (etag, last_modified, headers, body) for a key, if stored."""
+        row = (
+            sqlite_pool.reader(self.path)
+            .execute(
+                "SELECT etag, last_modified, headers, body FROM http_cache WHERE key = ?",
+                (key,),
+            )
+            .fetchone()
+        )
+        if row is None:
+            return None
+        return row[0], row[1], json.loads(row[2]), bytes(row[3])
+
+    def put(self, key: str, headers: Dict[str, str], body: bytes) -> None:
+        """Store a response body with its validators."""
+        with sqlite_pool.writer(self.path) as con:
+            con.execute(
+                "INSERT INTO http_cache"
+                "(key, etag, last_modified, headers, body, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET etag = excluded.etag, "
+                "last_modified = excluded.last_modified, "
+                "headers = excluded.headers, body = excluded.body, "
+                "updated_at = excluded.updated_at",
+                (
+                    key,
+                    headers.get("etag"),
+                    headers.get("last-modified"),
+                    json.dumps(headers),
+                    body,
+                    time.time(),
+                ),
+            )
+
+    def __len__(self) -> int:
+        con = sqlite_pool.reader(self.path)
+        return con.execute("SELECT COUNT(*) FROM http_cache").fetchone()[0]
+
+
+class ConditionalCacheTransport(httpx.AsyncBaseTransport):
+    """
+    RU: Транспорт httpx с условными запросами поверх HTTPResponseCache.
+    EN: httpx transport that revalidates GETs against an HTTPResponseCache.
+
+    Only GET requests are cached; other methods pass straight through.
+    SQLite reads and writes run in worker threads, off the event loop.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, cache: HTTPResponseCache):
+        self.transport = transport
+        self.cache = cache
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method != "GET":
+            return await self.transport.handle_async_request(request)
+
+        key = cache_key(request)
+        try:
+            stored = await asyncio.to_thread(self.cache.get, key)
+        except Exception as e:
+            logger.warning(f"HTTP cache read failed: {e}")
+            stored = None
+        if stored is not None:
+            etag, last_modified, _, _ = stored
+            if etag:
+                request.headers["If-None-Match"] = etag
+            if last_modified:
+                request.headers["If-Modified-Since"] = last_modified
+
+        response = await self.transport.handle_async_request(request)
+
+        if response.status_code == 304 and stored is not None:
+            await response.aclose()
+            _record(changed=False)
+            _, _, headers, body = stored
+            return httpx.Response(
+                200,
+                headers=headers,
+                content=body,
+                request=request,
+                extensions={"food_api_cache": "revalidated"},
+            )
+
+        if response.status_code != 200:
+            _record(changed=True)
+            return response
+
+        # Read the (decoded) body once so it can be stored and replayed
+        body = await response.aread()
+        await response.aclose()
+        headers = {
+            name: response.headers[name]
+            for name in _KEPT_HEADERS
+            if name in response.headers
+        }
+        changed = stored is None or stored[3] != body
+        _record(changed=changed)
+        if "etag" in headers or "last-modified" in headers:
+            try:
+                await asyncio.to_thread(self.cache.put, key, headers, body)
+            except Exception as e:
+                logger.warning(f"HTTP cache write failed: {e}")
+
+        return httpx.Response(
+            200,
+            headers=headers,
+            content=body,
+            request=request,
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
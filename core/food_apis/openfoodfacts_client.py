@@ -13,14 +13,16 @@ Data License: Open Database License (ODbL)
 
 from __future__ import annotations
 
-import asyncio
 import inspect
 import logging
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
 
 import httpx
 
+from .bulk import BULK_CONCURRENCY, stream_chunks
+from .transport import create_http_client
+
 logger = logging.getLogger(__name__)
 
 # Flag to indicate if Open Food Facts client is available
@@ -104,12 +106,16 @@ class OFFClient:
 
     BASE_URL = "https://world.openfoodfacts.org/api/v2"
 
-    def __init__(self):
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
         """
         Initialize Open Food Facts client.
+
+        Args:
+            http_client: Shared HTTP client; its owner is responsible for closing it
         """
         # Underlying async HTTP client
-        self.client = httpx.AsyncClient()
+        self._owns_client = http_client is None
+        self.client = http_client or create_http_client()
 
         # Common nutrient mappings (Open Food Facts nutrient names to our standard names)
         self.nutrient_mapping = {
@@ -142,7 +148,7 @@ class OFFClient:
         }
 
     async def search_products(
-        self, query: str, page_size: int = 25
+        self, query: str, page_size: int = 25, *, raise_errors: bool = False
     ) -> List[OFFFoodItem]:
         """
         RU: Поиск продуктов по названию.
@@ -151,6 +157,7 @@ class OFFClient:
         Args:
             query: Search query (e.g., "chocolate")
             page_size: Number of results to return (max 100)
+            raise_errors: Re-raise request errors instead of returning []
 
         Returns:
             List of OFFFoodItem objects
@@ -185,16 +192,22 @@ class OFFClient:
             return products
 
         except Exception as e:
+            if raise_errors:
+                raise
             logger.error(f"Error searching Open Food Facts products for '{query}': {e}")
             return []
 
-    async def get_product_details(self, barcode: str) -> Optional[OFFFoodItem]:
+    async def get_product_details(
+        self, barcode: str, *, raise_errors: bool = False
+    ) -> Optional[OFFFoodItem]:
         """
         RU: Получить детальную информацию о продукте по штрихкоду.
         EN: Get detailed product information by barcode.
 
         Args:
             barcode: Product barcode
+            raise_errors: Re-raise request errors instead of returning None;
+                an unknown barcode still returns None
 
         Returns:
             OFFFoodItem or None if not found
@@ -209,6 +222,8 @@ class OFFClient:
             }
 
             response = await self.client.get(url, params=params)
+            if raise_errors and response.status_code == 404:
+                return None
             maybe = response.raise_for_status()
             if inspect.isawaitable(maybe):
                 await maybe
@@ -219,6 +234,8 @@ class OFFClient:
                 return self._parse_product_item(data.get("product", {}))
 
         except Exception as e:
+            if raise_errors:
+                raise
             logger.error(
                 f"Error getting Open Food Facts product details for barcode {barcode}: {e}"
             )
@@ -303,24 +320,55 @@ class OFFClient:
             logger.error(f"Error parsing Open Food Facts product data: {e}")
             return None
 
-    async def get_multiple_products(self, barcodes: List[str]) -> List[OFFFoodItem]:
+    async def get_multiple_products(self, barcodes: Iterable[str]) -> List[OFFFoodItem]:
         """
         RU: Получить информацию о нескольких продуктах по штрихкодам.
         EN: Get information for multiple products by barcodes.
+
+        Returns products in barcode order; missing or failed ones are skipped.
+        """
+        return [item async for item in self.iter_products(barcodes, ordered=True)]
+
+    def iter_products(
+        self,
+        barcodes: Iterable[str],
+        concurrency: int = BULK_CONCURRENCY,
+        ordered: bool = False,
+    ) -> AsyncIterator[OFFFoodItem]:
         """
-        tasks = [self.get_product_details(barcode) for barcode in barcodes]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        RU: Потоковая загрузка продуктов с ограниченной параллельностью.
+        EN: Stream products for any number of barcodes with bounded concurrency.
 
-        # Filter out exceptions and None values
-        valid_results = []
-        for result in results:
-            if isinstance(result, Exception):
-                logger.error(f"Error fetching product: {result}")
-            elif result is not None:
-                valid_results.append(result)
+        Each barcode is one product read: OFF has no batch product endpoint,
+        and its search API (which can filter by code) is rate limited far
+        more strictly than product reads.
 
-        return valid_results
+        Args:
+            barcodes: Product barcodes (consumed lazily)
+            concurrency: Maximum product requests in flight
+            ordered: Yield in barcode order instead of completion order
+
+        Yields:
+            OFFFoodItem objects
+        """
+        return stream_chunks(
+            self._fetch_products_chunk,
+            barcodes,
+            1,
+            concurrency=concurrency,
+            ordered=ordered,
+        )
+
+    async def _fetch_products_chunk(self, barcodes: List[str]) -> List[OFFFoodItem]:
+        """Fetch one chunk of products, skipping missing ones."""
+        products = []
+        for barcode in barcodes:
+            product = await self.get_product_details(barcode)
+            if product is not None:
+                products.append(product)
+        return products
 
     async def close(self):
-        """Close the HTTP client."""
-        await self.client.aclose()
+        """Close the HTTP client unless it was injected."""
+        if self._owns_client:
+            await self.client.aclose()
@@ -0,0 +1,173 @@
+"""
+Upstream Rate Limiting
+
+RU: Ограничение частоты запросов к API продуктов и повторы с джиттером.
+EN: Per-source token buckets and jittered retries for food API calls.
+
+Each upstream gets a token bucket sized to its published limits; USDA's
+shared DEMO_KEY allows far fewer calls than a personal api.data.gov key.
+Transient failures (network errors, 429 and 5xx responses) are retried
+with exponential backoff and full jitter, honouring ``Retry-After``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+import httpx
+
+T = TypeVar("T")
+
+# (requests per second, burst) per source; overridable via environment
+SOURCE_LIMITS: Dict[str, Tuple[float, float]] = {
+    # DEMO_KEY: 30 requests per hour per IP
+    "usda_demo": (float(os.getenv("USDA_DEMO_RATE_PER_HOUR", "30")) / 3600, 30),
+    # api.data.gov keys: 1000 requests per hour
+    "usda": (float(os.getenv("USDA_RATE_PER_HOUR", "1000")) / 3600, 50),
+    # Open Food Facts search: 10 requests per minute
+    "openfoodfacts": (float(os.getenv("OFF_RATE_PER_MIN", "10")) / 60, 10),
+}
+# Longest a caller queues for a token before giving up
+MAX_WAIT_SEC = float(os.getenv("FOOD_API_MAX_WAIT_SEC", "30"))
+
+RETRY_ATTEMPTS = int(os.getenv("FOOD_API_RETRY_ATTEMPTS", "3"))
+RETRY_BASE_SEC = float(os.getenv("FOOD_API_RETRY_BASE_SEC", "0.25"))
+RETRY_MAX_SEC = float(os.getenv("FOOD_API_RETRY_MAX_SEC", "8"))
+
+_TRANSIENT_STATUS = {429, 500, 502, 503, 504}
+
+
+class RateLimitExceeded(Exception):
+    """
+    RU: Лимит запросов исчерпан дольше допустимого ожидания.
+    EN: Raised when a token would not be available within the allowed wait.
+    """
+
+    def __init__(self, source: str, wait: float) -> None:
+        super().__init__(f"{source} rate limit: next slot in {wait:.1f}s")
+        self.wait = wait
+
+
+class UpstreamUnavailable(Exception):
+    """
+    RU: Источник недоступен (сетевые ошибки после всех повторов).
+    EN: Raised for calls to a source already found unreachable.
+    """
+
+    def __init__(self, source: str) -> None:
+        super().__init__(f"{source} is unreachable")
+        self.source = source
+
+
+class TokenBucket:
+    """
+    RU: Ведро токенов: не более rate запросов в секунду со всплеском burst.
+    EN: Token bucket allowing `rate` calls per second with bursts of `burst`.
+
+    Callers reserve a token immediately and sleep until it is due, so waiters
+    are served in arrival order.
+    """
+
+    def __init__(self, rate: float, burst: float, name: str = "") -> None:
+        self.rate = rate
+        self.burst = burst
+        self.name = name
+        self._tokens = burst
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, max_wait: Optional[float] = MAX_WAIT_SEC) -> None:
+        """
+        RU: Получить токен, подождав при необходимости.
+        EN: Take one token, sleeping until it is available.
+
+        Raises:
+            RateLimitExceeded: If the wait would exceed max_wait
+        """
+        self._refill(time.monotonic())
+        wait = max(0.0, (1 - self._tokens) / self.rate) if self.rate > 0 else 0.0
+        if max_wait is not None and wait > max_wait:
+            raise RateLimitExceeded(self.name, wait)
+        self._tokens -= 1
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def release(self) -> None:
+        """
+        RU: Вернуть неиспользованный токен.
+        EN: Give back a token whose request never reached the upstream.
+        """
+        self._refill(time.monotonic())
+        self._tokens = min(self.burst, self._tokens + 1)
+
+
+def bucket_for(source: str, api_key: Optional[str] = None) -> TokenBucket:
+    """
+    RU: Новое ведро токенов с лимитами источника.
+    EN: Create a token bucket with the source's limits.
+
+    Args:
+        source: "usda" or "openfoodfacts"
+        api_key: USDA key; DEMO_KEY (or none) selects the demo limits
+    """
+    if source == "usda" and api_key in (None, "", "DEMO_KEY"):
+        source = "usda_demo"
+    rate, burst = SOURCE_LIMITS.get(source, (0.0, 1.0))
+    return TokenBucket(rate, burst, name=source)
+
+
+def is_transient(exc: BaseException) -> bool:
+    """
+    RU: Временная ли ошибка (сеть, 429, 5xx).
+    EN: Whether a failure is worth retrying (network, 429, 5xx).
+    """
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in _TRANSIENT_STATUS
+    return isinstance(exc, (httpx.TransportError, asyncio.TimeoutError))
+
+
+def _retry_after(exc: BaseException) -> float:
+    if isinstance(exc, httpx.HTTPStatusError):
+        try:
+            return float(exc.response.headers.get("Retry-After", 0))
+        except ValueError:
+            return 0.0
+    return 0.0
+
+
+async def retry_with_jitter(
+    fn: Callable[[], Awaitable[T]],
+    attempts: int = RETRY_ATTEMPTS,
+    base_delay: float = RETRY_BASE_SEC,
+    max_delay: float = RETRY_MAX_SEC,
+) -> T:
+    """
+    RU: Вызвать fn с повторами временных ошибок (экспонента + джиттер).
+    EN: Call fn, retrying transient failures with full-jitter backoff.
+
+    Args:
+        fn: Zero-argument coroutine function
+        attempts: Total number of calls, including the first
+        base_delay: Backoff base in seconds
+        max_delay: Backoff cap in seconds
+
+    Returns:
+        Result of the first successful call
+    """
+    attempt = 0
+    while True:
+        try:
+            return await fn()
+        except Exception as e:
+            attempt += 1
+            if attempt >= attempts or not is_transient(e):
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1)))
+            await asyncio.sleep(min(max(delay, _retry_after(e)), max_delay))
@@ -6,20 +6,83 @@ EN: Scheduler for automatic database updates.
 
 This module provides scheduled background tasks for keeping nutrition
 databases up to date with minimal impact on application performance.
+
+The update loop sleeps until the next source is due instead of polling.
+Each source has its own interval and next-run time, persisted next to the
+version data so a restart resumes the schedule rather than updating at once.
+Failed updates are retried with exponential backoff and jitter. Forced
+updates go through a priority queue ahead of scheduled work and cancel a
+scheduled update in progress, which is requeued behind them.
 """
 
 from __future__ import annotations
 
 import asyncio
+import heapq
+import itertools
+import json
 import logging
+import random
 import signal
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
+
+import httpx
 
+from .transport import get_shared_http_client
 from .update_manager import DatabaseUpdateManager, UpdateResult
 
 logger = logging.getLogger(__name__)
 
+# Job priorities (lower runs first)
+PRIORITY_FORCED = 0
+PRIORITY_SCHEDULED = 1
+
+# First delay after an unexpected error in the update loop itself
+LOOP_ERROR_DELAY = timedelta(minutes=1)
+# Shortest gap between two runs of a source (or checks, before start())
+MIN_RUN_GAP = timedelta(minutes=1)
+
+
+@dataclass
+class SourceSchedule:
+    """
+    RU: Расписание обновлений одного источника.
+    EN: Update schedule of one source.
+    """
+
+    source: str
+    interval: timedelta
+    next_run: datetime
+    failures: int = 0
+
+
+@dataclass(order=True)
+class _Job:
+    """Queued update; forced jobs sort ahead of scheduled ones."""
+
+    priority: int
+    seq: int
+    source: str = field(compare=False)
+    future: Optional["asyncio.Future[UpdateResult]"] = field(
+        default=None, compare=False
+    )
+
+
+def backoff_delay(
+    base: timedelta, attempt: int, cap: timedelta, jitter: float = 0.5
+) -> timedelta:
+    """
+    RU: Экспоненциальная задержка с джиттером.
+    EN: Exponential backoff delay with jitter.
+
+    The delay doubles with each attempt up to ``cap``; the last ``jitter``
+    fraction of it is randomised so sources failing together spread out.
+    """
+    delay = min(base * (2 ** min(max(attempt - 1, 0), 32)), cap)
+    return delay * (1 - jitter * random.random())
+
 
 class DatabaseUpdateScheduler:
     """
@@ -28,8 +91,9 @@ class DatabaseUpdateScheduler:
 
     Features:
     - Non-blocking background updates
-    - Configurable update intervals
-    - Error handling and retry logic
+    - Per-source update intervals, persisted across restarts
+    - Exponential backoff with jitter on failures
+    - Forced updates that preempt scheduled work
     - Graceful shutdown handling
     - Update notifications and logging
     """
@@ -39,19 +103,41 @@ class DatabaseUpdateScheduler:
         update_interval_hours: int = 24,
         retry_interval_minutes: int = 30,
         max_retries: int = 3,
+        source_interval_hours: Optional[Dict[str, float]] = None,
+        cache_dir: str = "cache/food_db",
+        shutdown_timeout_seconds: float = 30.0,
+        http_client: Optional[httpx.AsyncClient] = None,
     ):
         self.update_interval = timedelta(hours=update_interval_hours)
+        self.source_intervals = {
+            source: timedelta(hours=hours)
+            for source, hours in (source_interval_hours or {}).items()
+        }
         self.retry_interval = timedelta(minutes=retry_interval_minutes)
         self.max_retries = max_retries
+        self.shutdown_timeout = shutdown_timeout_seconds
 
         self.update_manager = DatabaseUpdateManager(
-            update_interval_hours=update_interval_hours
+            cache_dir=cache_dir,
+            update_interval_hours=update_interval_hours,
+            source_interval_hours=source_interval_hours,
+            http_client=http_client,
         )
 
         # State tracking
         self.is_running = False
         self.last_update_check: Optional[datetime] = None
         self.retry_counts: Dict[str, int] = {}
+        self.schedule: Dict[str, SourceSchedule] = {}
+        self.state_file = self.update_manager.cache_dir / "scheduler_state.json"
+
+        # Forced and scheduled jobs, and the event that wakes the loop
+        self._queue: List[_Job] = []
+        self._seq = itertools.count()
+        self._wake = asyncio.Event()
+        self._loop_failures = 0
+        self._busy = False
+        self._scheduled_task: Optional[asyncio.Future] = None
 
         # Background task
         self._update_task: Optional[asyncio.Task] = None
@@ -88,7 +174,10 @@ class DatabaseUpdateScheduler:
         self.is_running = True
         logger.info("Starting database update scheduler...")
 
+        self._load_schedule()
+
         # Start background update task
+        self._wake = asyncio.Event()
         self._update_task = asyncio.create_task(self._update_loop())
 
         logger.info(f"Update scheduler started (interval: {self.update_interval})")
@@ -97,15 +186,27 @@ class DatabaseUpdateScheduler:
         """
         RU: Останавливает планировщик обновлений.
         EN: Stop the update scheduler.
+
+        An update in progress gets ``shutdown_timeout`` seconds to finish
+        before the background task is cancelled.
         """
         if not self.is_running:
             return
 
         logger.info("Stopping database update scheduler...")
         self.is_running = False
+        self._wake.set()
+
+        # Drop queued jobs; scheduled sources stay due for the next start
+        for job in self._queue:
+            if job.future and not job.future.done():
+                job.future.cancel()
+        self._queue.clear()
 
-        # Cancel background task
+        # Let an update in progress finish, then cancel the background task
         if self._update_task and not self._update_task.done():
+            if self._busy:
+                await asyncio.wait({self._update_task}, timeout=self.shutdown_timeout)
             self._update_task.cancel()
             try:
                 await self._update_task
@@ -118,54 +219,113 @@ class DatabaseUpdateScheduler:
         logger.info("Database update scheduler stopped")
 
     async def _update_loop(self):
-        """Main update loop running in background."""
+        """Main update loop: run queued jobs, then sleep until a source is due."""
         while self.is_running:
             try:
-                # Check if it's time for updates
+                if self._queue:
+                    await self._run_busy(self._drain_queue())
+                    continue
+
                 current_time = datetime.now()
 
                 if self._should_check_for_updates(current_time):
-                    await self._run_update_check()
+                    await self._run_busy(self._run_update_check())
                     self.last_update_check = current_time
+                else:
+                    await self._wait_until_due(current_time)
 
-                # Sleep for a short interval before next check
-                await asyncio.sleep(60)  # Check every minute
+                self._loop_failures = 0
 
             except asyncio.CancelledError:
                 logger.info("Update loop cancelled")
                 break
             except Exception as e:
                 logger.error(f"Error in update loop: {e}")
-                # Continue running despite errors
-                await asyncio.sleep(300)  # Wait 5 minutes before retrying
+                # Continue running despite errors, backing off while they repeat
+                self._loop_failures += 1
+                delay = backoff_delay(
+                    LOOP_ERROR_DELAY, self._loop_failures, self.retry_interval
+                )
+                await asyncio.sleep(delay.total_seconds())
 
-    def _should_check_for_updates(self, current_time: datetime) -> bool:
-        """Determine if it's time to check for updates."""
+    async def _run_busy(self, work):
+        """Await work, marking the loop busy so stop() lets it finish."""
+        self._busy = True
+        try:
+            await work
+        finally:
+            self._busy = False
+
+    def _next_due(self) -> Optional[datetime]:
+        """Earliest next-run time, or None if a check is due right away."""
+        if self.schedule:
+            return min(entry.next_run for entry in self.schedule.values())
+        # Not started yet: fall back to a single check per interval
         if self.last_update_check is None:
-            return True
+            return None
+        return self.last_update_check + max(self.update_interval, MIN_RUN_GAP)
 
-        time_since_last_check = current_time - self.last_update_check
-        return time_since_last_check >= self.update_interval
+    def _should_check_for_updates(self, current_time: datetime) -> bool:
+        """Determine if any source is due for an update check."""
+        next_due = self._next_due()
+        return next_due is None or current_time >= next_due
+
+    async def _wait_until_due(self, current_time: datetime):
+        """Sleep until the next source is due or a job wakes the loop."""
+        next_due = self._next_due()
+        delay = (next_due - current_time).total_seconds() if next_due else 0.0
+
+        sleeper = asyncio.ensure_future(asyncio.sleep(max(delay, 0.0)))
+        waker = asyncio.ensure_future(self._wake.wait())
+        try:
+            await asyncio.wait({sleeper, waker}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in (sleeper, waker):
+                if not task.done():
+                    task.cancel()
+        self._wake.clear()
+        if sleeper.done():
+            sleeper.result()
+
+    def _due_sources(self, current_time: datetime) -> Optional[List[str]]:
+        """Sources due at current_time, or None for all before start()."""
+        if not self.schedule:
+            return None
+        return [
+            source
+            for source, entry in self.schedule.items()
+            if entry.next_run <= current_time
+        ]
 
     async def _run_update_check(self):
-        """Check for and run any available updates."""
+        """Check the due sources for updates and run the available ones."""
+        due = self._due_sources(datetime.now())
         try:
             logger.info("Checking for database updates...")
 
             # Check which sources have updates available
-            available_updates = await self.update_manager.check_for_updates()
+            available_updates = await self.update_manager.check_for_updates(due)
+
+            for source in due or []:
+                if not available_updates.get(source):
+                    self._schedule_next(source)
 
             if not any(available_updates.values()):
                 logger.info("No database updates available")
                 return
 
-            # Run updates for sources that have them
+            # Queue updates for sources that have them, behind forced ones
             for source, has_updates in available_updates.items():
                 if has_updates:
-                    await self._run_source_update(source)
+                    heapq.heappush(
+                        self._queue, _Job(PRIORITY_SCHEDULED, next(self._seq), source)
+                    )
+            await self._drain_queue()
 
         except Exception as e:
             logger.error(f"Error during update check: {e}")
+            for source in due or []:
+                self._handle_update_failure(source, [str(e)])
 
     async def _run_source_update(self, source: str):
         """Run update for a specific source with retry logic."""
@@ -179,6 +339,7 @@ class DatabaseUpdateScheduler:
             if result.success:
                 # Reset retry count on success
                 self.retry_counts[source] = 0
+                self._schedule_next(source)
                 logger.info(
                     f"Successfully updated {source}: "
                     f"+{result.records_added} ~{result.records_updated} "
@@ -200,12 +361,165 @@ class DatabaseUpdateScheduler:
             logger.error(f"Max retries exceeded for {source} updates. Errors: {errors}")
             # Reset retry count to try again next cycle
             self.retry_counts[source] = 0
+            self._schedule_next(source)
         else:
+            delay = backoff_delay(
+                self.retry_interval,
+                self.retry_counts[source],
+                self._interval_for(source),
+            )
+            self._schedule_next(source, delay)
             logger.warning(
                 f"Update failed for {source} (attempt {self.retry_counts[source]}). "
-                f"Will retry. Errors: {errors}"
+                f"Will retry in {delay.total_seconds():.0f}s. Errors: {errors}"
             )
 
+    def _interval_for(self, source: str) -> timedelta:
+        """Update interval of a source."""
+        return self.source_intervals.get(source, self.update_interval)
+
+    def _schedule_next(self, source: str, delay: Optional[timedelta] = None):
+        """Set the next run of a source (default: one interval from now)."""
+        interval = self._interval_for(source)
+        delay = interval if delay is None else delay
+        self.schedule[source] = SourceSchedule(
+            source=source,
+            interval=interval,
+            next_run=datetime.now() + max(delay, MIN_RUN_GAP),
+            failures=self.retry_counts.get(source, 0),
+        )
+        self._save_schedule()
+
+    def _load_schedule(self):
+        """
+        Restore next-run times from the state file. Sources without saved
+        state are due one interval after their last update or check.
+        """
+        saved: Dict[str, Any] = {}
+        if self.state_file.exists():
+            try:
+                with open(self.state_file, "r") as f:
+                    saved = json.load(f)
+            except Exception as e:
+                logger.error(f"Error loading scheduler state: {e}")
+
+        try:
+            sources = list(self.update_manager.sources())
+        except Exception as e:
+            logger.error(f"Error loading scheduler state: {e}")
+            return
+
+        now = datetime.now()
+        for source in sources:
+            if source in self.schedule:
+                continue
+            interval = self._interval_for(source)
+            state = saved.get(source, {})
+            try:
+                if "next_run" in state:
+                    # Bounded by one interval in case it was shortened since
+                    next_run = min(
+                        datetime.fromisoformat(state["next_run"]), now + interval
+                    )
+                else:
+                    next_run = self._last_activity(source) + interval
+            except (TypeError, ValueError):
+                next_run = now
+            self.retry_counts.setdefault(source, int(state.get("failures", 0)))
+            self.schedule[source] = SourceSchedule(
+                source=source,
+                interval=interval,
+                next_run=next_run,
+                failures=self.retry_counts[source],
+            )
+
+    def _last_activity(self, source: str) -> datetime:
+        """Last update or no-change check of a source (datetime.min if none)."""
+        version = self.update_manager.versions.get(source)
+        if version is None:
+            return datetime.min
+        last = datetime.fromisoformat(version.last_updated)
+        last_checked = version.metadata.get("last_checked")
+        if last_checked:
+            last = max(last, datetime.fromisoformat(last_checked))
+        return last
+
+    def _save_schedule(self):
+        """Persist next-run times and failure counts."""
+        try:
+            data = {
+                source: {
+                    "next_run": entry.next_run.isoformat(),
+                    "failures": entry.failures,
+                }
+                for source, entry in self.schedule.items()
+            }
+            with open(self.state_file, "w") as f:
+                json.dump(data, f, indent=2)
+        except Exception as e:
+            logger.error(f"Error saving scheduler state: {e}")
+
+    async def _drain_queue(self):
+        """
+        Run queued jobs one at a time, highest priority first. A forced update
+        queued meanwhile cancels the scheduled update in progress, runs, and
+        the cancelled one is requeued behind it.
+        """
+        while self._queue:
+            job = heapq.heappop(self._queue)
+            if job.priority == PRIORITY_FORCED:
+                await self._run_forced_job(job)
+                continue
+            entry = self.schedule.get(job.source)
+            if entry and entry.next_run > datetime.now():
+                # A forced update already brought this source up to date
+                continue
+            if await self._run_preemptible(job.source):
+                heapq.heappush(self._queue, job)
+
+    async def _run_preemptible(self, source: str) -> bool:
+        """
+        Run a scheduled update as a task force_update() may cancel. Updates
+        commit without awaiting, so cancellation lands before the commit.
+
+        Returns:
+            True if the update was preempted and should be requeued
+        """
+        task = asyncio.ensure_future(self._run_source_update(source))
+        self._scheduled_task = task
+        try:
+            await asyncio.wait({task})
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        finally:
+            self._scheduled_task = None
+        if task.cancelled():
+            logger.info(f"Scheduled update for {source} preempted by a forced one")
+            return True
+        task.result()
+        return False
+
+    async def _run_forced_job(self, job: _Job):
+        """Run a queued forced update and resolve its future."""
+        try:
+            result = await self._run_forced_update(job.source)
+        except Exception as e:
+            if job.future and not job.future.done():
+                job.future.set_exception(e)
+        else:
+            if job.future and not job.future.done():
+                job.future.set_result(result)
+
+    async def _run_forced_update(self, source: str) -> UpdateResult:
+        """Update a source now; a success restarts its interval."""
+        result = await self.update_manager.update_database(source, force=True)
+        if result.success:
+            self.retry_counts[source] = 0
+            if source in self.schedule:
+                self._schedule_next(source)
+        return result
+
     def _on_update_complete(self, result: UpdateResult):
         """Callback for when an update completes."""
         if result.success:
@@ -225,29 +539,44 @@ class DatabaseUpdateScheduler:
         RU: Принудительно запускает обновление.
         EN: Force an immediate update.
 
+        While the scheduler runs, the updates are queued ahead of scheduled
+        work and run by the update loop, cancelling a scheduled update in
+        progress (it is requeued behind them); otherwise they run here.
+
         Args:
             source: Specific source to update, or None for all sources
 
         Returns:
             Dict of update results by source
         """
-        results = {}
-
         if source:
             # Update specific source
             logger.info(f"Force updating {source}...")
-            result = await self.update_manager.update_database(source, force=True)
-            results[source] = result
+            sources = [source]
         else:
             # Update all sources
             logger.info("Force updating all sources...")
             available_updates = await self.update_manager.check_for_updates()
+            sources = list(available_updates.keys())
+
+        loop_alive = self._update_task is not None and not self._update_task.done()
+        if not (self.is_running and loop_alive):
+            return {src: await self._run_forced_update(src) for src in sources}
+
+        loop = asyncio.get_running_loop()
+        futures = {}
+        for src in sources:
+            futures[src] = loop.create_future()
+            heapq.heappush(
+                self._queue,
+                _Job(PRIORITY_FORCED, next(self._seq), src, futures[src]),
+            )
+        self._wake.set()
+        if self._scheduled_task is not None and not self._scheduled_task.done():
+            self._scheduled_task.cancel()
 
-            for src in available_updates.keys():
-                result = await self.update_manager.update_database(src, force=True)
-                results[src] = result
-
-        return results
+        results = await asyncio.gather(*futures.values())
+        return dict(zip(futures.keys(), results))
 
     def get_status(self) -> Dict[str, Any]:
         """
@@ -264,6 +593,15 @@ class DatabaseUpdateScheduler:
                 ),
                 "update_interval_hours": self.update_interval.total_seconds() / 3600,
                 "retry_counts": self.retry_counts.copy(),
+                "queued_jobs": len(self._queue),
+                "sources": {
+                    source: {
+                        "next_run": entry.next_run.isoformat(),
+                        "interval_hours": entry.interval.total_seconds() / 3600,
+                        "failures": entry.failures,
+                    }
+                    for source, entry in self.schedule.items()
+                },
             },
             "databases": self.update_manager.get_database_status(),
         }
@@ -281,8 +619,15 @@ async def get_update_scheduler() -> DatabaseUpdateScheduler:
     EN: Get global update scheduler instance.
     """
     global _scheduler_instance
-    if _scheduler_instance is None:
-        _scheduler_instance = DatabaseUpdateScheduler()
+    # The app closes the shared client at shutdown; a restarted app gets a
+    # fresh scheduler on a fresh client
+    if (
+        _scheduler_instance is None
+        or _scheduler_instance.update_manager.http_client.is_closed
+    ):
+        _scheduler_instance = DatabaseUpdateScheduler(
+            http_client=get_shared_http_client()
+        )
     return _scheduler_instance
 
 
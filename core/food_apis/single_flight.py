@@ -0,0 +1,86 @@
+"""
+Single-Flight Request Coalescing
+
+RU: Объединение одновременных одинаковых запросов к внешним API.
+EN: Coalesces concurrent identical upstream lookups into one call.
+
+The first caller for a key starts the upstream call as a task; callers that
+arrive while it is in flight await the same task instead of issuing their
+own HTTP request. The key is forgotten as soon as the call finishes, so
+later callers go through the cache first as usual.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+try:
+    from prometheus_client import Counter
+except ImportError:
+    Counter = None
+
+if Counter is not None:
+    SINGLE_FLIGHT_CALLS = Counter(
+        "food_api_single_flight_total",
+        "Upstream food lookups by role (leader: made the call, shared: joined it)",
+        ["role"],
+    )
+else:
+    SINGLE_FLIGHT_CALLS = None
+
+
+class SingleFlight:
+    """
+    RU: Группа "одного полета": один вызов на ключ среди одновременных.
+    EN: At most one in-flight call per key; concurrent callers share it.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        self.stats = {"leader": 0, "shared": 0}
+
+    def _count(self, role: str) -> None:
+        self.stats[role] += 1
+        if SINGLE_FLIGHT_CALLS is not None:
+            SINGLE_FLIGHT_CALLS.labels(role=role).inc()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        RU: Выполнить fn() или присоединиться к уже идущему вызову по ключу.
+        EN: Run fn(), or join the call already in flight for key.
+
+        The call runs in its own task and callers await it through
+        ``asyncio.shield``, so one cancelled caller does not cancel the
+        shared call for the others. Results and exceptions are shared as-is;
+        callers must not mutate a shared result.
+
+        Args:
+            key: Coalescing key, e.g. (source, query)
+            fn: Zero-argument coroutine function doing the upstream call
+
+        Returns:
+            Result of the (shared) call
+        """
+        loop = asyncio.get_running_loop()
+        task = self._calls.get(key)
+        # a task owned by another event loop cannot be awaited from this one
+        if task is not None and not task.done() and task.get_loop() is loop:
+            self._count("shared")
+            return await asyncio.shield(task)
+
+        task = loop.create_task(fn())
+        self._calls[key] = task
+        task.add_done_callback(lambda t: self._forget(key, t))
+        self._count("leader")
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # mark the exception retrieved: every caller already re-raised it
+        if not task.cancelled():
+            task.exception()
+
+    def __len__(self) -> int:
+        return len(self._calls)
@@ -0,0 +1,159 @@
+"""
+Food API HTTP Transport
+
+RU: Общая настройка HTTP-клиента для API продуктов.
+EN: Shared HTTP client factory for the food API clients.
+
+One tuned `httpx.AsyncClient` (pool limits, keep-alive expiry, connect/read
+timeouts, optional HTTP/2) is injected into the USDA and Open Food Facts
+clients. The app shares one such client across the process
+(``get_shared_http_client``) and closes it at shutdown, so the global food
+database and the update manager hold a single connection pool. Response
+times are recorded per upstream host when prometheus_client is installed.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import httpx
+
+from .http_cache import ConditionalCacheTransport, HTTPResponseCache
+
+try:
+    from prometheus_client import Histogram
+except ImportError:
+    Histogram = None
+
+logger = logging.getLogger(__name__)
+
+if Histogram is not None:
+    UPSTREAM_LATENCY = Histogram(
+        "food_api_upstream_seconds",
+        "Time to response headers from food API upstreams",
+        ["host", "status"],
+        buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+    )
+else:
+    UPSTREAM_LATENCY = None
+
+H2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Conditional response cache of the process-wide client
+SHARED_HTTP_CACHE_PATH = os.getenv(
+    "FOOD_API_HTTP_CACHE", "cache/food_db/http_cache.sqlite"
+)
+
+_shared_client: Optional[httpx.AsyncClient] = None
+
+
+def _env_bool(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+
+@dataclass(frozen=True)
+class HTTPSettings:
+    """
+    RU: Параметры пула соединений и тайм-аутов.
+    EN: Connection pool and timeout settings for food API requests.
+    """
+
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 5.0
+    read_timeout: float = 20.0
+    http2: bool = False
+
+    @classmethod
+    def from_env(cls) -> "HTTPSettings":
+        """Read settings from FOOD_API_* environment variables."""
+        return cls(
+            max_connections=int(os.getenv("FOOD_API_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=int(os.getenv("FOOD_API_MAX_KEEPALIVE", "10")),
+            keepalive_expiry=float(os.getenv("FOOD_API_KEEPALIVE_EXPIRY", "30")),
+            connect_timeout=float(os.getenv("FOOD_API_CONNECT_TIMEOUT", "5")),
+            read_timeout=float(os.getenv("FOOD_API_READ_TIMEOUT", "20")),
+            http2=_env_bool("FOOD_API_HTTP2", "false"),
+        )
+
+
+async def _start_timer(request: httpx.Request) -> None:
+    request.extensions["food_api_start"] = time.perf_counter()
+
+
+async def _observe(response: httpx.Response) -> None:
+    start = response.request.extensions.get("food_api_start")
+    if UPSTREAM_LATENCY is not None and start is not None:
+        UPSTREAM_LATENCY.labels(
+            host=response.request.url.host, status=str(response.status_code)
+        ).observe(time.perf_counter() - start)
+
+
+def create_http_client(
+    settings: HTTPSettings | None = None,
+    cache: HTTPResponseCache | None = None,
+) -> httpx.AsyncClient:
+    """
+    RU: Создать настроенный HTTP-клиент для API продуктов.
+    EN: Create a tuned AsyncClient for the food API clients.
+
+    HTTP/2 is used only when requested and the `h2` package is installed.
+
+    Args:
+        settings: Pool and timeout settings (default: from environment)
+        cache: Revalidate GET responses against this cache (ETag/Last-Modified)
+    """
+    settings = settings or HTTPSettings.from_env()
+    http2 = settings.http2 and H2_AVAILABLE
+    if settings.http2 and not H2_AVAILABLE:
+        logger.warning("FOOD_API_HTTP2 is set but h2 is not installed; using HTTP/1.1")
+
+    transport: httpx.AsyncBaseTransport = httpx.AsyncHTTPTransport(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.max_connections,
+            max_keepalive_connections=settings.max_keepalive_connections,
+            keepalive_expiry=settings.keepalive_expiry,
+        ),
+    )
+    if cache is not None:
+        transport = ConditionalCacheTransport(transport, cache)
+
+    return httpx.AsyncClient(
+        transport=transport,
+        timeout=httpx.Timeout(settings.read_timeout, connect=settings.connect_timeout),
+        event_hooks={"request": [_start_timer], "response": [_observe]},
+    )
+
+
+def get_shared_http_client() -> httpx.AsyncClient:
+    """
+    RU: Общий для процесса HTTP-клиент (создается при первом вызове).
+    EN: Process-wide food API client, built on first use.
+
+    Responses are revalidated against SHARED_HTTP_CACHE_PATH. Callers must
+    not close it; close_shared_http_client() does that at shutdown.
+    """
+    global _shared_client
+    if _shared_client is None or _shared_client.is_closed:
+        _shared_client = create_http_client(
+            cache=HTTPResponseCache(SHARED_HTTP_CACHE_PATH)
+        )
+    return _shared_client
+
+
+async def close_shared_http_client() -> None:
+    """
+    RU: Закрыть общий HTTP-клиент, если он был создан.
+    EN: Close the process-wide client, if it was built.
+    """
+    global _shared_client
+    client, _shared_client = _shared_client, None
+    if client is not None:
+        await client.aclose()
@@ -13,10 +13,30 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+import os
+from contextvars import ContextVar
 from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional
-
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import httpx
+
+from .cache_store import (
+    FLUSH_INTERVAL_SEC,
+    FoodCacheBackend,
+    LazyItemCache,
+    SQLiteFoodCache,
+)
+from .http_cache import HTTPResponseCache
+from .rate_limit import (
+    TokenBucket,
+    UpstreamUnavailable,
+    bucket_for,
+    is_transient,
+    retry_with_jitter,
+)
+from .single_flight import SingleFlight
+from .transport import create_http_client, get_shared_http_client
 from .usda_client import USDAClient, USDAFoodItem
 
 # Try to import Open Food Facts client
@@ -31,6 +51,46 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Concurrent searches while building the common foods database
+COMMON_FOODS_CONCURRENCY = int(os.getenv("COMMON_FOODS_CONCURRENCY", "4"))
+
+# Failures of requests that never reached the upstream (no rate-limit cost)
+_NOT_SENT = (httpx.ConnectError, httpx.ConnectTimeout, UpstreamUnavailable)
+
+# Standard name -> USDA search query
+COMMON_FOOD_SEARCHES = {
+    "chicken_breast": "chicken breast meat only cooked roasted",
+    "salmon": "salmon atlantic farmed cooked dry heat",
+    "lentils": "lentils mature seeds cooked boiled",
+    "spinach": "spinach raw",
+    "oats": "cereals oats regular and quick unenriched dry",
+    "broccoli": "broccoli raw",
+    "brown_rice": "rice brown long-grain cooked",
+    "quinoa": "quinoa cooked",
+    "almonds": "nuts almonds",
+    "greek_yogurt": "yogurt greek plain nonfat",
+    "eggs": "egg whole raw fresh",
+    "sweet_potato": "sweet potato raw unprepared",
+    "avocado": "avocados raw all commercial varieties",
+    "banana": "bananas raw",
+    "black_beans": "beans black mature seeds cooked boiled",
+    "tofu": "tofu raw firm prepared with calcium sulfate",
+    "olive_oil": "oil olive salad or cooking",
+    "milk": "milk reduced fat fluid 2% milkfat",
+    "carrots": "carrots raw",
+    "tomatoes": "tomatoes red ripe raw year round average",
+}
+
+# progress(done, total, standard_name)
+ProgressCallback = Callable[[int, int, str], None]
+
+# Set while building the common foods database: upstream calls are rate
+# limited, raise instead of returning empty results, and are retried.
+# Holds the sources found unreachable so far in that build.
+_strict_upstream: ContextVar[Optional[Set[str]]] = ContextVar(
+    "_strict_upstream", default=None
+)
+
 
 @dataclass
 class UnifiedFoodItem:
@@ -94,57 +154,161 @@ class UnifiedFoodItem:
         }
 
 
+def _encode_entry(value: Any) -> Dict[str, Any]:
+    """Encode a cache entry: one item, or a search result list."""
+    if isinstance(value, list):
+        return {"results": [asdict(item) for item in value]}
+    return asdict(value)
+
+
+def _decode_entry(record: Dict[str, Any]) -> Any:
+    """Decode a cache entry written by _encode_entry."""
+    if "results" in record:
+        return [UnifiedFoodItem(**item) for item in record["results"]]
+    return UnifiedFoodItem(**record)
+
+
+def _usda_ids(foods: Dict[str, UnifiedFoodItem]) -> Dict[str, int]:
+    """USDA ids of the common foods among foods, by common food name."""
+    return {
+        name: int(item.source_id)
+        for name, item in foods.items()
+        if name in COMMON_FOOD_SEARCHES
+        and item.source == "USDA FoodData Central"
+        and str(item.source_id).isdigit()
+    }
+
+
 class UnifiedFoodDatabase:
     """
     RU: Единая база данных продуктов с кэшированием и поддержкой нескольких источников.
     EN: Unified food database with caching and multiple source support.
     """
 
-    def __init__(self, cache_dir: Optional[str] = None):
-        self.usda_client = USDAClient()
-        self.off_client = OFFClient() if OFF_AVAILABLE else None
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        cache_backend: Optional[FoodCacheBackend] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+    ):
+        """
+        Args:
+            cache_dir: Directory for the cache store and JSON exports
+            cache_backend: Cache store (default: SQLite file in cache_dir)
+            http_client: Shared HTTP client; its owner is responsible for
+                closing it (default: one client for both upstreams)
+        """
         self.cache_dir = Path(cache_dir or "cache/food_db")
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._owns_http_client = http_client is None
+        self.http_client = http_client or create_http_client(
+            cache=HTTPResponseCache(self.cache_dir / "http_cache.sqlite")
+        )
+        self.usda_client = USDAClient(http_client=self.http_client)
+        self.off_client = (
+            OFFClient(http_client=self.http_client) if OFF_AVAILABLE else None
+        )
 
-        # In-memory cache for this session
-        self._memory_cache: Dict[str, UnifiedFoodItem] = {}
+        # Bounded LRU/TTL view over the persistent store, flushed write-behind.
+        # Search keys hold full result lists; id keys hold single items.
+        if cache_backend is None:
+            cache_backend = SQLiteFoodCache(
+                self.cache_dir / "unified_food_cache.sqlite"
+            )
+        self._memory_cache: Dict[str, UnifiedFoodItem] = LazyItemCache(
+            cache_backend,
+            decode=_decode_entry,
+            encode=_encode_entry,
+        )
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Future] = None
+        self._flights = SingleFlight()
+        self._rate_limits: Dict[str, TokenBucket] = {}
 
-        # Load persistent cache
+        # Import a legacy JSON cache into an empty store
         self._load_cache()
 
     def _get_cache_file(self) -> Path:
-        """Get path to cache file."""
+        """Get path to the JSON import/export file."""
         return self.cache_dir / "unified_food_cache.json"
 
     def _load_cache(self):
-        """Load cached food items from disk."""
+        """Import the JSON cache file into the store if the store is empty."""
         cache_file = self._get_cache_file()
-        if cache_file.exists():
-            try:
-                with open(cache_file, "r", encoding="utf-8") as f:
-                    cache_data = json.load(f)
-
-                for key, item_data in cache_data.items():
-                    self._memory_cache[key] = UnifiedFoodItem(**item_data)
-
-                logger.info(f"Loaded {len(self._memory_cache)} items from cache")
-            except Exception as e:
-                logger.error(f"Error loading cache: {e}")
-
-    def _save_cache(self):
-        """Save cached food items to disk."""
+        backend = self._memory_cache.backend
         try:
-            cache_data = {key: asdict(item) for key, item in self._memory_cache.items()}
+            if cache_file.exists() and len(backend) == 0:
+                count = backend.import_json(cache_file)
+                logger.info(f"Imported {count} items from {cache_file.name}")
+        except Exception as e:
+            logger.error(f"Error loading cache: {e}")
 
-            with open(self._get_cache_file(), "w", encoding="utf-8") as f:
-                json.dump(cache_data, f, indent=2, ensure_ascii=False)
+    def _save_cache(self):
+        """Flush pending cache items to the store in one batch."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._flush_cache()
 
-            logger.info(f"Saved {len(cache_data)} items to cache")
+    def _flush_cache(self):
+        try:
+            count = self._memory_cache.flush()
+            if count:
+                logger.info(f"Saved {count} items to cache")
         except Exception as e:
             logger.error(f"Error saving cache: {e}")
 
+    def _schedule_save(self):
+        """
+        Write-behind: flush when the batch is full or old enough, otherwise
+        arm a timer so a quiet period still persists pending items.
+        """
+        if self._memory_cache.flush_due():
+            self._start_save()
+        elif self._flush_handle is None and self._memory_cache.pending:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(FLUSH_INTERVAL_SEC, self._start_save)
+
+    def _start_save(self):
+        """Flush in a worker thread, keeping the batched write off the loop."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.ensure_future(
+                asyncio.to_thread(self._flush_cache)
+            )
+            self._flush_task.add_done_callback(self._save_done)
+
+    def _save_done(self, task: asyncio.Future):
+        # Items written during the flush (or left by a failed one) wait for
+        # the timer rather than retrying straight away
+        self._flush_task = None
+        if self._flush_handle is None and self._memory_cache.pending:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(FLUSH_INTERVAL_SEC, self._start_save)
+
+    def export_cache(self, path: Optional[Path] = None) -> int:
+        """
+        RU: Выгрузить кэш в JSON (по умолчанию unified_food_cache.json).
+        EN: Export the cache to JSON (default: unified_food_cache.json).
+        """
+        self._save_cache()
+        return self._memory_cache.backend.export_json(path or self._get_cache_file())
+
+    def compact_cache(self, max_entries: Optional[int] = None) -> int:
+        """
+        RU: Сжать хранилище кэша, удалив самые старые записи сверх лимита.
+        EN: Compact the cache store, dropping the oldest records over the limit.
+        """
+        self._save_cache()
+        removed = self._memory_cache.backend.compact(max_entries)
+        if removed:
+            self._memory_cache.clear()
+        return removed
+
     async def search_food(
-        self, query: str, prefer_source: str = "usda"
+        self, query: str, prefer_source: str = "usda", use_cache: bool = True
     ) -> List[UnifiedFoodItem]:
         """
         RU: Поиск продуктов по названию.
@@ -153,44 +317,65 @@ class UnifiedFoodDatabase:
         Args:
             query: Search query (e.g., "chicken breast")
             prefer_source: Preferred data source ("usda", "openfoodfacts")
+            use_cache: Serve cached results; if False, search upstream and
+                cache the fresh results
 
         Returns:
             List of unified food items
         """
-        # Check cache first
         cache_key = f"search_{query.lower().strip()}"
-        if cache_key in self._memory_cache:
-            return [self._memory_cache[cache_key]]
+        if use_cache:
+            # Check cache first
+            cached = await self._memory_cache.aget(cache_key)
+            if cached is not None:
+                # entries imported from older caches hold only the best item
+                return list(cached) if isinstance(cached, list) else [cached]
+            if self._memory_cache.is_negative(cache_key):
+                return []
+
+        # Concurrent misses for the same query share one upstream search
+        results = await self._flights.do(
+            (prefer_source, cache_key, _strict_upstream.get() is not None),
+            lambda: self._search_upstream(query, prefer_source, cache_key),
+        )
+        return list(results)
 
+    async def _search_upstream(
+        self, query: str, prefer_source: str, cache_key: str
+    ) -> List[UnifiedFoodItem]:
+        """Search the upstream APIs and cache the result list."""
         results = []
+        failed = False
 
         if prefer_source == "usda":
             # Search USDA first
-            usda_results = await self.usda_client.search_foods(query, page_size=5)
-            for usda_item in usda_results:
-                unified_item = UnifiedFoodItem.from_usda_item(usda_item)
-                results.append(unified_item)
-
-                # Cache the best result
-                if not self._memory_cache.get(cache_key):
-                    self._memory_cache[cache_key] = unified_item
+            try:
+                usda_results = await self._call_upstream(
+                    "usda", self.usda_client.search_foods, query, page_size=5
+                )
+                for usda_item in usda_results:
+                    results.append(UnifiedFoodItem.from_usda_item(usda_item))
+            except Exception as e:
+                failed = True
+                logger.error(f"Error searching USDA: {e}")
 
         # Search Open Food Facts if USDA results are empty or if preferred
         if (prefer_source == "openfoodfacts" or not results) and self.off_client:
             try:
-                off_results = await self.off_client.search_products(query, page_size=5)
+                off_results = await self._call_upstream(
+                    "openfoodfacts", self.off_client.search_products, query, page_size=5
+                )
                 for off_item in off_results:
-                    unified_item = UnifiedFoodItem.from_off_item(off_item)
-                    results.append(unified_item)
-
-                    # Cache the best result
-                    if not self._memory_cache.get(cache_key):
-                        self._memory_cache[cache_key] = unified_item
+                    results.append(UnifiedFoodItem.from_off_item(off_item))
             except Exception as e:
+                failed = True
                 logger.error(f"Error searching Open Food Facts: {e}")
 
         if results:
-            self._save_cache()
+            self._memory_cache[cache_key] = list(results)
+            self._schedule_save()
+        elif not failed:
+            self._memory_cache.put_negative(cache_key)
 
         return results
 
@@ -202,43 +387,70 @@ class UnifiedFoodDatabase:
         EN: Get food by source ID.
         """
         cache_key = f"{source}_{food_id}"
-        if cache_key in self._memory_cache:
-            return self._memory_cache[cache_key]
+        cached = await self._memory_cache.aget(cache_key)
+        if cached is not None:
+            return cached
+        if self._memory_cache.is_negative(cache_key):
+            return None
+
+        # Concurrent misses for the same id share one upstream request
+        return await self._flights.do(
+            (source, food_id), lambda: self._fetch_by_id(source, food_id, cache_key)
+        )
 
+    async def _fetch_by_id(
+        self, source: str, food_id: str, cache_key: str
+    ) -> Optional[UnifiedFoodItem]:
+        """Fetch one item from its upstream API and cache it."""
         if source == "usda":
             try:
-                fdc_id = int(food_id)
-                usda_item = await self.usda_client.get_food_details(fdc_id)
-                if usda_item:
-                    unified_item = UnifiedFoodItem.from_usda_item(usda_item)
-                    self._memory_cache[cache_key] = unified_item
-                    self._save_cache()
-                    return unified_item
+                request_id: Any = int(food_id)
             except ValueError:
                 logger.error(f"Invalid USDA FDC ID: {food_id}")
-
+                return None
+            fetch = self.usda_client.get_food_details
+            convert = UnifiedFoodItem.from_usda_item
         elif source == "openfoodfacts" and self.off_client:
-            try:
-                off_item = await self.off_client.get_product_details(food_id)
-                if off_item:
-                    unified_item = UnifiedFoodItem.from_off_item(off_item)
-                    self._memory_cache[cache_key] = unified_item
-                    self._save_cache()
-                    return unified_item
-            except Exception as e:
-                logger.error(f"Error fetching Open Food Facts item {food_id}: {e}")
-
-        return None
+            request_id = food_id
+            fetch = self.off_client.get_product_details
+            convert = UnifiedFoodItem.from_off_item
+        else:
+            return None
 
-    async def get_common_foods_database(self) -> Dict[str, UnifiedFoodItem]:
+        try:
+            item = await self._call_upstream(source, fetch, request_id)
+            if item is None:
+                # The source answered and has no such item
+                self._memory_cache.put_negative(cache_key)
+                return None
+            unified_item = convert(item)
+        except Exception as e:
+            logger.error(f"Error fetching {source} item {food_id}: {e}")
+            return None
+
+        self._memory_cache[cache_key] = unified_item
+        self._schedule_save()
+        return unified_item
+
+    async def get_common_foods_database(
+        self,
+        refresh: bool = False,
+        progress: Optional[ProgressCallback] = None,
+    ) -> Dict[str, UnifiedFoodItem]:
         """
         RU: Получает базу часто используемых продуктов.
         EN: Gets database of commonly used foods.
 
         Returns a dictionary of common foods with standardized names.
+
+        Args:
+            refresh: Refetch even if common_foods.json exists; foods with a
+                known USDA id are refreshed through the batch endpoint
+            progress: Called as progress(done, total, name) after each food
         """
         # Check if we have cached common foods
         cache_file = self.cache_dir / "common_foods.json"
+        previous: Dict[str, UnifiedFoodItem] = {}
 
         if cache_file.exists():
             try:
@@ -249,51 +461,14 @@ class UnifiedFoodDatabase:
                 for key, item_data in cache_data.items():
                     foods_db[key] = UnifiedFoodItem(**item_data)
 
-                logger.info(f"Loaded {len(foods_db)} common foods from cache")
-                return foods_db
+                if not refresh:
+                    logger.info(f"Loaded {len(foods_db)} common foods from cache")
+                    return foods_db
+                previous = foods_db
             except Exception as e:
                 logger.error(f"Error loading common foods cache: {e}")
 
-        # Build common foods database from USDA
-        common_searches = {
-            "chicken_breast": "chicken breast meat only cooked roasted",
-            "salmon": "salmon atlantic farmed cooked dry heat",
-            "lentils": "lentils mature seeds cooked boiled",
-            "spinach": "spinach raw",
-            "oats": "cereals oats regular and quick unenriched dry",
-            "broccoli": "broccoli raw",
-            "brown_rice": "rice brown long-grain cooked",
-            "quinoa": "quinoa cooked",
-            "almonds": "nuts almonds",
-            "greek_yogurt": "yogurt greek plain nonfat",
-            "eggs": "egg whole raw fresh",
-            "sweet_potato": "sweet potato raw unprepared",
-            "avocado": "avocados raw all commercial varieties",
-            "banana": "bananas raw",
-            "black_beans": "beans black mature seeds cooked boiled",
-            "tofu": "tofu raw firm prepared with calcium sulfate",
-            "olive_oil": "oil olive salad or cooking",
-            "milk": "milk reduced fat fluid 2% milkfat",
-            "carrots": "carrots raw",
-            "tomatoes": "tomatoes red ripe raw year round average",
-        }
-
-        foods_db = {}
-
-        for standard_name, search_query in common_searches.items():
-            try:
-                results = await self.search_food(search_query)
-                if results:
-                    # Take the first result (usually most relevant)
-                    foods_db[standard_name] = results[0]
-                    logger.info(f"Found food for {standard_name}: {results[0].name}")
-
-                # Small delay to be respectful to the API
-                await asyncio.sleep(0.1)
-
-            except Exception as e:
-                logger.error(f"Error fetching {standard_name}: {e}")
-                continue
+        foods_db = await self._fetch_common_foods(previous, progress, refresh)
 
         # Save common foods cache
         try:
@@ -306,11 +481,160 @@ class UnifiedFoodDatabase:
 
         return foods_db
 
+    def common_food_ids(self) -> Dict[str, int]:
+        """
+        RU: Известные USDA id часто используемых продуктов.
+        EN: Known USDA ids of common foods, from common_foods.json.
+
+        A refresh fetches these through the batch endpoint and searches for
+        the other common foods.
+        """
+        cache_file = self.cache_dir / "common_foods.json"
+        if not cache_file.exists():
+            return {}
+        try:
+            with open(cache_file, "r", encoding="utf-8") as f:
+                cache_data = json.load(f)
+            return _usda_ids(
+                {key: UnifiedFoodItem(**data) for key, data in cache_data.items()}
+            )
+        except Exception as e:
+            logger.error(f"Error loading common foods cache: {e}")
+            return {}
+
+    async def _fetch_common_foods(
+        self,
+        previous: Dict[str, UnifiedFoodItem],
+        progress: Optional[ProgressCallback],
+        refresh: bool = False,
+    ) -> Dict[str, UnifiedFoodItem]:
+        """
+        Fetch COMMON_FOOD_SEARCHES: one batch call for foods whose USDA id is
+        known, then concurrent searches (at most COMMON_FOODS_CONCURRENCY at a
+        time) for the rest; a refresh skips cached search results. Upstream
+        calls made here are rate limited per source and retried on transient
+        errors.
+        """
+        found: Dict[str, UnifiedFoodItem] = {}
+        total = len(COMMON_FOOD_SEARCHES)
+
+        def report(name: str) -> None:
+            done = len(reported)
+            logger.info(f"Common foods: {done}/{total} ({name})")
+            if progress is not None:
+                try:
+                    progress(done, total, name)
+                except Exception as e:
+                    logger.error(f"Error in progress callback: {e}")
+
+        reported: set = set()
+        token = _strict_upstream.set(set())
+        try:
+            known = _usda_ids(previous)
+            if known:
+                try:
+                    usda_items = await self._call_upstream(
+                        "usda",
+                        self.usda_client.get_multiple_foods,
+                        list(known.values()),
+                    )
+                except Exception as e:
+                    logger.error(f"Error refreshing common foods in batch: {e}")
+                    usda_items = []
+                by_id = {item.fdc_id: item for item in usda_items}
+                for name, fdc_id in known.items():
+                    if fdc_id in by_id:
+                        found[name] = UnifiedFoodItem.from_usda_item(by_id[fdc_id])
+                        reported.add(name)
+                        report(name)
+
+            semaphore = asyncio.Semaphore(COMMON_FOODS_CONCURRENCY)
+
+            async def fetch(name: str, query: str) -> None:
+                async with semaphore:
+                    try:
+                        results = await self.search_food(query, use_cache=not refresh)
+                        if results:
+                            # Take the first result (usually most relevant)
+                            found[name] = results[0]
+                            logger.info(f"Found food for {name}: {results[0].name}")
+                    except Exception as e:
+                        logger.error(f"Error fetching {name}: {e}")
+                reported.add(name)
+                report(name)
+
+            await asyncio.gather(
+                *(
+                    fetch(name, query)
+                    for name, query in COMMON_FOOD_SEARCHES.items()
+                    if name not in found
+                )
+            )
+        finally:
+            _strict_upstream.reset(token)
+
+        return {name: found[name] for name in COMMON_FOOD_SEARCHES if name in found}
+
+    async def _call_upstream(self, source: str, method, *args, **kwargs):
+        """
+        Call a client method, raising request errors instead of letting the
+        client turn them into empty results, so that an outage is never
+        cached as a negative lookup. Inside the common-foods pipeline the call
+        also takes one token from the source's bucket and is retried with
+        jitter on transient failures (retries are spaced by backoff and
+        Retry-After, not by further tokens); a source that is still
+        unreachable after its retries is skipped for the rest of the pipeline
+        instead of spending rate-limit tokens on every food. Connection
+        failures give their token back.
+        """
+        unreachable = _strict_upstream.get()
+        if unreachable is None:
+            return await method(*args, raise_errors=True, **kwargs)
+
+        bucket = self._rate_limits.get(source)
+        if bucket is None:
+            api_key = self.usda_client.api_key if source == "usda" else None
+            bucket = self._rate_limits[source] = bucket_for(source, api_key)
+
+        async def attempt():
+            # Another worker may have given up on the source meanwhile
+            if source in unreachable:
+                raise UpstreamUnavailable(source)
+            return await method(*args, raise_errors=True, **kwargs)
+
+        if source in unreachable:
+            raise UpstreamUnavailable(source)
+        await bucket.acquire()
+        try:
+            return await retry_with_jitter(attempt)
+        except Exception as e:
+            if isinstance(e, _NOT_SENT):
+                bucket.release()
+            if is_transient(e):
+                unreachable.add(source)
+            raise
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        RU: Статистика кэша (записи, попадания, промахи, вытеснения).
+        EN: Cache statistics (entries, hits, misses, evictions).
+        """
+        return self._memory_cache.stats()
+
     async def close(self):
-        """Close all API clients."""
+        """Flush the cache and close all API clients."""
+        if self._flush_task is not None and not self._flush_task.done():
+            await self._flush_task
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        await asyncio.to_thread(self._flush_cache)
+        self._memory_cache.backend.close()
         await self.usda_client.close()
         if self.off_client:
             await self.off_client.close()
+        if self._owns_http_client:
+            await self.http_client.aclose()
 
 
 # Global instance for easy access
@@ -323,8 +647,10 @@ async def get_unified_food_db() -> UnifiedFoodDatabase:
     EN: Get global instance of unified food database.
     """
     global _unified_db_instance
-    if _unified_db_instance is None:
-        _unified_db_instance = UnifiedFoodDatabase()
+    # The app closes the shared client at shutdown; a restarted app gets a
+    # fresh instance on a fresh client
+    if _unified_db_instance is None or _unified_db_instance.http_client.is_closed:
+        _unified_db_instance = UnifiedFoodDatabase(http_client=get_shared_http_client())
     return _unified_db_instance
 
 
@@ -14,17 +14,37 @@ import asyncio
 import hashlib
 import json
 import logging
+import os
 from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
 
+import httpx
+
+from .http_cache import HTTPResponseCache, track_changes
 from .openfoodfacts_client import OFF_AVAILABLE, OFFClient
-from .unified_db import UnifiedFoodDatabase, UnifiedFoodItem
+from .transport import create_http_client
+from .unified_db import COMMON_FOOD_SEARCHES, UnifiedFoodDatabase, UnifiedFoodItem
 from .usda_client import USDAClient
+from .version_store import FoodVersionStore, combined_checksum, diff_records
 
 logger = logging.getLogger(__name__)
 
+# Requests re-sent to decide whether a source changed since the last update
+UPDATE_PROBES = int(os.getenv("FOOD_UPDATE_PROBES", "3"))
+
+# Open Food Facts searches sampled into the database
+OFF_SAMPLE_SEARCHES = [
+    "apple",
+    "banana",
+    "chicken",
+    "bread",
+    "milk",
+    "cheese",
+    "rice",
+]
+
 
 @dataclass
 class DatabaseVersion:
@@ -77,17 +97,36 @@ class DatabaseUpdateManager:
         cache_dir: str = "cache/food_db",
         update_interval_hours: int = 24,
         max_rollback_versions: int = 5,
+        source_interval_hours: Optional[Dict[str, float]] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
     ):
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
 
         self.update_interval = timedelta(hours=update_interval_hours)
+        # Per-source overrides of update_interval
+        self.source_intervals = {
+            source: timedelta(hours=hours)
+            for source, hours in (source_interval_hours or {}).items()
+        }
         self.max_rollback_versions = max_rollback_versions
 
-        # Data sources
-        self.usda_client = USDAClient()
-        self.off_client = OFFClient() if OFF_AVAILABLE else None
-        self.unified_db = UnifiedFoodDatabase(str(self.cache_dir))
+        # Data sources share one connection pool and conditional HTTP cache;
+        # an injected client is closed by its owner
+        self._owns_http_client = http_client is None
+        self.http_client = http_client or create_http_client(
+            cache=HTTPResponseCache(self.cache_dir / "http_cache.sqlite")
+        )
+        self.usda_client = USDAClient(http_client=self.http_client)
+        self.off_client = (
+            OFFClient(http_client=self.http_client) if OFF_AVAILABLE else None
+        )
+        self.unified_db = UnifiedFoodDatabase(
+            str(self.cache_dir), http_client=self.http_client
+        )
+
+        # Current records and version deltas per source
+        self.version_store = FoodVersionStore(self.cache_dir / "food_versions.sqlite")
 
         # Update callbacks
         self.update_callbacks: List[Callable[[UpdateResult], None]] = []
@@ -134,26 +173,47 @@ class DatabaseUpdateManager:
         json_str = json.dumps(data, sort_keys=True)
         return hashlib.sha256(json_str.encode()).hexdigest()
 
-    async def check_for_updates(self) -> Dict[str, bool]:
+    def sources(self) -> List[str]:
+        """Names of the sources this manager can update."""
+        if self.off_client and OFF_AVAILABLE:
+            return ["usda", "openfoodfacts"]
+        return ["usda"]
+
+    def interval_for(self, source: str) -> timedelta:
+        """Update interval of a source."""
+        return self.source_intervals.get(source, self.update_interval)
+
+    async def check_for_updates(
+        self, sources: Optional[Iterable[str]] = None
+    ) -> Dict[str, bool]:
         """
         RU: Проверяет наличие обновлений для всех источников данных.
         EN: Check for updates across all data sources.
 
+        Args:
+            sources: Only check these sources (default: all)
+
         Returns:
             Dict mapping source names to whether updates are available
         """
         updates_available = {}
+        wanted = set(sources) if sources is not None else None
 
         # Check USDA updates
-        try:
-            usda_available = await self._check_usda_updates()
-            updates_available["usda"] = usda_available
-        except Exception as e:
-            logger.error(f"Error checking USDA updates: {e}")
-            updates_available["usda"] = False
+        if wanted is None or "usda" in wanted:
+            try:
+                usda_available = await self._check_usda_updates()
+                updates_available["usda"] = usda_available
+            except Exception as e:
+                logger.error(f"Error checking USDA updates: {e}")
+                updates_available["usda"] = False
 
         # Check Open Food Facts updates
-        if self.off_client and OFF_AVAILABLE:
+        if (
+            self.off_client
+            and OFF_AVAILABLE
+            and (wanted is None or "openfoodfacts" in wanted)
+        ):
             try:
                 off_available = await self._check_off_updates()
                 updates_available["openfoodfacts"] = off_available
@@ -164,25 +224,50 @@ class DatabaseUpdateManager:
         return updates_available
 
     async def _check_usda_updates(self) -> bool:
-        """Check if USDA database has updates."""
-        current_version = self.versions.get("usda")
-
-        # If no current version, updates are available
-        if not current_version:
-            return True
-
-        # Check if enough time has passed for an update
-        last_update = datetime.fromisoformat(current_version.last_updated)
-        if datetime.now() - last_update < self.update_interval:
-            return False
+        """
+        Check if USDA database has updates.
 
-        # For USDA, we can check their data release schedule
-        # For now, assume updates available if interval passed
-        return True
+        An update fetches foods with a known id through the batch POST
+        endpoint, which the HTTP cache cannot revalidate, so those foods are
+        probed through their GET details endpoint instead; the rest are
+        probed with the searches the update makes.
+        """
+        known = self.unified_db.common_food_ids()
+        searched = [
+            query for name, query in COMMON_FOOD_SEARCHES.items() if name not in known
+        ]
+        probes = [
+            lambda i=fdc_id: self.usda_client.get_food_details(i)
+            for fdc_id in list(known.values())[:UPDATE_PROBES]
+        ]
+        probes += [
+            lambda q=query: self.usda_client.search_foods(q, page_size=5)
+            for query in searched[:UPDATE_PROBES]
+        ]
+        return await self._check_source_updates("usda", probes)
 
     async def _check_off_updates(self) -> bool:
         """Check if Open Food Facts database has updates."""
-        current_version = self.versions.get("openfoodfacts")
+        return await self._check_source_updates(
+            "openfoodfacts",
+            [
+                lambda q=query: self.off_client.search_products(q, page_size=5)
+                for query in OFF_SAMPLE_SEARCHES[:UPDATE_PROBES]
+            ],
+        )
+
+    async def _check_source_updates(
+        self, source: str, probes: List[Callable[[], Awaitable[Any]]]
+    ) -> bool:
+        """
+        Updates are due once the interval has passed since the last update or
+        no-change check. The source is then probed with a few of the requests
+        an update makes; if every one is answered 304 Not Modified from the
+        HTTP cache, nothing changed and the full update is skipped. The probes
+        are a sample, so this is a heuristic: changes to data no probe covers
+        wait for a forced update or the next changed probe.
+        """
+        current_version = self.versions.get(source)
 
         # If no current version, updates are available
         if not current_version:
@@ -190,12 +275,22 @@ class DatabaseUpdateManager:
 
         # Check if enough time has passed for an update
         last_update = datetime.fromisoformat(current_version.last_updated)
-        if datetime.now() - last_update < self.update_interval:
+        last_checked = current_version.metadata.get("last_checked")
+        if last_checked:
+            last_update = max(last_update, datetime.fromisoformat(last_checked))
+        if datetime.now() - last_update < self.interval_for(source):
             return False
 
-        # For Open Food Facts, check for updates based on their update frequency
-        # For now, assume updates available if interval passed
-        return True
+        with track_changes() as tracker:
+            for probe in probes:
+                await probe()
+        if not tracker.unchanged:
+            return True
+
+        logger.info(f"{source} unchanged since last update (HTTP 304)")
+        current_version.metadata["last_checked"] = datetime.now().isoformat()
+        self._save_versions()
+        return False
 
     async def update_database(self, source: str, force: bool = False) -> UpdateResult:
         """
@@ -247,94 +342,17 @@ class DatabaseUpdateManager:
         old_version = current_version.version if current_version else None
 
         try:
-            # Create backup of current data
-            if current_version:
-                await self._create_backup(source, current_version.version)
-
             # Get updated common foods from USDA
             logger.info("Fetching updated USDA food data...")
-            updated_foods = await self.unified_db.get_common_foods_database()
-
-            # Calculate new version info
-            new_version = datetime.now().strftime("%Y%m%d_%H%M%S")
-            checksum = self._calculate_checksum(
-                {name: asdict(food) for name, food in updated_foods.items()}
-            )
-
-            # Check if data actually changed (unless forced)
-            if not force and current_version and current_version.checksum == checksum:
-                return UpdateResult(
-                    success=True,
-                    source=source,
-                    old_version=old_version,
-                    new_version=old_version,  # No change
-                    records_added=0,
-                    records_updated=0,
-                    records_removed=0,
-                    errors=[],
-                    duration_seconds=0.0,
-                )
-
-            # Validate new data
-            validation_errors = await self._validate_food_data(updated_foods)
-            if validation_errors:
-                return UpdateResult(
-                    success=False,
-                    source=source,
-                    old_version=old_version,
-                    new_version=None,
-                    records_added=0,
-                    records_updated=0,
-                    records_removed=0,
-                    errors=validation_errors,
-                    duration_seconds=0.0,
-                )
-
-            # Calculate changes
-            old_foods = {}
-            if current_version:
-                try:
-                    old_foods = await self._load_backup(source, current_version.version)
-                except Exception as e:
-                    logger.warning(f"Could not load old data for comparison: {e}")
-
-            records_added = len(updated_foods) - len(old_foods)
-            records_updated = len(set(updated_foods.keys()) & set(old_foods.keys()))
-            records_removed = len(old_foods) - len(updated_foods)
-
-            # Update version tracking
-            new_db_version = DatabaseVersion(
-                source=source,
-                version=new_version,
-                last_updated=datetime.now().isoformat(),
-                record_count=len(updated_foods),
-                checksum=checksum,
-                metadata={
-                    "update_type": "scheduled" if not force else "forced",
-                    "api_source": "USDA FoodData Central",
-                },
+            updated_foods = await self.unified_db.get_common_foods_database(
+                refresh=True
             )
 
-            self.versions[source] = new_db_version
-            self._save_versions()
-
-            # Clean up old backups
-            await self._cleanup_old_backups(source)
-
-            logger.info(
-                f"Successfully updated {source} database: {len(updated_foods)} foods"
-            )
-
-            return UpdateResult(
-                success=True,
-                source=source,
-                old_version=old_version,
-                new_version=new_version,
-                records_added=max(0, records_added),
-                records_updated=records_updated,
-                records_removed=max(0, records_removed),
-                errors=[],
-                duration_seconds=0.0,
+            return await self._commit_update(
+                source,
+                updated_foods,
+                force,
+                {"api_source": "USDA FoodData Central"},
             )
 
         except Exception as e:
@@ -358,10 +376,6 @@ class DatabaseUpdateManager:
         old_version = current_version.version if current_version else None
 
         try:
-            # Create backup of current data
-            if current_version:
-                await self._create_backup(source, current_version.version)
-
             # For Open Food Facts, we'll fetch a sample of popular products
             # In a real implementation, this would be more sophisticated
             logger.info("Fetching Open Food Facts data...")
@@ -371,16 +385,7 @@ class DatabaseUpdateManager:
             sample_products = []
             if self.off_client:
                 # Search for some common products to include in our database
-                common_searches = [
-                    "apple",
-                    "banana",
-                    "chicken",
-                    "bread",
-                    "milk",
-                    "cheese",
-                    "rice",
-                ]
-                for search_term in common_searches:
+                for search_term in OFF_SAMPLE_SEARCHES:
                     try:
                         products = await self.off_client.search_products(
                             search_term, page_size=5
@@ -402,91 +407,76 @@ class DatabaseUpdateManager:
                 except Exception as e:
                     logger.warning(f"Error converting OFF item to unified format: {e}")
 
-            # Calculate new version info
-            new_version = datetime.now().strftime("%Y%m%d_%H%M%S")
-            checksum = self._calculate_checksum(
-                {name: asdict(food) for name, food in unified_foods.items()}
-            )
-
-            # Check if data actually changed (unless forced)
-            if not force and current_version and current_version.checksum == checksum:
-                return UpdateResult(
-                    success=True,
-                    source=source,
-                    old_version=old_version,
-                    new_version=old_version,  # No change
-                    records_added=0,
-                    records_updated=0,
-                    records_removed=0,
-                    errors=[],
-                    duration_seconds=0.0,
-                )
-
-            # Validate new data
-            validation_errors = await self._validate_food_data(unified_foods)
-            if validation_errors:
-                return UpdateResult(
-                    success=False,
-                    source=source,
-                    old_version=old_version,
-                    new_version=None,
-                    records_added=0,
-                    records_updated=0,
-                    records_removed=0,
-                    errors=validation_errors,
-                    duration_seconds=0.0,
-                )
-
-            # Calculate changes
-            old_foods = {}
-            if current_version:
-                try:
-                    old_foods = await self._load_backup(source, current_version.version)
-                except Exception as e:
-                    logger.warning(f"Could not load old data for comparison: {e}")
-
-            records_added = len(unified_foods) - len(old_foods)
-            records_updated = len(set(unified_foods.keys()) & set(old_foods.keys()))
-            records_removed = len(old_foods) - len(unified_foods)
-
-            # Update version tracking
-            new_db_version = DatabaseVersion(
-                source=source,
-                version=new_version,
-                last_updated=datetime.now().isoformat(),
-                record_count=len(unified_foods),
-                checksum=checksum,
-                metadata={
-                    "update_type": "scheduled" if not force else "forced",
+            return await self._commit_update(
+                source,
+                unified_foods,
+                force,
+                {
                     "api_source": "Open Food Facts",
                     "sample_size": len(sample_products),
                 },
             )
 
-            self.versions[source] = new_db_version
-            self._save_versions()
-
-            # Clean up old backups
-            await self._cleanup_old_backups(source)
-
-            logger.info(
-                f"Successfully updated {source} database: {len(unified_foods)} foods"
-            )
-
+        except Exception as e:
+            logger.error(f"Error updating {source} database: {e}")
             return UpdateResult(
-                success=True,
+                success=False,
                 source=source,
                 old_version=old_version,
-                new_version=new_version,
-                records_added=max(0, records_added),
-                records_updated=records_updated,
-                records_removed=max(0, records_removed),
-                errors=[],
+                new_version=None,
+                records_added=0,
+                records_updated=0,
+                records_removed=0,
+                errors=[str(e)],
                 duration_seconds=0.0,
             )
 
-        except Exception as e:
-            logger.error(f"Error updating {source} database: {e}")
+    async def _commit_update(
+        self,
+        source: str,
+        foods: Dict[str, UnifiedFoodItem],
+        force: bool,
+        metadata: Dict[str, Any],
+    ) -> UpdateResult:
+        """
+        Diff fetched foods against the version store by per-record hash and
+        commit only the added, changed and removed records as a new version.
+        """
+        current_version = self.versions.get(source)
+        old_version = current_version.version if current_version else None
+        records = {name: asdict(food) for name, food in foods.items()}
+
+        old_hashes = self.version_store.hashes(source)
+        if not old_hashes and current_version:
+            # Version recorded before the store existed: compare the legacy
+            # whole-data checksum, then use its backup as the baseline
+            if not force and current_version.checksum == self._calculate_checksum(
+                records
+            ):
+                self.version_store.seed(source, records)
+                return self._unchanged_result(source, old_version)
+            try:
+                old_foods = await self._load_backup(source, current_version.version)
+                self.version_store.seed(
+                    source, {name: asdict(food) for name, food in old_foods.items()}
+                )
+                old_hashes = self.version_store.hashes(source)
+            except Exception as e:
+                logger.warning(f"Could not load old data for comparison: {e}")
+
+        delta, new_hashes = diff_records(
+            old_hashes,
+            records,
+            lambda keys: self.version_store.get_many(source, keys),
+        )
+
+        # Check if data actually changed (unless forced)
+        if not force and current_version and not delta:
+            return self._unchanged_result(source, old_version)
+
+        # Validate new data
+        validation_errors = await self._validate_food_data(foods)
+        if validation_errors:
             return UpdateResult(
                 success=False,
                 source=source,
@@ -495,10 +485,68 @@ class DatabaseUpdateManager:
                 records_added=0,
                 records_updated=0,
                 records_removed=0,
-                errors=[str(e)],
+                errors=validation_errors,
                 duration_seconds=0.0,
             )
 
+        # Write only the changed records, and the delta for rollback
+        new_version = self._unused_version(
+            source, datetime.now().strftime("%Y%m%d_%H%M%S")
+        )
+        self.version_store.commit(source, new_version, old_version, delta, new_hashes)
+        counts = delta.counts()
+
+        # Update version tracking
+        self.versions[source] = DatabaseVersion(
+            source=source,
+            version=new_version,
+            last_updated=datetime.now().isoformat(),
+            record_count=len(new_hashes),
+            checksum=combined_checksum(new_hashes),
+            metadata={
+                "update_type": "scheduled" if not force else "forced",
+                **metadata,
+                "parent_version": old_version,
+                "delta": counts,
+            },
+        )
+        self._save_versions()
+
+        # Clean up old deltas and legacy backups
+        self.version_store.prune(source, self.max_rollback_versions)
+        await self._cleanup_old_backups(source)
+
+        logger.info(
+            f"Successfully updated {source} database: {len(new_hashes)} foods "
+            f"(+{counts['added']} ~{counts['changed']} -{counts['removed']})"
+        )
+
+        return UpdateResult(
+            success=True,
+            source=source,
+            old_version=old_version,
+            new_version=new_version,
+            records_added=counts["added"],
+            records_updated=counts["changed"],
+            records_removed=counts["removed"],
+            errors=[],
+            duration_seconds=0.0,
+        )
+
+    def _unchanged_result(self, source: str, version: Optional[str]) -> UpdateResult:
+        """Result of an update that found no changes."""
+        return UpdateResult(
+            success=True,
+            source=source,
+            old_version=version,
+            new_version=version,  # No change
+            records_added=0,
+            records_updated=0,
+            records_removed=0,
+            errors=[],
+            duration_seconds=0.0,
+        )
+
     def _generate_food_key(self, name: str) -> str:
         """Generate a standardized key for food items."""
         # Convert to lowercase and replace spaces with underscores
@@ -573,6 +621,22 @@ class DatabaseUpdateManager:
 
         return foods
 
+    def _unused_version(self, source: str, version: str) -> str:
+        """
+        RU: Идентификатор версии, еще не занятый для источника.
+        EN: Version id not yet taken for the source.
+
+        Ids resolve to the second; a suffix keeps several updates or
+        rollbacks within one second from overwriting each other.
+        """
+        taken = set(self.version_store.versions(source))
+        if source in self.versions:
+            taken.add(self.versions[source].version)
+        base, n = version, 1
+        while version in taken:
+            version, n = f"{base}_{n}", n + 1
+        return version
+
     async def _cleanup_old_backups(self, source: str):
         """Remove old backup files beyond the retention limit."""
         try:
@@ -603,18 +667,55 @@ class DatabaseUpdateManager:
             True if rollback successful, False otherwise
         """
         try:
-            # Load backup data
+            # Replay stored manifests back to the target version
+            current = self.versions.get(source)
+            rollback_id = self._unused_version(
+                source,
+                f"{target_version}_rollback_{datetime.now().strftime('%H%M%S')}",
+            )
+            delta = (
+                self.version_store.revert(
+                    source, current.version, target_version, rollback_id
+                )
+                if current
+                else None
+            )
+            if delta is not None:
+                hashes = self.version_store.hashes(source)
+                self.versions[source] = DatabaseVersion(
+                    source=source,
+                    version=rollback_id,
+                    last_updated=datetime.now().isoformat(),
+                    record_count=len(hashes),
+                    checksum=combined_checksum(hashes),
+                    metadata={
+                        "update_type": "rollback",
+                        "rolled_back_from": current.version,
+                        "rolled_back_to": target_version,
+                        "parent_version": current.version,
+                        "delta": delta.counts(),
+                    },
+                )
+                self._save_versions()
+                logger.info(
+                    f"Rolled back {source} to version {target_version} "
+                    f"({sum(delta.counts().values())} records)"
+                )
+                return True
+
+            # No manifest chain (older versions): fall back to a full backup
             backup_data = await self._load_backup(source, target_version)
 
-            # Restore the data (implementation depends on storage method)
-            # For now, just update the version tracking
             if source in self.versions:
                 old_version = self.versions[source]
+                self.version_store.seed(
+                    source, {name: asdict(food) for name, food in backup_data.items()}
+                )
 
                 # Create new version entry for rollback
                 rollback_version = DatabaseVersion(
                     source=source,
-                    version=f"{target_version}_rollback_{datetime.now().strftime('%H%M%S')}",
+                    version=rollback_id,
                     last_updated=datetime.now().isoformat(),
                     record_count=len(backup_data),
                     checksum=self._calculate_checksum(
@@ -675,6 +776,8 @@ class DatabaseUpdateManager:
         if self.off_client and OFF_AVAILABLE:
             await self.off_client.close()
         await self.unified_db.close()
+        if self._owns_http_client:
+            await self.http_client.aclose()
 
 
 # Convenience functions for scheduled updates
@@ -16,10 +16,13 @@ from __future__ import annotations
 import asyncio
 import logging
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
 
 import httpx
 
+from .bulk import BULK_CONCURRENCY, stream_chunks
+from .transport import create_http_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -96,16 +99,24 @@ class USDAClient:
     """
 
     BASE_URL = "https://api.nal.usda.gov/fdc/v1"
-
-    def __init__(self, api_key: Optional[str] = None):
+    # Maximum fdcIds accepted by one POST /foods request
+    BATCH_SIZE = 20
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+    ):
         """
         Initialize USDA client.
 
         Args:
             api_key: Optional API key. If None, will use demo key with limitations.
+            http_client: Shared HTTP client; its owner is responsible for closing it
         """
         self.api_key = api_key or "DEMO_KEY"  # USDA provides demo access
-        self.client = httpx.AsyncClient()
+        self._owns_client = http_client is None
+        self.client = http_client or create_http_client()
 
         # Common nutrient mappings (USDA nutrient IDs to our standard names)
         self.nutrient_mapping = {
@@ -138,7 +149,9 @@ class USDAClient:
             1179: "b6_mg",  # Vitamin B-6
         }
 
-    async def search_foods(self, query: str, page_size: int = 25) -> List[USDAFoodItem]:
+    async def search_foods(
+        self, query: str, page_size: int = 25, *, raise_errors: bool = False
+    ) -> List[USDAFoodItem]:
         """
         RU: Поиск продуктов по названию.
         EN: Search foods by name.
@@ -146,6 +159,7 @@ class USDAClient:
         Args:
             query: Search query (e.g., "chicken breast")
             page_size: Number of results to return (max 200)
+            raise_errors: Re-raise request errors instead of returning []
 
         Returns:
             List of USDAFoodItem objects
@@ -175,16 +189,22 @@ class USDAClient:
             return foods
 
         except Exception as e:
+            if raise_errors:
+                raise
             logger.error(f"Error searching USDA foods for '{query}': {e}")
             return []
 
-    async def get_food_details(self, fdc_id: int) -> Optional[USDAFoodItem]:
+    async def get_food_details(
+        self, fdc_id: int, *, raise_errors: bool = False
+    ) -> Optional[USDAFoodItem]:
         """
         RU: Получить детальную информацию о продукте по FDC ID.
         EN: Get detailed food information by FDC ID.
 
         Args:
             fdc_id: FoodData Central ID
+            raise_errors: Re-raise request errors instead of returning None;
+                a 404 still returns None
 
         Returns:
             USDAFoodItem or None if not found
@@ -194,51 +214,93 @@ class USDAClient:
             params = {"api_key": self.api_key}
 
             response = await self.client.get(url, params=params)
+            if raise_errors and response.status_code == 404:
+                return None
             response.raise_for_status()
             data = response.json()
 
             return self._parse_food_item(data)
 
         except Exception as e:
+            if raise_errors:
+                raise
             logger.error(f"Error getting USDA food details for FDC ID {fdc_id}: {e}")
             return None
 
-    async def get_multiple_foods(self, fdc_ids: List[int]) -> List[USDAFoodItem]:
+    async def get_multiple_foods(
+        self, fdc_ids: Iterable[int], *, raise_errors: bool = False
+    ) -> List[USDAFoodItem]:
         """
-        RU: Получить информацию о нескольких продуктах одним запросом.
-        EN: Get information about multiple foods in one request.
+        RU: Получить информацию о нескольких продуктах.
+        EN: Get information about multiple foods.
+
+        Any number of ids is accepted; they are requested BATCH_SIZE at a time.
 
         Args:
-            fdc_ids: List of FoodData Central IDs
+            fdc_ids: FoodData Central IDs
+            raise_errors: Re-raise request errors instead of skipping the chunk
 
         Returns:
-            List of USDAFoodItem objects
+            List of USDAFoodItem objects, in request order
         """
-        try:
-            url = f"{self.BASE_URL}/foods"
-            payload = {
-                "fdcIds": fdc_ids[:20],  # Limit to 20 IDs per request
-                "format": "abridged",
-                "nutrients": list(self.nutrient_mapping.keys()),
-            }
-
-            response = await self.client.post(
-                url, json=payload, params={"api_key": self.api_key}
+        return [
+            item
+            async for item in self.iter_foods(
+                fdc_ids, ordered=True, raise_errors=raise_errors
             )
-            response.raise_for_status()
-            data = response.json()
+        ]
 
-            foods = []
-            for food_data in data:
-                food_item = self._parse_food_item(food_data)
-                if food_item:
-                    foods.append(food_item)
+    def iter_foods(
+        self,
+        fdc_ids: Iterable[int],
+        concurrency: int = BULK_CONCURRENCY,
+        ordered: bool = False,
+        raise_errors: bool = False,
+    ) -> AsyncIterator[USDAFoodItem]:
+        """
+        RU: Потоковая загрузка продуктов порциями по BATCH_SIZE.
+        EN: Stream foods for any number of ids, BATCH_SIZE ids per request.
 
-            return foods
+        Args:
+            fdc_ids: FoodData Central IDs (consumed lazily)
+            concurrency: Maximum batch requests in flight
+            ordered: Yield in request order instead of completion order
+            raise_errors: Re-raise request errors instead of skipping the chunk
 
-        except Exception as e:
-            logger.error(f"Error getting multiple USDA foods: {e}")
-            return []
+        Yields:
+            USDAFoodItem objects
+        """
+        return stream_chunks(
+            self._fetch_foods_batch,
+            fdc_ids,
+            self.BATCH_SIZE,
+            concurrency=concurrency,
+            ordered=ordered,
+            raise_errors=raise_errors,
+        )
+
+    async def _fetch_foods_batch(self, fdc_ids: List[int]) -> List[USDAFoodItem]:
+        """Fetch one batch of at most BATCH_SIZE foods."""
+        url = f"{self.BASE_URL}/foods"
+        payload = {
+            "fdcIds": fdc_ids,
+            "format": "abridged",
+            "nutrients": list(self.nutrient_mapping.keys()),
+        }
+
+        response = await self.client.post(
+            url, json=payload, params={"api_key": self.api_key}
+        )
+        response.raise_for_status()
+        data = response.json()
+
+        foods = []
+        for food_data in data:
+            food_item = self._parse_food_item(food_data)
+            if food_item:
+                foods.append(food_item)
+
+        return foods
 
     def _parse_food_item(self, food_data: Dict) -> Optional[USDAFoodItem]:
         """
@@ -305,8 +367,9 @@ class USDAClient:
             return None
 
     async def close(self):
-        """Close the HTTP client."""
-        await self.client.aclose()
+        """Close the HTTP client unless it was injected."""
+        if self._owns_client:
+            await self.client.aclose()
 
 
 # Convenience functions for common foods
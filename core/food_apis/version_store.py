@@ -0,0 +1,560 @@
+"""
+Food Version Store
+
+RU: Хранилище версий базы продуктов: хэши записей и дельты между версиями.
+EN: Versioned food record store with per-record hashes and deltas.
+
+Records are stored content-addressed: each distinct record is one
+compressed blob keyed by its hash (zstd when ``zstandard`` is installed,
+zlib otherwise), so records that did not change are shared by every version
+and every source. Each source maps its keys to blob hashes. An update is
+diffed against those hashes into added, changed and removed keys; only
+those refs are rewritten, and a compressed manifest of the changed refs is
+stored under the new version. Rolling back replays manifests in reverse,
+touching only the changed refs, and pruning old manifests garbage-collects
+blobs no version refers to.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+from core import sqlite_pool
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Compression level for record blobs and manifests (zstd 1-22, zlib 1-9)
+COMPRESSION_LEVEL = int(os.getenv("FOOD_VERSIONS_COMPRESSION_LEVEL", "6"))
+CODEC = "zstd" if zstandard is not None else "zlib"
+# Stay well below SQLite's bound-parameter limit
+_CHUNK = 500
+# PRAGMA auto_vacuum value for INCREMENTAL
+_INCREMENTAL = 2
+
+PathLike = Union[str, Path]
+Record = Dict[str, Any]
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS food_blobs (
+        hash TEXT PRIMARY KEY,
+        codec TEXT NOT NULL,
+        data BLOB NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS food_refs (
+        source TEXT NOT NULL,
+        key TEXT NOT NULL,
+        hash TEXT NOT NULL,
+        PRIMARY KEY (source, key)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS food_manifests (
+        source TEXT NOT NULL,
+        version TEXT NOT NULL,
+        parent TEXT,
+        codec TEXT NOT NULL,
+        manifest BLOB NOT NULL,
+        created_at REAL NOT NULL,
+        PRIMARY KEY (source, version)
+    )
+    """,
+)
+
+
+def _compress(data: bytes) -> bytes:
+    if CODEC == "zstd":
+        return zstandard.ZstdCompressor(level=COMPRESSION_LEVEL).compress(data)
+    return zlib.compress(data, min(COMPRESSION_LEVEL, 9))
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd-compressed food versions need zstandard")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+def _dumps(record: Any) -> bytes:
+    return json.dumps(record, sort_keys=True, ensure_ascii=False).encode()
+
+
+def record_hash(record: Mapping[str, Any]) -> str:
+    """
+    RU: Хэш содержимого одной записи.
+    EN: Content hash of one record.
+    """
+    return hashlib.sha256(_dumps(record)).hexdigest()
+
+
+def combined_checksum(hashes: Mapping[str, str]) -> str:
+    """
+    RU: Контрольная сумма набора по хэшам записей.
+    EN: Checksum of a record set, built from its per-record hashes.
+    """
+    digest = hashlib.sha256()
+    for key in sorted(hashes):
+        digest.update(f"{key}\0{hashes[key]}\n".encode())
+    return digest.hexdigest()
+
+
+@dataclass
+class RecordDelta:
+    """
+    RU: Разница между двумя версиями набора записей.
+    EN: Difference between two versions of a record set.
+
+    ``changed`` maps each key to its (old, new) records; ``removed`` keeps
+    the old records so the delta can be reverted. Stored manifests use the
+    same shape with record hashes in place of records.
+    """
+
+    added: Dict[str, Record] = field(default_factory=dict)
+    changed: Dict[str, Tuple[Record, Record]] = field(default_factory=dict)
+    removed: Dict[str, Record] = field(default_factory=dict)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            "added": len(self.added),
+            "changed": len(self.changed),
+            "removed": len(self.removed),
+        }
+
+    def inverted(self) -> "RecordDelta":
+        """Delta that undoes this one."""
+        return RecordDelta(
+            added=dict(self.removed),
+            changed={k: (new, old) for k, (old, new) in self.changed.items()},
+            removed=dict(self.added),
+        )
+
+    def then(self, other: "RecordDelta") -> "RecordDelta":
+        """Delta equivalent to applying this one, then other."""
+        merged = RecordDelta(dict(self.added), dict(self.changed), dict(self.removed))
+        for key, record in other.added.items():
+            old = merged.removed.pop(key, None)
+            if old is None:
+                merged.added[key] = record
+            elif old != record:
+                merged.changed[key] = (old, record)
+        for key, (_, new) in other.changed.items():
+            if key in merged.added:
+                merged.added[key] = new
+            elif key in merged.changed:
+                old = merged.changed[key][0]
+                if old == new:
+                    del merged.changed[key]
+                else:
+                    merged.changed[key] = (old, new)
+            else:
+                merged.changed[key] = other.changed[key]
+        for key, record in other.removed.items():
+            if merged.added.pop(key, None) is not None:
+                continue
+            if key in merged.changed:
+                record = merged.changed.pop(key)[0]
+            merged.removed[key] = record
+        return merged
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "added": self.added,
+            "changed": {k: [old, new] for k, (old, new) in self.changed.items()},
+            "removed": self.removed,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "RecordDelta":
+        return cls(
+            added=dict(data.get("added", {})),
+            changed={k: (v[0], v[1]) for k, v in data.get("changed", {}).items()},
+            removed=dict(data.get("removed", {})),
+        )
+
+
+def diff_records(
+    old_hashes: Mapping[str, str],
+    new_records: Mapping[str, Record],
+    load_old: Callable[[Iterable[str]], Dict[str, Record]],
+) -> Tuple[RecordDelta, Dict[str, str]]:
+    """
+    RU: Сравнить новые записи с текущими по хэшам.
+    EN: Diff new records against the current ones by hash.
+
+    Only the old records of changed or removed keys are loaded.
+
+    Args:
+        old_hashes: Current key -> hash
+        new_records: New key -> record
+        load_old: Loads current records for the given keys
+
+    Returns:
+        (delta, new key -> hash)
+    """
+    new_hashes = {key: record_hash(record) for key, record in new_records.items()}
+    changed = [
+        k for k, h in new_hashes.items() if k in old_hashes and old_hashes[k] != h
+    ]
+    removed = [k for k in old_hashes if k not in new_hashes]
+    old = load_old(changed + removed) if changed or removed else {}
+
+    delta = RecordDelta(
+        added={k: new_records[k] for k in new_hashes if k not in old_hashes},
+        changed={k: (old[k], new_records[k]) for k in changed},
+        removed={k: old[k] for k in removed},
+    )
+    return delta, new_hashes
+
+
+class FoodVersionStore:
+    """
+    RU: SQLite-хранилище записей (по хэшу содержимого) и манифестов версий.
+    EN: Content-addressed SQLite store of food records and version manifests.
+    """
+
+    def __init__(self, path: PathLike) -> None:
+        """
+        Args:
+            path: Database file (created with its schema if missing)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._enable_incremental_vacuum()
+        with sqlite_pool.writer(self.path) as con:
+            for statement in _SCHEMA:
+                con.execute(statement)
+
+    def _enable_incremental_vacuum(self) -> None:
+        """
+        Put the file in auto_vacuum=INCREMENTAL mode, so prune() can hand
+        freed blob pages back to the filesystem. The mode only takes effect
+        before the first table is created or on a VACUUM, so it is set on a
+        plain connection before any other statement; files created without
+        it are rebuilt once.
+        """
+        con = sqlite3.connect(self.path, timeout=30)
+        try:
+            if con.execute("PRAGMA auto_vacuum").fetchone()[0] != _INCREMENTAL:
+                con.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                con.execute("VACUUM")
+        finally:
+            con.close()
+
+    def hashes(self, source: str) -> Dict[str, str]:
+        """Current key -> hash for a source."""
+        rows = (
+            sqlite_pool.reader(self.path)
+            .execute("SELECT key, hash FROM food_refs WHERE source = ?", (source,))
+            .fetchall()
+        )
+        return {row[0]: row[1] for row in rows}
+
+    def get_many(self, source: str, keys: Iterable[str]) -> Dict[str, Record]:
+        """Current records for the given keys (missing keys are skipped)."""
+        keys = list(keys)
+        found: Dict[str, Record] = {}
+        con = sqlite_pool.reader(self.path)
+        for i in range(0, len(keys), _CHUNK):
+            chunk = keys[i : i + _CHUNK]
+            marks = ", ".join("?" * len(chunk))
+            rows = con.execute(
+                "SELECT r.key, b.codec, b.data FROM food_refs r "
+                "JOIN food_blobs b ON b.hash = r.hash "
+                f"WHERE r.source = ? AND r.key IN ({marks})",
+                (source, *chunk),
+            ).fetchall()
+            found.update(
+                (row[0], json.loads(_decompress(row[1], row[2]))) for row in rows
+            )
+        return found
+
+    def records(self, source: str) -> Dict[str, Record]:
+        """All current records for a source."""
+        rows = (
+            sqlite_pool.reader(self.path)
+            .execute(
+                "SELECT r.key, b.codec, b.data FROM food_refs r "
+                "JOIN food_blobs b ON b.hash = r.hash WHERE r.source = ?",
+                (source,),
+            )
+            .fetchall()
+        )
+        return {row[0]: json.loads(_decompress(row[1], row[2])) for row in rows}
+
+    def commit(
+        self,
+        source: str,
+        version: str,
+        parent: Optional[str],
+        delta: RecordDelta,
+        hashes: Optional[Mapping[str, str]] = None,
+    ) -> RecordDelta:
+        """
+        RU: Записать новые записи, ссылки и манифест новой версии.
+        EN: Store the new records, refs and manifest of a new version.
+
+        Args:
+            source: Data source name
+            version: New version id
+            parent: Version the delta applies to (None for the first one)
+            delta: Changes from parent to version
+            hashes: Precomputed hashes of the added/changed records
+
+        Returns:
+            The delta as stored, with record hashes in place of records
+        """
+        hashes = hashes or {}
+        new = {k: hashes.get(k) or record_hash(r) for k, r in delta.added.items()}
+        new.update(
+            (k, hashes.get(k) or record_hash(n)) for k, (_, n) in delta.changed.items()
+        )
+        blobs = {new[k]: r for k, r in delta.added.items()}
+        blobs.update((new[k], n) for k, (_, n) in delta.changed.items())
+
+        with sqlite_pool.writer(self.path) as con:
+            old = self._current_hashes(con, source, [*delta.changed, *delta.removed])
+            refs = RecordDelta(
+                added={
+                    k: new[k] for k in [*delta.added, *delta.changed] if k not in old
+                },
+                changed={k: (old[k], new[k]) for k in delta.changed if k in old},
+                removed={k: old[k] for k in delta.removed if k in old},
+            )
+            self._put_blobs(con, blobs)
+            self._apply(con, source, refs)
+            self._put_manifest(con, source, version, parent, refs)
+        return refs
+
+    def seed(self, source: str, records: Mapping[str, Record]) -> None:
+        """Store records as the baseline of a source without a manifest."""
+        hashes = {key: record_hash(r) for key, r in records.items()}
+        with sqlite_pool.writer(self.path) as con:
+            self._put_blobs(con, {hashes[k]: r for k, r in records.items()})
+            con.execute("DELETE FROM food_refs WHERE source = ?", (source,))
+            con.executemany(
+                "INSERT INTO food_refs(source, key, hash) VALUES (?, ?, ?)",
+                [(source, key, h) for key, h in hashes.items()],
+            )
+
+    def delta_between(
+        self, source: str, current: str, target: str
+    ) -> Optional[RecordDelta]:
+        """
+        RU: Дельта (по хэшам) для отката с current на target, или None.
+        EN: Hash delta taking the refs from current back to target, or None.
+        """
+        con = sqlite_pool.reader(self.path)
+        known = con.execute(
+            "SELECT 1 FROM food_manifests WHERE source = ? AND version IN (?, ?)",
+            (source, current, target),
+        ).fetchone()
+        if known is None:
+            return None
+
+        combined = RecordDelta()
+        version: Optional[str] = current
+        seen = set()
+        while version != target:
+            if version in seen:
+                return None
+            seen.add(version)
+            row = con.execute(
+                "SELECT parent, codec, manifest FROM food_manifests "
+                "WHERE source = ? AND version = ?",
+                (source, version),
+            ).fetchone()
+            if row is None:
+                return None
+            step = RecordDelta.from_dict(json.loads(_decompress(row[1], row[2])))
+            combined = combined.then(step.inverted())
+            version = row[0]
+        return combined
+
+    def revert(
+        self, source: str, current: str, target: str, version: str
+    ) -> Optional[RecordDelta]:
+        """
+        RU: Откатить ссылки с current на target как новую версию.
+        EN: Roll the refs back from current to target as a new version.
+
+        Only the refs of records changed in between are rewritten; no record
+        data is read.
+
+        Returns:
+            The applied hash delta, or None if no manifest chain links the two
+        """
+        refs = self.delta_between(source, current, target)
+        if refs is None:
+            return None
+        with sqlite_pool.writer(self.path) as con:
+            self._apply(con, source, refs)
+            self._put_manifest(con, source, version, current, refs)
+        return refs
+
+    def versions(self, source: str) -> List[str]:
+        """Versions with a stored manifest, newest first."""
+        rows = (
+            sqlite_pool.reader(self.path)
+            .execute(
+                "SELECT version FROM food_manifests WHERE source = ? "
+                "ORDER BY created_at DESC, rowid DESC",
+                (source,),
+            )
+            .fetchall()
+        )
+        return [row[0] for row in rows]
+
+    def prune(self, source: str, keep: int) -> int:
+        """
+        RU: Удалить все манифесты, кроме keep последних, и лишние записи.
+        EN: Drop all but the newest `keep` manifests and unreferenced blobs.
+
+        Returns:
+            Number of manifests removed
+        """
+        old = self.versions(source)[keep:]
+        if old:
+            with sqlite_pool.writer(self.path) as con:
+                con.executemany(
+                    "DELETE FROM food_manifests WHERE source = ? AND version = ?",
+                    [(source, version) for version in old],
+                )
+                self._collect_garbage(con)
+                # sqlite3 steps the pragma only once and each step frees one
+                # page, so run it once per free page
+                free = con.execute("PRAGMA freelist_count").fetchone()[0]
+                for _ in range(free):
+                    con.execute("PRAGMA incremental_vacuum(1)")
+        return len(old)
+
+    def stats(self) -> Dict[str, int]:
+        """Blob, ref and manifest counts and their stored sizes in bytes."""
+        con = sqlite_pool.reader(self.path)
+        blobs, blob_bytes = con.execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM food_blobs"
+        ).fetchone()
+        manifests, manifest_bytes = con.execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(manifest)), 0) FROM food_manifests"
+        ).fetchone()
+        refs = con.execute("SELECT COUNT(*) FROM food_refs").fetchone()[0]
+        return {
+            "blobs": blobs,
+            "blob_bytes": blob_bytes,
+            "refs": refs,
+            "manifests": manifests,
+            "manifest_bytes": manifest_bytes,
+        }
+
+    @staticmethod
+    def _current_hashes(con, source: str, keys: List[str]) -> Dict[str, str]:
+        found: Dict[str, str] = {}
+        for i in range(0, len(keys), _CHUNK):
+            chunk = keys[i : i + _CHUNK]
+            marks = ", ".join("?" * len(chunk))
+            rows = con.execute(
+                f"SELECT key, hash FROM food_refs WHERE source = ? AND key IN ({marks})",
+                (source, *chunk),
+            ).fetchall()
+            found.update((row[0], row[1]) for row in rows)
+        return found
+
+    @staticmethod
+    def _put_blobs(con, blobs: Mapping[str, Record]) -> None:
+        """Insert records under their hashes, compressing only new ones."""
+        hashes = list(blobs)
+        stored = set()
+        for i in range(0, len(hashes), _CHUNK):
+            chunk = hashes[i : i + _CHUNK]
+            marks = ", ".join("?" * len(chunk))
+            rows = con.execute(
+                f"SELECT hash FROM food_blobs WHERE hash IN ({marks})", chunk
+            ).fetchall()
+            stored.update(row[0] for row in rows)
+        con.executemany(
+            "INSERT OR IGNORE INTO food_blobs(hash, codec, data) VALUES (?, ?, ?)",
+            [
+                (h, CODEC, _compress(_dumps(blobs[h])))
+                for h in hashes
+                if h not in stored
+            ],
+        )
+
+    @staticmethod
+    def _apply(con, source: str, refs: RecordDelta) -> None:
+        """Point the source's refs at the new hashes of a hash delta."""
+        upserts = list(refs.added.items())
+        upserts += [(k, new) for k, (_, new) in refs.changed.items()]
+        con.executemany(
+            "INSERT INTO food_refs(source, key, hash) VALUES (?, ?, ?) "
+            "ON CONFLICT(source, key) DO UPDATE SET hash = excluded.hash",
+            [(source, key, h) for key, h in upserts],
+        )
+        con.executemany(
+            "DELETE FROM food_refs WHERE source = ? AND key = ?",
+            [(source, key) for key in refs.removed],
+        )
+
+    @staticmethod
+    def _put_manifest(
+        con, source: str, version: str, parent: Optional[str], refs: RecordDelta
+    ) -> None:
+        con.execute(
+            "INSERT OR REPLACE INTO food_manifests"
+            "(source, version, parent, codec, manifest, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                source,
+                version,
+                parent,
+                CODEC,
+                _compress(_dumps(refs.to_dict())),
+                time.time(),
+            ),
+        )
+
+    @staticmethod
+    def _collect_garbage(con) -> int:
+        """Delete blobs referenced by no current ref and no kept manifest."""
+        con.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS live_hashes (hash TEXT PRIMARY KEY)"
+        )
+        try:
+            for codec, manifest in con.execute(
+                "SELECT codec, manifest FROM food_manifests"
+            ).fetchall():
+                refs = RecordDelta.from_dict(json.loads(_decompress(codec, manifest)))
+                live = [*refs.added.values(), *refs.removed.values()]
+                live += [h for pair in refs.changed.values() for h in pair]
+                con.executemany(
+                    "INSERT OR IGNORE INTO live_hashes(hash) VALUES (?)",
+                    [(h,) for h in live],
+                )
+            removed = con.execute(
+                "DELETE FROM food_blobs WHERE hash NOT IN (SELECT hash FROM food_refs) "
+                "AND hash NOT IN (SELECT hash FROM live_hashes)"
+            ).rowcount
+        finally:
+            con.execute("DROP TABLE live_hashes")
+        if removed:
+            logger.info(f"Removed {removed} unreferenced food record blobs")
+        return removed
@@ -0,0 +1,361 @@
+"""
+Food Build Manifest
+
+RU: Манифест инкрементальной сборки базы продуктов.
+EN: Manifest for incremental food DB builds.
+
+For every source chunk file the manifest keeps its size, mtime and content
+hash, and for every (chunk, canonical name) pair the chunk's pre-aggregated
+contribution (a ``core.food_merge.PartialGroup``). A re-run compares chunk
+files against it (stat first, hashing only files whose stat changed), swaps
+the contributions of changed or removed chunks, and re-merges just the
+names those chunks touched, from the contributions of every chunk.
+
+The manifest is a SQLite file attached to the food database connection, so
+a manifest update and the matching food rows commit in one transaction.
+A generation counter is stored both here and in the food database's
+``user_version``; if they disagree (e.g. the database was rebuilt by a full
+build), the manifest is not trusted and the next build starts fresh.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Tuple, Union
+
+from .food_ingest import ChunkResult
+from .food_merge import PartialGroup
+
+PathLike = Union[str, Path]
+
+# Bump when merge inputs or contribution encoding change; forces a fresh build
+MANIFEST_VERSION = 1
+
+# Attached schema name on the food database connection
+SCHEMA = "manifest"
+
+_TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS {s}.build_meta (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS {s}.build_chunks (
+        chunk_id INTEGER PRIMARY KEY,
+        path TEXT NOT NULL UNIQUE,
+        source TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        sha256 TEXT NOT NULL,
+        records INTEGER NOT NULL,
+        ord INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS {s}.build_contributions (
+        chunk_id INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        data TEXT NOT NULL,
+        PRIMARY KEY (chunk_id, name)
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS {s}.idx_contributions_name
+    ON build_contributions(name)
+    """,
+)
+
+
+def file_hash(path: PathLike) -> str:
+    """
+    RU: SHA-256 содержимого файла.
+    EN: SHA-256 of a file's content.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _dump_partial(partial: PartialGroup) -> str:
+    # Python's json keeps NaN/inf and -0.0, which the merge must see as-is
+    return json.dumps([partial.rows, sorted(partial.flags), sorted(partial.sources)])
+
+
+def _load_partial(data: str) -> PartialGroup:
+    rows, flags, sources = json.loads(data)
+    partial = PartialGroup()
+    partial.rows = [tuple(row) for row in rows]
+    partial.flags = set(flags)
+    partial.sources = set(sources)
+    return partial
+
+
+@dataclass
+class ChunkState:
+    """
+    RU: Состояние файла-чанка на диске.
+    EN: On-disk state of one chunk file.
+    """
+
+    source: str
+    path: str
+    key: str
+    size: int
+    mtime_ns: int
+    sha256: str = ""
+
+
+@dataclass
+class BuildPlan:
+    """
+    RU: Что изменилось с прошлой сборки.
+    EN: What changed since the last build.
+    """
+
+    changed: List[ChunkState] = field(default_factory=list)
+    unchanged: List[ChunkState] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.changed or self.removed)
+
+
+class BuildManifest:
+    """
+    RU: Манифест сборки: хэши чанков и вклад каждого чанка по именам.
+    EN: Build manifest: chunk hashes and per-name chunk contributions.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, root: PathLike, schema: str = SCHEMA):
+        """
+        Args:
+            conn: Food database connection with the manifest attached
+            root: Project root; chunk paths are stored relative to it
+            schema: Name the manifest database is attached under
+        """
+        self.conn = conn
+        self.root = Path(root).resolve()
+        self.s = schema
+        for statement in _TABLES:
+            conn.execute(statement.format(s=schema))
+
+    # -- meta ---------------------------------------------------------------
+
+    def _meta(self, key: str, default: str = "") -> str:
+        row = self.conn.execute(
+            f"SELECT value FROM {self.s}.build_meta WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self.conn.execute(
+            f"INSERT OR REPLACE INTO {self.s}.build_meta(key, value) VALUES (?, ?)",
+            (key, value),
+        )
+
+    @property
+    def generation(self) -> int:
+        return int(self._meta("generation", "0"))
+
+    def matches(self, schema: str = "main") -> bool:
+        """
+        RU: Соответствует ли манифест базе данных продуктов.
+        EN: Whether the manifest describes the attached food database.
+        """
+        user_version = self.conn.execute(f"PRAGMA {schema}.user_version").fetchone()[0]
+        return (
+            self._meta("version") == str(MANIFEST_VERSION)
+            and self.generation > 0
+            and self.generation == user_version
+        )
+
+    def commit_generation(self, schema: str = "main") -> int:
+        """
+        RU: Увеличить поколение в манифесте и в базе (в текущей транзакции).
+        EN: Bump the generation in the manifest and the food database.
+
+        Call inside the transaction that writes the food rows.
+        """
+        generation = self.generation + 1
+        self._set_meta("version", str(MANIFEST_VERSION))
+        self._set_meta("generation", str(generation))
+        self.conn.execute(f"PRAGMA {schema}.user_version = {generation:d}")
+        return generation
+
+    # -- chunks -------------------------------------------------------------
+
+    def _key(self, path: PathLike) -> str:
+        resolved = Path(path).resolve()
+        try:
+            return resolved.relative_to(self.root).as_posix()
+        except ValueError:
+            return resolved.as_posix()
+
+    def plan(self, tasks: Iterable[Tuple[str, str]]) -> BuildPlan:
+        """
+        RU: Сравнить чанки с манифестом.
+        EN: Compare chunk files against the manifest.
+
+        A chunk whose size and mtime match is taken as unchanged without
+        reading it; otherwise its content hash decides.
+
+        Args:
+            tasks: (source label, chunk path) pairs of the current build
+        """
+        known = {
+            row[0]: row[1:]
+            for row in self.conn.execute(
+                f"SELECT path, source, size, mtime_ns, sha256 FROM {self.s}.build_chunks"
+            )
+        }
+        plan = BuildPlan()
+        seen: Set[str] = set()
+        for source, path in tasks:
+            st = os.stat(path)
+            state = ChunkState(
+                source, path, self._key(path), st.st_size, st.st_mtime_ns
+            )
+            seen.add(state.key)
+            old = known.get(state.key)
+            if old is not None and old[:3] == (source, state.size, state.mtime_ns):
+                state.sha256 = old[3]
+                plan.unchanged.append(state)
+                continue
+            state.sha256 = file_hash(path)
+            if old is not None and (old[0], old[3]) == (source, state.sha256):
+                # Touched but identical: only refresh the stat cache
+                self.conn.execute(
+                    f"UPDATE {self.s}.build_chunks SET size = ?, mtime_ns = ? "
+                    "WHERE path = ?",
+                    (state.size, state.mtime_ns, state.key),
+                )
+                plan.unchanged.append(state)
+            else:
+                plan.changed.append(state)
+        plan.removed = sorted(set(known) - seen)
+        return plan
+
+    def remove_chunk(self, key: str) -> Set[str]:
+        """
+        RU: Удалить чанк и его вклад из манифеста.
+        EN: Drop a chunk and its contributions from the manifest.
+
+        Returns:
+            Canonical names the chunk contributed to
+        """
+        row = self.conn.execute(
+            f"SELECT chunk_id FROM {self.s}.build_chunks WHERE path = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return set()
+        names = {
+            name
+            for (name,) in self.conn.execute(
+                f"SELECT name FROM {self.s}.build_contributions WHERE chunk_id = ?", row
+            )
+        }
+        self.conn.execute(
+            f"DELETE FROM {self.s}.build_contributions WHERE chunk_id = ?", row
+        )
+        self.conn.execute(f"DELETE FROM {self.s}.build_chunks WHERE chunk_id = ?", row)
+        return names
+
+    def replace_chunk(self, state: ChunkState, result: ChunkResult) -> Set[str]:
+        """
+        RU: Заменить вклад чанка результатом новой нормализации.
+        EN: Replace a chunk's contributions with a fresh normalisation.
+
+        Returns:
+            Canonical names affected: those in the old or the new contribution
+        """
+        names = self.remove_chunk(state.key)
+        cur = self.conn.execute(
+            f"INSERT INTO {self.s}.build_chunks"
+            "(path, source, size, mtime_ns, sha256, records, ord) "
+            "VALUES (?, ?, ?, ?, ?, ?, 0)",
+            (
+                state.key,
+                state.source,
+                state.size,
+                state.mtime_ns,
+                state.sha256,
+                result.records,
+            ),
+        )
+        self.conn.executemany(
+            f"INSERT INTO {self.s}.build_contributions(chunk_id, name, data) "
+            "VALUES (?, ?, ?)",
+            (
+                (cur.lastrowid, name, _dump_partial(partial))
+                for name, partial in result.groups.items()
+            ),
+        )
+        return names | set(result.groups)
+
+    def set_order(self, tasks: Iterable[Tuple[str, str]]) -> None:
+        """
+        RU: Запомнить порядок чанков в сборке.
+        EN: Record the build order of chunks (contributions fold in it).
+        """
+        self.conn.executemany(
+            f"UPDATE {self.s}.build_chunks SET ord = ? WHERE path = ?",
+            ((i, self._key(path)) for i, (_, path) in enumerate(tasks)),
+        )
+
+    def record_counts(self) -> Dict[str, int]:
+        """
+        RU: Число исходных записей по источникам.
+        EN: Input record counts per source.
+        """
+        return dict(
+            self.conn.execute(
+                f"SELECT source, SUM(records) FROM {self.s}.build_chunks GROUP BY source"
+            ).fetchall()
+        )
+
+    # -- contributions ------------------------------------------------------
+
+    def partials(self, names: Iterable[str]) -> Dict[str, PartialGroup]:
+        """
+        RU: Свести вклад всех чанков для заданных имен.
+        EN: Fold the contributions of every chunk for the given names.
+
+        Returns:
+            Partials keyed by name, in name order; names without any
+            contribution left are absent
+        """
+        conn = self.conn
+        conn.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS build_names(name TEXT PRIMARY KEY)"
+        )
+        conn.execute("DELETE FROM temp.build_names")
+        conn.executemany(
+            "INSERT INTO temp.build_names(name) VALUES (?)", ((n,) for n in names)
+        )
+        groups: Dict[str, PartialGroup] = {}
+        rows = conn.execute(
+            f"""
+            SELECT c.name, c.data
+            FROM temp.build_names AS n
+            JOIN {self.s}.build_contributions AS c ON c.name = n.name
+            JOIN {self.s}.build_chunks AS k ON k.chunk_id = c.chunk_id
+            ORDER BY c.name, k.ord
+            """
+        )
+        for name, data in rows:
+            partial = _load_partial(data)
+            existing = groups.get(name)
+            if existing is None:
+                groups[name] = partial
+            else:
+                existing.update(partial)
+        return groups
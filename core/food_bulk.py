@@ -0,0 +1,90 @@
+"""
+Bulk Food Lookups
+
+RU: Пакетная выборка продуктов из FoodDB (SQLite) и суммирование нутриентов.
+EN: Batched FoodDB (SQLite) lookups and nutrient/cost aggregation.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from typing import Dict, Iterable, List
+
+NUTRIENT_KEYS = [
+    "kcal",
+    "protein_g",
+    "fat_g",
+    "carbs_g",
+    "Fe_mg",
+    "Ca_mg",
+    "K_mg",
+    "Mg_mg",
+    "VitD_IU",
+    "B12_ug",
+    "Folate_ug",
+    "Iodine_ug",
+]
+
+# Stay well below SQLITE_MAX_VARIABLE_NUMBER on old builds
+_IN_CHUNK = 500
+
+
+def fetch_foods(con: sqlite3.Connection, food_ids: Iterable[str]) -> Dict[str, Dict]:
+    """
+    RU: Получить строки продуктов одним запросом WHERE id IN (...).
+    EN: Fetch food rows with a single WHERE id IN (...) query.
+
+    Args:
+        con: Open FoodDB connection
+        food_ids: Food ids (duplicates are ignored)
+
+    Returns:
+        Mapping food id -> row dict; unknown ids are absent
+    """
+    ids = list(dict.fromkeys(food_ids))
+    foods: Dict[str, Dict] = {}
+    for i in range(0, len(ids), _IN_CHUNK):
+        chunk = ids[i : i + _IN_CHUNK]
+        sql = "SELECT * FROM foods WHERE id IN (" + ",".join("?" * len(chunk)) + ")"
+        for row in con.execute(sql, chunk).fetchall():
+            item = dict(row)
+            foods[item["id"]] = item
+    return foods
+
+
+def sum_nutrients(ingredients: List[Dict], foods: Dict[str, Dict]) -> Dict[str, float]:
+    """
+    RU: Сумма нутриентов по ингредиентам (grams / per_g).
+    EN: Sum nutrients over ingredients scaled by grams / per_g.
+
+    Args:
+        ingredients: Dicts with "food_id" and "grams"
+        foods: Rows from fetch_foods()
+
+    Returns:
+        Totals for every key in NUTRIENT_KEYS
+    """
+    total = {k: 0.0 for k in NUTRIENT_KEYS}
+    for ing in ingredients:
+        food = foods.get(ing["food_id"])
+        if not food:
+            continue
+        ratio = float(ing["grams"]) / float(food.get("per_g", 100.0))
+        for k in NUTRIENT_KEYS:
+            total[k] += float(food.get(k, 0.0)) * ratio
+    return total
+
+
+def sum_cost(ingredients: List[Dict], foods: Dict[str, Dict]) -> float:
+    """
+    RU: Стоимость ингредиентов по price_per_100g.
+    EN: Ingredient cost from price_per_100g.
+    """
+    cost = 0.0
+    for ing in ingredients:
+        food = foods.get(ing["food_id"])
+        if not food:
+            continue
+        price100 = float(food.get("price_per_100g", 0.0))
+        cost += price100 * (float(ing["grams"]) / 100.0)
+    return cost
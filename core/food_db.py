@@ -14,8 +14,24 @@ import csv
 from dataclasses import dataclass
 from typing import Dict, List, Optional, Set
 
+from .booster_index import BoosterIndex
+from .diet_index import IndexedDict
 from .targets import MicroTargets
 
+# Micronutrients with booster rankings (names as in get_nutrient_amount)
+BOOSTER_MICROS = (
+    "iron_mg",
+    "calcium_mg",
+    "folate_ug",
+    "vitamin_d_iu",
+    "b12_ug",
+    "iodine_ug",
+    "magnesium_mg",
+    "potassium_mg",
+)
+# Stands for any user flag that no food carries
+_OTHER_FLAG = "\0other"
+
 
 @dataclass
 class FoodItem:
@@ -88,6 +104,54 @@ class FoodItem:
         return nutrient_mapping.get(nutrient_name, 0.0) * factor
 
 
+class FoodCatalog(IndexedDict):
+    """
+    RU: Словарь продуктов с кешированным рейтингом бустеров.
+    EN: Food dict with a cached booster ranking (dropped on mutation).
+    """
+
+
+def _booster_compatible(food_flags: Set[str], flags: Set[str]) -> bool:
+    return not flags or flags.issubset(food_flags) or not flags.intersection(food_flags)
+
+
+def _build_booster_index(
+    food_db: Dict[str, FoodItem], eager: bool = True
+) -> BoosterIndex:
+    foods = []
+    for name, item in food_db.items():
+        # getattr: tolerate partial items (e.g. hand-built test doubles)
+        macro = {k: getattr(item, k, 0.0) for k in ("protein_g", "fat_g", "carbs_g")}
+        per_100g = 100.0 / (getattr(item, "unit_per", 100) or 100)
+        kcal = macro["protein_g"] * 4 + macro["carbs_g"] * 4 + macro["fat_g"] * 9
+        kcal *= per_100g
+        price = getattr(item, "price_per_unit", 0.0) * per_100g
+        nutrients = {m: item.get_nutrient_amount(m, 100.0) for m in BOOSTER_MICROS}
+        foods.append((name, nutrients, kcal, price, set(getattr(item, "flags", ()))))
+    vocabulary = sorted({f for food in foods for f in food[4]})
+    return BoosterIndex(
+        foods,
+        BOOSTER_MICROS,
+        vocabulary + [_OTHER_FLAG],
+        _booster_compatible,
+        other=_OTHER_FLAG,
+        eager=eager,
+    )
+
+
+def booster_index(food_db: Dict[str, FoodItem]) -> BoosterIndex:
+    """
+    RU: Рейтинг бустеров для базы (кешируется для FoodCatalog).
+    EN: Booster ranking for a food DB (cached on FoodCatalog instances).
+
+    A plain dict has no snapshot to cache on, so it gets a lazy index that
+    ranks only what is looked up.
+    """
+    if isinstance(food_db, IndexedDict):
+        return food_db.cached_index("boosters", lambda: _build_booster_index(food_db))
+    return _build_booster_index(food_db, eager=False)
+
+
 def parse_food_db(csv_path: str = "data/food_db.csv") -> Dict[str, FoodItem]:
     """
     RU: Парсит CSV файл базы данных продуктов.
@@ -99,7 +163,7 @@ def parse_food_db(csv_path: str = "data/food_db.csv") -> Dict[str, FoodItem]:
     Returns:
         Dictionary mapping food names to FoodItem objects
     """
-    food_db = {}
+    food_db = FoodCatalog()
 
     with open(csv_path, "r", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -150,35 +214,8 @@ def pick_booster_for(
     Returns:
         Name of the best booster food or None if not found
     """
-    # Define which foods are good sources for each micronutrient
-    booster_candidates = {
-        "iron_mg": ["lentils", "spinach_raw", "tofu"],
-        "calcium_mg": ["tofu"],
-        "folate_ug": ["lentils", "spinach_raw"],
-        "vitamin_d_iu": ["salmon"],
-        "b12_ug": ["chicken_breast", "salmon", "greek_yogurt"],
-        "iodine_ug": ["chicken_breast", "salmon", "greek_yogurt"],
-        "magnesium_mg": ["lentils", "spinach_raw", "tofu"],
-        "potassium_mg": ["lentils", "spinach_raw", "tofu"],
-    }
-
-    candidates = booster_candidates.get(micro, [])
-
-    # Filter by dietary flags
-    filtered_candidates = []
-    for candidate in candidates:
-        if candidate in food_db:
-            food = food_db[candidate]
-            # Check if food matches dietary flags
-            if (
-                not flags
-                or flags.issubset(food.flags)
-                or not flags.intersection(food.flags)
-            ):
-                filtered_candidates.append(candidate)
-
-    # Return the first matching candidate
-    return filtered_candidates[0] if filtered_candidates else None
+    # Best compatible source by nutrient density per kcal
+    return booster_index(food_db).best(micro, flags)
 
 
 def aggregate_shopping(days: List[Dict]) -> Dict[str, float]:
@@ -16,6 +16,9 @@ from typing import Dict, List, Optional
 
 from .meal_i18n import Language, translate_food
 
+# Diet flags that change compatibility in FoodDB._compatible
+_DIET_FLAGS = ("VEG", "PESC", "GF")
+
 MICRO_KEYS = [
     "Fe_mg",
     "Ca_mg",
@@ -47,6 +50,8 @@ class FoodDB:
 
     def __init__(self, path: str) -> None:
         self.items: Dict[str, FoodItem] = {}
+        self._matrix = None
+        self._boosters = None
         with open(path, newline="", encoding="utf-8") as f:
             for row in csv.DictReader(f):
                 micros = {k: float(row.get(k, 0) or 0) for k in MICRO_KEYS}
@@ -71,6 +76,46 @@ class FoodDB:
     def get_food(self, name: str) -> FoodItem:
         return self.items[name]
 
+    @property
+    def matrix(self):
+        """RU: Матрица нутриентов (строится один раз; None без numpy).
+        EN: Per-gram nutrient matrix, built once (None if numpy is missing).
+        """
+        if self._matrix is None:
+            try:
+                from .nutrient_matrix import NutrientMatrix
+            except ImportError:
+                return None
+            self._matrix = NutrientMatrix.from_food_db(self)
+        return self._matrix
+
+    @property
+    def booster_index(self):
+        """RU: Рейтинг бустеров по микро и флагам (строится один раз).
+        EN: Booster ranking per micro and diet flags, built once.
+        """
+        if self._boosters is None:
+            from .booster_index import BoosterIndex
+
+            self._boosters = BoosterIndex(
+                (
+                    (
+                        name,
+                        fi.micros,
+                        (fi.protein_g * 4 + fi.carbs_g * 4 + fi.fat_g * 9)
+                        * 100.0
+                        / fi.per_g,
+                        fi.price * 100.0 / fi.per_g,
+                        fi.flags,
+                    )
+                    for name, fi in self.items.items()
+                ),
+                MICRO_KEYS,
+                _DIET_FLAGS,
+                self._compatible,
+            )
+        return self._boosters
+
     def get_translated_food_name(self, name: str, lang: Language) -> str:
         """Get translated food name for the specified language."""
         return translate_food(lang, name)
@@ -79,23 +124,7 @@ class FoodDB:
         """RU: Выбрать продукт-донор для микро с учетом флагов диеты.
         EN: Pick a donor food for given micro respecting diet flags.
         """
-        donors = {
-            "Fe_mg": ["lentils", "spinach", "tofu", "chicken_breast"],
-            "Ca_mg": ["greek_yogurt", "tofu", "spinach"],
-            "VitD_IU": ["salmon", "eggs?"],
-            "B12_ug": ["salmon", "chicken_breast", "greek_yogurt"],
-            "Folate_ug": ["spinach", "lentils"],
-            "Iodine_ug": ["salmon"],  # и/или йодированная соль (тут пропускаем)
-            "K_mg": ["banana", "spinach", "potato?"],
-            "Mg_mg": ["oats", "spinach", "lentils"],
-        }
-        for candidate in donors.get(micro, []):
-            item = self.items.get(candidate)
-            if not item:
-                continue
-            if self._compatible(item.flags, diet_flags):
-                return candidate
-        return None
+        return self.booster_index.best(micro, diet_flags)
 
     def _compatible(self, food_flags: List[str], diet_flags: List[str]) -> bool:
         # RU: очень простой фильтр — подойдет для MVP
@@ -0,0 +1,210 @@
+"""
+Parallel Food Ingestion
+
+RU: Параллельная нормализация CSV-чанков USDA/OFF по процессам.
+EN: Parallel normalisation of USDA/OFF CSV chunks across processes.
+
+Each chunk file is read and normalised by a worker process, which also
+pre-aggregates its records into per-name partials (see
+``core.food_merge.PartialGroup``). The parent reduces the partials in chunk
+order (USDA chunks, then OFF chunks, each sorted by file name), so both the
+merged values and the order of names match a sequential build regardless of
+the number of workers or the order in which workers finish.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .food_merge import PartialGroup
+from .food_sources.base import BaseAdapter
+from .food_sources.off import OFFAdapter
+from .food_sources.usda import USDAAdapter
+
+# Worker processes for parallel ingestion (0 = one per CPU)
+INGEST_WORKERS = int(os.getenv("FOOD_BUILD_WORKERS", "0"))
+
+# Adapter per source label; workers build their own adapter per chunk
+ADAPTERS = {
+    "USDA": USDAAdapter,
+    "OFF": OFFAdapter,
+}
+
+
+@dataclass
+class ChunkResult:
+    """
+    RU: Результат обработки одного чанка.
+    EN: Result of normalising one chunk file.
+    """
+
+    source: str
+    path: str
+    records: int = 0
+    seconds: float = 0.0
+    groups: Dict[str, PartialGroup] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+@dataclass
+class IngestResult:
+    """
+    RU: Итог параллельной загрузки: агрегаты по именам и статистика.
+    EN: Reduced ingestion output: per-name partials plus statistics.
+    """
+
+    groups: Dict[str, PartialGroup]
+    counts: Dict[str, int]
+    chunks: List[ChunkResult]
+    workers: int
+    seconds: float
+
+
+def chunk_files(csv_path: str) -> List[str]:
+    """
+    RU: Список CSV-файлов источника (директория чанков или один файл).
+    EN: CSV files of a source (a chunk directory or a single file).
+
+    Directories are listed in sorted order, as the adapters read them.
+    """
+    if os.path.isdir(csv_path):
+        return [
+            os.path.join(csv_path, name)
+            for name in sorted(os.listdir(csv_path))
+            if name.lower().endswith(".csv")
+        ]
+    return [csv_path]
+
+
+def normalize_chunk(task: Tuple[str, str]) -> ChunkResult:
+    """
+    RU: Нормализовать один чанк и агрегировать его записи по имени.
+    EN: Normalise one chunk and pre-aggregate its records by name.
+
+    Runs in a worker process; errors are returned rather than raised so that
+    the parent can drop the whole source, as a sequential build would.
+
+    Args:
+        task: (source label, chunk file path)
+    """
+    source, path = task
+    result = ChunkResult(source=source, path=path)
+    start = time.perf_counter()
+    try:
+        adapter: BaseAdapter = ADAPTERS[source](path)
+        groups: Dict[str, PartialGroup] = {}
+        for rec in adapter.normalize():
+            partial = groups.get(rec.name)
+            if partial is None:
+                partial = groups[rec.name] = PartialGroup()
+            partial.add(rec)
+            result.records += 1
+        result.groups = groups
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+        result.records = 0
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def worker_count(tasks: List[Tuple[str, str]], workers: Optional[int] = None) -> int:
+    """
+    RU: Число процессов для списка чанков.
+    EN: Worker processes to use for a list of chunks.
+
+    None/0 means INGEST_WORKERS, or one per CPU; never more than chunks.
+    """
+    workers = workers or INGEST_WORKERS or os.cpu_count() or 1
+    return max(1, min(workers, len(tasks) or 1))
+
+
+def map_chunks(
+    tasks: List[Tuple[str, str]], workers: Optional[int] = None
+) -> Iterator[ChunkResult]:
+    """
+    RU: Нормализовать чанки в пуле процессов, результаты по порядку задач.
+    EN: Normalise chunks over a process pool, yielding results in task order.
+
+    Args:
+        tasks: (source label, chunk path) pairs
+        workers: Worker processes (see worker_count; 1 = in this process)
+    """
+    if worker_count(tasks, workers) == 1:
+        yield from map(normalize_chunk, tasks)
+        return
+
+    with ProcessPoolExecutor(max_workers=worker_count(tasks, workers)) as pool:
+        # map() yields in submission order, which keeps the reduce deterministic
+        yield from pool.map(normalize_chunk, tasks)
+
+
+def ingest_chunks(
+    tasks: Iterable[Tuple[str, str]], workers: Optional[int] = None
+) -> IngestResult:
+    """
+    RU: Обработать чанки в пуле процессов и свести результаты.
+    EN: Map chunks over a process pool and reduce the results.
+
+    A source with any failing chunk contributes nothing, matching the
+    sequential build, which loads each source as a whole.
+
+    Args:
+        tasks: (source label, chunk path) pairs, in build order
+        workers: Worker processes (None/0 = INGEST_WORKERS or one per CPU;
+            1 = run in this process)
+
+    Returns:
+        IngestResult with partials keyed by name in first-seen order
+    """
+    tasks = list(tasks)
+    start = time.perf_counter()
+    return _reduce(map_chunks(tasks, workers), worker_count(tasks, workers), start)
+
+
+def _reduce(results: Iterable[ChunkResult], workers: int, start: float) -> IngestResult:
+    """Fold chunk partials per source, then sources in order."""
+    per_source: Dict[str, Dict[str, PartialGroup]] = {}
+    counts: Dict[str, int] = {}
+    failed = set()
+    chunks: List[ChunkResult] = []
+
+    for result in results:
+        source_groups = per_source.setdefault(result.source, {})
+        counts.setdefault(result.source, 0)
+        if result.error is not None:
+            failed.add(result.source)
+        if result.source not in failed:
+            counts[result.source] += result.records
+            for name, partial in result.groups.items():
+                existing = source_groups.get(name)
+                if existing is None:
+                    source_groups[name] = partial
+                else:
+                    existing.update(partial)
+        # Keep timings, not data, for the report
+        result.groups = {}
+        chunks.append(result)
+
+    groups: Dict[str, PartialGroup] = {}
+    for source, source_groups in per_source.items():
+        if source in failed:
+            counts[source] = 0
+            continue
+        for name, partial in source_groups.items():
+            existing = groups.get(name)
+            if existing is None:
+                groups[name] = partial
+            else:
+                existing.update(partial)
+
+    return IngestResult(
+        groups=groups,
+        counts=counts,
+        chunks=chunks,
+        workers=workers,
+        seconds=time.perf_counter() - start,
+    )
@@ -7,13 +7,23 @@ EN: Food data merge logic.
 
 from __future__ import annotations
 
+import os
 from collections import defaultdict
 from datetime import date
+from operator import attrgetter
 from statistics import median
-from typing import Dict, Iterable, List
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 from .food_sources.base import FoodRecord
 
+# Default merge_records backend: "python" or "numpy" (core.food_merge_columnar)
+MERGE_BACKEND = os.getenv("FOOD_MERGE_BACKEND", "python")
+
+MERGE_BACKENDS = ("python", "numpy")
+
+# Macro nutrients list (merged by median over all sources)
+MACROS = ["kcal", "protein_g", "fat_g", "carbs_g", "fiber_g"]
+
 # Micro nutrients list
 MICROS = [
     "Fe_mg",
@@ -47,80 +57,207 @@ def _merge_values(values: List[float], strategy: str = "median") -> float:
     return float(vals[0])
 
 
-def merge_records(streams: List[Iterable[FoodRecord]]) -> List[Dict]:
+class PartialGroup:
+    """
+    RU: Частичный агрегат записей одного продукта (значения полей по записям).
+    EN: Partial aggregate of one food's records (field values per record).
+
+    Partials built from different chunks of input can be combined with
+    ``update`` in any split, so chunks can be pre-aggregated independently
+    (e.g. in worker processes) and reduced afterwards. Merged values are
+    medians, so the result does not depend on how the input was split.
+    Values are kept as plain tuples, which are cheap to pickle.
+    """
+
+    __slots__ = ("rows", "flags", "sources")
+
+    # Numeric fields kept per record, after a leading "is USDA" flag
+    FIELDS = MACROS + MICROS
+    _values = attrgetter(*FIELDS)
+    _COLUMNS = {key: i for i, key in enumerate(FIELDS, start=1)}
+
+    def __init__(self):
+        self.rows: List[Tuple] = []
+        self.flags: Set[str] = set()
+        self.sources: Set[str] = set()
+
+    @classmethod
+    def from_records(cls, rows: Iterable[FoodRecord]) -> "PartialGroup":
+        """
+        RU: Построить агрегат из записей.
+        EN: Build a partial from records.
+        """
+        partial = cls()
+        for rec in rows:
+            partial.add(rec)
+        return partial
+
+    def add(self, rec: FoodRecord) -> None:
+        """
+        RU: Добавить одну запись.
+        EN: Add one record.
+        """
+        self.rows.append((rec.source == "USDA",) + self._values(rec))
+        if rec.flags:
+            self.flags.update(rec.flags)
+        self.sources.add(rec.source)
+
+    def update(self, other: "PartialGroup") -> None:
+        """
+        RU: Объединить с другим агрегатом того же продукта.
+        EN: Combine with another partial of the same food.
+        """
+        self.rows.extend(other.rows)
+        self.flags |= other.flags
+        self.sources |= other.sources
+
+    def merge(self, name: str, today: Optional[str] = None) -> Dict:
+        """
+        RU: Получить итоговую объединенную запись.
+        EN: Produce the merged food record.
+
+        Args:
+            name: Canonical name of the food
+            today: Version date (default: today)
+
+        Returns:
+            Merged food record as a dictionary
+        """
+        rows = self.rows
+        column = self._COLUMNS
+
+        def values(key: str) -> List[float]:
+            i = column[key]
+            return [row[i] for row in rows]
+
+        # Priority for micronutrients: if USDA present, take from USDA, otherwise median
+        def micro_pick(key: str) -> float:
+            i = column[key]
+            usda_vals = [row[i] for row in rows if row[0]]
+            usda_vals = [v for v in usda_vals if v is not None and v >= 0]
+            if usda_vals:
+                return _merge_values(usda_vals, "median")
+            return _merge_values(values(key), "median")
+
+        out = {
+            "name": name,
+            "group": "other",  # Will be determined by classification logic
+            "per_g": 100.0,
+            # Merge macronutrients using median
+            "kcal": round(_merge_values(values("kcal")), 1),
+            "protein_g": round(_merge_values(values("protein_g")), 2),
+            "fat_g": round(_merge_values(values("fat_g")), 2),
+            "carbs_g": round(_merge_values(values("carbs_g")), 2),
+            "fiber_g": round(_merge_values(values("fiber_g")), 2),
+            **{k: round(micro_pick(k), 3) for k in MICROS},
+            "flags": list(sorted(self.flags)),
+            "price": 0.0,  # Can be populated from OFF later
+            "source": "MERGED(" + ",".join(sorted(self.sources)) + ")",
+            "version_date": today or date.today().isoformat(),
+        }
+
+        # Classify food group based on macronutrient profile
+        out["group"] = _classify_food_group(out)
+        return out
+
+
+def merge_group(name: str, rows: List[FoodRecord], today: Optional[str] = None) -> Dict:
+    """
+    RU: Объединить записи одного продукта (одно каноническое имя).
+    EN: Merge the records of one food (one canonical name).
+
+    Args:
+        name: Canonical name shared by the rows
+        rows: FoodRecord objects to merge
+        today: Version date (default: today)
+
+    Returns:
+        Merged food record as a dictionary
+    """
+    return PartialGroup.from_records(rows).merge(name, today)
+
+
+def merge_records(
+    streams: List[Iterable[FoodRecord]], backend: Optional[str] = None
+) -> List[Dict]:
     """
     RU: Объединить записи из нескольких источников.
     EN: Merge records from multiple sources.
 
     Args:
         streams: List of iterables with FoodRecord objects
+        backend: "python" (per-group loops) or "numpy" (vectorised, same
+            result); default MERGE_BACKEND
 
     Returns:
         List of merged food records as dictionaries
+
+    Raises:
+        ValueError: If the backend is unknown
     """
+    backend = backend or MERGE_BACKEND
+    if backend == "numpy":
+        from .food_merge_columnar import merge_records_columnar
+
+        return merge_records_columnar(streams)
+    if backend != "python":
+        raise ValueError(f"Unknown merge backend: {backend}")
+
     # Group records by canonical name
     bucket: Dict[str, List[FoodRecord]] = defaultdict(list)
     for stream in streams:
         for rec in stream:
             bucket[rec.name].append(rec)
 
-    merged: List[Dict] = []
     today = date.today().isoformat()
+    return [merge_group(name, rows, today) for name, rows in bucket.items()]
 
-    for name, rows in bucket.items():
-        # Merge macronutrients using median
-        kcal = _merge_values([r.kcal for r in rows])
-        protein = _merge_values([r.protein_g for r in rows])
-        fat = _merge_values([r.fat_g for r in rows])
-        carbs = _merge_values([r.carbs_g for r in rows])
-        fiber = _merge_values([r.fiber_g for r in rows])
 
-        # Priority for micronutrients: if USDA present, take from USDA, otherwise median
-        def micro_pick(key: str) -> float:
-            # Get values from USDA source first
-            usda_vals = [getattr(r, key) for r in rows if r.source == "USDA"]
-            usda_vals = [v for v in usda_vals if v is not None and v >= 0]
+def merge_partials(
+    groups: Dict[str, PartialGroup], backend: Optional[str] = None
+) -> List[Dict]:
+    """
+    RU: Объединить частичные агрегаты по именам (см. core.food_ingest).
+    EN: Merge per-name partial aggregates (see core.food_ingest).
 
-            if usda_vals:
-                # If we have USDA values, use median of USDA values
-                return _merge_values(usda_vals, "median")
+    Args:
+        groups: Partials keyed by canonical name
+        backend: "python" or "numpy"; default MERGE_BACKEND
 
-            # Otherwise, use median of all values
-            all_vals = [getattr(r, key) for r in rows]
-            all_vals = [v for v in all_vals if v is not None and v >= 0]
-            return _merge_values(all_vals, "median")
+    Returns:
+        List of merged food records as dictionaries
 
-        # Collect all flags
-        all_flags = set()
-        for r in rows:
-            if r.flags:
-                all_flags.update(r.flags)
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    backend = backend or MERGE_BACKEND
+    today = date.today().isoformat()
+    if backend == "numpy":
+        from .food_merge_columnar import merge_partials_columnar
 
-        # Determine primary source for logging
-        sources = sorted({r.source for r in rows})
+        return merge_partials_columnar(groups, today)
+    if backend != "python":
+        raise ValueError(f"Unknown merge backend: {backend}")
+    return [partial.merge(name, today) for name, partial in groups.items()]
 
-        out = {
-            "name": name,
-            "group": "other",  # Will be determined by classification logic
-            "per_g": 100.0,
-            "kcal": round(kcal, 1),
-            "protein_g": round(protein, 2),
-            "fat_g": round(fat, 2),
-            "carbs_g": round(carbs, 2),
-            "fiber_g": round(fiber, 2),
-            **{k: round(micro_pick(k), 3) for k in MICROS},
-            "flags": list(sorted(all_flags)),
-            "price": 0.0,  # Can be populated from OFF later
-            "source": "MERGED(" + ",".join(sources) + ")",
-            "version_date": today,
-        }
-        merged.append(out)
 
-    # Classify food groups based on macronutrient profile
-    for record in merged:
-        record["group"] = _classify_food_group(record)
+def merge_grouped(groups: Iterable[Tuple[str, List[FoodRecord]]]) -> Iterator[Dict]:
+    """
+    RU: Объединять уже сгруппированные записи по одной группе за раз.
+    EN: Merge already grouped records one group at a time.
+
+    Only one group is held in memory, so this suits grouped streams from an
+    on-disk staging table (see core.food_staging).
 
-    return merged
+    Args:
+        groups: (canonical name, records) pairs, one per name
+
+    Yields:
+        Merged food records as dictionaries
+    """
+    today = date.today().isoformat()
+    for name, rows in groups:
+        yield merge_group(name, rows, today)
 
 
 def _classify_food_group(record: Dict) -> str:
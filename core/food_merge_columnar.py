@@ -0,0 +1,285 @@
+"""
+Columnar Food Merge
+
+RU: Векторизованный (NumPy) движок мерджа записей о продуктах.
+EN: Vectorised (NumPy) backend for merging food records.
+
+Produces exactly the same records as ``food_merge.merge_records``: records
+are loaded once into a (records × nutrients) array with a group code per
+record, medians are taken per group from row-wise sorts of equal-size
+groups, the USDA priority for micronutrients becomes a row mask, and food
+groups are classified over whole columns. Rounding falls back to ``round``
+near ties, and the name/flag checks of the classifier stay in Python, so
+results match bit for bit.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from itertools import chain, repeat
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+import numpy as np
+
+from .food_merge import MACROS, MICROS, PartialGroup
+from .food_sources.base import FoodRecord
+
+# Value columns, in PartialGroup row order (after the leading USDA flag)
+FIELDS = PartialGroup.FIELDS
+_MICRO_COLUMNS = [FIELDS.index(k) for k in MICROS]
+
+# Output rounding per field, as in PartialGroup.merge
+_DIGITS = {"kcal": 1, **{k: 2 for k in MACROS[1:]}, **{k: 3 for k in MICROS}}
+
+_LEGUME_WORDS = ("legume", "lentil", "bean", "chickpea")
+
+
+def merge_records_columnar(streams: List[Iterable[FoodRecord]]) -> List[Dict]:
+    """
+    RU: Объединить записи из нескольких источников (векторно).
+    EN: Merge records from multiple sources (vectorised).
+
+    Drop-in replacement for ``food_merge.merge_records``.
+
+    Args:
+        streams: List of iterables with FoodRecord objects
+
+    Returns:
+        List of merged food records as dictionaries, in first-seen name order
+    """
+    index: Dict[str, int] = {}
+    codes: List[int] = []
+    rows: List[tuple] = []
+    labels: List[str] = []
+    flags: List[Set[str]] = []
+    values = PartialGroup._values
+
+    for stream in streams:
+        for rec in stream:
+            code = index.get(rec.name)
+            if code is None:
+                code = index[rec.name] = len(index)
+                flags.append(set())
+            codes.append(code)
+            rows.append(values(rec))
+            labels.append(rec.source)
+            if rec.flags:
+                flags[code].update(rec.flags)
+
+    if not index:
+        return []
+    group = np.asarray(codes, dtype=np.intp)
+    source_names, source_codes = np.unique(
+        np.asarray(labels, dtype=object), return_inverse=True
+    )
+    # Distinct (group, source) pairs give each group's source set
+    pairs = np.unique(group * len(source_names) + source_codes)
+    sources: List[Set[str]] = [set() for _ in index]
+    for g, src in zip(
+        (pairs // len(source_names)).tolist(), (pairs % len(source_names)).tolist()
+    ):
+        sources[g].add(source_names[src])
+
+    return _merge_columns(
+        list(index),
+        group,
+        source_names[source_codes] == "USDA",
+        _as_table(rows, len(FIELDS)),
+        flags,
+        sources,
+    )
+
+
+def merge_partials_columnar(
+    groups: Dict[str, PartialGroup], today: Optional[str] = None
+) -> List[Dict]:
+    """
+    RU: Объединить частичные агрегаты по именам (векторно).
+    EN: Merge per-name partial aggregates (vectorised).
+
+    Same result as calling ``PartialGroup.merge`` for every item.
+
+    Args:
+        groups: Partials keyed by canonical name
+        today: Version date (default: today)
+    """
+    codes: List[int] = []
+    rows: List[tuple] = []
+    for code, partial in enumerate(groups.values()):
+        codes.extend([code] * len(partial.rows))
+        rows.extend(partial.rows)
+    table = _as_table(rows, len(FIELDS) + 1)
+    return _merge_columns(
+        list(groups),
+        np.asarray(codes, dtype=np.intp),
+        table[:, 0] != 0,
+        table[:, 1:],
+        [p.flags for p in groups.values()],
+        [p.sources for p in groups.values()],
+        today,
+    )
+
+
+def _as_table(rows: List[tuple], width: int) -> np.ndarray:
+    """Rows of numbers (None allowed) as a float array; None becomes NaN."""
+    flat = np.fromiter(chain.from_iterable(rows), dtype=float, count=len(rows) * width)
+    return flat.reshape(len(rows), width)
+
+
+def grouped_median(codes: np.ndarray, values: np.ndarray, n_groups: int) -> np.ndarray:
+    """
+    RU: Медиана значений по группам (0.0 для пустых групп).
+    EN: Median of values per group code (0.0 for empty groups).
+
+    Matches ``statistics.median``: the middle value, or the mean of the two
+    middle values, of each group's sorted values. ``codes`` must be sorted
+    (each group contiguous). Groups of equal size are gathered into one
+    (groups × size) block and sorted along rows, so the cost is a handful of
+    small sorts rather than one sort over all values by (group, value).
+    """
+    out = np.zeros(n_groups)
+    counts = np.bincount(codes, minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+    by_size = np.argsort(counts, kind="stable")
+    sizes, first = np.unique(counts[by_size], return_index=True)
+    for size, group in zip(sizes.tolist(), np.split(by_size, first[1:])):
+        if not size:
+            continue
+        block = values[starts[group, None] + np.arange(size)]
+        # Stable, like sorted(): equal values (0.0 and -0.0) keep their order
+        block.sort(axis=1, kind="stable")
+        if size % 2:
+            out[group] = block[:, size // 2]
+        else:
+            out[group] = (block[:, size // 2 - 1] + block[:, size // 2]) / 2
+    return out
+
+
+def round_column(values: np.ndarray, digits: int) -> List[float]:
+    """
+    RU: Округление как у round(), но по массиву.
+    EN: Round like the round() builtin, over an array.
+
+    ``np.round`` scales, rounds and divides, which can land on the other side
+    of a tie than Python's correctly rounded ``round``. Away from ties the two
+    agree, so only values close to a tie are rounded in Python.
+    """
+    scaled = values * 10.0**digits
+    with np.errstate(invalid="ignore"):
+        distance = np.abs(scaled - np.floor(scaled) - 0.5)
+    # Beyond 2**30 the scaling error can exceed the margin; those values and
+    # NaN distances (inf) go through round() as well
+    exact = ~(distance > 1e-6) | (np.abs(scaled) > 2.0**30)
+    out = np.round(values, digits)
+    for i in np.flatnonzero(exact).tolist():
+        out[i] = round(float(values[i]), digits)
+    return out.tolist()
+
+
+def _merge_columns(
+    names: Sequence[str],
+    group: np.ndarray,
+    is_usda: np.ndarray,
+    values: np.ndarray,
+    flags: Sequence[Set[str]],
+    sources: Sequence[Set[str]],
+    today: Optional[str] = None,
+) -> List[Dict]:
+    """
+    Merge records given as a group code, USDA flag and FIELDS row each.
+    """
+    n_groups = len(names)
+    if not n_groups:
+        return []
+    today = today or date.today().isoformat()
+
+    # Make each group contiguous once; stable, so records keep their order
+    order = np.argsort(group, kind="stable")
+    group, is_usda, values = group[order], is_usda[order], values[order]
+
+    # None is loaded as NaN, which fails >= 0 just like None is skipped
+    valid = values >= 0
+
+    medians = np.empty((n_groups, len(FIELDS)))
+    for j, key in enumerate(FIELDS):
+        mask = valid[:, j]
+        if j in _MICRO_COLUMNS:
+            # USDA priority: groups with any valid USDA value use USDA rows only
+            usda = mask & is_usda
+            has_usda = np.bincount(group[usda], minlength=n_groups) > 0
+            mask = usda | (mask & ~has_usda[group])
+        medians[:, j] = grouped_median(group[mask], values[mask, j], n_groups)
+
+    columns = {
+        key: round_column(medians[:, j], _DIGITS[key]) for j, key in enumerate(FIELDS)
+    }
+    food_groups = _classify_food_groups(names, columns, flags)
+
+    keys = (
+        "name",
+        "group",
+        "per_g",
+        *FIELDS,
+        "flags",
+        "price",
+        "source",
+        "version_date",
+    )
+    rows = zip(
+        names,
+        food_groups,
+        repeat(100.0),
+        *columns.values(),
+        [sorted(f) for f in flags],
+        repeat(0.0),
+        ["MERGED(" + ",".join(sorted(s)) + ")" for s in sources],
+        repeat(today),
+    )
+    return [dict(zip(keys, row)) for row in rows]
+
+
+def _classify_food_groups(
+    names: Sequence[str],
+    columns: Dict[str, List[float]],
+    flags: Sequence[Set[str]],
+) -> List[str]:
+    """
+    RU: Векторная версия food_merge._classify_food_group.
+    EN: Vectorised form of food_merge._classify_food_group.
+
+    Merged records carry no sugar_g, so its branches never apply.
+    """
+    kcal = np.asarray(columns["kcal"], dtype=float)
+    fiber = np.asarray(columns["fiber_g"], dtype=float)
+    divisor = np.maximum(1, kcal)
+    positive = kcal > 0
+
+    def pct(key: str, factor: int) -> np.ndarray:
+        # inf/inf gives NaN, which compares False as in the scalar version
+        with np.errstate(invalid="ignore"):
+            share = (np.asarray(columns[key], dtype=float) * factor / divisor) * 100
+        return np.where(positive, share, 0)
+
+    protein = pct("protein_g", 4) > 15
+    fat = pct("fat_g", 9) > 30
+    carb = pct("carbs_g", 4) > 50
+    high_fiber = fiber > 3
+    legume = np.array(
+        [any(word in name for word in _LEGUME_WORDS) for name in names], dtype=bool
+    )
+    dairy = np.array(
+        [any("DAIRY" in flag for flag in group) for group in flags], dtype=bool
+    )
+
+    return np.select(
+        [
+            protein,
+            fat,
+            carb & high_fiber & legume,
+            carb,
+            (fiber > 2) & (kcal < 100),
+            dairy,
+        ],
+        ["protein", "fat", "legume", "grain", "veg", "dairy"],
+        default="other",
+    ).tolist()
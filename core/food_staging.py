@@ -0,0 +1,129 @@
+"""
+Food Staging Table
+
+RU: Промежуточная SQLite-таблица для потоковой сборки базы продуктов.
+EN: On-disk SQLite staging table for the streaming food DB build.
+
+``merge_records`` buckets every normalised record in memory before merging,
+which does not scale to a full Open Food Facts dump. The staging table takes
+records as they stream out of the adapters, writes them in batches, and then
+hands them back grouped by canonical name (an index scan ordered by name), so
+only one group is in memory at a time.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+from dataclasses import asdict
+from itertools import groupby
+from pathlib import Path
+from typing import Iterable, Iterator, List, Tuple, Union
+
+from .food_sources.base import FoodRecord
+
+PathLike = Union[str, Path]
+
+# Records per executemany() batch while staging
+STAGING_BATCH_SIZE = int(os.getenv("FOOD_STAGING_BATCH_SIZE", "5000"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS staged_records (
+    seq INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    record TEXT NOT NULL
+)
+"""
+
+
+class FoodStaging:
+    """
+    RU: Промежуточное хранилище записей, сгруппированных по имени.
+    EN: Scratch store of FoodRecords, read back grouped by canonical name.
+
+    The file is scratch space: it is truncated on open and removed on close.
+    """
+
+    def __init__(self, path: PathLike, batch_size: int = STAGING_BATCH_SIZE):
+        """
+        Args:
+            path: Scratch database file
+            batch_size: Records per insert batch
+        """
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            self.path.unlink()
+        self._con = sqlite3.connect(self.path)
+        # Scratch data: no journal or fsync needed
+        self._con.execute("PRAGMA journal_mode=OFF")
+        self._con.execute("PRAGMA synchronous=OFF")
+        self._con.execute(_SCHEMA)
+        self._indexed = False
+
+    def add(self, records: Iterable[FoodRecord]) -> int:
+        """
+        RU: Добавить записи из потока (всё или ничего).
+        EN: Stage records from a stream, all or nothing.
+
+        If the stream raises, records staged from it are rolled back, so a
+        failing source contributes nothing, as with a list() of it.
+
+        Returns:
+            Number of records staged
+        """
+        count = 0
+        batch: List[Tuple[str, str]] = []
+        with self._con:
+            for rec in records:
+                batch.append((rec.name, json.dumps(asdict(rec), ensure_ascii=False)))
+                if len(batch) >= self.batch_size:
+                    self._insert(batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                self._insert(batch)
+                count += len(batch)
+        return count
+
+    def _insert(self, batch: List[Tuple[str, str]]) -> None:
+        self._con.executemany(
+            "INSERT INTO staged_records(name, record) VALUES (?, ?)", batch
+        )
+
+    def __len__(self) -> int:
+        return self._con.execute("SELECT COUNT(*) FROM staged_records").fetchone()[0]
+
+    def groups(self) -> Iterator[Tuple[str, List[FoodRecord]]]:
+        """
+        RU: Записи, сгруппированные по каноническому имени (по алфавиту).
+        EN: Staged records grouped by canonical name, in name order.
+
+        Within a group records keep the order they were staged in.
+        """
+        if not self._indexed:
+            # Built once after loading; cheaper than maintaining it per insert
+            self._con.execute(
+                "CREATE INDEX IF NOT EXISTS idx_staged_name "
+                "ON staged_records(name, seq)"
+            )
+            self._indexed = True
+        rows = self._con.execute(
+            "SELECT name, record FROM staged_records ORDER BY name, seq"
+        )
+        for name, group in groupby(rows, key=lambda row: row[0]):
+            yield name, [FoodRecord(**json.loads(row[1])) for row in group]
+
+    def close(self) -> None:
+        """RU: Закрыть и удалить файл. EN: Close and remove the scratch file."""
+        self._con.close()
+        if self.path.exists():
+            self.path.unlink()
+
+    def __enter__(self) -> "FoodStaging":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -12,9 +12,15 @@ considering dietary preferences, budget constraints, and food availability.
 from __future__ import annotations
 
 import asyncio
+import concurrent.futures
+import threading
+from concurrent.futures import Executor
 from dataclasses import dataclass
+from functools import partial
 from typing import Any, Dict, List, Optional
 
+from .booster_index import BoosterIndex
+from .diet_index import IndexedDict
 from .food_apis.unified_db import get_unified_food_db
 from .plate import make_plate
 from .recommendations import (
@@ -23,6 +29,7 @@ from .recommendations import (
     score_nutrient_coverage,
 )
 from .targets import MicronutrientTargets, NutritionTargets, UserProfile
+from .week_executor import run_days
 
 
 @dataclass
@@ -109,6 +116,7 @@ def make_daily_menu(
     food_db: Optional[Dict[str, FoodItem]] = None,
     recipe_db: Optional[Dict[str, Recipe]] = None,
     target_date: Optional[str] = None,
+    targets: Optional[NutritionTargets] = None,
 ) -> DayMenu:
     """
     RU: Генерирует меню на один день на основе целей ВОЗ.
@@ -119,12 +127,14 @@ def make_daily_menu(
         food_db: Food database (uses default if None)
         recipe_db: Recipe database (uses default if None)
         target_date: Date for the menu (today if None)
+        targets: Precomputed targets for this profile (built if None)
 
     Returns:
         Complete daily menu with nutrient analysis
     """
     # 1. Build WHO-based nutrition targets
-    targets = build_nutrition_targets(profile)
+    if targets is None:
+        targets = build_nutrition_targets(profile)
 
     # 2. Use existing plate logic as foundation, but extend with micro tracking
     plate_result = make_plate(
@@ -173,6 +183,10 @@ def make_weekly_menu(
     profile: UserProfile,
     food_db: Optional[Dict[str, FoodItem]] = None,
     recipe_db: Optional[Dict[str, Recipe]] = None,
+    *,
+    executor: Optional[Executor] = None,
+    max_workers: Optional[int] = None,
+    seed: Optional[int] = None,
 ) -> WeekMenu:
     """
     RU: Генерирует недельное меню с оптимизацией покрытия микронутриентов.
@@ -180,17 +194,29 @@ def make_weekly_menu(
 
     Weekly planning allows for day-to-day variation while ensuring
     adequate average intake of all nutrients over the week.
+
+    Args:
+        profile: User profile with preferences and goals
+        food_db: Food database (uses default if None)
+        recipe_db: Recipe database (uses default if None)
+        executor: Executor for the seven days (see core.week_executor)
+        max_workers: Thread pool size when no executor is given (<= 1: inline)
+        seed: Week seed; each day gets a deterministic derived seed
     """
-    daily_menus = []
+    # Resolve shared databases and targets once for the whole week
+    if food_db is None:
+        food_db = _get_default_food_db()
+    if recipe_db is None:
+        recipe_db = _get_default_recipe_db()
+    targets = build_nutrition_targets(profile)
 
     # Generate 7 daily menus with some variation
-    for day in range(7):
-        # Add slight variation to prevent monotony
-        varied_profile = _add_daily_variation(profile, day)
-        daily_menu = make_daily_menu(
-            varied_profile, food_db, recipe_db, f"day_{day + 1}"
-        )
-        daily_menus.append(daily_menu)
+    daily_menus = run_days(
+        partial(_make_week_day, profile, food_db, recipe_db, targets),
+        executor=executor,
+        max_workers=max_workers,
+        seed=seed,
+    )
 
     # Calculate weekly averages
     daily_coverages = [menu.coverage for menu in daily_menus]
@@ -215,21 +241,55 @@ def make_weekly_menu(
     )
 
 
-def _get_default_food_db() -> Dict[str, FoodItem]:
+class FoodDBSnapshot(IndexedDict):
     """
-    RU: Получает реальную базу данных продуктов из USDA.
-    EN: Gets real food database from USDA.
+    RU: Неизменяемый снимок базы продуктов по умолчанию.
+    EN: Read-only snapshot of the default food database.
 
-    This function now uses real USDA nutrition data instead of mock values.
+    Shared between requests, so in-place mutation is rejected; build a new
+    dict (``dict(snapshot)``) if a caller needs to extend it.
     """
-    # Try to get cached common foods first
-    try:
-        # Run async function in sync context
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
 
-        unified_db = loop.run_until_complete(get_unified_food_db())
-        common_foods = loop.run_until_complete(unified_db.get_common_foods_database())
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("FoodDBSnapshot is read-only")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly  # type: ignore[assignment]
+
+    def __reduce__(self):
+        return (FoodDBSnapshot, (dict(self),))
+
+
+# Cached default food database, shared by all menu requests
+_default_food_db: Optional[FoodDBSnapshot] = None
+_default_food_db_lock = threading.Lock()
+_default_food_db_generation = 0
+
+
+def invalidate_default_food_db(result: Any = None) -> None:
+    """
+    RU: Сбросить кеш базы продуктов (callback DatabaseUpdateManager).
+    EN: Drop the cached default food database.
+
+    Signature matches ``DatabaseUpdateManager.add_update_callback`` so it can
+    be registered directly; failed updates leave the snapshot in place.
+
+    Args:
+        result: UpdateResult of the finished update (None forces invalidation)
+    """
+    global _default_food_db, _default_food_db_generation
+    if result is not None and not getattr(result, "success", True):
+        return
+    with _default_food_db_lock:
+        _default_food_db = None
+        _default_food_db_generation += 1
+
+
+async def _load_default_food_db() -> Optional[FoodDBSnapshot]:
+    """Load common foods from the unified database (None if unavailable)."""
+    try:
+        unified_db = await get_unified_food_db()
+        common_foods = await unified_db.get_common_foods_database()
 
         # Convert to FoodItem format
         foods_db = {}
@@ -243,12 +303,92 @@ def _get_default_food_db() -> Dict[str, FoodItem]:
             )
 
         if foods_db:
-            return foods_db
+            return FoodDBSnapshot(foods_db)
 
     except Exception as e:
         # Fall back to basic mock data if API fails
         print(f"Warning: Could not load USDA data, using fallback: {e}")
 
+    return None
+
+
+def _publish_default_food_db(
+    snapshot: Optional[FoodDBSnapshot], generation: int
+) -> Dict[str, FoodItem]:
+    global _default_food_db
+    if snapshot is None:
+        # Not cached: the next call retries the real database
+        return _fallback_food_db()
+    with _default_food_db_lock:
+        # Don't resurrect a snapshot invalidated while we were loading
+        if generation == _default_food_db_generation:
+            _default_food_db = snapshot
+    return snapshot
+
+
+async def aget_default_food_db() -> Dict[str, FoodItem]:
+    """
+    RU: Асинхронно получить базу продуктов по умолчанию (из кеша).
+    EN: Get the default food database from async code (cached).
+
+    For async handlers: awaits the loader on the running loop instead of
+    spinning up a private event loop.
+    """
+    snapshot = _default_food_db
+    if snapshot is not None:
+        return snapshot
+    generation = _default_food_db_generation
+    return _publish_default_food_db(await _load_default_food_db(), generation)
+
+
+def _make_week_day(
+    profile: UserProfile,
+    food_db: Dict[str, FoodItem],
+    recipe_db: Dict[str, Recipe],
+    targets: NutritionTargets,
+    day: int,
+    seed: Optional[int] = None,
+) -> DayMenu:
+    """
+    RU: Один день недельного меню (выполняется в пуле).
+    EN: Build one day of the weekly menu (runs on the week executor).
+
+    Days are deterministic today, so ``seed`` is accepted for the
+    run_days() contract but not consumed.
+    """
+    # Add slight variation to prevent monotony
+    varied_profile = _add_daily_variation(profile, day)
+    day_targets = targets if varied_profile is profile else None
+    return make_daily_menu(
+        varied_profile, food_db, recipe_db, f"day_{day + 1}", targets=day_targets
+    )
+
+
+def _get_default_food_db() -> Dict[str, FoodItem]:
+    """
+    RU: Получает реальную базу данных продуктов из USDA.
+    EN: Gets real food database from USDA.
+
+    The result is cached as a read-only snapshot until
+    invalidate_default_food_db() is called (on database updates).
+    """
+    snapshot = _default_food_db
+    if snapshot is not None:
+        return snapshot
+
+    generation = _default_food_db_generation
+    # Cold cache only. Load in a worker thread so this works from sync code
+    # running inside an event loop and leaves the caller's loop untouched.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+        loaded = pool.submit(asyncio.run, _load_default_food_db()).result()
+    return _publish_default_food_db(loaded, generation)
+
+
+def _fallback_food_db() -> Dict[str, FoodItem]:
+    """
+    RU: Запасные данные, если реальная база недоступна.
+    EN: Fallback data used when the real database is unavailable.
+    """
     # Fallback mock data (reduced set)
     return {
         "chicken_breast": FoodItem(
@@ -687,25 +827,40 @@ def _find_booster_foods(
     EN: Find booster foods for deficient nutrients.
     """
     booster_foods = {}
+    index = _booster_index(food_db)
 
     for nutrient, gap in gaps.items():
         if gap > 0:  # Only for deficient nutrients
-            # Find foods rich in this nutrient
-            candidates = []
-            for food in food_db.values():
-                nutrient_content = food.nutrients_per_100g.get(nutrient, 0.0)
-                if nutrient_content > 0:
-                    # Calculate how much food needed to fill gap
-                    amount_needed = gap / nutrient_content * 100  # grams
-                    candidates.append((food, nutrient_content, amount_needed))
-
-            # Sort by nutrient density and select top candidates
-            candidates.sort(key=lambda x: x[1], reverse=True)
-            booster_foods[nutrient] = [c[0] for c in candidates[:5]]  # Top 5
+            # Top 5 foods by nutrient density per kcal (pre-sorted)
+            booster_foods[nutrient] = [food_db[n] for n in index.top(nutrient, k=5)]
 
     return booster_foods
 
 
+def _booster_index(food_db: Dict[str, FoodItem]) -> BoosterIndex:
+    """
+    RU: Рейтинг бустеров (кешируется в снимке базы продуктов).
+    EN: Booster ranking for a food DB (cached on the default snapshot).
+    """
+
+    def build(eager: bool = True) -> BoosterIndex:
+        foods = []
+        for key, food in food_db.items():
+            n = food.nutrients_per_100g
+            kcal = n.get("kcal") or (
+                n.get("protein_g", 0.0) * 4
+                + n.get("carbs_g", 0.0) * 4
+                + n.get("fat_g", 0.0) * 9
+            )
+            foods.append((key, n, kcal, food.cost_per_100g, food.tags))
+        return BoosterIndex(foods, eager=eager)
+
+    if isinstance(food_db, IndexedDict):
+        return food_db.cached_index("boosters", build)
+    # No snapshot to cache on: rank only the micros looked up
+    return build(eager=False)
+
+
 def _apply_repair_strategy(
     plan: WeekMenu,
     daily_gaps: Dict[str, Dict[str, float]],
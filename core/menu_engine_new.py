@@ -11,8 +11,9 @@ for nutrient deficiencies.
 
 from __future__ import annotations
 
+import random
 from dataclasses import dataclass
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from .food_db_new import MICRO_KEYS, FoodDB
 from .meal_i18n import Language, translate_tip
@@ -41,7 +42,9 @@ def build_plate_day(
     lang: Language,
     fooddb: FoodDB,
     recipedb: RecipeDB,
+    rng: Optional[random.Random] = None,
 ) -> DayPlan:
+    # rng: request-scoped generator; the same seed yields the same day
     splits = [0.25, 0.35, 0.30, 0.10]
     kcal_split = [int(targets["kcal"] * s) for s in splits]
 
@@ -50,10 +53,12 @@ def build_plate_day(
     micros_sum = {k: 0.0 for k in MICRO_KEYS}
 
     for i, kcal_goal in enumerate(kcal_split):
-        r = recipedb.pick_base_recipe(diet_flags, i)
+        r = recipedb.pick_base_recipe(diet_flags, i, rng=rng)
         if r is None:
             continue
-        m = recipedb.scale_recipe_to_kcal(r, kcal_goal, lang, prefer_fiber=True)
+        m = recipedb.scale_recipe_to_kcal(
+            r, kcal_goal, lang, prefer_fiber=True, rng=rng
+        )
         meals.append(m)
         for k in macros_sum:
             macros_sum[k] += m.macros[k]
@@ -0,0 +1,207 @@
+"""
+Nutrient Matrix
+
+RU: Колоночная матрица нутриентов (продукты × нутриенты) для векторных сумм.
+EN: Columnar nutrient matrix (foods × nutrients) for vectorised totals.
+
+Values are stored per gram, so totals for any grams map are a single
+(sparse grams vector) × (matrix) product instead of per-food dict loops.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+from .food_db_new import MICRO_KEYS
+
+COLUMNS = ["kcal", "protein_g", "fat_g", "carbs_g", "fiber_g", *MICRO_KEYS, "price"]
+
+
+def _num(value) -> float:
+    try:
+        return float(value) if value is not None else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class NutrientMatrix:
+    """
+    RU: Неизменяемая матрица нутриентов на 1 г продукта.
+    EN: Immutable per-gram nutrient matrix with a name/id → row index.
+    """
+
+    def __init__(
+        self,
+        keys: Sequence[str],
+        values: np.ndarray,
+        columns: Sequence[str] = COLUMNS,
+        aliases: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        self.keys: List[str] = list(keys)
+        self.columns: List[str] = list(columns)
+        self.values = np.ascontiguousarray(values, dtype=np.float32)
+        self.values.flags.writeable = False
+        self.index: Dict[str, int] = {k: i for i, k in enumerate(self.keys)}
+        for alias, key in (aliases or {}).items():
+            if key in self.index:
+                self.index.setdefault(alias, self.index[key])
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.index
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Iterable[Mapping],
+        key: str = "name",
+        alias_key: Optional[str] = None,
+        price_key: str = "price",
+    ) -> "NutrientMatrix":
+        """
+        RU: Построить матрицу из строк-словарей (значения на per_g граммов).
+        EN: Build from row mappings holding values per ``per_g`` grams.
+
+        ``kcal`` is derived from macros (4/4/9) when a row has none; price is
+        taken per 100 g.
+        """
+        keys: List[str] = []
+        aliases: Dict[str, str] = {}
+        data: List[List[float]] = []
+        for row in rows:
+            per_g = _num(row.get("per_g")) or 100.0
+            protein, fat, carbs = (
+                _num(row.get(k)) for k in ("protein_g", "fat_g", "carbs_g")
+            )
+            kcal = row.get("kcal")
+            kcal = _num(kcal) if kcal is not None else protein * 4 + carbs * 4 + fat * 9
+            vec = [kcal, protein, fat, carbs, _num(row.get("fiber_g"))]
+            vec += [_num(row.get(k)) for k in MICRO_KEYS]
+            vec = [v / per_g for v in vec]
+            vec.append(_num(row.get(price_key)) / 100.0)
+            keys.append(str(row[key]))
+            if alias_key and row.get(alias_key):
+                aliases[str(row[alias_key])] = str(row[key])
+            data.append(vec)
+        values = np.array(data, dtype=np.float32).reshape(len(data), len(COLUMNS))
+        return cls(keys, values, COLUMNS, aliases)
+
+    @classmethod
+    def from_food_db(cls, fooddb) -> "NutrientMatrix":
+        """RU: Из FoodDB (CSV). EN: Build from a ``core.food_db_new.FoodDB``."""
+        rows = (
+            {
+                "name": fi.name,
+                "per_g": fi.per_g,
+                "protein_g": fi.protein_g,
+                "fat_g": fi.fat_g,
+                "carbs_g": fi.carbs_g,
+                "fiber_g": fi.fiber_g,
+                **fi.micros,
+                "price": fi.price,
+            }
+            for fi in fooddb.items.values()
+        )
+        return cls.from_rows(rows)
+
+    @classmethod
+    def from_sqlite(
+        cls, path: Union[str, Path] = "data/food.sqlite"
+    ) -> "NutrientMatrix":
+        """RU: Из data/food.sqlite. EN: Build from the FoodDB SQLite file."""
+        from . import sqlite_pool
+
+        con = sqlite_pool.reader(path, immutable=True)
+        rows = [dict(r) for r in con.execute("SELECT * FROM foods").fetchall()]
+        return cls.from_rows(
+            rows, key="id", alias_key="canonical_name", price_key="price_per_100g"
+        )
+
+    @classmethod
+    def from_parquet(
+        cls, path: Union[str, Path] = "data/food.parquet"
+    ) -> "NutrientMatrix":
+        """RU: Из data/food.parquet (нужен pandas). EN: Build from Parquet (needs pandas)."""
+        import pandas as pd
+
+        rows = pd.read_parquet(path).to_dict("records")
+        return cls.from_rows(
+            rows, key="id", alias_key="canonical_name", price_key="price_per_100g"
+        )
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "NutrientMatrix":
+        """RU: Загрузить по расширению файла. EN: Load by file extension."""
+        if Path(path).suffix == ".parquet":
+            return cls.from_parquet(path)
+        return cls.from_sqlite(path)
+
+    def _gather(self, grams_by_id: Mapping[str, float], strict: bool):
+        idx: List[int] = []
+        grams: List[float] = []
+        for key, g in grams_by_id.items():
+            row = self.index.get(key)
+            if row is None:
+                if strict:
+                    raise KeyError(key)
+                continue
+            idx.append(row)
+            grams.append(float(g))
+        return idx, grams
+
+    def totals_array(
+        self, grams_by_id: Mapping[str, float], strict: bool = False
+    ) -> np.ndarray:
+        """
+        RU: Сумма нутриентов как вектор в порядке ``columns``.
+        EN: Totals as a float64 vector ordered like ``columns``.
+        """
+        idx, grams = self._gather(grams_by_id, strict)
+        if not idx:
+            return np.zeros(len(self.columns))
+        return np.asarray(grams) @ self.values[idx]
+
+    def totals(
+        self, grams_by_id: Mapping[str, float], strict: bool = False
+    ) -> Dict[str, float]:
+        """
+        RU: Сумма нутриентов для {продукт: граммы}.
+        EN: Nutrient totals for a ``{food: grams}`` map.
+
+        Args:
+            grams_by_id: Food name/id → grams
+            strict: Raise KeyError on unknown foods instead of skipping them
+
+        Returns:
+            Mapping column → total
+        """
+        return dict(zip(self.columns, self.totals_array(grams_by_id, strict).tolist()))
+
+    def totals_many(
+        self, grams_maps: Sequence[Mapping[str, float]], strict: bool = False
+    ) -> np.ndarray:
+        """
+        RU: Суммы для многих блюд/дней одним проходом (N × columns).
+        EN: Batched totals for many meals/days in one pass (N × columns).
+        """
+        out = np.zeros((len(grams_maps), len(self.columns)))
+        rows: List[int] = []
+        idx: List[int] = []
+        grams: List[float] = []
+        for n, grams_map in enumerate(grams_maps):
+            i, g = self._gather(grams_map, strict)
+            rows.extend([n] * len(i))
+            idx.extend(i)
+            grams.extend(g)
+        if not idx:
+            return out
+        weighted = self.values[idx] * np.asarray(grams)[:, None]
+        rows_arr = np.asarray(rows)
+        starts = np.flatnonzero(np.r_[True, rows_arr[1:] != rows_arr[:-1]])
+        out[rows_arr[starts]] = np.add.reduceat(weighted, starts, axis=0)
+        return out
@@ -19,6 +19,7 @@ from .food_db import FoodItem, parse_food_db
 from .food_sources.base import FoodRecord
 from .food_sources.off import OFFAdapter
 from .food_sources.usda import USDAAdapter
+from .product_index import ProductIndex, name_confidence
 
 logger = logging.getLogger(__name__)
 
@@ -49,6 +50,8 @@ class ProductFinder:
         self.usda_adapter = USDAAdapter()
         self.off_adapter = OFFAdapter()
         self.food_db = parse_food_db("data/food_db.csv")
+        # Matching indexes per source, built on first search
+        self._indexes: Dict[str, ProductIndex] = {}
 
     def find_missing_products(self, recipe_ingredients: List[str]) -> List[str]:
         """
@@ -61,24 +64,17 @@ class ProductFinder:
         Returns:
             Список недостающих продуктов
         """
-        missing_products = []
-        food_names = {food.name.lower() for food in self.food_db.values()}
-
-        for ingredient in recipe_ingredients:
-            found = False
-            for food_name in food_names:
-                if (
-                    ingredient.lower() in food_name
-                    or food_name in ingredient.lower()
-                    or self._similar_names(ingredient, food_name)
-                ):
-                    found = True
-                    break
-
-            if not found:
-                missing_products.append(ingredient)
-
-        return missing_products
+        # Containment either way or a common word is exactly a non-zero
+        # confidence, so an index lookup replaces the scan over all foods
+        food_names = ProductIndex()
+        for food in self.food_db.values():
+            food_names.add(food.name.lower())
+
+        return [
+            ingredient
+            for ingredient in recipe_ingredients
+            if food_names.best(ingredient) is None
+        ]
 
     def _similar_names(self, name1: str, name2: str) -> bool:
         """
@@ -143,51 +139,60 @@ class ProductFinder:
             error_message="Product not found in any source",
         )
 
-    def _search_in_usda(self, product_name: str) -> ProductSearchResult:
+    def _index(self, source: str) -> ProductIndex:
         """
-        RU: Поиск продукта в USDA базе данных.
-        EN: Search for product in USDA database.
+        RU: Индекс источника (строится один раз).
+        EN: Matching index of a source, built once.
+
+        Args:
+            source: "USDA" or "OFF"
+        """
+        index = self._indexes.get(source)
+        if index is None:
+            adapter = self.usda_adapter if source == "USDA" else self.off_adapter
+            index = self._indexes[source] = ProductIndex.from_records(
+                adapter.normalize()
+            )
+        return index
+
+    def _search_in(self, source: str, product_name: str) -> ProductSearchResult:
+        """
+        RU: Поиск продукта в индексе источника.
+        EN: Search for a product in a source's index.
 
         Args:
+            source: "USDA" or "OFF"
             product_name: Название продукта
 
         Returns:
             Результат поиска
         """
         try:
-            # Получаем все продукты из USDA
-            usda_foods = self.usda_adapter.normalize()
+            # Наиболее подходящий продукт с уверенностью выше 0.3
+            match = self._index(source).best(product_name, min_confidence=0.3)
 
-            # Ищем наиболее подходящий продукт
-            best_match = None
-            best_confidence = 0.0
-
-            for food in usda_foods:
-                confidence = self._calculate_confidence(product_name, food.name)
-                if confidence > best_confidence and confidence > 0.3:
-                    best_match = food
-                    best_confidence = confidence
-
-            if best_match:
+            if match:
                 return ProductSearchResult(
                     product_name=product_name,
                     found=True,
-                    source="USDA",
-                    food_record=best_match,
-                    confidence=best_confidence,
+                    source=source,
+                    food_record=match.item,
+                    confidence=match.confidence,
                 )
 
         except Exception as e:
-            logger.error(f"Error searching in USDA: {e}")
+            logger.error(f"Error searching in {source}: {e}")
 
         return ProductSearchResult(
-            product_name=product_name, found=False, error_message="USDA search failed"
+            product_name=product_name,
+            found=False,
+            error_message=f"{source} search failed",
         )
 
-    def _search_in_off(self, product_name: str) -> ProductSearchResult:
+    def _search_in_usda(self, product_name: str) -> ProductSearchResult:
         """
-        RU: Поиск продукта в Open Food Facts.
-        EN: Search for product in Open Food Facts.
+        RU: Поиск продукта в USDA базе данных.
+        EN: Search for product in USDA database.
 
         Args:
             product_name: Название продукта
@@ -195,35 +200,20 @@ class ProductFinder:
         Returns:
             Результат поиска
         """
-        try:
-            # Получаем все продукты из OFF
-            off_foods = self.off_adapter.normalize()
-
-            # Ищем наиболее подходящий продукт
-            best_match = None
-            best_confidence = 0.0
+        return self._search_in("USDA", product_name)
 
-            for food in off_foods:
-                confidence = self._calculate_confidence(product_name, food.name)
-                if confidence > best_confidence and confidence > 0.3:
-                    best_match = food
-                    best_confidence = confidence
-
-            if best_match:
-                return ProductSearchResult(
-                    product_name=product_name,
-                    found=True,
-                    source="OFF",
-                    food_record=best_match,
-                    confidence=best_confidence,
-                )
+    def _search_in_off(self, product_name: str) -> ProductSearchResult:
+        """
+        RU: Поиск продукта в Open Food Facts.
+        EN: Search for product in Open Food Facts.
 
-        except Exception as e:
-            logger.error(f"Error searching in OFF: {e}")
+        Args:
+            product_name: Название продукта
 
-        return ProductSearchResult(
-            product_name=product_name, found=False, error_message="OFF search failed"
-        )
+        Returns:
+            Результат поиска
+        """
+        return self._search_in("OFF", product_name)
 
     def _calculate_confidence(self, search_name: str, found_name: str) -> float:
         """
@@ -237,26 +227,7 @@ class ProductFinder:
         Returns:
             Уровень уверенности от 0.0 до 1.0
         """
-        search_clean = search_name.lower().replace(" ", "").replace("_", "")
-        found_clean = found_name.lower().replace(" ", "").replace("_", "")
-
-        # Точное совпадение
-        if search_clean == found_clean:
-            return 1.0
-
-        # Одно название содержит другое
-        if search_clean in found_clean or found_clean in search_clean:
-            return 0.8
-
-        # Проверяем общие слова
-        search_words = set(search_name.lower().split())
-        found_words = set(found_name.lower().split())
-        common_words = search_words.intersection(found_words)
-
-        if common_words:
-            return len(common_words) / max(len(search_words), len(found_words))
-
-        return 0.0
+        return name_confidence(search_name, found_name)
 
     def add_product_to_database(self, search_result: ProductSearchResult) -> bool:
         """
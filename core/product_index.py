@@ -0,0 +1,202 @@
+"""
+Product Index
+
+RU: Индекс нечеткого поиска продуктов по названию.
+EN: Fuzzy product-name matching index.
+
+Built once per source, it replaces a scan of the whole catalogue with a
+``name_confidence`` call per candidate. Candidates come from three lookups
+on the query: an exact map of normalised names, a character-trigram index
+for names that contain the query, and a word inverted index for names that
+share words with it. Names contained in the query are found by looking up
+the query's substrings in the exact map. Any name that could score above
+the threshold is among the candidates, so results equal a full scan.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from .food_sources.base import FoodRecord
+
+
+def clean_name(name: str) -> str:
+    """
+    RU: Нормализованное название: нижний регистр без пробелов и "_".
+    EN: Normalised name: lower case without spaces and underscores.
+    """
+    return name.lower().replace(" ", "").replace("_", "")
+
+
+def name_confidence(search_name: str, found_name: str) -> float:
+    """
+    RU: Уверенность в совпадении названий (0.0 - 1.0).
+    EN: Confidence that two product names match (0.0 - 1.0).
+
+    1.0 for equal normalised names, 0.8 if one contains the other, else the
+    share of common words (relative to the longer name), or 0.0.
+    """
+    search_clean = clean_name(search_name)
+    found_clean = clean_name(found_name)
+
+    if search_clean == found_clean:
+        return 1.0
+
+    if search_clean in found_clean or found_clean in search_clean:
+        return 0.8
+
+    search_words = set(search_name.lower().split())
+    found_words = set(found_name.lower().split())
+    common_words = search_words.intersection(found_words)
+
+    if common_words:
+        return len(common_words) / max(len(search_words), len(found_words))
+
+    return 0.0
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+@dataclass
+class ProductMatch:
+    """
+    RU: Кандидат поиска по индексу.
+    EN: Index search candidate.
+    """
+
+    name: str
+    confidence: float
+    item: Any
+
+
+class ProductIndex:
+    """
+    RU: Индекс названий: точные, по словам и по триграммам.
+    EN: Name index: exact, word-inverted and character-trigram.
+
+    Works on distinct names; each keeps the first item added under it, as
+    a scan keeping the first best match would.
+    """
+
+    def __init__(self) -> None:
+        self._names: List[str] = []
+        self._items: List[Any] = []
+        self._ids: Dict[str, int] = {}
+        self._word_counts: List[int] = []
+        # clean name -> name ids
+        self._exact: Dict[str, List[int]] = {}
+        # word -> name ids
+        self._words: Dict[str, List[int]] = {}
+        # trigram -> clean names
+        self._grams: Dict[str, List[str]] = {}
+
+    @classmethod
+    def from_records(cls, records: Iterable[FoodRecord]) -> "ProductIndex":
+        """
+        RU: Построить индекс по записям источника.
+        EN: Build an index over a source's records.
+        """
+        index = cls()
+        for rec in records:
+            index.add(rec.name, rec)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def add(self, name: str, item: Any = None) -> None:
+        """
+        RU: Добавить название (повторные названия игнорируются).
+        EN: Add a name; repeated names keep their first item.
+        """
+        if name in self._ids:
+            return
+        name_id = self._ids[name] = len(self._names)
+        self._names.append(name)
+        self._items.append(item)
+
+        words = set(name.lower().split())
+        self._word_counts.append(len(words))
+        for word in words:
+            self._words.setdefault(word, []).append(name_id)
+
+        clean = clean_name(name)
+        ids = self._exact.get(clean)
+        if ids is None:
+            ids = self._exact[clean] = []
+            for gram in _trigrams(clean):
+                self._grams.setdefault(gram, []).append(clean)
+        ids.append(name_id)
+
+    def _containing(self, query: str) -> Iterable[str]:
+        """Clean names that contain the clean query."""
+        grams = sorted(
+            (self._grams.get(g, ()) for g in _trigrams(query)),
+            key=len,
+        )
+        if not grams:
+            # Under three characters: no trigrams to narrow by
+            return [clean for clean in self._exact if query in clean]
+        candidates = set(grams[0]).intersection(*grams[1:])
+        return [clean for clean in candidates if query in clean]
+
+    def _contained(self, query: str) -> Iterable[str]:
+        """Clean names contained in the clean query (its indexed substrings)."""
+        substrings = {
+            query[i:j] for i in range(len(query)) for j in range(i + 1, len(query) + 1)
+        }
+        substrings.add("")
+        return [s for s in substrings if s in self._exact]
+
+    def search(
+        self, query: str, limit: int = 5, min_confidence: float = 0.0
+    ) -> List[ProductMatch]:
+        """
+        RU: Лучшие совпадения с уверенностью выше порога.
+        EN: Best matches scoring above min_confidence.
+
+        Args:
+            query: Product name to look up
+            limit: Maximum number of matches
+            min_confidence: Matches must score strictly above this
+
+        Returns:
+            Matches by confidence, then insertion order
+        """
+        query_clean = clean_name(query)
+        candidates: Set[int] = set()
+        for clean in (*self._containing(query_clean), *self._contained(query_clean)):
+            candidates.update(self._exact[clean])
+
+        # Word matches only: confidence is the common-word share, so names
+        # that cannot beat the threshold are dropped before scoring
+        words = set(query.lower().split())
+        common = Counter()
+        for word in words:
+            common.update(self._words.get(word, ()))
+        for name_id, count in common.items():
+            if count / max(len(words), self._word_counts[name_id]) > min_confidence:
+                candidates.add(name_id)
+
+        scored = []
+        for name_id in candidates:
+            confidence = name_confidence(query, self._names[name_id])
+            if confidence > min_confidence:
+                scored.append((-confidence, name_id))
+        scored.sort()
+        return [
+            ProductMatch(self._names[i], -negative, self._items[i])
+            for negative, i in scored[:limit]
+        ]
+
+    def best(self, query: str, min_confidence: float = 0.0) -> Optional[ProductMatch]:
+        """
+        RU: Лучшее совпадение или None.
+        EN: Best match, or None.
+        """
+        matches = self.search(query, limit=1, min_confidence=min_confidence)
+        return matches[0] if matches else None
@@ -12,8 +12,9 @@ from __future__ import annotations
 
 import csv
 from dataclasses import dataclass
-from typing import Dict, Set
+from typing import Callable, Dict, Sequence, Set
 
+from .diet_index import DietFlagIndex, IndexedDict
 from .food_db import FoodItem, parse_food_db
 
 
@@ -29,6 +30,34 @@ class Recipe:
     flags: Set[str]
 
 
+class RecipeCatalog(IndexedDict):
+    """
+    RU: Словарь рецептов с кешированным индексом диетических флагов.
+    EN: Recipe dict with a cached diet-flag compatibility index.
+
+    Behaves like the plain dict parse_recipe_db() used to return; any
+    mutation drops the cached indexes.
+    """
+
+    def flag_index(
+        self,
+        vocabulary: Sequence[str],
+        compatible: Callable[[Set[str], Set[str]], bool],
+    ) -> DietFlagIndex:
+        """
+        RU: Индекс совместимости для заданного предиката (кешируется).
+        EN: Compatibility index for a predicate (cached until mutation).
+        """
+        return self.cached_index(
+            ("flags", tuple(vocabulary), compatible),
+            lambda: DietFlagIndex(
+                vocabulary,
+                ((None, name, r.flags) for name, r in self.items()),
+                compatible,
+            ),
+        )
+
+
 def parse_recipe_db(
     csv_path: str = "data/recipes.csv", food_db: Dict[str, FoodItem] = None
 ) -> Dict[str, Recipe]:
@@ -46,7 +75,7 @@ def parse_recipe_db(
     if food_db is None:
         food_db = parse_food_db()
 
-    recipe_db = {}
+    recipe_db = RecipeCatalog()
 
     with open(csv_path, "r", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -13,11 +13,17 @@ from __future__ import annotations
 import csv
 import random
 from dataclasses import dataclass
-from typing import Dict, List
+from typing import Dict, List, Optional
 
+from .diet_index import DietFlagIndex
 from .food_db_new import MICRO_KEYS, FoodDB
 from .meal_i18n import Language, translate_recipe
 
+_MACRO_KEYS = ("protein_g", "fat_g", "carbs_g", "fiber_g")
+_MEAL_SLOTS = ("breakfast", "lunch", "dinner", "snack")
+# Diet flags that change compatibility in RecipeDB._compatible
+_DIET_FLAGS = ("VEG", "PESC", "GF")
+
 
 @dataclass
 class Recipe:
@@ -53,22 +59,39 @@ class RecipeDB:
                     if x.strip()
                 ]
                 self.recipes.append(Recipe(row["name"], row["meal"], ings, tags))
-
-    def pick_base_recipe(self, diet_flags: List[str], meal_index: int) -> Recipe:
+        self._flag_index: Optional[DietFlagIndex] = None
+        self._flag_index = self.flag_index  # build at load time
+
+    @property
+    def flag_index(self) -> DietFlagIndex:
+        """RU: Индекс (слот, маска) -> рецепты. EN: (slot, mask) -> recipe ids."""
+        index = self._flag_index
+        if index is None or index.count != len(self.recipes):
+            index = DietFlagIndex(
+                _DIET_FLAGS,
+                ((r.meal, i, r.tags) for i, r in enumerate(self.recipes)),
+                self._compatible,
+            )
+            self._flag_index = index
+        return index
+
+    def pick_base_recipe(
+        self,
+        diet_flags: List[str],
+        meal_index: int,
+        rng: Optional[random.Random] = None,
+    ) -> Recipe:
+        # rng: request-scoped generator for reproducible plans (global random if None)
         # breakfast/lunch/dinner/snack by index
-        meal_map = ["breakfast", "lunch", "dinner", "snack"]
-        target = meal_map[meal_index % len(meal_map)]
-        candidates = [
-            r
-            for r in self.recipes
-            if r.meal == target and self._compatible(r.tags, diet_flags)
-        ]
+        target = _MEAL_SLOTS[meal_index % len(_MEAL_SLOTS)]
+        index = self.flag_index
+        candidates = index.candidates(diet_flags, target)
         if not candidates:
             # fallback: любой с совместимыми флагами
-            candidates = [
-                r for r in self.recipes if self._compatible(r.tags, diet_flags)
-            ]
-        return random.choice(candidates) if candidates else None
+            candidates = index.candidates(diet_flags)
+        if not candidates:
+            return None
+        return self.recipes[(rng or random).choice(candidates)]
 
     def _compatible(self, recipe_flags: List[str], diet_flags: List[str]) -> bool:
         if "VEG" in diet_flags and "OMNI" in recipe_flags:
@@ -82,6 +105,17 @@ class RecipeDB:
     def _nutrition_for(
         self, grams_map: Dict[str, float]
     ) -> Dict[str, Dict[str, float]]:
+        matrix = self.fooddb.matrix
+        if matrix is not None:
+            tot = matrix.totals(grams_map, strict=True)
+            return {
+                "kcal": tot["kcal"],
+                "macros": {k: tot[k] for k in _MACRO_KEYS},
+                "micros": {k: tot[k] for k in MICRO_KEYS},
+            }
+
+        # RU: запасной путь без numpy (numpy не входит в requirements.txt);
+        # EN: FoodDB.matrix is None when core.nutrient_matrix cannot import numpy
         kcal = 0.0
         macros = {"protein_g": 0.0, "fat_g": 0.0, "carbs_g": 0.0, "fiber_g": 0.0}
         micros = {k: 0.0 for k in MICRO_KEYS}
@@ -103,10 +137,14 @@ class RecipeDB:
         kcal_goal: int,
         lang: Language = "en",
         prefer_fiber: bool = True,
+        rng: Optional[random.Random] = None,
     ) -> Meal:
         """RU: Масштабируем рецепт под цель kcal с мягкой коррекцией по клетчатке.
         EN: Scale recipe to kcal target with soft fiber preference.
+
+        rng: request-scoped generator for the ±5% jitter (global random if None).
         """
+        rand = (rng or random).random
         grams = dict(recipe.ingredients)
         base = self._nutrition_for(grams)
         if base["kcal"] <= 0:
@@ -116,7 +154,7 @@ class RecipeDB:
         # первичное масштабирование
         grams = {k: max(10.0, v * alpha) for k, v in grams.items()}
         # лёгкая рандомизация (±5%) для вариативности
-        grams = {k: v * (0.95 + 0.10 * random.random()) for k, v in grams.items()}
+        grams = {k: v * (0.95 + 0.10 * rand()) for k, v in grams.items()}
         nut = self._nutrition_for(grams)
 
         # если сильно промахнулись по цели >5%, подправим ещё раз
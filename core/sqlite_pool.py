@@ -0,0 +1,239 @@
+"""
+SQLite Connection Pool
+
+RU: Пул соединений SQLite: read-only соединения на поток и WAL-писатели.
+EN: SQLite connection pool: per-thread read-only connections and WAL writers.
+
+Read-write stores (caches, version stores) stay in WAL mode and are written
+through one long-lived connection per file; their readers are ordinary
+read-only connections. Only files that are built offline and swapped in
+with ``os.replace`` may be read with ``immutable=True``, which skips
+locking altogether.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple, Union
+
+try:
+    from prometheus_client import Counter
+except ImportError:
+    Counter = None
+
+PathLike = Union[str, Path]
+
+# Tunables (overridable via environment)
+MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(64 * 1024 * 1024)))
+CACHE_SIZE_KIB = int(os.getenv("SQLITE_CACHE_SIZE_KIB", "8192"))
+STATEMENT_CACHE_SIZE = int(os.getenv("SQLITE_STATEMENT_CACHE_SIZE", "256"))
+
+if Counter is not None:
+    POOL_REQUESTS = Counter(
+        "sqlite_pool_requests_total",
+        "SQLite pool connection requests by result (hit/miss)",
+        ["db", "result"],
+    )
+else:
+    POOL_REQUESTS = None
+
+_local = threading.local()
+_lock = threading.Lock()
+_generations: Dict[str, int] = {}
+_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+# Long-lived write connections: path -> (connection, lock, pid, inode)
+_writers: Dict[str, Tuple[sqlite3.Connection, threading.Lock, int, int]] = {}
+
+# (inode, mtime_ns, size, immutable, generation); mtime and size are only
+# tracked for immutable readers, which cannot notice changes themselves
+_Signature = Tuple[int, int, int, bool, int]
+
+
+def _key(path: PathLike) -> str:
+    return str(Path(path).resolve())
+
+
+def _signature(key: str, immutable: bool) -> _Signature:
+    try:
+        st = os.stat(key)
+    except FileNotFoundError as e:
+        raise sqlite3.OperationalError(f"unable to open database file: {key}") from e
+    # A -wal file means the database is not a finished offline build
+    immutable = immutable and not os.path.exists(key + "-wal")
+    if not immutable:
+        return (st.st_ino, 0, 0, False, _generations.get(key, 0))
+    return (st.st_ino, st.st_mtime_ns, st.st_size, True, _generations.get(key, 0))
+
+
+def _record(key: str, result: str) -> None:
+    with _lock:
+        _stats["hits" if result == "hit" else "misses"] += 1
+    if POOL_REQUESTS is not None:
+        POOL_REQUESTS.labels(db=Path(key).name, result=result).inc()
+
+
+def _open_reader(key: str, immutable: bool) -> sqlite3.Connection:
+    uri = Path(key).as_uri() + "?mode=ro"
+    if immutable:
+        uri += "&immutable=1"
+    con = sqlite3.connect(
+        uri, uri=True, timeout=30, cached_statements=STATEMENT_CACHE_SIZE
+    )
+    con.row_factory = sqlite3.Row
+    con.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+    con.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KIB}")
+    con.execute("PRAGMA query_only=ON")
+    return con
+
+
+def reader(path: PathLike, immutable: bool = False) -> sqlite3.Connection:
+    """
+    RU: Получить read-only соединение текущего потока (переиспользуется).
+    EN: Get the calling thread's pooled read-only connection.
+
+    The connection is opened once per thread with ``mode=ro`` and reused
+    until the file is replaced or the pool is invalidated. Prepared
+    statements are cached per connection, so repeated queries skip
+    re-parsing.
+
+    Args:
+        path: Path to the SQLite database file
+        immutable: The file is built offline and never written in place
+            (only replaced), so it can be opened with ``immutable=1``
+            and read without locks. It is reopened when it changes on disk.
+
+    Returns:
+        Shared sqlite3.Connection with ``sqlite3.Row`` row factory. Callers
+        must not close it.
+    """
+    key = _key(path)
+    sig = _signature(key, immutable)
+    conns: Dict[str, Tuple[sqlite3.Connection, _Signature]] = (
+        _local.__dict__.setdefault("conns", {})
+    )
+    entry = conns.get(key)
+    if entry is not None and entry[1] == sig:
+        _record(key, "hit")
+        return entry[0]
+
+    if entry is not None:
+        entry[0].close()
+    con = _open_reader(key, immutable=sig[3])
+    _generations.setdefault(key, 0)
+    conns[key] = (con, sig)
+    _record(key, "miss")
+    return con
+
+
+def _open_writer(key: str) -> sqlite3.Connection:
+    Path(key).parent.mkdir(parents=True, exist_ok=True)
+    con = sqlite3.connect(
+        key,
+        timeout=30,
+        check_same_thread=False,
+        cached_statements=STATEMENT_CACHE_SIZE,
+    )
+    con.row_factory = sqlite3.Row
+    # Persistent: the file stays in WAL mode, so readers in other
+    # connections and processes never block on (or block) the writer
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    return con
+
+
+def _writer_entry(key: str) -> Tuple[sqlite3.Connection, threading.Lock]:
+    with _lock:
+        entry = _writers.get(key)
+        try:
+            inode = os.stat(key).st_ino
+        except FileNotFoundError:
+            inode = -1
+        # Reopen after a fork or when the file was removed or replaced
+        if entry is None or entry[2] != os.getpid() or entry[3] != inode:
+            con = _open_writer(key)
+            entry = (con, threading.Lock(), os.getpid(), os.stat(key).st_ino)
+            _writers[key] = entry
+        return entry[0], entry[1]
+
+
+@contextmanager
+def writer(path: PathLike) -> Iterator[sqlite3.Connection]:
+    """
+    RU: Транзакция записи через долгоживущее WAL-соединение файла.
+    EN: Write transaction on the file's long-lived WAL connection.
+
+    One connection per file and process is shared by all threads; the
+    transaction holds its lock, so writers of one process are serialised
+    and other processes wait on SQLite's busy timeout. The transaction
+    starts with ``BEGIN IMMEDIATE``, commits on success and rolls back on
+    error. Not reentrant.
+
+    Args:
+        path: Path to the SQLite database file (created if missing)
+
+    Yields:
+        The file's write connection, inside a transaction
+    """
+    key = _key(path)
+    con, lock = _writer_entry(key)
+    with lock:
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            yield con
+        except BaseException:
+            con.rollback()
+            raise
+        con.commit()
+
+
+def close_writers(path: Optional[PathLike] = None) -> None:
+    """
+    RU: Закрыть долгоживущие соединения записи (для файла или все).
+    EN: Close the long-lived write connections of one file or all files.
+    """
+    with _lock:
+        keys = [_key(path)] if path is not None else list(_writers)
+        entries = [_writers.pop(key) for key in keys if key in _writers]
+    for con, lock, pid, _inode in entries:
+        if pid == os.getpid():
+            with lock:
+                con.close()
+
+
+def invalidate(path: Optional[PathLike] = None) -> None:
+    """
+    RU: Сбросить кешированные соединения (для файла или для всех).
+    EN: Invalidate pooled connections for one database or all of them.
+
+    Connections held by other threads are reopened on their next acquire.
+    """
+    with _lock:
+        keys = [_key(path)] if path is not None else list(_generations)
+        for key in keys:
+            _generations[key] = _generations.get(key, 0) + 1
+        _stats["invalidations"] += 1
+    close_thread_connections()
+
+
+def close_thread_connections() -> None:
+    """
+    RU: Закрыть соединения текущего потока.
+    EN: Close the calling thread's pooled connections.
+    """
+    conns = _local.__dict__.pop("conns", {})
+    for con, _sig in conns.values():
+        con.close()
+
+
+def stats() -> Dict[str, int]:
+    """
+    RU: Статистика пула (попадания/промахи/инвалидации).
+    EN: Pool statistics (hits/misses/invalidations).
+    """
+    with _lock:
+        return dict(_stats)
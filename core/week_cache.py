@@ -0,0 +1,138 @@
+"""
+Week Plan Cache
+
+RU: Кеш недельных планов (LRU + TTL) по каноническому хешу запроса.
+EN: LRU + TTL cache of weekly plans keyed by a canonical request hash.
+
+The same hash seeds the request-scoped ``random.Random`` passed to
+``build_week``, so a cached week is exactly what a rebuild would produce.
+The data snapshot version is part of the key, so a data reload naturally
+misses the old entries.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+DEFAULT_MAX_ENTRIES = int(os.getenv("WEEK_CACHE_SIZE", "1024"))
+DEFAULT_TTL_SECONDS = float(os.getenv("WEEK_CACHE_TTL_SEC", "3600"))
+
+
+def plan_request_key(
+    targets: Dict[str, Any],
+    diet_flags: Iterable[str],
+    lang: str,
+    version: Any,
+) -> str:
+    """
+    RU: Канонический хеш запроса недельного плана.
+    EN: Canonical hash of a weekly plan request.
+
+    Args:
+        targets: Targets dict passed to build_week
+        diet_flags: Diet flags (order and duplicates are ignored)
+        lang: Response language
+        version: Data snapshot version
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    payload = {
+        "targets": targets,
+        "diet_flags": sorted(set(diet_flags or [])),
+        "lang": lang,
+        "version": str(version),
+    }
+    blob = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def rng_for_key(key: str) -> random.Random:
+    """
+    RU: Генератор случайных чисел, детерминированный ключом запроса.
+    EN: Request-scoped RNG seeded from the request key.
+    """
+    return random.Random(int(key[:16], 16))
+
+
+class WeekCache:
+    """
+    RU: Потокобезопасный LRU-кеш с ограничением по времени жизни.
+    EN: Thread-safe LRU cache with a per-entry time-to-live.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """RU: Значение или None. EN: Cached value, or None if missing/expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, value: Any) -> None:
+        """RU: Сохранить значение. EN: Store a value, evicting the oldest."""
+        if self.max_entries <= 0 or self.ttl_seconds <= 0:
+            return
+        expires = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """RU: Очистить кеш. EN: Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """RU: Статистика кеша. EN: Cache statistics."""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+_week_cache: Optional[WeekCache] = None
+
+
+def get_week_cache() -> WeekCache:
+    """
+    RU: Глобальный кеш недельных планов.
+    EN: Get the global weekly plan cache.
+    """
+    global _week_cache
+    if _week_cache is None:
+        _week_cache = WeekCache()
+    return _week_cache
@@ -0,0 +1,101 @@
+"""
+Week Executor
+
+RU: Параллельная генерация дней недельного плана через пул исполнителей.
+EN: Fan-out of weekly plan days across an executor pool.
+
+Day builders are called as ``fn(day_index, seed)`` and results come back in
+day order, so merging is identical to the sequential loop. Any
+``concurrent.futures.Executor`` can be plugged in (a ProcessPoolExecutor
+needs a picklable ``fn``, e.g. a ``functools.partial`` of a module-level
+function).
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+DAYS_PER_WEEK = 7
+# Inline by default: day builders are CPU-bound pure Python, so a thread pool
+# gains nothing under the GIL. Set WEEKLY_PLAN_MAX_WORKERS or pass an
+# executor to opt in.
+DEFAULT_MAX_WORKERS = int(os.getenv("WEEKLY_PLAN_MAX_WORKERS", "1"))
+
+_pools: Dict[int, ThreadPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def day_seed(seed: Optional[int], day_index: int) -> Optional[int]:
+    """
+    RU: Детерминированное зерно для дня недели.
+    EN: Deterministic per-day seed derived from the week seed.
+
+    Args:
+        seed: Week seed (None keeps days unseeded)
+        day_index: Zero-based day index
+
+    Returns:
+        32-bit seed, stable across processes and Python runs
+    """
+    if seed is None:
+        return None
+    return random.Random(f"{seed}:{day_index}").getrandbits(32)
+
+
+def _shared_pool(max_workers: int) -> ThreadPoolExecutor:
+    with _pools_lock:
+        pool = _pools.get(max_workers)
+        if pool is None:
+            pool = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="week-day"
+            )
+            _pools[max_workers] = pool
+        return pool
+
+
+def run_days(
+    fn: Callable[[int, Optional[int]], T],
+    days: int = DAYS_PER_WEEK,
+    *,
+    executor: Optional[Executor] = None,
+    max_workers: Optional[int] = None,
+    seed: Optional[int] = None,
+) -> List[T]:
+    """
+    RU: Выполнить построение дней (последовательно или в пуле).
+    EN: Build the days, sequentially or on an executor.
+
+    Args:
+        fn: Day builder called as fn(day_index, seed)
+        days: Number of days to build
+        executor: Executor to use (overrides max_workers)
+        max_workers: Thread pool size; <= 1 runs inline
+            (default: WEEKLY_PLAN_MAX_WORKERS, 1)
+        seed: Week seed, expanded with day_seed()
+
+    Returns:
+        Day results in day order
+    """
+    indexes = list(range(days))
+    seeds = [day_seed(seed, i) for i in indexes]
+    if executor is None:
+        workers = DEFAULT_MAX_WORKERS if max_workers is None else max_workers
+        if workers <= 1 or days <= 1:
+            return [fn(i, s) for i, s in zip(indexes, seeds)]
+        executor = _shared_pool(min(workers, days))
+    return list(executor.map(fn, indexes, seeds))
+
+
+def shutdown_pools() -> None:
+    """RU: Закрыть общие пулы. EN: Shut down the shared thread pools."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=True)
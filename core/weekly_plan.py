@@ -1,13 +1,57 @@
-from typing import Dict, Set
+from concurrent.futures import Executor
+from functools import partial
+from typing import Dict, Optional, Set
 
 from .daily_plate import create_daily_plate
 from .food_db import parse_food_db
 from .recipe_db import parse_recipe_db
 from .targets import NutritionTargets
+from .week_executor import run_days
+
+
+def _day_kcal_target(kcal_daily: float, day_index: int) -> int:
+    # Add slight variation to prevent monotony (±5%)
+    variation = 1 + (0.05 * ((day_index % 3) - 1))  # -5%, 0%, +5% variation
+    return int(kcal_daily * variation)
+
+
+def _plan_day(
+    kcal_daily: float,
+    diet_flags: Set[str],
+    food_db: Dict,
+    recipe_db: Dict,
+    day_index: int,
+    seed: Optional[int] = None,
+) -> Dict:
+    """
+    RU: План одного дня (выполняется в пуле).
+    EN: Plan one day (runs on the week executor; seed is not consumed yet).
+    """
+    kcal_target = _day_kcal_target(kcal_daily, day_index)
+
+    # Generate daily plate
+    day_plan = create_daily_plate(
+        kcal_total=kcal_target,
+        diet_flags=diet_flags,
+        food_db=food_db,
+        recipe_db=recipe_db,
+    )
+
+    return {
+        "day": day_index + 1,
+        "kcal_target": kcal_target,
+        "meals": day_plan["meals"],
+        "micro_coverage": day_plan["micro_coverage"],
+    }
 
 
 def generate_weekly_plan(
-    targets: NutritionTargets, diet_flags: Set[str] = None
+    targets: NutritionTargets,
+    diet_flags: Set[str] = None,
+    *,
+    executor: Optional[Executor] = None,
+    max_workers: Optional[int] = None,
+    seed: Optional[int] = None,
 ) -> Dict:
     """
     RU: Генерирует недельный план питания.
@@ -16,6 +60,9 @@ def generate_weekly_plan(
     Args:
         targets: Nutrition targets for the user
         diet_flags: Dietary restrictions/preferences
+        executor: Executor for the seven days (see core.week_executor)
+        max_workers: Thread pool size when no executor is given (<= 1: inline)
+        seed: Week seed; each day gets a deterministic derived seed
 
     Returns:
         Complete weekly plan with meals, coverage, and shopping list
@@ -28,33 +75,17 @@ def generate_weekly_plan(
     recipe_db = parse_recipe_db(food_db=food_db)
 
     # Generate 7 days of meal plans
-    days = []
-    weekly_micro_coverage = {}
-
-    for day_index in range(7):
-        # Add slight variation to prevent monotony (±5%)
-        variation = 1 + (0.05 * ((day_index % 3) - 1))  # -5%, 0%, +5% variation
-        kcal_target = int(targets.kcal_daily * variation)
-
-        # Generate daily plate
-        day_plan = create_daily_plate(
-            kcal_total=kcal_target,
-            diet_flags=diet_flags,
-            food_db=food_db,
-            recipe_db=recipe_db,
-        )
-
-        day_entry = {
-            "day": day_index + 1,
-            "kcal_target": kcal_target,
-            "meals": day_plan["meals"],
-            "micro_coverage": day_plan["micro_coverage"],
-        }
-
-        days.append(day_entry)
+    days = run_days(
+        partial(_plan_day, targets.kcal_daily, diet_flags, food_db, recipe_db),
+        executor=executor,
+        max_workers=max_workers,
+        seed=seed,
+    )
 
+    weekly_micro_coverage = {}
+    for day_entry in days:
         # Aggregate micro coverage for weekly average
-        for micro, coverage in day_plan["micro_coverage"].items():
+        for micro, coverage in day_entry["micro_coverage"].items():
             if micro not in weekly_micro_coverage:
                 weekly_micro_coverage[micro] = []
             weekly_micro_coverage[micro].append(coverage)
@@ -8,7 +8,8 @@ This module generates a 7-day meal plan with nutrient coverage analysis
 and shopping list aggregation.
 """
 
-from typing import List
+import random
+from typing import List, Optional
 
 from .food_db_new import FoodDB
 from .meal_i18n import Language
@@ -22,10 +23,12 @@ def build_week(
     lang: Language,
     fooddb: FoodDB,
     recipedb: RecipeDB,
+    rng: Optional[random.Random] = None,
 ) -> dict:
+    # rng: request-scoped generator shared by all 7 days (see core.week_cache)
     days = []
     for _ in range(7):
-        d = build_plate_day(targets, diet_flags, lang, fooddb, recipedb)
+        d = build_plate_day(targets, diet_flags, lang, fooddb, recipedb, rng=rng)
         # лёгкая вариативность (±5% уже в scale_recipe, этого достаточно)
         days.append(d.__dict__)
     # усредняем покрытие
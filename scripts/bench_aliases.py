@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Alias Mapping Benchmark
+
+RU: Нормализация синтетических строк OFF через кешированный map_to_canonical.
+EN: Normalise synthetic OFF rows through the cached map_to_canonical.
+
+Usage:
+    python scripts/bench_aliases.py [--rows 1000000] [--baseline-rows 20000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core import aliases
+from core.food_sources.off import OFFAdapter
+
+NAMES = [
+    "Spinach",
+    "Chicken Breast",
+    "Greek Yogurt",
+    "Brown Rice",
+    "Sweet Potato",
+    "Olive Oil, extra virgin",
+    "Lentils - red",
+    "Oats",
+]
+
+
+def _rows(n: int, seed: int = 42):
+    rng = random.Random(seed)
+    for i in range(n):
+        name = rng.choice(NAMES)
+        if rng.random() < 0.3:
+            name = f"{name} {i % 5000}"
+        yield {
+            "product_name": name,
+            "energy-kcal_100g": str(rng.uniform(0, 900)),
+            "proteins_100g": str(rng.uniform(0, 40)),
+            "fat_100g": str(rng.uniform(0, 100)),
+            "carbohydrates_100g": str(rng.uniform(0, 90)),
+        }
+
+
+def _normalise(n: int) -> float:
+    adapter = OFFAdapter()
+    adapter.fetch = lambda: _rows(n)
+    t0 = time.perf_counter()
+    for _ in adapter.normalize():
+        pass
+    return time.perf_counter() - t0
+
+
+def _uncached_map(raw_name: str, locale: str = "en") -> str:
+    """Pre-cache behaviour: re-read the alias CSV on every call."""
+    key = (raw_name or "").strip().lower()
+    table = aliases._load_aliases()
+    return table.get(key) or aliases._snake_case.__wrapped__(key)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Alias mapping benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--baseline-rows", type=int, default=20_000)
+    args = parser.parse_args()
+
+    cached = _normalise(args.rows)
+
+    import core.food_sources.off as off_module
+
+    off_module.map_to_canonical = _uncached_map
+    try:
+        baseline = _normalise(args.baseline_rows)
+    finally:
+        off_module.map_to_canonical = aliases.map_to_canonical
+
+    per_row_cached = cached / args.rows * 1e6
+    per_row_baseline = baseline / args.baseline_rows * 1e6
+    print(
+        f"cached:   {args.rows:>9} rows in {cached:7.2f} s ({per_row_cached:6.2f} µs/row)"
+    )
+    print(
+        f"uncached: {args.baseline_rows:>9} rows in {baseline:7.2f} s "
+        f"({per_row_baseline:6.2f} µs/row, ~{per_row_baseline * args.rows / 1e6:.0f} s "
+        f"for {args.rows} rows)"
+    )
+    print(f"snake_case LRU: {aliases._snake_case.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
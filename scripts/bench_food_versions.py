@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Food Version Storage Benchmark
+
+RU: Диск и время отката: полные JSON-бэкапы против хранилища версий.
+EN: Disk usage and rollback time: full JSON backups vs the version store.
+
+Builds a synthetic catalogue, applies a series of small updates and keeps
+every version both ways: one indented JSON copy per version (the legacy
+``_create_backup`` format) and the content-addressed FoodVersionStore.
+Then rolls back to the oldest retained version with each.
+
+Usage:
+    python scripts/bench_food_versions.py [--foods 100000] [--versions 5] [--churn 0.01]
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core.food_apis.unified_db import UnifiedFoodItem
+from core.food_apis.version_store import CODEC, FoodVersionStore, diff_records
+
+NUTRIENTS = ["protein_g", "fat_g", "carbs_g", "fiber_g", "sugar_g", "sodium_mg"]
+
+
+def _catalogue(n: int, rng: random.Random):
+    return {
+        f"food_{i}": asdict(
+            UnifiedFoodItem(
+                name=f"Food {i}",
+                nutrients_per_100g={k: round(rng.uniform(0, 60), 2) for k in NUTRIENTS},
+                cost_per_100g=round(rng.uniform(0.1, 5), 2),
+                tags=rng.sample(["vegan", "dairy", "grain", "protein", "fruit"], 2),
+                availability_regions=["US"],
+                source="USDA FoodData Central",
+                source_id=str(100000 + i),
+            )
+        )
+        for i in range(n)
+    }
+
+
+def _next_version(records, churn: float, rng: random.Random, serial: int):
+    snapshot, records = records, dict(records)
+    keys = list(records)
+    for key in rng.sample(keys, int(len(keys) * churn)):
+        record = json.loads(json.dumps(records[key]))
+        record["cost_per_100g"] = round(rng.uniform(0.1, 5), 2)
+        records[key] = record
+    for key in rng.sample(keys, int(len(keys) * churn / 4)):
+        del records[key]
+    for i in range(int(len(keys) * churn / 4)):
+        records[f"food_new_{serial}_{i}"] = dict(snapshot[keys[i]], name=f"New {i}")
+    return records
+
+
+def _dir_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.iterdir() if f.is_file())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Food version storage benchmark")
+    parser.add_argument("--foods", type=int, default=100_000)
+    parser.add_argument("--versions", type=int, default=5)
+    parser.add_argument("--churn", type=float, default=0.01)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    snapshots = [_catalogue(args.foods, rng)]
+    for serial in range(1, args.versions):
+        snapshots.append(_next_version(snapshots[-1], args.churn, rng, serial))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_dir = Path(tmp) / "legacy"
+        legacy_dir.mkdir()
+        t0 = time.perf_counter()
+        for version, records in enumerate(snapshots):
+            with open(legacy_dir / f"usda_backup_v{version}.json", "w") as f:
+                json.dump(records, f, indent=2)
+        legacy_write = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        with open(legacy_dir / "usda_backup_v0.json") as f:
+            restored = {k: UnifiedFoodItem(**v) for k, v in json.load(f).items()}
+        legacy_rollback = time.perf_counter() - t0
+        assert len(restored) == len(snapshots[0])
+
+        store_dir = Path(tmp) / "store"
+        store = FoodVersionStore(store_dir / "food_versions.sqlite")
+        t0 = time.perf_counter()
+        parent = None
+        for version, records in enumerate(snapshots):
+            delta, hashes = diff_records(
+                store.hashes("usda"),
+                records,
+                lambda keys: store.get_many("usda", keys),
+            )
+            store.commit("usda", f"v{version}", parent, delta, hashes)
+            parent = f"v{version}"
+        store_write = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        refs = store.revert("usda", parent, "v0", "v0_rollback")
+        store_rollback = time.perf_counter() - t0
+        assert refs is not None
+        assert store.records("usda") == snapshots[0]
+
+        legacy_bytes = _dir_size(legacy_dir)
+        store_bytes = _dir_size(store_dir)
+
+    changed = sum(refs.counts().values())
+    print(
+        f"{args.foods} foods, {args.versions} versions, {args.churn:.1%} churn "
+        f"per version ({CODEC} blobs)"
+    )
+    print(
+        f"json backups:  {legacy_bytes / 1e6:8.1f} MB, write {legacy_write:6.2f} s, "
+        f"rollback {legacy_rollback * 1e3:8.1f} ms ({len(snapshots[0])} records)"
+    )
+    print(
+        f"version store: {store_bytes / 1e6:8.1f} MB, write {store_write:6.2f} s, "
+        f"rollback {store_rollback * 1e3:8.1f} ms ({changed} records)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Nutrient Matrix Benchmark
+
+RU: Сравнение векторных сумм NutrientMatrix с циклами по словарям.
+EN: Compare NutrientMatrix vectorised totals against dict loops.
+
+Usage:
+    python scripts/bench_nutrient_matrix.py [--foods 2000] [--meals 2800]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core.food_db_new import MICRO_KEYS
+from core.nutrient_matrix import NutrientMatrix
+
+MACROS = ("protein_g", "fat_g", "carbs_g", "fiber_g")
+
+
+def _dict_totals(foods: dict, grams_map: dict) -> dict:
+    total = {k: 0.0 for k in ("kcal", *MACROS, *MICRO_KEYS)}
+    for name, g in grams_map.items():
+        row = foods[name]
+        mul = g / row["per_g"]
+        total["kcal"] += (
+            row["protein_g"] * 4 + row["carbs_g"] * 4 + row["fat_g"] * 9
+        ) * mul
+        for k in (*MACROS, *MICRO_KEYS):
+            total[k] += row[k] * mul
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="NutrientMatrix benchmark")
+    parser.add_argument("--foods", type=int, default=2000)
+    parser.add_argument(
+        "--meals", type=int, default=2800, help="e.g. 100 weeks × 28 meals"
+    )
+    parser.add_argument("--ingredients", type=int, default=6)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    foods = {
+        f"food_{i}": {
+            "name": f"food_{i}",
+            "per_g": 100.0,
+            **{k: rng.uniform(0, 30) for k in MACROS},
+            **{k: rng.uniform(0, 200) for k in MICRO_KEYS},
+            "price": rng.uniform(0, 10),
+        }
+        for i in range(args.foods)
+    }
+    names = list(foods)
+    meals = [
+        {rng.choice(names): rng.uniform(10, 250) for _ in range(args.ingredients)}
+        for _ in range(args.meals)
+    ]
+
+    t0 = time.perf_counter()
+    matrix = NutrientMatrix.from_rows(foods.values())
+    build = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for m in meals:
+        _dict_totals(foods, m)
+    loop = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for m in meals:
+        matrix.totals(m)
+    single = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    matrix.totals_many(meals)
+    batched = time.perf_counter() - t0
+
+    print(f"foods={args.foods} meals={args.meals} ingredients/meal={args.ingredients}")
+    print(f"matrix build:          {build * 1000:8.2f} ms")
+    print(f"dict loops:            {loop * 1000:8.2f} ms")
+    print(f"matrix.totals (each):  {single * 1000:8.2f} ms  ({loop / single:.1f}x)")
+    print(f"matrix.totals_many:    {batched * 1000:8.2f} ms  ({loop / batched:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Weekly Plan Benchmark
+
+RU: Сравнение последовательной и параллельной генерации недельного плана.
+EN: Sequential vs parallel weekly plan generation under concurrent load.
+
+Each of N concurrent "requests" builds one week; days are generated either
+inline (max_workers=1) or on the week executor.
+
+Usage:
+    python scripts/bench_weekly_plan.py [--requests 1 10 100] [--workers 7]
+        [--planner menu|plan] [--processes]
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core.menu_engine import _get_default_food_db, make_weekly_menu
+from core.recommendations import build_nutrition_targets
+from core.targets import UserProfile
+from core.week_executor import shutdown_pools
+from core.weekly_plan import generate_weekly_plan
+
+PROFILE = UserProfile(
+    sex="male",
+    age=30,
+    height_cm=178,
+    weight_kg=75,
+    activity="moderate",
+    goal="maintain",
+)
+
+
+def _week_fn(planner: str, food_db):
+    if planner == "menu":
+        return lambda **kw: make_weekly_menu(PROFILE, food_db, **kw)
+    targets = build_nutrition_targets(PROFILE)
+    return lambda **kw: generate_weekly_plan(targets, set(), **kw)
+
+
+def _run(week, requests: int, **kw) -> float:
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=requests) as clients:
+        for future in [clients.submit(week, seed=i, **kw) for i in range(requests)]:
+            future.result()
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Weekly plan benchmark")
+    parser.add_argument("--requests", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--workers", type=int, default=7)
+    parser.add_argument("--planner", choices=["menu", "plan"], default="menu")
+    parser.add_argument(
+        "--processes", action="store_true", help="Use a process pool for the days"
+    )
+    args = parser.parse_args()
+
+    week = _week_fn(args.planner, _get_default_food_db())
+    week(max_workers=1)  # warm caches
+
+    pool = ProcessPoolExecutor(max_workers=args.workers) if args.processes else None
+    parallel_kw = {"executor": pool} if pool else {"max_workers": args.workers}
+    mode = "processes" if pool else "threads"
+    try:
+        print(f"planner={args.planner} workers={args.workers} ({mode})")
+        print(f"{'requests':>8} {'sequential s':>13} {'parallel s':>11} {'speedup':>8}")
+        for n in args.requests:
+            seq = _run(week, n, max_workers=1)
+            par = _run(week, n, **parallel_kw)
+            print(f"{n:>8} {seq:>13.3f} {par:>11.3f} {seq / par:>7.2f}x")
+    finally:
+        if pool:
+            pool.shutdown()
+        shutdown_pools()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,26 +6,209 @@ RU: Сборка профессиональной базы данных прод
 EN: Build professional food database from CSV to Parquet/SQLite.
 """
 
+import argparse
 import hashlib
 import json
+import os
+import shutil
 import sqlite3
 
 # Add project root to path
 import sys
+import time
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 import pandas as pd
 from pydantic import ValidationError
 
 sys.path.append(str(Path(__file__).parent.parent))
 
-from core.food_merge import merge_records
+from core.food_build_manifest import BuildManifest
+from core.food_ingest import (
+    INGEST_WORKERS,
+    chunk_files,
+    ingest_chunks,
+    map_chunks,
+    worker_count,
+)
+from core.food_merge import (
+    MERGE_BACKEND,
+    MERGE_BACKENDS,
+    merge_grouped,
+    merge_partials,
+    merge_records,
+)
+from core.food_sources.base import BaseAdapter
 from core.food_sources.off import OFFAdapter
 from core.food_sources.usda import USDAAdapter
+from core.food_staging import FoodStaging
 from core.schemas import FoodItem
 
+# Validated foods written per batch in streaming mode
+STREAM_BATCH_SIZE = int(os.getenv("FOOD_BUILD_BATCH_SIZE", "5000"))
+
+MICRONUTRIENT_FIELDS = [
+    "Fe_mg",
+    "Ca_mg",
+    "K_mg",
+    "Mg_mg",
+    "VitD_IU",
+    "B12_ug",
+    "Folate_ug",
+    "Iodine_ug",
+]
+
+_FOODS_TABLE = """
+    CREATE TABLE foods (
+        id TEXT PRIMARY KEY,
+        canonical_name TEXT NOT NULL,
+        group_name TEXT,
+        per_g REAL,
+        kcal REAL,
+        protein_g REAL,
+        fat_g REAL,
+        carbs_g REAL,
+        fiber_g REAL,
+        Fe_mg REAL,
+        Ca_mg REAL,
+        K_mg REAL,
+        Mg_mg REAL,
+        VitD_IU REAL,
+        B12_ug REAL,
+        Folate_ug REAL,
+        Iodine_ug REAL,
+        flags TEXT,
+        brand TEXT,
+        gtin TEXT,
+        fdc_id TEXT,
+        source TEXT,
+        source_priority INTEGER,
+        version_date TEXT,
+        price_per_100g REAL
+    )
+"""
+
+_FOODS_FTS_TABLE = """
+    CREATE VIRTUAL TABLE foods_fts USING fts5(
+        canonical_name,
+        group_name,
+        brand,
+        flags,
+        content='foods',
+        content_rowid='rowid'
+    )
+"""
+
+
+class BuildStats:
+    """
+    RU: Накопительная статистика сборки для отчета.
+    EN: Running build statistics for the report.
+    """
+
+    def __init__(self):
+        self.total_foods = 0
+        self.sources: Dict[str, int] = {}
+        self.groups: Dict[str, int] = {}
+        self.micronutrient_coverage: Dict[str, int] = {}
+
+    @classmethod
+    def from_sqlite(cls, conn: sqlite3.Connection) -> "BuildStats":
+        """Statistics of the foods table, for builds that update it in place."""
+        stats = cls()
+        stats.total_foods = conn.execute("SELECT COUNT(*) FROM foods").fetchone()[0]
+        stats.sources = dict(
+            conn.execute("SELECT source, COUNT(*) FROM foods GROUP BY source")
+        )
+        stats.groups = dict(
+            conn.execute("SELECT group_name, COUNT(*) FROM foods GROUP BY group_name")
+        )
+        counts = conn.execute(
+            "SELECT "
+            + ", ".join(f"SUM({field} > 0)" for field in MICRONUTRIENT_FIELDS)
+            + " FROM foods"
+        ).fetchone()
+        stats.micronutrient_coverage = {
+            field: count for field, count in zip(MICRONUTRIENT_FIELDS, counts) if count
+        }
+        return stats
+
+    def add(self, food: FoodItem) -> None:
+        self.total_foods += 1
+        # Source distribution
+        self.sources[food.source] = self.sources.get(food.source, 0) + 1
+        # Group distribution
+        self.groups[food.group] = self.groups.get(food.group, 0) + 1
+        # Micronutrient coverage
+        for field in MICRONUTRIENT_FIELDS:
+            if getattr(food, field) > 0:
+                self.micronutrient_coverage[field] = (
+                    self.micronutrient_coverage.get(field, 0) + 1
+                )
+
+
+class ParquetBatchWriter:
+    """
+    RU: Запись Parquet порциями (row groups) без загрузки всех данных.
+    EN: Writes Parquet in row-group batches without holding all rows.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._writer = None
+
+    def write(self, frame: pd.DataFrame) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        if self._writer is None:
+            # Columns that are all None in the first batch (brand, gtin...)
+            # come out as null type; later batches may hold strings
+            schema = pa.schema(
+                [
+                    pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f
+                    for f in table.schema
+                ],
+                metadata=table.schema.metadata,
+            )
+            self._writer = pq.ParquetWriter(self.path, schema)
+        self._writer.write_table(table.cast(self._writer.schema))
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class _PhaseTimer:
+    """
+    RU: Замер длительности фаз сборки для отчета.
+    EN: Wall-clock timing of build phases for the report.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+
+    @contextmanager
+    def __call__(self, phase: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[phase] = round(time.perf_counter() - start, 3)
+
+    def report(self, **extra) -> Dict:
+        return {
+            **extra,
+            **self.phases,
+            "total_s": round(time.perf_counter() - self.start, 3),
+        }
+
 
 class FoodDatabaseBuilder:
     """
@@ -33,11 +216,14 @@ class FoodDatabaseBuilder:
     EN: Food database builder with full provenance tracking.
     """
 
-    def __init__(self, project_root: str = None):
-        """Initialize builder with project paths."""
+    def __init__(self, project_root: str = None, merge_backend: str = None):
+        """Initialize builder with project paths and merge backend."""
         if project_root is None:
             project_root = Path(__file__).parent.parent
 
+        # "python" or "numpy" (vectorised, same output)
+        self.merge_backend = merge_backend or MERGE_BACKEND
+
         self.project_root = Path(project_root)
         self.data_dir = self.project_root / "data"
         self.external_dir = self.project_root / "external"
@@ -48,6 +234,8 @@ class FoodDatabaseBuilder:
         self.food_parquet = self.data_dir / "food.parquet"
         self.food_sqlite = self.data_dir / "food.sqlite"
         self.build_report = self.data_dir / "build_report.json"
+        # Chunk hashes and per-name contributions for incremental builds
+        self.build_manifest = self.data_dir / "food_build_manifest.sqlite"
 
         # Ensure directories exist
         self.data_dir.mkdir(exist_ok=True)
@@ -62,12 +250,7 @@ class FoodDatabaseBuilder:
 
         # Load USDA data (from chunks or single file)
         usda_data = []
-        if self.usda_chunks_dir.exists() and any(self.usda_chunks_dir.glob("*.csv")):
-            print(f"  📊 Loading USDA chunks from {self.usda_chunks_dir}")
-            adapter = USDAAdapter(str(self.usda_chunks_dir))
-        else:
-            print("  📊 Loading USDA from single file")
-            adapter = USDAAdapter()
+        adapter = self._usda_adapter()
 
         try:
             usda_data = list(adapter.normalize())
@@ -77,12 +260,7 @@ class FoodDatabaseBuilder:
 
         # Load OFF data (from chunks or single file)
         off_data = []
-        if self.off_chunks_dir.exists() and any(self.off_chunks_dir.glob("*.csv")):
-            print(f"  📊 Loading OFF chunks from {self.off_chunks_dir}")
-            adapter = OFFAdapter(str(self.off_chunks_dir))
-        else:
-            print("  📊 Loading OFF from single file")
-            adapter = OFFAdapter()
+        adapter = self._off_adapter()
 
         try:
             off_data = list(adapter.normalize())
@@ -92,6 +270,51 @@ class FoodDatabaseBuilder:
 
         return usda_data, off_data
 
+    def _usda_adapter(self) -> USDAAdapter:
+        """USDA adapter over the chunk directory, or the single sample file."""
+        if self.usda_chunks_dir.exists() and any(self.usda_chunks_dir.glob("*.csv")):
+            print(f"  📊 Loading USDA chunks from {self.usda_chunks_dir}")
+            return USDAAdapter(str(self.usda_chunks_dir))
+        print("  📊 Loading USDA from single file")
+        return USDAAdapter()
+
+    def _off_adapter(self) -> OFFAdapter:
+        """OFF adapter over the chunk directory, or the single sample file."""
+        if self.off_chunks_dir.exists() and any(self.off_chunks_dir.glob("*.csv")):
+            print(f"  📊 Loading OFF chunks from {self.off_chunks_dir}")
+            return OFFAdapter(str(self.off_chunks_dir))
+        print("  📊 Loading OFF from single file")
+        return OFFAdapter()
+
+    def _chunk_tasks(self) -> List[Tuple[str, str]]:
+        """(source, chunk file) pairs in build order: USDA, then OFF."""
+        return [
+            ("USDA", path) for path in chunk_files(self._usda_adapter().csv_path)
+        ] + [("OFF", path) for path in chunk_files(self._off_adapter().csv_path)]
+
+    def stage_source_data(self, staging: FoodStaging) -> Dict[str, int]:
+        """
+        RU: Потоково записать данные источников во временную таблицу.
+        EN: Stream source data into the staging table.
+
+        Returns:
+            Records staged per source ("USDA", "OFF")
+        """
+        print("🔄 Staging source data...")
+        counts = {}
+        sources: Dict[str, BaseAdapter] = {
+            "USDA": self._usda_adapter(),
+            "OFF": self._off_adapter(),
+        }
+        for label, adapter in sources.items():
+            counts[label] = 0
+            try:
+                counts[label] = staging.add(adapter.normalize())
+                print(f"  ✅ {label}: {counts[label]} records")
+            except Exception as e:
+                print(f"  ❌ {label} error: {e}")
+        return counts
+
     def merge_and_validate(
         self, usda_data: List[Dict], off_data: List[Dict]
     ) -> List[FoodItem]:
@@ -102,49 +325,22 @@ class FoodDatabaseBuilder:
         print("🔄 Merging and validating data...")
 
         # Merge records (pass objects directly)
-        merged_records = merge_records([usda_data, off_data])
+        merged_records = merge_records([usda_data, off_data], self.merge_backend)
         print(f"  📊 Merged: {len(merged_records)} unique foods")
+        return self._validate_records(merged_records)
 
+    def _validate_records(self, merged_records: List[Dict]) -> List[FoodItem]:
+        """
+        RU: Валидировать объединенные записи через Pydantic.
+        EN: Validate merged records through Pydantic.
+        """
         # Validate and convert to FoodItem
         validated_foods = []
         validation_errors = []
 
         for i, record in enumerate(merged_records):
             try:
-                # Generate deterministic ID
-                canonical_name = record.get("name", f"unknown_{i}")
-                food_id = self._generate_food_id(canonical_name, record)
-
-                # Create FoodItem with full provenance
-                food_item = FoodItem(
-                    id=food_id,
-                    canonical_name=canonical_name,
-                    group=record.get("group", "unknown"),
-                    per_g=record.get("per_g", 100.0),
-                    kcal=record.get("kcal", 0.0),
-                    protein_g=record.get("protein_g", 0.0),
-                    fat_g=record.get("fat_g", 0.0),
-                    carbs_g=record.get("carbs_g", 0.0),
-                    fiber_g=record.get("fiber_g", 0.0),
-                    Fe_mg=record.get("Fe_mg", 0.0),
-                    Ca_mg=record.get("Ca_mg", 0.0),
-                    K_mg=record.get("K_mg", 0.0),
-                    Mg_mg=record.get("Mg_mg", 0.0),
-                    VitD_IU=record.get("VitD_IU", 0.0),
-                    B12_ug=record.get("B12_ug", 0.0),
-                    Folate_ug=record.get("Folate_ug", 0.0),
-                    Iodine_ug=record.get("Iodine_ug", 0.0),
-                    flags=record.get("flags", []),
-                    brand=record.get("brand"),
-                    gtin=record.get("gtin"),
-                    fdc_id=record.get("fdc_id"),
-                    source=record.get("source", "unknown"),
-                    source_priority=record.get("source_priority", 0),
-                    version_date=record.get("version_date", datetime.now().isoformat()),
-                    price_per_100g=record.get("price_per_100g", 0.0),
-                )
-                validated_foods.append(food_item)
-
+                validated_foods.append(self._to_food_item(record, i))
             except ValidationError as e:
                 validation_errors.append(
                     {"index": i, "record": record, "error": str(e)}
@@ -158,6 +354,47 @@ class FoodDatabaseBuilder:
         print(f"  ✅ Validated: {len(validated_foods)} foods")
         return validated_foods
 
+    def _to_food_item(self, record: Dict, index: int) -> FoodItem:
+        """
+        RU: Провалидировать объединенную запись как FoodItem.
+        EN: Validate a merged record as a FoodItem.
+
+        Raises:
+            ValidationError: If the record does not fit the schema
+        """
+        # Generate deterministic ID
+        canonical_name = record.get("name", f"unknown_{index}")
+        food_id = self._generate_food_id(canonical_name, record)
+
+        # Create FoodItem with full provenance
+        return FoodItem(
+            id=food_id,
+            canonical_name=canonical_name,
+            group=record.get("group", "unknown"),
+            per_g=record.get("per_g", 100.0),
+            kcal=record.get("kcal", 0.0),
+            protein_g=record.get("protein_g", 0.0),
+            fat_g=record.get("fat_g", 0.0),
+            carbs_g=record.get("carbs_g", 0.0),
+            fiber_g=record.get("fiber_g", 0.0),
+            Fe_mg=record.get("Fe_mg", 0.0),
+            Ca_mg=record.get("Ca_mg", 0.0),
+            K_mg=record.get("K_mg", 0.0),
+            Mg_mg=record.get("Mg_mg", 0.0),
+            VitD_IU=record.get("VitD_IU", 0.0),
+            B12_ug=record.get("B12_ug", 0.0),
+            Folate_ug=record.get("Folate_ug", 0.0),
+            Iodine_ug=record.get("Iodine_ug", 0.0),
+            flags=record.get("flags", []),
+            brand=record.get("brand"),
+            gtin=record.get("gtin"),
+            fdc_id=record.get("fdc_id"),
+            source=record.get("source", "unknown"),
+            source_priority=record.get("source_priority", 0),
+            version_date=record.get("version_date", datetime.now().isoformat()),
+            price_per_100g=record.get("price_per_100g", 0.0),
+        )
+
     def _generate_food_id(self, canonical_name: str, record: Dict) -> str:
         """
         RU: Генерировать детерминированный ID продукта.
@@ -177,89 +414,67 @@ class FoodDatabaseBuilder:
         """
         print("🔄 Saving to Parquet...")
 
-        # Convert to DataFrame
+        df = self._parquet_frame(foods)
+        parquet_tmp = self.food_parquet.with_suffix(".parquet.tmp")
+        df.to_parquet(parquet_tmp, index=False)
+        os.replace(parquet_tmp, self.food_parquet)
+
+        print(f"  ✅ Parquet saved: {self.food_parquet}")
+        print(f"  📊 Records: {len(df)}")
+
+    @staticmethod
+    def _parquet_frame(foods: Iterable[FoodItem]) -> pd.DataFrame:
+        """Foods as a DataFrame, with flags as JSON strings for Parquet."""
         data = []
         for food in foods:
             row = food.dict()
             # Convert lists to JSON strings for Parquet compatibility
             row["flags"] = json.dumps(row["flags"])
             data.append(row)
-
-        df = pd.DataFrame(data)
-        df.to_parquet(self.food_parquet, index=False)
-
-        print(f"  ✅ Parquet saved: {self.food_parquet}")
-        print(f"  📊 Records: {len(df)}")
+        return pd.DataFrame(data)
 
     def save_sqlite(self, foods: List[FoodItem]) -> None:
         """
         RU: Сохранить в SQLite с FTS для поиска.
         EN: Save to SQLite with FTS for search.
+
+        The database is built in a temporary file and swapped in with
+        os.replace: readers open food.sqlite immutable, so the live file is
+        never written in place.
         """
         print("🔄 Saving to SQLite with FTS...")
 
-        # Remove existing database
-        if self.food_sqlite.exists():
-            self.food_sqlite.unlink()
+        sqlite_tmp = self.food_sqlite.with_suffix(".sqlite.tmp")
+        if sqlite_tmp.exists():
+            sqlite_tmp.unlink()
 
-        conn = sqlite3.connect(self.food_sqlite)
-        cursor = conn.cursor()
+        conn = self._create_sqlite(sqlite_tmp)
+        self._insert_sqlite(conn, foods)
+        self._finish_sqlite(conn)
+        conn.close()
+        os.replace(sqlite_tmp, self.food_sqlite)
 
-        # Create main table
-        cursor.execute(
-            """
-            CREATE TABLE foods (
-                id TEXT PRIMARY KEY,
-                canonical_name TEXT NOT NULL,
-                group_name TEXT,
-                per_g REAL,
-                kcal REAL,
-                protein_g REAL,
-                fat_g REAL,
-                carbs_g REAL,
-                fiber_g REAL,
-                Fe_mg REAL,
-                Ca_mg REAL,
-                K_mg REAL,
-                Mg_mg REAL,
-                VitD_IU REAL,
-                B12_ug REAL,
-                Folate_ug REAL,
-                Iodine_ug REAL,
-                flags TEXT,
-                brand TEXT,
-                gtin TEXT,
-                fdc_id TEXT,
-                source TEXT,
-                source_priority INTEGER,
-                version_date TEXT,
-                price_per_100g REAL
-            )
-        """
-        )
+        print(f"  ✅ SQLite saved: {self.food_sqlite}")
+        print("  🔍 FTS enabled for search")
+
+    @staticmethod
+    def _create_sqlite(path: Path) -> sqlite3.Connection:
+        """Create the foods table and its FTS index in a new database."""
+        conn = sqlite3.connect(path)
+        conn.execute(_FOODS_TABLE)
+        conn.execute(_FOODS_FTS_TABLE)
+        return conn
 
-        # Create FTS table for search
-        cursor.execute(
+    @staticmethod
+    def _insert_sqlite(conn: sqlite3.Connection, foods: Iterable[FoodItem]) -> None:
+        """Insert foods into the foods table in one batch."""
+        conn.executemany(
             """
-            CREATE VIRTUAL TABLE foods_fts USING fts5(
-                canonical_name,
-                group_name,
-                brand,
-                flags,
-                content='foods',
-                content_rowid='rowid'
+            INSERT INTO foods VALUES (
+                ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
             )
-        """
-        )
-
-        # Insert data
-        for food in foods:
-            cursor.execute(
-                """
-                INSERT INTO foods VALUES (
-                    ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
-                )
             """,
+            [
                 (
                     food.id,
                     food.canonical_name,
@@ -286,8 +501,57 @@ class FoodDatabaseBuilder:
                     food.source_priority,
                     food.version_date,
                     food.price_per_100g,
-                ),
-            )
+                )
+                for food in foods
+            ],
+        )
+
+    @classmethod
+    def _upsert_sqlite(
+        cls, conn: sqlite3.Connection, names: Set[str], foods: List[FoodItem]
+    ) -> None:
+        """
+        RU: Заменить строки продуктов с указанными именами и их записи FTS.
+        EN: Replace the rows of the given foods and their FTS entries.
+
+        Rows for names without a valid merged food are only removed.
+        """
+        conn.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS upsert_names(name TEXT PRIMARY KEY)"
+        )
+        conn.execute("DELETE FROM temp.upsert_names")
+        conn.executemany(
+            "INSERT INTO temp.upsert_names(name) VALUES (?)", ((n,) for n in names)
+        )
+        selected = "canonical_name IN (SELECT name FROM temp.upsert_names)"
+        # foods_fts is an external-content index: old entries are deleted by
+        # replaying their indexed values
+        conn.execute(
+            "INSERT INTO foods_fts(foods_fts, rowid, canonical_name, group_name, "
+            "brand, flags) SELECT 'delete', rowid, canonical_name, group_name, "
+            f"brand, flags FROM foods WHERE {selected}"
+        )
+        conn.execute(f"DELETE FROM foods WHERE {selected}")
+        cls._insert_sqlite(conn, foods)
+        conn.execute(
+            "INSERT INTO foods_fts(rowid, canonical_name, group_name, brand, flags) "
+            f"SELECT rowid, canonical_name, group_name, brand, flags FROM foods "
+            f"WHERE {selected}"
+        )
+
+    def _export_parquet(self, conn: sqlite3.Connection) -> None:
+        """Rewrite Parquet from the foods table, replacing it atomically."""
+        df = pd.read_sql_query("SELECT * FROM foods ORDER BY rowid", conn)
+        df = df.rename(columns={"group_name": "group"})
+        parquet_tmp = self.food_parquet.with_suffix(".parquet.tmp")
+        df.to_parquet(parquet_tmp, index=False)
+        os.replace(parquet_tmp, self.food_parquet)
+        print(f"  ✅ Parquet saved: {self.food_parquet}")
+
+    @staticmethod
+    def _finish_sqlite(conn: sqlite3.Connection) -> None:
+        """Populate FTS, create indexes and commit."""
+        cursor = conn.cursor()
 
         # Populate FTS
         cursor.execute("INSERT INTO foods_fts(foods_fts) VALUES('rebuild')")
@@ -298,54 +562,47 @@ class FoodDatabaseBuilder:
         cursor.execute("CREATE INDEX idx_foods_flags ON foods(flags)")
 
         conn.commit()
-        conn.close()
-
-        print(f"  ✅ SQLite saved: {self.food_sqlite}")
-        print("  🔍 FTS enabled for search")
 
     def generate_report(
-        self, foods: List[FoodItem], usda_count: int, off_count: int
+        self,
+        foods: List[FoodItem],
+        usda_count: int,
+        off_count: int,
+        timings: Optional[Dict] = None,
     ) -> None:
         """
         RU: Сгенерировать отчет о сборке.
         EN: Generate build report.
         """
-        print("🔄 Generating build report...")
+        stats = BuildStats()
+        for food in foods:
+            stats.add(food)
+        self.write_report(stats, usda_count, off_count, timings)
 
-        # Calculate statistics
-        total_foods = len(foods)
-        sources = {}
-        groups = {}
-        micronutrient_coverage = {}
+    def write_report(
+        self,
+        stats: BuildStats,
+        usda_count: int,
+        off_count: int,
+        timings: Optional[Dict] = None,
+    ) -> None:
+        """
+        RU: Записать отчет о сборке по накопленной статистике.
+        EN: Write the build report from accumulated statistics.
 
-        for food in foods:
-            # Source distribution
-            sources[food.source] = sources.get(food.source, 0) + 1
-
-            # Group distribution
-            groups[food.group] = groups.get(food.group, 0) + 1
-
-            # Micronutrient coverage
-            micronutrient_fields = [
-                "Fe_mg",
-                "Ca_mg",
-                "K_mg",
-                "Mg_mg",
-                "VitD_IU",
-                "B12_ug",
-                "Folate_ug",
-                "Iodine_ug",
-            ]
-            for field in micronutrient_fields:
-                if getattr(food, field) > 0:
-                    micronutrient_coverage[field] = (
-                        micronutrient_coverage.get(field, 0) + 1
-                    )
+        Args:
+            timings: Optional per-phase timings, stored under "timings"
+        """
+        print("🔄 Generating build report...")
+
+        total_foods = stats.total_foods
+        sources = stats.sources
+        groups = stats.groups
 
         # Calculate coverage percentages
         micronutrient_percentages = {
             field: (count / total_foods * 100) if total_foods > 0 else 0
-            for field, count in micronutrient_coverage.items()
+            for field, count in stats.micronutrient_coverage.items()
         }
 
         report = {
@@ -366,6 +623,8 @@ class FoodDatabaseBuilder:
                 "report": str(self.build_report),
             },
         }
+        if timings is not None:
+            report["timings"] = timings
 
         with open(self.build_report, "w", encoding="utf-8") as f:
             json.dump(report, f, indent=2, ensure_ascii=False)
@@ -388,23 +647,100 @@ class FoodDatabaseBuilder:
         """
         print("🚀 Starting food database build...")
 
+        timer = _PhaseTimer()
         try:
             # Load source data
-            usda_data, off_data = self.load_source_data()
+            with timer("load_s"):
+                usda_data, off_data = self.load_source_data()
 
             # Merge and validate
-            foods = self.merge_and_validate(usda_data, off_data)
+            with timer("merge_s"):
+                foods = self.merge_and_validate(usda_data, off_data)
 
             if not foods:
                 print("❌ No valid foods found!")
                 return
 
             # Save outputs
-            self.save_parquet(foods)
-            self.save_sqlite(foods)
+            with timer("write_s"):
+                self.save_parquet(foods)
+                self.save_sqlite(foods)
 
             # Generate report
-            self.generate_report(foods, len(usda_data), len(off_data))
+            self.generate_report(
+                foods,
+                len(usda_data),
+                len(off_data),
+                timer.report(workers=1, merge_backend=self.merge_backend),
+            )
+
+            print("✅ Build completed successfully!")
+
+        except Exception as e:
+            print(f"❌ Build failed: {e}")
+            raise
+
+    def build_parallel(self, workers: Optional[int] = None) -> None:
+        """
+        RU: Сборка с параллельной нормализацией чанков по процессам.
+        EN: Build with chunk normalisation spread over worker processes.
+
+        Every USDA/OFF chunk file is normalised and pre-aggregated by name in
+        a process pool (core.food_ingest), then the partials are reduced in
+        chunk order and merged. Output matches the sequential build.
+
+        Args:
+            workers: Worker processes (default: FOOD_BUILD_WORKERS or CPUs)
+        """
+        print("🚀 Starting parallel food database build...")
+
+        timer = _PhaseTimer()
+        try:
+            tasks = self._chunk_tasks()
+
+            print(f"🔄 Normalising {len(tasks)} chunks...")
+            with timer("load_s"):
+                ingest = ingest_chunks(tasks, workers)
+            print(f"  👷 Workers: {ingest.workers}")
+            for chunk in ingest.chunks:
+                if chunk.error is not None:
+                    print(f"  ❌ {chunk.source} error in {chunk.path}: {chunk.error}")
+            for label, count in ingest.counts.items():
+                print(f"  ✅ {label}: {count} records")
+
+            print("🔄 Merging and validating data...")
+            with timer("merge_s"):
+                merged_records = merge_partials(ingest.groups, self.merge_backend)
+                print(f"  📊 Merged: {len(merged_records)} unique foods")
+                foods = self._validate_records(merged_records)
+
+            if not foods:
+                print("❌ No valid foods found!")
+                return
+
+            with timer("write_s"):
+                self.save_parquet(foods)
+                self.save_sqlite(foods)
+
+            timings = timer.report(
+                workers=ingest.workers, merge_backend=self.merge_backend
+            )
+            timings["chunks"] = [
+                {
+                    "source": chunk.source,
+                    "file": os.path.basename(chunk.path),
+                    "records": chunk.records,
+                    "seconds": round(chunk.seconds, 3),
+                    **({"error": chunk.error} if chunk.error else {}),
+                }
+                for chunk in ingest.chunks
+            ]
+            self.generate_report(
+                foods,
+                ingest.counts.get("USDA", 0),
+                ingest.counts.get("OFF", 0),
+                timings,
+            )
 
             print("✅ Build completed successfully!")
 
@@ -412,11 +748,301 @@ class FoodDatabaseBuilder:
             print(f"❌ Build failed: {e}")
             raise
 
+    def build_incremental(self, workers: Optional[int] = None) -> None:
+        """
+        RU: Инкрементальная сборка: обрабатываются только измененные чанки.
+        EN: Incremental build that only reprocesses changed source chunks.
+
+        A build manifest (core.food_build_manifest) keeps per-chunk content
+        hashes and per-name chunk contributions. Changed chunks are
+        re-normalised (over ``workers`` processes), only the names they
+        touch are re-merged, and those rows and their FTS entries are
+        replaced in a copy of food.sqlite, in the same transaction as the
+        manifest update. The copy is then swapped in with os.replace:
+        readers open food.sqlite immutable, so it is never written in place.
+        Parquet is re-exported from SQLite when rows changed. Without a
+        manifest matching food.sqlite (first run, after a full build, or
+        after a crash between the commit and the swap) everything is built
+        fresh.
+
+        A chunk that fails to normalise aborts the build and leaves the
+        previous outputs in place.
+
+        Args:
+            workers: Worker processes for changed chunks (default: CPUs)
+        """
+        print("🚀 Starting incremental food database build...")
+
+        timer = _PhaseTimer()
+        tasks = self._chunk_tasks()
+        sqlite_tmp = self.food_sqlite.with_suffix(".sqlite.tmp")
+        conn, manifest, fresh = self._open_incremental(sqlite_tmp)
+        try:
+            with timer("scan_s"):
+                plan = manifest.plan(tasks)
+            print(
+                f"  📊 Chunks: {len(plan.changed)} changed, "
+                f"{len(plan.unchanged)} unchanged, {len(plan.removed)} removed"
+            )
+
+            changed = [(state.source, state.path) for state in plan.changed]
+            affected: Set[str] = set()
+            if plan and not fresh:
+                # Keep stat refreshes from plan(), then switch to a copy
+                conn.commit()
+                conn.close()
+                shutil.copyfile(self.food_sqlite, sqlite_tmp)
+                conn, manifest = self._attach_manifest(sqlite_tmp)
+            if plan:
+                print(f"🔄 Normalising {len(changed)} changed chunks...")
+                with timer("load_s"):
+                    results = map_chunks(changed, workers)
+                    for state, result in zip(plan.changed, results):
+                        if result.error is not None:
+                            raise RuntimeError(
+                                f"{result.source} chunk {result.path}: {result.error}"
+                            )
+                        affected |= manifest.replace_chunk(state, result)
+                    for key in plan.removed:
+                        affected |= manifest.remove_chunk(key)
+                    manifest.set_order(tasks)
+
+                print(f"🔄 Merging {len(affected)} affected foods...")
+                with timer("merge_s"):
+                    groups = manifest.partials(affected)
+                    foods = self._validate_records(
+                        merge_partials(groups, self.merge_backend)
+                    )
+
+                if fresh and not foods:
+                    print("❌ No valid foods found!")
+                    return
+
+                with timer("write_s"):
+                    if fresh:
+                        self._insert_sqlite(conn, foods)
+                    else:
+                        self._upsert_sqlite(conn, affected, foods)
+                    manifest.commit_generation()
+                    if fresh:
+                        self._finish_sqlite(conn)
+            # Also keeps stat refreshes from plan() when nothing changed
+            conn.commit()
+            if fresh or plan:
+                conn.close()
+                os.replace(sqlite_tmp, self.food_sqlite)
+                conn, manifest = self._attach_manifest(self.food_sqlite)
+
+            # Parquet older than SQLite: an earlier export did not finish
+            parquet_stale = not self.food_parquet.exists() or (
+                self.food_parquet.stat().st_mtime_ns
+                < self.food_sqlite.stat().st_mtime_ns
+            )
+            if fresh or plan or parquet_stale:
+                with timer("parquet_s"):
+                    self._export_parquet(conn)
+
+            stats = BuildStats.from_sqlite(conn)
+            counts = manifest.record_counts()
+            conn.close()
+            print(f"  ✅ SQLite: {self.food_sqlite}")
+
+            timings = timer.report(
+                workers=worker_count(changed, workers) if changed else 0,
+                merge_backend=self.merge_backend,
+                mode="fresh" if fresh else ("incremental" if plan else "unchanged"),
+                changed_chunks=len(plan.changed),
+                removed_chunks=len(plan.removed),
+                affected_foods=len(affected),
+            )
+            self.write_report(
+                stats, counts.get("USDA", 0), counts.get("OFF", 0), timings
+            )
+
+            print("✅ Build completed successfully!")
+
+        except Exception as e:
+            print(f"❌ Build failed: {e}")
+            raise
+
+        finally:
+            # Uncommitted manifest and food changes roll back on close
+            conn.close()
+            if sqlite_tmp.exists():
+                sqlite_tmp.unlink()
+
+    def _open_incremental(
+        self, sqlite_tmp: Path
+    ) -> Tuple[sqlite3.Connection, BuildManifest, bool]:
+        """
+        RU: Открыть food.sqlite с манифестом или начать с чистого листа.
+        EN: Open food.sqlite with its manifest, or start a fresh pair.
+
+        Returns:
+            (connection with the manifest attached, manifest, fresh) where a
+            fresh build writes to ``sqlite_tmp`` and an incremental one
+            plans against food.sqlite, which it does not write
+        """
+        if self.food_sqlite.exists() and self.build_manifest.exists():
+            conn, manifest = self._attach_manifest(self.food_sqlite)
+            if manifest.matches():
+                return conn, manifest, False
+            conn.close()
+            print("  ⚠️  Build manifest does not match food.sqlite, building fresh")
+
+        for path in (self.build_manifest, sqlite_tmp):
+            if path.exists():
+                path.unlink()
+        conn = self._create_sqlite(sqlite_tmp)
+        conn.execute("ATTACH DATABASE ? AS manifest", (str(self.build_manifest),))
+        return conn, BuildManifest(conn, self.project_root), True
+
+    def _attach_manifest(self, path: Path) -> Tuple[sqlite3.Connection, BuildManifest]:
+        """Open a food database with the build manifest attached."""
+        conn = sqlite3.connect(path)
+        conn.execute("ATTACH DATABASE ? AS manifest", (str(self.build_manifest),))
+        return conn, BuildManifest(conn, self.project_root)
+
+    def build_streaming(self, batch_size: Optional[int] = None) -> None:
+        """
+        RU: Потоковая сборка с ограниченным потреблением памяти.
+        EN: Streaming build with bounded memory use.
+
+        Adapters stream into an on-disk staging table, which hands records
+        back grouped by canonical name. Each group is merged and validated on
+        its own and the results are written to SQLite and Parquet in batches,
+        so peak memory depends on the batch and largest group size, not on
+        the input size. Outputs are written to temporary files and swapped in
+        once the build succeeds.
+        """
+        print("🚀 Starting streaming food database build...")
+        batch_size = batch_size or STREAM_BATCH_SIZE
+
+        sqlite_tmp = self.food_sqlite.with_suffix(".sqlite.tmp")
+        parquet_tmp = self.food_parquet.with_suffix(".parquet.tmp")
+        for path in (sqlite_tmp, parquet_tmp):
+            if path.exists():
+                path.unlink()
+
+        stats = BuildStats()
+        validation_errors = 0
+        conn = None
+        parquet = ParquetBatchWriter(parquet_tmp)
+        try:
+            with FoodStaging(self.data_dir / "food_staging.sqlite") as staging:
+                counts = self.stage_source_data(staging)
+
+                print("🔄 Merging, validating and writing by group...")
+                conn = self._create_sqlite(sqlite_tmp)
+                batch: List[FoodItem] = []
+                for i, record in enumerate(merge_grouped(staging.groups())):
+                    try:
+                        batch.append(self._to_food_item(record, i))
+                    except ValidationError as e:
+                        validation_errors += 1
+                        if validation_errors <= 3:  # Show first 3
+                            print(f"    - {e}")
+                        continue
+                    if len(batch) >= batch_size:
+                        self._write_batch(conn, parquet, batch, stats)
+                        batch = []
+                if batch:
+                    self._write_batch(conn, parquet, batch, stats)
+
+            if validation_errors:
+                print(f"  ⚠️  Validation errors: {validation_errors}")
+            print(f"  ✅ Validated: {stats.total_foods} foods")
+
+            if not stats.total_foods:
+                print("❌ No valid foods found!")
+                return
+
+            self._finish_sqlite(conn)
+            conn.close()
+            conn = None
+            parquet.close()
+            os.replace(sqlite_tmp, self.food_sqlite)
+            os.replace(parquet_tmp, self.food_parquet)
+            print(f"  ✅ SQLite saved: {self.food_sqlite}")
+            print(f"  ✅ Parquet saved: {self.food_parquet}")
+
+            self.write_report(stats, counts["USDA"], counts["OFF"])
+
+            print("✅ Build completed successfully!")
+
+        except Exception as e:
+            print(f"❌ Build failed: {e}")
+            raise
+
+        finally:
+            if conn is not None:
+                conn.close()
+            parquet.close()
+            for path in (sqlite_tmp, parquet_tmp):
+                if path.exists():
+                    path.unlink()
+
+    def _write_batch(
+        self,
+        conn: sqlite3.Connection,
+        parquet: ParquetBatchWriter,
+        foods: List[FoodItem],
+        stats: BuildStats,
+    ) -> None:
+        """Append one batch of validated foods to both outputs."""
+        self._insert_sqlite(conn, foods)
+        parquet.write(self._parquet_frame(foods))
+        for food in foods:
+            stats.add(food)
+
 
 def main():
     """Main entry point."""
-    builder = FoodDatabaseBuilder()
-    builder.build()
+    parser = argparse.ArgumentParser(description="Build data/food.{sqlite,parquet}")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream through an on-disk staging table with bounded memory",
+    )
+    mode.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only reprocess source chunks changed since the last build",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="?",
+        const=INGEST_WORKERS,
+        default=None,
+        help="Normalise source chunks in N worker processes (default: CPUs)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=STREAM_BATCH_SIZE,
+        help="Foods written per batch in streaming mode",
+    )
+    parser.add_argument(
+        "--merge-backend",
+        choices=MERGE_BACKENDS,
+        default=MERGE_BACKEND,
+        help="Merge engine for the in-memory and parallel builds",
+    )
+    args = parser.parse_args()
+    if args.stream and args.workers is not None:
+        parser.error("--workers is not supported with --stream")
+
+    builder = FoodDatabaseBuilder(merge_backend=args.merge_backend)
+    if args.stream:
+        builder.build_streaming(batch_size=args.batch_size)
+    elif args.incremental:
+        builder.build_incremental(workers=args.workers)
+    elif args.workers is not None:
+        builder.build_parallel(workers=args.workers)
+    else:
+        builder.build()
 
 
 if __name__ == "__main__":
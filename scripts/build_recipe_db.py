@@ -4,66 +4,46 @@ RU: Сборка RecipeDB из CSV → recipes.sqlite/parquet с расчёто
 EN: Build RecipeDB from CSV → recipes.sqlite/parquet with per-serving compute.
 """
 import json
+import os
 import sqlite3
+import sys
 from datetime import date
 from pathlib import Path
 
 import pandas as pd
 
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core import sqlite_pool
+from core.food_bulk import NUTRIENT_KEYS, fetch_foods, sum_cost, sum_nutrients
+
 FOOD_DB = Path("data/food.sqlite")
 SRC_CSV = Path("data/recipes_new.csv")  # твой файл
 OUT_PARQUET = Path("data/recipes.parquet")
 OUT_SQLITE = Path("data/recipes.sqlite")
 
-KEYS = [
-    "kcal",
-    "protein_g",
-    "fat_g",
-    "carbs_g",
-    "Fe_mg",
-    "Ca_mg",
-    "K_mg",
-    "Mg_mg",
-    "VitD_IU",
-    "B12_ug",
-    "Folate_ug",
-    "Iodine_ug",
-]
+KEYS = NUTRIENT_KEYS
 
 
 def _connect_food():
-    con = sqlite3.connect(FOOD_DB)
-    con.row_factory = sqlite3.Row
-    return con
+    return sqlite_pool.reader(FOOD_DB, immutable=True)
 
 
-def _get_food(food_id: str) -> dict | None:
+def _get_foods(food_ids: list[str]) -> dict[str, dict]:
     with _connect_food() as con:
-        row = con.execute("SELECT * FROM foods WHERE id = ?", (food_id,)).fetchone()
-    return dict(row) if row else None
+        return fetch_foods(con, food_ids)
 
 
-def _sum_nutrients(ingredients: list[dict]) -> dict:
-    total = {k: 0.0 for k in KEYS}
-    for ing in ingredients:
-        food = _get_food(ing["food_id"])
-        if not food:
-            continue
-        ratio = float(ing["grams"]) / float(food.get("per_g", 100.0))
-        for k in KEYS:
-            total[k] += float(food.get(k, 0.0)) * ratio
-    return total
+def _sum_nutrients(ingredients: list[dict], foods: dict | None = None) -> dict:
+    if foods is None:
+        foods = _get_foods([i["food_id"] for i in ingredients])
+    return sum_nutrients(ingredients, foods)
 
 
-def _sum_cost(ingredients: list[dict]) -> float:
-    cost = 0.0
-    for ing in ingredients:
-        food = _get_food(ing["food_id"])
-        if not food:
-            continue
-        price100 = float(food.get("price_per_100g", 0.0))
-        cost += price100 * (float(ing["grams"]) / 100.0)
-    return cost
+def _sum_cost(ingredients: list[dict], foods: dict | None = None) -> float:
+    if foods is None:
+        foods = _get_foods([i["food_id"] for i in ingredients])
+    return sum_cost(ingredients, foods)
 
 
 def main():
@@ -85,12 +65,13 @@ def main():
                 food_id = name.lower().replace(" ", "_").replace("ё", "e")
                 ingredients.append({"food_id": food_id, "grams": float(grams)})
         total_g = float(sum(i["grams"] for i in ingredients))
-        tot = _sum_nutrients(ingredients)
+        foods = _get_foods([i["food_id"] for i in ingredients])
+        tot = _sum_nutrients(ingredients, foods)
         serv = 2  # По умолчанию 2 порции
         per_serv = (
             {k: (v / serv) for k, v in tot.items()} if serv else {k: 0.0 for k in KEYS}
         )
-        cost_total = _sum_cost(ingredients)
+        cost_total = _sum_cost(ingredients, foods)
         cost_per_serv = cost_total / serv if serv else 0.0
 
         # Парсим теги
@@ -118,16 +99,23 @@ def main():
     out_df = pd.DataFrame(out_rows)
     OUT_PARQUET.parent.mkdir(parents=True, exist_ok=True)
     out_df.to_parquet(OUT_PARQUET, index=False)
-    con = sqlite3.connect(OUT_SQLITE)
-    out_df.to_sql("recipes", con, if_exists="replace", index=False)
-    con.execute("DROP TABLE IF EXISTS recipes_fts;")
-    con.execute(
-        "CREATE VIRTUAL TABLE recipes_fts USING fts5("
-        "title, content='recipes', content_rowid='rowid');"
-    )
-    con.execute("INSERT INTO recipes_fts(rowid,title) SELECT rowid,title FROM recipes;")
-    con.commit()
-    con.close()
+    # Build next to the live file and swap it in: readers open it immutable
+    tmp_sqlite = OUT_SQLITE.with_suffix(".sqlite.tmp")
+    tmp_sqlite.unlink(missing_ok=True)
+    con = sqlite3.connect(tmp_sqlite)
+    try:
+        out_df.to_sql("recipes", con, if_exists="replace", index=False)
+        con.execute(
+            "CREATE VIRTUAL TABLE recipes_fts USING fts5("
+            "title, content='recipes', content_rowid='rowid');"
+        )
+        con.execute(
+            "INSERT INTO recipes_fts(rowid,title) SELECT rowid,title FROM recipes;"
+        )
+        con.commit()
+    finally:
+        con.close()
+    os.replace(tmp_sqlite, OUT_SQLITE)
     filled = (out_df["kcal_per_serv"] > 0).mean()
     print(f"Built {len(out_df)} recipes; kcal coverage per_serv: {filled:.0%}")
 
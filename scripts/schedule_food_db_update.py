@@ -36,10 +36,10 @@ def update_food_database():
     logger.info("Starting food database update...")
 
     try:
-        # Run the build script
+        # Run the build script; incremental, so unchanged sources are skipped
         build_script = os.path.join(project_root, "scripts", "build_food_db.py")
         result = subprocess.run(
-            [sys.executable, build_script],
+            [sys.executable, build_script, "--incremental"],
             cwd=project_root,
             capture_output=True,
             text=True,
@@ -7,5 +7,16 @@ EN: Global test configuration
 """
 import os
 
+import pytest
+
 # Set VIP_MODULE_ENABLED globally for all tests
 os.environ["VIP_MODULE_ENABLED"] = "true"
+
+
+@pytest.fixture(autouse=True)
+def _clear_week_cache():
+    """Keep cached weekly plans from leaking between tests with mocked builders."""
+    from core.week_cache import get_week_cache
+
+    get_week_cache().clear()
+    yield
@@ -7,9 +7,11 @@ EN: Alias mapping tests.
 
 import os
 import tempfile
+from unittest.mock import Mock
 
 import pytest
 
+from core import aliases
 from core.aliases import _load_aliases, map_to_canonical
 
 
@@ -70,5 +72,42 @@ def test_map_to_canonical_edge_cases():
     assert map_to_canonical("Spinach - raw") == "spinach_raw"
 
 
+@pytest.fixture
+def temp_index(tmp_path, monkeypatch):
+    """Point the process-wide alias index at a temporary CSV."""
+    path = tmp_path / "aliases.csv"
+    path.write_text("alias,canonical\nespinacas,spinach_raw\n", encoding="utf-8")
+    index = aliases._AliasIndex(str(path), loader=Mock(wraps=_load_aliases))
+    monkeypatch.setattr(aliases, "_index", index)
+    return path
+
+
+def test_alias_table_loaded_once(temp_index):
+    """Test that the alias CSV is not re-read on every call."""
+    for _ in range(100):
+        assert map_to_canonical("Espinacas") == "spinach_raw"
+    assert aliases._index.loader.call_count == 1
+
+
+def test_alias_table_reloaded_on_mtime_change(temp_index, monkeypatch):
+    """Test that editing the CSV invalidates the cached table."""
+    monkeypatch.setattr(aliases, "MTIME_CHECK_INTERVAL", 0.0)
+    assert map_to_canonical("pollo") == "pollo"
+    temp_index.write_text(
+        "alias,canonical\nespinacas,spinach_raw\npollo,chicken_breast\n",
+        encoding="utf-8",
+    )
+    assert map_to_canonical("pollo") == "chicken_breast"
+
+
+def test_add_alias_updates_index_incrementally(temp_index):
+    """Test that add_alias patches the cached table without a full reload."""
+    assert map_to_canonical("Queso Fresco") == "queso_fresco"
+    aliases.add_alias("Queso Fresco", "cottage_cheese", str(temp_index))
+    assert map_to_canonical("queso fresco") == "cottage_cheese"
+    assert aliases._index.loader.call_count == 1
+    assert "queso fresco,cottage_cheese" in temp_index.read_text(encoding="utf-8")
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
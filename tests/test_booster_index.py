@@ -0,0 +1,119 @@
+"""
+Booster Index Tests
+
+RU: Тесты рейтинга продуктов-бустеров.
+EN: Booster ranking tests.
+"""
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+from core.booster_index import BoosterIndex
+from core.food_db import booster_index, parse_food_db, pick_booster_for
+from core.food_db_new import MICRO_KEYS, FoodDB
+from core.menu_engine import FoodDBSnapshot, FoodItem, _find_booster_foods
+
+DATA = os.path.join(os.path.dirname(__file__), "..", "data")
+
+FOODS = [
+    # name, nutrients per 100 g, kcal, price, flags
+    ("liver", {"Fe_mg": 6.0}, 130.0, 2.0, ["OMNI"]),
+    ("spinach", {"Fe_mg": 2.7}, 23.0, 5.0, ["VEG"]),
+    ("lentils", {"Fe_mg": 3.3}, 116.0, 0.5, ["VEG"]),
+    ("rice", {"Fe_mg": 0.0}, 130.0, 0.3, ["VEG"]),
+]
+
+
+def _veg_only(food_flags, diet_flags):
+    return not ("VEG" in diet_flags and "OMNI" in food_flags)
+
+
+def test_rankings_by_kcal_and_cost():
+    """Test density-per-kcal and per-cost orders with diet filtering."""
+    index = BoosterIndex(FOODS, ["Fe_mg"], ["VEG"], _veg_only)
+    assert index.ranked("Fe_mg") == ("spinach", "liver", "lentils")
+    assert index.ranked("Fe_mg", by="cost") == ("lentils", "liver", "spinach")
+    assert index.top("Fe_mg", ["VEG"], k=5) == ("spinach", "lentils")
+    assert index.best("Fe_mg", ["VEG"], by="cost") == "lentils"
+    assert index.best("Ca_mg") is None
+    with pytest.raises(ValueError):
+        index.ranked("Fe_mg", by="weight")
+
+
+def test_large_vocabulary_is_indexed_lazily():
+    """Test that masks are built on demand for large flag vocabularies."""
+    vocabulary = [f"F{i}" for i in range(12)]
+    index = BoosterIndex(FOODS, ["Fe_mg"], vocabulary, lambda f, d: "F11" not in d)
+    assert index.ranked("Fe_mg", ["F3"]) == ("spinach", "liver", "lentils")
+    assert index.ranked("Fe_mg", ["F11"]) == ()
+
+
+def test_lazy_index_ranks_only_what_is_asked():
+    """Test that a lazy index matches an eager one but ranks on demand."""
+    foods = FOODS + [("milk", {"Ca_mg": 120.0}, 60.0, 1.0, ["VEG"])]
+    eager = BoosterIndex(foods, ["Fe_mg", "Ca_mg"], ["VEG"], _veg_only)
+    lazy = BoosterIndex(foods, ["Fe_mg", "Ca_mg"], ["VEG"], _veg_only, eager=False)
+    assert not lazy._orders and not lazy._ranked
+
+    assert lazy.top("Fe_mg", ["VEG"], k=5) == eager.top("Fe_mg", ["VEG"], k=5)
+    assert set(lazy._ranked) == {("Fe_mg", 1, "kcal"), ("Fe_mg", 1, "cost")}
+    for micro in ("Fe_mg", "Ca_mg"):
+        for flags in ([], ["VEG"]):
+            for by in ("kcal", "cost"):
+                assert lazy.ranked(micro, flags, by) == eager.ranked(micro, flags, by)
+    assert lazy.best("B12_ug") is None
+
+
+def test_plain_dict_gets_lazy_booster_index():
+    """Test that uncached plain dicts rank only the looked-up micro."""
+    food_db = dict(parse_food_db())
+    index = booster_index(food_db)
+    assert not index._orders
+    assert pick_booster_for("iron_mg", {"VEG"}, food_db) == pick_booster_for(
+        "iron_mg", {"VEG"}, parse_food_db()
+    )
+
+
+def test_food_db_new_boosters_match_diet_rules():
+    """Test FoodDB boosters respect _compatible for every micro."""
+    fooddb = FoodDB(os.path.join(DATA, "food_db_new.csv"))
+    for micro in MICRO_KEYS:
+        for flags in ([], ["VEG"], ["GF"], ["PESC", "GF"]):
+            donor = fooddb.pick_booster_for(micro, flags)
+            ranked = fooddb.booster_index.ranked(micro, flags)
+            assert donor == (ranked[0] if ranked else None)
+            for name in ranked:
+                assert fooddb._compatible(fooddb.items[name].flags, flags)
+                assert fooddb.items[name].micros[micro] > 0
+    assert fooddb.booster_index is fooddb.booster_index
+
+
+def test_food_db_booster_index_cached_until_mutation():
+    """Test parse_food_db caches the ranking and drops it on change."""
+    food_db = parse_food_db()
+    assert booster_index(food_db) is booster_index(food_db)
+    assert pick_booster_for("iron_mg", {"VEG"}, food_db) is not None
+    assert pick_booster_for("unknown_mg", set(), food_db) is None
+
+    first = booster_index(food_db)
+    food_db["spinach_copy"] = food_db[pick_booster_for("iron_mg", set(), food_db)]
+    assert booster_index(food_db) is not first
+
+
+def test_find_booster_foods_uses_snapshot_index():
+    """Test menu_engine boosters come pre-sorted from the cached index."""
+    food_db = FoodDBSnapshot(
+        {
+            name: FoodItem(name, dict(nutrients, kcal=kcal), price, flags, ["BY"])
+            for name, nutrients, kcal, price, flags in FOODS
+        }
+    )
+    boosters = _find_booster_foods({"Fe_mg": 5.0, "Ca_mg": 0.0}, None, food_db)
+    assert [f.name for f in boosters["Fe_mg"]] == ["spinach", "liver", "lentils"]
+    assert "Ca_mg" not in boosters
+
+    with patch("core.menu_engine.BoosterIndex") as build:
+        _find_booster_foods({"Fe_mg": 5.0}, None, food_db)
+    build.assert_not_called()
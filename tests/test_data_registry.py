@@ -0,0 +1,115 @@
+"""
+Data Registry Tests
+
+RU: Тесты реестра данных (снимки FoodDB/RecipeDB).
+EN: Data registry tests (FoodDB/RecipeDB snapshots).
+"""
+
+import asyncio
+import os
+import shutil
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from core.data_registry import DataRegistry
+
+DATA = os.path.join(os.path.dirname(__file__), "..", "data")
+
+
+@pytest.fixture
+def registry(tmp_path):
+    food = tmp_path / "food.csv"
+    recipes = tmp_path / "recipes.csv"
+    shutil.copy(os.path.join(DATA, "food_db_new.csv"), food)
+    shutil.copy(os.path.join(DATA, "recipes_new.csv"), recipes)
+    return DataRegistry(str(food), str(recipes))
+
+
+def _touch_recipes(registry: DataRegistry, extra: str) -> None:
+    with open(registry.recipe_path, "a", encoding="utf-8") as f:
+        f.write(extra)
+
+
+def test_snapshot_loaded_once(registry):
+    """Test that repeated access reuses the same snapshot."""
+    snap = registry.snapshot
+    assert registry.snapshot is snap
+    assert registry.reload(force=False) is snap
+    assert snap.generation == 1
+    assert "oats" in snap.fooddb.items
+    assert snap.recipedb.fooddb is snap.fooddb
+
+
+def test_reload_swaps_on_change(registry):
+    """Test that a changed source file produces a new snapshot version."""
+    old = registry.snapshot
+    _touch_recipes(registry, '\noats_bowl,breakfast,"oats:80",VEG\n')
+    assert registry.has_changed()
+    new = registry.reload(force=False)
+    assert new is not old
+    assert new.version != old.version
+    assert new.generation == old.generation + 1
+    assert len(new.recipedb.recipes) == len(old.recipedb.recipes) + 1
+
+
+def test_failed_reload_keeps_previous_snapshot(registry):
+    """Test that a broken file does not replace the served snapshot."""
+    old = registry.snapshot
+    _touch_recipes(registry, "\nbroken_row_without_fields\n")
+    with pytest.raises(Exception):
+        registry.reload(force=True)
+    assert registry.snapshot is old
+    assert registry.status()["last_error"]
+
+
+def test_status_fields(registry):
+    """Test status payload exposed on /api/v1/admin/db-status."""
+    assert registry.status()["loaded"] is False
+    snap = registry.snapshot
+    status = registry.status()
+    assert status["loaded"] is True
+    assert status["version"] == snap.version
+    assert status["loaded_at"] == snap.loaded_at
+    assert status["watching"] is False
+
+
+@pytest.mark.asyncio
+async def test_watcher_picks_up_changes(registry):
+    """Test that the mtime watcher swaps snapshots in the background."""
+    await registry.start(watch_interval=0.01)
+    try:
+        old = registry.snapshot
+        _touch_recipes(registry, '\noats_bowl,breakfast,"oats:80",VEG\n')
+        for _ in range(200):
+            if registry.snapshot is not old:
+                break
+            await asyncio.sleep(0.01)
+        assert registry.snapshot is not old
+        assert registry.status()["watching"] is True
+    finally:
+        await registry.stop()
+    assert registry.status()["watching"] is False
+
+
+def test_admin_endpoints_expose_registry(monkeypatch):
+    """Test /api/v1/admin/db-status and reload-data include the snapshot info."""
+    from app import app
+
+    monkeypatch.setenv("API_KEY", "test_key")
+    client = TestClient(app)
+    headers = {"X-API-Key": "test_key"}
+
+    reloaded = client.post("/api/v1/admin/reload-data", headers=headers)
+    assert reloaded.status_code == 200
+    assert reloaded.json()["loaded"] is True
+
+    scheduler = AsyncMock()
+    scheduler.get_status = MagicMock(return_value={"scheduler": {}, "databases": {}})
+    with patch("app.get_update_scheduler", AsyncMock(return_value=scheduler)):
+        status = client.get("/api/v1/admin/db-status", headers=headers)
+    assert status.status_code == 200
+    registry = status.json()["data_registry"]
+    assert registry["version"] == reloaded.json()["version"]
+    assert registry["loaded_at"]
@@ -0,0 +1,96 @@
+"""
+Diet Flag Index Tests
+
+RU: Тесты индекса совместимости рецептов с диетическими флагами.
+EN: Tests for the recipe/diet-flag compatibility index.
+"""
+
+import itertools
+import os
+import random
+
+import pytest
+
+from core.daily_plate import find_recipe_for_meal, is_compatible_with_flags
+from core.diet_index import DietFlagIndex
+from core.food_db_new import FoodDB
+from core.recipe_db import Recipe as PlateRecipe
+from core.recipe_db import RecipeCatalog, parse_recipe_db
+from core.recipe_db_new import Recipe, RecipeDB
+
+DATA = os.path.join(os.path.dirname(__file__), "..", "data")
+FLAG_SETS = [
+    list(c) for n in range(4) for c in itertools.combinations(["VEG", "PESC", "GF"], n)
+] + [["VEG", "DAIRY_FREE"]]
+
+
+@pytest.fixture
+def recipedb():
+    fooddb = FoodDB(os.path.join(DATA, "food_db_new.csv"))
+    db = RecipeDB(os.path.join(DATA, "recipes_new.csv"), fooddb)
+    # grow the catalogue to exercise the index beyond the demo CSV
+    rng = random.Random(0)
+    base = list(db.recipes)
+    for i in range(2000):
+        src = rng.choice(base)
+        tags = rng.sample(["OMNI", "VEG", "GF", "PESC"], rng.randint(0, 2))
+        db.recipes.append(Recipe(f"{src.name}_{i}", src.meal, src.ingredients, tags))
+    return db
+
+
+def _linear_pick(db, diet_flags, meal_index, rng):
+    target = ["breakfast", "lunch", "dinner", "snack"][meal_index % 4]
+    candidates = [
+        r for r in db.recipes if r.meal == target and db._compatible(r.tags, diet_flags)
+    ]
+    if not candidates:
+        candidates = [r for r in db.recipes if db._compatible(r.tags, diet_flags)]
+    return rng.choice(candidates) if candidates else None
+
+
+def test_mask_roundtrip_ignores_unknown_flags():
+    """Test bitmask encoding of diet flags."""
+    index = DietFlagIndex(["VEG", "GF"], [], lambda r, d: True)
+    assert index.mask(["GF", "VEG", "KETO"]) == 0b11
+    assert index.flags_for(index.mask(["GF"])) == {"GF"}
+    assert index.candidates(["VEG"], "lunch") == ()
+
+
+@pytest.mark.parametrize("diet_flags", FLAG_SETS)
+def test_indexed_pick_matches_linear_scan(recipedb, diet_flags):
+    """Test that indexed selection equals the old scan for the same seed."""
+    for meal_index in range(4):
+        picked = recipedb.pick_base_recipe(diet_flags, meal_index, random.Random(7))
+        expected = _linear_pick(recipedb, diet_flags, meal_index, random.Random(7))
+        assert picked is expected
+
+
+def test_index_rebuilds_when_recipes_change(recipedb):
+    """Test that appended recipes are picked up by the index."""
+    recipedb.recipes[:] = [Recipe("only_gf", "snack", {"oats": 50}, ["GF"])]
+    assert recipedb.pick_base_recipe(["GF"], 3).name == "only_gf"
+    assert recipedb.pick_base_recipe(["GF"], 0).name == "only_gf"  # slot fallback
+
+
+@pytest.mark.parametrize("diet_flags", [set(), {"VEG"}, {"GF"}, {"VEG", "GF"}])
+def test_daily_plate_catalog_matches_plain_dict(diet_flags):
+    """Test that find_recipe_for_meal gives the same answer with the index."""
+    catalog = parse_recipe_db()
+    catalog["Лосось"] = PlateRecipe("Лосось", {"salmon": 150}, {"лосось", "Глютен"})
+    plain = dict(catalog)
+    for meal in ["breakfast", "lunch", "dinner", "snack", "brunch"]:
+        assert find_recipe_for_meal(meal, 500, diet_flags, catalog) is (
+            find_recipe_for_meal(meal, 500, diet_flags, plain)
+        )
+
+
+def test_catalog_mutation_drops_index():
+    """Test that mutating the catalogue invalidates cached indexes."""
+    catalog = RecipeCatalog()
+    catalog["a"] = PlateRecipe("a", {}, {"Глютен"})
+    assert (
+        catalog.flag_index(("GF",), is_compatible_with_flags).candidates({"GF"}) == ()
+    )
+    catalog["b"] = PlateRecipe("b", {}, set())
+    index = catalog.flag_index(("GF",), is_compatible_with_flags)
+    assert index.candidates({"GF"}) == ("b",)
@@ -0,0 +1,119 @@
+"""
+Food API Bulk Fetch Tests
+
+RU: Тесты потоковой загрузки продуктов порциями.
+EN: Tests for chunked, bounded-concurrency bulk fetches from food APIs.
+"""
+
+import asyncio
+
+import pytest
+
+from core.food_apis.bulk import chunked, stream_chunks
+from core.food_apis.openfoodfacts_client import OFFClient
+from core.food_apis.usda_client import USDAClient
+
+
+class _Resp:
+    def __init__(self, data):
+        self._data = data
+
+    def raise_for_status(self):
+        return None
+
+    def json(self):
+        return self._data
+
+
+def _usda_food(fdc_id: int) -> dict:
+    return {
+        "fdcId": fdc_id,
+        "description": f"Food {fdc_id}",
+        "foodNutrients": [
+            {"nutrientId": n, "value": 1.0} for n in (1003, 1004, 1005, 1008)
+        ],
+    }
+
+
+def test_chunked_splits_lazily():
+    """Test chunk sizes and that generators are accepted."""
+    assert list(chunked(iter(range(5)), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(chunked([], 3)) == []
+    with pytest.raises(ValueError):
+        list(chunked([1], 0))
+
+
+def test_stream_chunks_bounds_concurrency_and_skips_failures():
+    """Test the in-flight limit, ordering and failed chunk handling."""
+    active, peak = [0], [0]
+
+    async def fetch(chunk):
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        # Later chunks finish first
+        await asyncio.sleep(0.01 * (10 - chunk[0] // 3))
+        active[0] -= 1
+        if chunk[0] == 3:
+            raise RuntimeError("boom")
+        return chunk
+
+    async def collect(**kwargs):
+        return [x async for x in stream_chunks(fetch, range(30), 3, **kwargs)]
+
+    ordered = asyncio.run(collect(concurrency=3, ordered=True))
+    assert ordered == [x for x in range(30) if not 3 <= x < 6]
+    assert peak[0] == 3
+
+    unordered = asyncio.run(collect(concurrency=10))
+    assert sorted(unordered) == ordered
+    assert unordered != ordered
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(collect(raise_errors=True))
+
+
+def test_usda_get_multiple_foods_handles_more_than_20_ids():
+    """Test that 45 ids become three POSTs of at most 20 ids each."""
+    client = USDAClient(api_key="X")
+    batches = []
+
+    class _AC:
+        async def aclose(self):
+            return None
+
+        async def post(self, url, json=None, **kw):
+            batches.append(json["fdcIds"])
+            await asyncio.sleep(0)
+            return _Resp([_usda_food(i) for i in json["fdcIds"]])
+
+    client.client = _AC()
+    foods = asyncio.run(client.get_multiple_foods(range(1, 46)))
+
+    assert [f.fdc_id for f in foods] == list(range(1, 46))
+    assert sorted(len(b) for b in batches) == [5, 20, 20]
+
+
+def test_off_iter_products_is_bounded_and_skips_missing():
+    """Test bounded concurrent product reads for many barcodes."""
+    client = OFFClient()
+    active, peak = [0], [0]
+
+    async def details(barcode):
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        await asyncio.sleep(0.001)
+        active[0] -= 1
+        return None if barcode.endswith("7") else barcode
+
+    client.get_product_details = details
+
+    async def run():
+        try:
+            return [p async for p in client.iter_products(map(str, range(100)), 5)]
+        finally:
+            await client.close()
+
+    products = asyncio.run(run())
+
+    assert sorted(products) == sorted(str(i) for i in range(100) if i % 10 != 7)
+    assert peak[0] == 5
@@ -0,0 +1,88 @@
+"""
+Food API Transport Tests
+
+RU: Тесты общего HTTP-клиента для API продуктов.
+EN: Tests for the shared, tuned HTTP client of the food API clients.
+"""
+
+import asyncio
+
+from core.food_apis import scheduler, transport, unified_db
+from core.food_apis.transport import (
+    HTTPSettings,
+    close_shared_http_client,
+    create_http_client,
+    get_shared_http_client,
+)
+from core.food_apis.unified_db import UnifiedFoodDatabase
+from core.food_apis.usda_client import USDAClient
+
+
+def test_settings_from_env(monkeypatch):
+    """Test that pool, timeout and HTTP/2 settings come from the environment."""
+    monkeypatch.setenv("FOOD_API_MAX_CONNECTIONS", "7")
+    monkeypatch.setenv("FOOD_API_READ_TIMEOUT", "3.5")
+    monkeypatch.setenv("FOOD_API_HTTP2", "true")
+    monkeypatch.setattr(transport, "H2_AVAILABLE", False)
+
+    settings = HTTPSettings.from_env()
+    assert settings.max_connections == 7
+    assert settings.http2 is True
+
+    client = create_http_client(settings)
+    assert client.timeout.read == 3.5
+    assert client.timeout.connect == settings.connect_timeout
+    asyncio.run(client.aclose())
+
+
+def test_unified_db_shares_one_client(tmp_path):
+    """Test that both API clients use the db's pool and only it closes it."""
+    db = UnifiedFoodDatabase(str(tmp_path))
+    assert db.usda_client.client is db.http_client
+    if db.off_client is not None:
+        assert db.off_client.client is db.http_client
+
+    shared = create_http_client()
+    usda = USDAClient(http_client=shared)
+    asyncio.run(usda.close())
+    assert not shared.is_closed
+
+    asyncio.run(db.close())
+    assert db.http_client.is_closed
+    asyncio.run(shared.aclose())
+
+
+def test_process_shares_one_client(tmp_path, monkeypatch):
+    """Test that the global food db and update manager share one pool."""
+    monkeypatch.setattr(transport, "_shared_client", None)
+    monkeypatch.setattr(
+        transport, "SHARED_HTTP_CACHE_PATH", str(tmp_path / "http_cache.sqlite")
+    )
+    monkeypatch.setattr(unified_db, "_unified_db_instance", None)
+    monkeypatch.setattr(scheduler, "_scheduler_instance", None)
+    monkeypatch.chdir(tmp_path)
+
+    async def run():
+        shared = get_shared_http_client()
+        db = await unified_db.get_unified_food_db()
+        manager = (await scheduler.get_update_scheduler()).update_manager
+        assert db.http_client is shared and manager.http_client is shared
+        assert manager.usda_client.client is shared
+
+        # Owners that did not build the client leave it open
+        await manager.close()
+        await db.close()
+        assert not shared.is_closed
+
+        await close_shared_http_client()
+        assert shared.is_closed
+
+        # After a shutdown, the next app start gets holders of a new client
+        fresh = get_shared_http_client()
+        assert fresh is not shared
+        assert (await unified_db.get_unified_food_db()).http_client is fresh
+        restarted = await scheduler.get_update_scheduler()
+        assert restarted.update_manager.http_client is fresh
+        await close_shared_http_client()
+
+    asyncio.run(run())
@@ -109,7 +109,7 @@ def test_unified_db_cache_search_get_by_id(tmp_path: Path):
     db = UnifiedFoodDatabase(str(cache_dir))
 
     # Patch USDA client methods
-    async def _search_foods(q: str, page_size: int = 5):
+    async def _search_foods(q: str, page_size: int = 5, *, raise_errors: bool = False):
         return [
             USDAFoodItem(
                 fdc_id=1,
@@ -121,7 +121,7 @@ def test_unified_db_cache_search_get_by_id(tmp_path: Path):
             )
         ]
 
-    async def _get_details(fid: int):
+    async def _get_details(fid: int, *, raise_errors: bool = False):
         return USDAFoodItem(
             fdc_id=fid,
             description="ItemX",
@@ -154,7 +154,7 @@ def test_unified_db_common_foods_cache(tmp_path: Path):
     cache_dir = tmp_path / "food_common"
     db = UnifiedFoodDatabase(str(cache_dir))
 
-    async def _search_food(q: str):
+    async def _search_food(q: str, **_):
         return [
             UnifiedFoodItem(
                 name=f"{q}-X",
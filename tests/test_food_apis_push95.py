@@ -79,7 +79,7 @@ def test_unified_db_common_cache_error_and_save_error(tmp_path: Path):
 
     db = UnifiedFoodDatabase(str(cache_dir))
 
-    async def _search_food(q):
+    async def _search_food(q, **_):
         return []
 
     loop = asyncio.new_event_loop()
@@ -195,7 +195,7 @@ def test_update_manager_more_edges(tmp_path: Path):
     loop.close()
 
 
-def test_scheduler_remaining_edges():
+def test_scheduler_remaining_edges(monkeypatch):
     import core.food_apis.scheduler as sched_mod
     from core.food_apis.scheduler import (
         DatabaseUpdateScheduler,
@@ -242,6 +242,6 @@ def test_scheduler_remaining_edges():
         async def stop(self):
             self.is_running = False
 
-    sched_mod._scheduler_instance = _Sched2()  # type: ignore[attr-defined]
+    monkeypatch.setattr(sched_mod, "_scheduler_instance", _Sched2())
     loop.run_until_complete(stop_background_updates())
     loop.close()
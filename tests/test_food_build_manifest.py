@@ -0,0 +1,97 @@
+"""
+Food Build Manifest Tests
+
+RU: Тесты манифеста инкрементальной сборки.
+EN: Incremental build manifest tests.
+"""
+
+import csv
+import os
+import sqlite3
+
+from core.food_build_manifest import BuildManifest
+from core.food_ingest import chunk_files, normalize_chunk
+from core.food_merge import merge_records
+from core.food_sources.off import OFFAdapter
+
+OFF_FIELDS = ["product_name", "energy-kcal_100g", "proteins_100g", "iron_100g", "vegan"]
+
+
+def _write_chunk(path, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(OFF_FIELDS)
+        writer.writerows(rows)
+
+
+def _manifest(tmp_path):
+    conn = sqlite3.connect(":memory:")
+    conn.execute("ATTACH DATABASE ':memory:' AS manifest")
+    return BuildManifest(conn, tmp_path)
+
+
+def _sync(manifest, tasks):
+    """Apply a plan like build_incremental; return the affected names."""
+    plan = manifest.plan(tasks)
+    affected = set()
+    for state in plan.changed:
+        affected |= manifest.replace_chunk(
+            state, normalize_chunk((state.source, state.path))
+        )
+    for key in plan.removed:
+        affected |= manifest.remove_chunk(key)
+    manifest.set_order(tasks)
+    return plan, affected
+
+
+def test_manifest_tracks_changed_and_removed_chunks(tmp_path):
+    off = tmp_path / "off"
+    off.mkdir()
+    _write_chunk(
+        off / "chunk_0.csv",
+        [["apple", 52, 0.3, 0.1, "yes"], ["oats", 389, 17, 4.7, ""]],
+    )
+    _write_chunk(
+        off / "chunk_1.csv", [["apple", 48, 0.2, 0.2, ""], ["milk", 60, 3.2, 0, ""]]
+    )
+    _write_chunk(off / "chunk_2.csv", [["lentils", 116, 9, 3.3, "yes"]])
+    tasks = [("OFF", p) for p in chunk_files(str(off))]
+    manifest = _manifest(tmp_path)
+
+    plan, affected = _sync(manifest, tasks)
+    assert len(plan.changed) == 3 and affected == {"apple", "oats", "milk", "lentils"}
+    assert not manifest.plan(tasks)
+
+    # Touching a file without changing it does not count as a change
+    os.utime(off / "chunk_0.csv", ns=(1, 1))
+    assert not manifest.plan(tasks)
+
+    _write_chunk(
+        off / "chunk_1.csv", [["milk", 64, 3.4, 0, ""], ["rice", 130, 2.7, 0.2, ""]]
+    )
+    os.remove(off / "chunk_2.csv")
+    tasks = [("OFF", p) for p in chunk_files(str(off))]
+    plan, affected = _sync(manifest, tasks)
+
+    assert [s.key for s in plan.changed] == ["off/chunk_1.csv"]
+    assert plan.removed == ["off/chunk_2.csv"]
+    assert affected == {"apple", "milk", "rice", "lentils"}
+    assert manifest.record_counts() == {"OFF": 4}
+
+    expected = {r["name"]: r for r in merge_records([OFFAdapter(str(off)).normalize()])}
+    partials = manifest.partials(affected)
+    assert set(partials) == {"apple", "milk", "rice"}
+    for name, partial in partials.items():
+        assert partial.merge(name) == expected[name]
+
+
+def test_generation_must_match_database(tmp_path):
+    manifest = _manifest(tmp_path)
+    assert not manifest.matches()
+
+    assert manifest.commit_generation() == 1
+    assert manifest.matches()
+
+    # A full rebuild resets the food database's user_version
+    manifest.conn.execute("PRAGMA main.user_version = 0")
+    assert not manifest.matches()
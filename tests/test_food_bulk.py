@@ -0,0 +1,51 @@
+"""
+Bulk Food Lookup Tests
+
+RU: Тесты пакетной выборки продуктов.
+EN: Bulk food lookup tests.
+"""
+
+import sqlite3
+
+from core.food_bulk import NUTRIENT_KEYS, fetch_foods, sum_cost, sum_nutrients
+
+
+def _db(n: int) -> sqlite3.Connection:
+    con = sqlite3.connect(":memory:")
+    con.row_factory = sqlite3.Row
+    con.execute(
+        "CREATE TABLE foods (id TEXT PRIMARY KEY, per_g REAL, price_per_100g REAL, "
+        + ", ".join(f"{k} REAL" for k in NUTRIENT_KEYS)
+        + ")"
+    )
+    for i in range(n):
+        con.execute(
+            "INSERT INTO foods VALUES (?, 100.0, ?, "
+            + ",".join("?" * len(NUTRIENT_KEYS))
+            + ")",
+            [f"f{i}", 1.0 + i, *[float(i + 1)] * len(NUTRIENT_KEYS)],
+        )
+    return con
+
+
+def test_fetch_foods_chunks_large_id_lists():
+    """Test that more ids than one IN chunk are fetched."""
+    con = _db(1200)
+    foods = fetch_foods(con, [f"f{i}" for i in range(1200)] + ["missing"])
+    assert len(foods) == 1200
+    assert foods["f1199"]["kcal"] == 1200.0
+
+
+def test_sum_nutrients_and_cost():
+    """Test aggregation matches per-row scaling and skips unknown ids."""
+    con = _db(2)
+    ings = [
+        {"food_id": "f0", "grams": 200},
+        {"food_id": "f1", "grams": 50},
+        {"food_id": "nope", "grams": 1000},
+    ]
+    foods = fetch_foods(con, [i["food_id"] for i in ings])
+    total = sum_nutrients(ings, foods)
+    assert list(total) == NUTRIENT_KEYS
+    assert total["kcal"] == 1.0 * 2 + 2.0 * 0.5
+    assert sum_cost(ings, foods) == 1.0 * 2 + 2.0 * 0.5
@@ -0,0 +1,277 @@
+"""
+Food Cache Store Tests
+
+RU: Тесты SQLite-хранилища кэша продуктов.
+EN: Tests for the SQLite food cache store.
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import asdict
+from unittest.mock import AsyncMock, patch
+
+import httpx
+
+from core import sqlite_pool
+from core.food_apis.cache_store import (
+    NEGATIVE_TTL_SEC,
+    LazyItemCache,
+    MemoryFoodCache,
+    SQLiteFoodCache,
+)
+from core.food_apis.unified_db import (
+    UnifiedFoodDatabase,
+    UnifiedFoodItem,
+    _decode_entry,
+    _encode_entry,
+)
+
+
+def _item(name, source_id="1"):
+    return UnifiedFoodItem(
+        name=name,
+        nutrients_per_100g={"protein_g": 10.0},
+        cost_per_100g=1.0,
+        tags=["VEG"],
+        availability_regions=["US"],
+        source="USDA FoodData Central",
+        source_id=source_id,
+    )
+
+
+def test_sqlite_upsert_get_and_compact(tmp_path):
+    """Test per-key upserts, ordering by update time and compaction."""
+    store = SQLiteFoodCache(tmp_path / "cache.sqlite")
+    store.put_many({"a": {"v": 1}, "b": {"v": 2}})
+    store.put_many({"a": {"v": 3}})
+    assert store.get("a") == {"v": 3}
+    assert store.get("missing") is None
+    assert len(store) == 2 and "b" in store
+
+    with patch("core.food_apis.cache_store.time.time", return_value=2e9):
+        store.put_many({"c": {"v": 4}})
+    assert store.compact(max_entries=1) == 2
+    assert list(store.keys()) == ["c"]
+
+
+def test_compact_vacuums_outside_the_writer(tmp_path):
+    """Test that VACUUM runs outside the shared writer's transaction."""
+    store = SQLiteFoodCache(tmp_path / "cache.sqlite")
+    store.put_many({f"k{i}": {"v": "x" * 2000} for i in range(200)})
+    with sqlite_pool.writer(store.path) as con:
+        writer = con
+    statements = []
+    writer.set_trace_callback(statements.append)
+
+    assert store.compact(max_entries=1) == 199
+
+    writer.set_trace_callback(None)
+    assert "VACUUM" not in statements and "COMMIT" in statements
+    check = sqlite3.connect(store.path)
+    assert check.execute("PRAGMA freelist_count").fetchone()[0] == 0
+    check.close()
+    store.put_many({"k": {"v": 1}})
+    with sqlite_pool.writer(store.path) as con:
+        assert con is writer
+    assert len(store) == 2
+    sqlite_pool.close_writers(store.path)
+
+
+def test_flushes_reuse_wal_connection_and_readers(tmp_path):
+    """Test that put_many neither reopens the writer nor drops readers."""
+    store = SQLiteFoodCache(tmp_path / "cache.sqlite")
+    store.put_many({"a": {"v": 1}})
+    reader = sqlite_pool.reader(store.path)
+    with sqlite_pool.writer(store.path) as con:
+        writer = con
+    before = sqlite_pool.stats()
+
+    for i in range(5):
+        store.put_many({f"k{i}": {"v": i}})
+
+    with sqlite_pool.writer(store.path) as con:
+        assert con is writer
+        assert con.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert sqlite_pool.reader(store.path) is reader
+    assert len(store) == 6
+    assert sqlite_pool.stats()["invalidations"] == before["invalidations"]
+    sqlite_pool.close_writers(store.path)
+
+
+def test_json_import_export_roundtrip(tmp_path):
+    """Test that JSON remains a lossless import/export format."""
+    source = tmp_path / "in.json"
+    source.write_text(json.dumps({"k": asdict(_item("Oats"))}), encoding="utf-8")
+    store = MemoryFoodCache()
+    assert store.import_json(source) == 1
+    assert store.export_json(tmp_path / "out.json") == 1
+    assert json.loads((tmp_path / "out.json").read_text(encoding="utf-8")) == {
+        "k": asdict(_item("Oats"))
+    }
+
+
+def test_legacy_json_cache_is_imported_and_loaded_lazily(tmp_path):
+    """Test one-time migration of the old JSON cache and lazy reads."""
+    legacy = {"search_oats": asdict(_item("Oats"))}
+    (tmp_path / "unified_food_cache.json").write_text(json.dumps(legacy), "utf-8")
+
+    db = UnifiedFoodDatabase(str(tmp_path))
+    assert dict.__len__(db._memory_cache) == 0  # nothing parsed up front
+    assert db._memory_cache["search_oats"] == _item("Oats")
+    assert db._memory_cache.get("search_rice") is None
+
+
+def test_misses_are_flushed_in_batches(tmp_path):
+    """Test write-behind: misses are persisted in one batch, not per call."""
+    backend = MemoryFoodCache()
+    db = UnifiedFoodDatabase(str(tmp_path), cache_backend=backend)
+
+    async def run():
+        with patch.object(
+            db.usda_client,
+            "get_food_details",
+            new=AsyncMock(side_effect=lambda fdc_id, **_: str(fdc_id)),
+        ), patch.object(UnifiedFoodItem, "from_usda_item", side_effect=_item):
+            with patch.object(backend, "put_many", wraps=backend.put_many) as put:
+                for i in range(1, 4):
+                    await db.get_food_by_id("usda", str(i))
+                assert put.call_count == 0 and len(backend) == 0
+                await db.close()
+                assert put.call_count == 1
+
+    asyncio.run(run())
+    assert sorted(backend.keys()) == ["usda_1", "usda_2", "usda_3"]
+
+    db2 = UnifiedFoodDatabase(str(tmp_path), cache_backend=backend)
+    assert "usda_2" in db2._memory_cache
+
+
+def test_store_io_runs_off_the_event_loop(tmp_path):
+    """Test that store reads and write-behind flushes leave the loop thread."""
+    backend = MemoryFoodCache()
+    db = UnifiedFoodDatabase(str(tmp_path), cache_backend=backend)
+    threads = []
+    get, put_many = backend.get, backend.put_many
+
+    def record(fn):
+        def wrapper(*args, **kwargs):
+            threads.append(threading.get_ident())
+            return fn(*args, **kwargs)
+
+        return wrapper
+
+    backend.get, backend.put_many = record(get), record(put_many)
+
+    async def run():
+        with patch.object(
+            db.usda_client,
+            "get_food_details",
+            new=AsyncMock(side_effect=lambda fdc_id, **_: str(fdc_id)),
+        ), patch.object(UnifiedFoodItem, "from_usda_item", side_effect=_item), patch(
+            "core.food_apis.cache_store.FLUSH_BATCH_SIZE", 1
+        ):
+            await db.get_food_by_id("usda", "1")
+            for _ in range(200):  # flushed as soon as the batch was full
+                if len(backend):
+                    break
+                await asyncio.sleep(0.01)
+            assert len(backend) == 1
+            await db.get_food_by_id("usda", "1")  # memory hit: no store read
+            await db.close()
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+
+    assert len(threads) == 3 and loop_thread not in threads
+
+
+def test_memory_tier_is_bounded_by_size_and_ttl():
+    """Test LRU eviction and expiry; evicted items reload from the store."""
+    backend = MemoryFoodCache()
+    cache = LazyItemCache(
+        backend, _decode_entry, _encode_entry, max_entries=2, ttl_seconds=10
+    )
+    with patch("core.food_apis.cache_store.time.monotonic", return_value=100.0):
+        cache["a"], cache["b"] = _item("A"), _item("B")
+        assert cache.get("a") == _item("A")  # "b" is now least recently used
+        cache["c"] = _item("C")
+        assert dict.__len__(cache) == 2 and not dict.__contains__(cache, "b")
+        cache.flush()
+        assert cache["b"] == _item("B")  # loaded back from the backend
+    with patch("core.food_apis.cache_store.time.time", return_value=1e12):
+        assert cache.get("a") is None  # expired in the store as well
+    stats = cache.stats()
+    assert stats["positive_eviction"] == 2 and stats["positive_load"] == 1
+
+
+def test_negative_entries_expire_and_skip_upstream(tmp_path):
+    """Test that empty searches are cached briefly and full lists are kept."""
+    db = UnifiedFoodDatabase(str(tmp_path), cache_backend=MemoryFoodCache())
+    db.off_client = None
+    search = AsyncMock(return_value=[])
+
+    async def run():
+        with patch.object(db.usda_client, "search_foods", search):
+            assert await db.search_food("nothing") == []
+            assert await db.search_food("nothing") == []
+            assert search.await_count == 1
+            with patch(
+                "core.food_apis.cache_store.time.monotonic",
+                return_value=time.monotonic() + NEGATIVE_TTL_SEC + 1,
+            ):
+                await db.search_food("nothing")
+            assert search.await_count == 2
+
+            search.return_value = ["a", "b", "c"]
+            with patch.object(UnifiedFoodItem, "from_usda_item", side_effect=_item):
+                first = await db.search_food("Oats ")
+            assert await db.search_food("oats") == first and len(first) == 3
+
+    asyncio.run(run())
+    assert db.cache_stats()["negative_hit"] == 1
+
+
+def test_outages_are_not_cached_as_negative(tmp_path):
+    """Test that transport errors never turn into cached empty lookups."""
+    requests = []
+    down = True
+
+    def handler(request):
+        requests.append(request.url.path)
+        if down:
+            raise httpx.ConnectError("connection refused", request=request)
+        if request.url.path.endswith("/search"):
+            return httpx.Response(200, json={"foods": [], "products": []})
+        return httpx.Response(404)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    db = UnifiedFoodDatabase(
+        str(tmp_path), cache_backend=MemoryFoodCache(), http_client=client
+    )
+
+    async def run():
+        # USDA and OFF are both down: nothing is remembered
+        assert await db.search_food("oats") == []
+        assert await db.get_food_by_id("usda", "42") is None
+        assert await db.get_food_by_id("openfoodfacts", "123") is None
+        assert not db._memory_cache.is_negative("search_oats")
+        assert not db._memory_cache.is_negative("usda_42")
+        assert not db._memory_cache.is_negative("openfoodfacts_123")
+        assert len(requests) == 4
+
+        # Once they answer, genuinely empty lookups are cached
+        nonlocal down
+        down = False
+        assert await db.search_food("oats") == []
+        assert await db.get_food_by_id("usda", "42") is None
+        assert await db.get_food_by_id("openfoodfacts", "123") is None
+        assert len(requests) == 8
+        assert await db.search_food("oats") == []
+        assert await db.get_food_by_id("usda", "42") is None
+        assert len(requests) == 8
+        await client.aclose()
+
+    asyncio.run(run())
@@ -0,0 +1,77 @@
+"""
+Parallel Food Ingestion Tests
+
+RU: Тесты параллельной нормализации чанков.
+EN: Tests for parallel chunk normalisation.
+"""
+
+import csv
+
+from core.food_ingest import chunk_files, ingest_chunks
+from core.food_merge import merge_records
+from core.food_sources.off import OFFAdapter
+from core.food_sources.usda import USDAAdapter
+
+USDA_FIELDS = ["description", "energy_kcal", "protein_g", "fat_g", "carbs_g", "iron_mg"]
+OFF_FIELDS = ["product_name", "energy-kcal_100g", "proteins_100g", "iron_100g", "vegan"]
+
+
+def _write_chunks(directory, fields, rows, per_chunk):
+    directory.mkdir()
+    for n in range(0, len(rows), per_chunk):
+        with open(directory / f"chunk_{n:03d}.csv", "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(fields)
+            writer.writerows(rows[n : n + per_chunk])
+    return str(directory)
+
+
+def _sources(tmp_path):
+    names = ["apple", "oats", "spinach", "lentils", "milk"]
+    usda = [
+        [names[i % 5], 50 + i, 1 + i % 3, 0.5, 10 + i % 7, 0.1 * i] for i in range(23)
+    ]
+    off = [
+        [names[(i * 2) % 5], 40 + i, 2, 0.2 * i, "yes" if i % 2 else ""]
+        for i in range(17)
+    ]
+    usda_dir = _write_chunks(tmp_path / "usda", USDA_FIELDS, usda, 4)
+    off_dir = _write_chunks(tmp_path / "off", OFF_FIELDS, off, 5)
+    return usda_dir, off_dir
+
+
+def _tasks(usda_dir, off_dir):
+    return [("USDA", p) for p in chunk_files(usda_dir)] + [
+        ("OFF", p) for p in chunk_files(off_dir)
+    ]
+
+
+def test_parallel_ingest_matches_sequential_merge(tmp_path):
+    usda_dir, off_dir = _sources(tmp_path)
+    expected = merge_records(
+        [USDAAdapter(usda_dir).normalize(), OFFAdapter(off_dir).normalize()]
+    )
+
+    for workers in (1, 3):
+        result = ingest_chunks(_tasks(usda_dir, off_dir), workers=workers)
+        merged = [p.merge(name) for name, p in result.groups.items()]
+
+        assert merged == expected
+        assert result.workers == workers
+        assert result.counts == {"USDA": 23, "OFF": 17}
+        assert [c.path for c in result.chunks] == [
+            p for _, p in _tasks(usda_dir, off_dir)
+        ]
+
+
+def test_failing_chunk_drops_whole_source(tmp_path):
+    usda_dir, off_dir = _sources(tmp_path)
+    with open(tmp_path / "off" / "chunk_005.csv", "a") as f:
+        f.write("broken,not-a-number,1,1,\n")
+
+    result = ingest_chunks(_tasks(usda_dir, off_dir), workers=2)
+
+    assert result.counts == {"USDA": 23, "OFF": 0}
+    assert [c.error is not None for c in result.chunks].count(True) == 1
+    expected = merge_records([USDAAdapter(usda_dir).normalize()])
+    assert [p.merge(name) for name, p in result.groups.items()] == expected
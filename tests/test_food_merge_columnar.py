@@ -0,0 +1,114 @@
+"""
+Columnar Merge Tests
+
+RU: Тесты векторизованного движка мерджа: совпадение с эталонным.
+EN: Vectorised merge backend tests: equality with the reference merge.
+"""
+
+import numpy as np
+import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from core.food_merge import (
+    MACROS,
+    MICROS,
+    PartialGroup,
+    merge_partials,
+    merge_records,
+)
+from core.food_merge_columnar import grouped_median, round_column
+from core.food_sources.base import FoodRecord
+
+NAMES = ["apple", "red bean", "lentil soup", "oats", "milk", "chickpea"]
+
+values = st.one_of(
+    st.none(),
+    st.sampled_from(
+        [-1.0, 0.0, -0.0, 0.125, 2.675, 1.0005, float("inf"), float("nan")]
+    ),
+    st.floats(min_value=-10, max_value=1e4),
+    st.integers(min_value=0, max_value=500),
+)
+
+records = st.builds(
+    FoodRecord,
+    name=st.sampled_from(NAMES),
+    locale=st.just("en"),
+    per_g=st.just(100.0),
+    flags=st.lists(st.sampled_from(["GF", "VEG", "DAIRY", "DAIRY_FREE"]), max_size=2),
+    price=st.just(0.0),
+    source=st.sampled_from(["USDA", "OFF"]),
+    version_date=st.just("2025-01-01"),
+    **{key: values for key in MACROS + MICROS},
+)
+
+
+@settings(max_examples=200, deadline=None)
+@given(st.lists(st.lists(records, max_size=12), max_size=3))
+def test_numpy_backend_matches_python(streams):
+    expected = merge_records(streams, backend="python")
+    # repr() also tells -0.0 from 0.0
+    assert repr(merge_records(streams, backend="numpy")) == repr(expected)
+
+
+@settings(max_examples=100, deadline=None)
+@given(st.lists(records, max_size=20))
+def test_partials_backends_match(rows):
+    groups = {}
+    for rec in rows:
+        groups.setdefault(rec.name, PartialGroup()).add(rec)
+    assert repr(merge_partials(groups, "numpy")) == repr(
+        merge_partials(groups, "python")
+    )
+
+
+def test_classification_uses_names_and_flags():
+    def rec(name, **values):
+        base = {key: 0.0 for key in MACROS + MICROS}
+        base.update(values)
+        return FoodRecord(
+            name=name,
+            locale="en",
+            per_g=100.0,
+            flags=["DAIRY"] if name == "milk" else [],
+            price=0.0,
+            source="OFF",
+            version_date="2025-01-01",
+            **base,
+        )
+
+    streams = [
+        [
+            rec("lentils", kcal=300, carbs_g=60, fiber_g=10),
+            rec("rice", kcal=300, carbs_g=60, fiber_g=10),
+            rec("spinach", kcal=23, fiber_g=2.5),
+            rec("milk", kcal=60, carbs_g=1),
+            rec("chicken", kcal=120, protein_g=25),
+        ]
+    ]
+    merged = merge_records(streams, backend="numpy")
+    assert [r["group"] for r in merged] == [
+        "legume",
+        "grain",
+        "veg",
+        "dairy",
+        "protein",
+    ]
+    assert merged == merge_records(streams, backend="python")
+
+
+def test_grouped_median_and_rounding():
+    codes = np.array([0, 0, 0, 0, 1, 1, 1])
+    vals = np.array([4.0, 1.0, 3.0, 2.0, 1.0, 3.0, 2.0])
+    assert grouped_median(codes, vals, 3).tolist() == [2.5, 2.0, 0.0]
+    # Ties resolved like round(), not like np.round
+    column = np.array([2.675, 0.125, 1.0005, float("inf")])
+    assert round_column(column, 2) == [round(v, 2) for v in column.tolist()]
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        merge_records([], backend="cuda")
+    with pytest.raises(ValueError):
+        merge_partials({}, backend="cuda")
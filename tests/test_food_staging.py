@@ -0,0 +1,79 @@
+"""
+Food Staging Tests
+
+RU: Тесты промежуточной таблицы потоковой сборки.
+EN: Tests for the streaming build staging table.
+"""
+
+import pytest
+
+from core.food_merge import merge_grouped, merge_records
+from core.food_sources.base import FoodRecord
+from core.food_staging import FoodStaging
+
+
+def _record(name, source="USDA", kcal=50.0, flags=None):
+    return FoodRecord(
+        name=name,
+        locale="en",
+        per_g=100.0,
+        kcal=kcal,
+        protein_g=2.0,
+        fat_g=1.0,
+        carbs_g=8.0,
+        fiber_g=1.5,
+        Fe_mg=0.5,
+        Ca_mg=20.0,
+        VitD_IU=0.0,
+        B12_ug=0.0,
+        Folate_ug=10.0,
+        Iodine_ug=0.0,
+        K_mg=150.0,
+        Mg_mg=12.0,
+        flags=flags or [],
+        price=0.0,
+        source=source,
+        version_date="2025-01-01",
+    )
+
+
+def test_grouped_merge_matches_in_memory_merge(tmp_path):
+    usda = [_record("spinach_raw", kcal=23), _record("apple", kcal=52)]
+    off = [
+        _record("apple", source="OFF", kcal=54, flags=["FRUIT"]),
+        _record("oats", source="OFF", kcal=389),
+    ]
+
+    expected = {r["name"]: r for r in merge_records([usda, off])}
+
+    with FoodStaging(tmp_path / "staging.db", batch_size=1) as staging:
+        assert staging.add(iter(usda)) == 2
+        assert staging.add(iter(off)) == 2
+        assert len(staging) == 4
+        merged = list(merge_grouped(staging.groups()))
+
+    assert [r["name"] for r in merged] == ["apple", "oats", "spinach_raw"]
+    assert {r["name"]: r for r in merged} == expected
+
+
+def test_failing_stream_is_rolled_back(tmp_path):
+    def broken():
+        yield _record("apple")
+        yield _record("oats")
+        raise RuntimeError("source went away")
+
+    with FoodStaging(tmp_path / "staging.db", batch_size=1) as staging:
+        staging.add([_record("spinach_raw")])
+        with pytest.raises(RuntimeError):
+            staging.add(broken())
+        assert len(staging) == 1
+        assert [name for name, _ in staging.groups()] == ["spinach_raw"]
+
+
+def test_scratch_file_is_removed_on_close(tmp_path):
+    path = tmp_path / "staging.db"
+    staging = FoodStaging(path)
+    staging.add([_record("apple")])
+    assert path.exists()
+    staging.close()
+    assert not path.exists()
@@ -4,7 +4,13 @@
 """
 from unittest.mock import MagicMock, patch
 
-from app.services.food_store import expand_query, get_food, nutrients_for, search_foods
+from app.services.food_store import (
+    expand_query,
+    get_food,
+    get_foods,
+    nutrients_for,
+    search_foods,
+)
 
 
 class TestFoodStoreCoverage:
@@ -106,10 +112,10 @@ class TestFoodStoreCoverage:
         result = get_food("1")
         assert result == mock_row
 
-    @patch("app.services.food_store.get_food")
+    @patch("app.services.food_store.get_foods")
     def test_nutrients_for_missing_food(self, mock_get_food):
         """Тест nutrients_for с отсутствующей едой"""
-        mock_get_food.return_value = None
+        mock_get_food.return_value = {}
 
         ingredients = [{"food_id": "missing", "grams": 100}]
         result = nutrients_for(ingredients)
@@ -118,7 +124,7 @@ class TestFoodStoreCoverage:
         for value in result.values():
             assert value == 0.0
 
-    @patch("app.services.food_store.get_food")
+    @patch("app.services.food_store.get_foods")
     def test_nutrients_for_with_per_g_override(self, mock_get_food):
         """Тест nutrients_for с переопределением per_g"""
         mock_food = {
@@ -136,7 +142,7 @@ class TestFoodStoreCoverage:
             "Iodine_ug": 2,
             "per_g": 50,  # Переопределяем стандартное значение 100
         }
-        mock_get_food.return_value = mock_food
+        mock_get_food.return_value = {"1": mock_food}
 
         ingredients = [{"food_id": "1", "grams": 100}]
         result = nutrients_for(ingredients)
@@ -145,7 +151,7 @@ class TestFoodStoreCoverage:
         assert result["kcal"] == 200.0  # 100 * (100/50)
         assert result["protein_g"] == 20.0  # 10 * (100/50)
 
-    @patch("app.services.food_store.get_food")
+    @patch("app.services.food_store.get_foods")
     def test_nutrients_for_missing_nutrients(self, mock_get_food):
         """Тест nutrients_for с отсутствующими нутриентами"""
         mock_food = {
@@ -153,7 +159,7 @@ class TestFoodStoreCoverage:
             "protein_g": 10,
             # Остальные нутриенты отсутствуют
         }
-        mock_get_food.return_value = mock_food
+        mock_get_food.return_value = {"1": mock_food}
 
         ingredients = [{"food_id": "1", "grams": 100}]
         result = nutrients_for(ingredients)
@@ -164,44 +170,40 @@ class TestFoodStoreCoverage:
         assert result["fat_g"] == 0.0
         assert result["Fe_mg"] == 0.0
 
-    @patch("app.services.food_store.get_food")
+    @patch("app.services.food_store.get_foods")
     def test_nutrients_for_multiple_ingredients(self, mock_get_food):
         """Тест nutrients_for с несколькими ингредиентами"""
 
-        def mock_get_food_side_effect(food_id):
-            if food_id == "1":
-                return {
-                    "kcal": 100,
-                    "protein_g": 10,
-                    "fat_g": 5,
-                    "carbs_g": 15,
-                    "Fe_mg": 1,
-                    "Ca_mg": 50,
-                    "K_mg": 200,
-                    "Mg_mg": 20,
-                    "VitD_IU": 10,
-                    "B12_ug": 1,
-                    "Folate_ug": 5,
-                    "Iodine_ug": 2,
-                }
-            elif food_id == "2":
-                return {
-                    "kcal": 200,
-                    "protein_g": 20,
-                    "fat_g": 10,
-                    "carbs_g": 30,
-                    "Fe_mg": 2,
-                    "Ca_mg": 100,
-                    "K_mg": 400,
-                    "Mg_mg": 40,
-                    "VitD_IU": 20,
-                    "B12_ug": 2,
-                    "Folate_ug": 10,
-                    "Iodine_ug": 4,
-                }
-            return None
-
-        mock_get_food.side_effect = mock_get_food_side_effect
+        mock_get_food.return_value = {
+            "1": {
+                "kcal": 100,
+                "protein_g": 10,
+                "fat_g": 5,
+                "carbs_g": 15,
+                "Fe_mg": 1,
+                "Ca_mg": 50,
+                "K_mg": 200,
+                "Mg_mg": 20,
+                "VitD_IU": 10,
+                "B12_ug": 1,
+                "Folate_ug": 5,
+                "Iodine_ug": 2,
+            },
+            "2": {
+                "kcal": 200,
+                "protein_g": 20,
+                "fat_g": 10,
+                "carbs_g": 30,
+                "Fe_mg": 2,
+                "Ca_mg": 100,
+                "K_mg": 400,
+                "Mg_mg": 40,
+                "VitD_IU": 20,
+                "B12_ug": 2,
+                "Folate_ug": 10,
+                "Iodine_ug": 4,
+            },
+        }
 
         ingredients = [{"food_id": "1", "grams": 100}, {"food_id": "2", "grams": 50}]
         result = nutrients_for(ingredients)
@@ -209,3 +211,24 @@ class TestFoodStoreCoverage:
         # Проверяем, что нутриенты суммируются
         assert result["kcal"] == 200.0  # 100 + 200*0.5
         assert result["protein_g"] == 20.0  # 10 + 20*0.5
+
+    @patch("app.services.food_store._connect")
+    def test_get_foods_single_query(self, mock_connect):
+        """Тест get_foods: один запрос WHERE id IN (...)"""
+        mock_con = MagicMock()
+        mock_connect.return_value.__enter__.return_value = mock_con
+        mock_con.execute.return_value.fetchall.return_value = [
+            {"id": "1", "kcal": 100},
+            {"id": "2", "kcal": 200},
+        ]
+
+        result = get_foods(["1", "2", "1", "3"])
+        assert set(result) == {"1", "2"}
+        mock_con.execute.assert_called_once()
+        sql, params = mock_con.execute.call_args[0]
+        assert "IN (?,?,?)" in sql
+        assert params == ["1", "2", "3"]
+
+    def test_get_foods_empty(self):
+        """Тест get_foods без идентификаторов"""
+        assert get_foods([]) == {}
@@ -0,0 +1,198 @@
+"""
+Conditional HTTP Cache Tests
+
+RU: Тесты условного HTTP-кэша (ETag/Last-Modified) для API продуктов.
+EN: Tests for validator-based HTTP caching in the food API clients.
+"""
+
+import asyncio
+import json
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from core.food_apis.http_cache import (
+    ConditionalCacheTransport,
+    HTTPResponseCache,
+    track_changes,
+)
+from core.food_apis.transport import create_http_client
+from core.food_apis.update_manager import (
+    UPDATE_PROBES,
+    DatabaseUpdateManager,
+    DatabaseVersion,
+)
+
+
+class _FakeUpstream(BaseHTTPRequestHandler):
+    """Serves a fixed JSON body with an ETag and honours If-None-Match."""
+
+    version = "v1"
+    statuses: list = []
+    paths: list = []
+
+    def do_GET(self):  # noqa: N802 - http.server API
+        self.paths.append(self.path.split("?")[0])
+        etag = f'"{self.version}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.statuses.append(304)
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self.statuses.append(200)
+        payload = json.dumps(
+            {"foods": [], "products": [], "version": self.version}
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def upstream():
+    _FakeUpstream.version = "v1"
+    _FakeUpstream.statuses = []
+    _FakeUpstream.paths = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeUpstream)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_revalidates_and_replays_body(upstream, tmp_path):
+    """Test 304 replay, change detection and credential-free cache keys."""
+    cache = HTTPResponseCache(tmp_path / "http.sqlite")
+
+    async def run():
+        client = create_http_client(cache=cache)
+        try:
+            first = await client.get(f"{upstream}/search", params={"api_key": "a"})
+            with track_changes() as same:
+                second = await client.get(f"{upstream}/search", params={"api_key": "b"})
+            _FakeUpstream.version = "v2"
+            with track_changes() as changed:
+                third = await client.get(f"{upstream}/search")
+            return first, second, third, same, changed
+        finally:
+            await client.aclose()
+
+    first, second, third, same, changed = asyncio.run(run())
+
+    assert _FakeUpstream.statuses == [200, 304, 200]
+    assert second.status_code == 200
+    assert second.json() == first.json()
+    assert third.json()["version"] == "v2"
+    assert same.unchanged and not changed.unchanged
+    assert len(cache) == 1
+
+
+def test_cache_io_runs_off_the_event_loop(tmp_path):
+    """Test that cache reads and writes do not block the event loop thread."""
+    cache = HTTPResponseCache(tmp_path / "http.sqlite")
+    threads = []
+    get, put = cache.get, cache.put
+
+    def record(fn):
+        def wrapper(*args):
+            threads.append(threading.get_ident())
+            return fn(*args)
+
+        return wrapper
+
+    cache.get, cache.put = record(get), record(put)
+    inner = httpx.MockTransport(
+        lambda request: httpx.Response(200, headers={"ETag": '"v1"'}, json={})
+    )
+
+    async def run():
+        async with httpx.AsyncClient(
+            transport=ConditionalCacheTransport(inner, cache)
+        ) as client:
+            await client.get("http://test/search")
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+
+    assert len(threads) == 2 and loop_thread not in threads
+    assert len(cache) == 1
+
+
+def test_update_check_short_circuits_on_304(upstream, tmp_path):
+    """Test that an unchanged source is not updated after the interval."""
+    manager = DatabaseUpdateManager(cache_dir=str(tmp_path), update_interval_hours=1)
+    manager.usda_client.BASE_URL = upstream
+    old = (datetime.now() - timedelta(hours=2)).isoformat()
+    manager.versions["usda"] = DatabaseVersion(
+        source="usda",
+        version="v0",
+        last_updated=old,
+        record_count=0,
+        checksum="x",
+        metadata={},
+    )
+
+    async def run():
+        try:
+            # First probes fill the cache, so the source counts as changed
+            first = await manager._check_usda_updates()
+            manager.versions["usda"].last_updated = old
+            second = await manager._check_usda_updates()
+            third = await manager._check_usda_updates()
+            return first, second, third
+        finally:
+            await manager.close()
+
+    assert asyncio.run(run()) == (True, False, False)
+    # The third check falls inside the interval and sends nothing
+    assert _FakeUpstream.statuses == [200] * 3 + [304] * 3
+    assert "last_checked" in manager.versions["usda"].metadata
+
+
+def test_update_check_probes_batch_fetched_foods_by_id(upstream, tmp_path):
+    """Test that foods the update batch-fetches are probed through GET."""
+    item = {
+        "name": "Chicken breast",
+        "nutrients_per_100g": {"protein_g": 31.0},
+        "cost_per_100g": 1.0,
+        "tags": [],
+        "availability_regions": ["US"],
+        "source": "USDA FoodData Central",
+        "source_id": "171077",
+    }
+    (tmp_path / "common_foods.json").write_text(
+        json.dumps({"chicken_breast": item}), encoding="utf-8"
+    )
+    manager = DatabaseUpdateManager(cache_dir=str(tmp_path), update_interval_hours=1)
+    manager.usda_client.BASE_URL = upstream
+    manager.versions["usda"] = DatabaseVersion(
+        source="usda",
+        version="v0",
+        last_updated=(datetime.now() - timedelta(hours=2)).isoformat(),
+        record_count=1,
+        checksum="x",
+        metadata={},
+    )
+
+    async def run():
+        try:
+            return await manager._check_usda_updates()
+        finally:
+            await manager.close()
+
+    assert asyncio.run(run()) is True
+    assert _FakeUpstream.paths[0] == "/food/171077"
+    assert _FakeUpstream.paths[1:] == ["/foods/search"] * UPDATE_PROBES
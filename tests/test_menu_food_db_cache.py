@@ -0,0 +1,99 @@
+"""
+Menu Engine Food DB Cache Tests
+
+RU: Тесты кеша базы продуктов по умолчанию в menu_engine.
+EN: Tests for the cached default food database in menu_engine.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+import core.menu_engine as me
+from core.targets import UserProfile
+
+
+def _unified_db(names=("oats", "spinach")):
+    items = {
+        name: SimpleNamespace(
+            name=name,
+            nutrients_per_100g={"protein_g": 1.0},
+            cost_per_100g=1.0,
+            tags=["VEG"],
+            availability_regions=["BY"],
+        )
+        for name in names
+    }
+    db = MagicMock()
+    db.get_common_foods_database = AsyncMock(return_value=items)
+    return db
+
+
+@pytest.fixture(autouse=True)
+def cold_cache():
+    me.invalidate_default_food_db()
+    yield
+    me.invalidate_default_food_db()
+
+
+def test_default_food_db_loaded_once():
+    """Test that repeated calls reuse one read-only snapshot."""
+    db = _unified_db()
+    with patch("core.menu_engine.get_unified_food_db", AsyncMock(return_value=db)):
+        first = me._get_default_food_db()
+        second = me._get_default_food_db()
+    assert first is second
+    assert set(first) == {"oats", "spinach"}
+    assert db.get_common_foods_database.await_count == 1
+    with pytest.raises(TypeError):
+        first["new"] = first["oats"]
+
+
+def test_update_callback_invalidates_snapshot():
+    """Test that DatabaseUpdateManager results drop the snapshot on success only."""
+    getter = AsyncMock(side_effect=[_unified_db(), _unified_db(("milk",))])
+    with patch("core.menu_engine.get_unified_food_db", getter):
+        first = me._get_default_food_db()
+        me.invalidate_default_food_db(SimpleNamespace(success=False))
+        assert me._get_default_food_db() is first
+        me.invalidate_default_food_db(SimpleNamespace(success=True))
+        assert set(me._get_default_food_db()) == {"milk"}
+
+
+def test_fallback_is_not_cached():
+    """Test that a failed load falls back without pinning the mock data."""
+    with patch("core.menu_engine.get_unified_food_db", side_effect=Exception("down")):
+        assert "lentils" in me._get_default_food_db()
+    with patch(
+        "core.menu_engine.get_unified_food_db", AsyncMock(return_value=_unified_db())
+    ):
+        assert set(me._get_default_food_db()) == {"oats", "spinach"}
+
+
+async def test_async_accessor_shares_snapshot():
+    """Test that the async accessor and sync path share the cached snapshot."""
+    db = _unified_db()
+    with patch("core.menu_engine.get_unified_food_db", AsyncMock(return_value=db)):
+        snapshot = await me.aget_default_food_db()
+        # Sync access from inside a running loop must not touch the loop
+        assert me._get_default_food_db() is snapshot
+    assert db.get_common_foods_database.await_count == 1
+
+
+def test_weekly_menu_resolves_food_db_once():
+    """Test that make_weekly_menu resolves the default food DB once per week."""
+    profile = UserProfile(
+        sex="female",
+        age=30,
+        height_cm=165,
+        weight_kg=60,
+        activity="moderate",
+        goal="maintain",
+    )
+    with patch(
+        "core.menu_engine._get_default_food_db", wraps=me._get_default_food_db
+    ) as getter:
+        week = me.make_weekly_menu(profile)
+    assert len(week.daily_menus) == 7
+    assert getter.call_count == 1
@@ -0,0 +1,95 @@
+"""
+Nutrient Matrix Tests
+
+RU: Тесты матрицы нутриентов.
+EN: Nutrient matrix tests.
+"""
+
+import os
+import sys
+
+import pytest
+
+from core.food_db_new import MICRO_KEYS, FoodDB
+from core.nutrient_matrix import COLUMNS, NutrientMatrix
+from core.recipe_db_new import RecipeDB
+
+DATA = os.path.join(os.path.dirname(__file__), "..", "data")
+
+
+@pytest.fixture(scope="module")
+def food_db():
+    return FoodDB(os.path.join(DATA, "food_db_new.csv"))
+
+
+def test_totals_match_dict_loop(food_db):
+    """Test that matrix totals equal the per-item dict computation."""
+    grams = {"oats": 60, "greek_yogurt": 150, "banana": 100}
+    tot = food_db.matrix.totals(grams)
+
+    expected_kcal = 0.0
+    for name, g in grams.items():
+        fi = food_db.get_food(name)
+        mul = g / fi.per_g
+        expected_kcal += (fi.protein_g * 4 + fi.carbs_g * 4 + fi.fat_g * 9) * mul
+        for k in MICRO_KEYS:
+            assert tot[k] == pytest.approx(
+                sum(food_db.get_food(n).micros[k] * v / 100 for n, v in grams.items()),
+                rel=1e-5,
+            )
+    assert tot["kcal"] == pytest.approx(expected_kcal, rel=1e-5)
+    assert tot["price"] == pytest.approx(
+        sum(food_db.get_food(n).price * v / 100 for n, v in grams.items()), rel=1e-5
+    )
+    assert list(tot) == COLUMNS
+
+
+def test_unknown_food_strict_and_lenient(food_db):
+    """Test unknown foods are skipped, or raise KeyError in strict mode."""
+    assert food_db.matrix.totals({"unobtainium": 100})["kcal"] == 0.0
+    with pytest.raises(KeyError):
+        food_db.matrix.totals({"unobtainium": 100}, strict=True)
+
+
+def test_totals_many_matches_single(food_db):
+    """Test batched totals equal per-map totals, including empty maps."""
+    maps = [{"oats": 60}, {}, {"salmon": 120, "spinach": 80}, {"banana": 100}]
+    batched = food_db.matrix.totals_many(maps)
+    for row, grams in zip(batched, maps):
+        assert row.tolist() == pytest.approx(
+            food_db.matrix.totals_array(grams).tolist()
+        )
+
+
+def test_matrix_is_read_only(food_db):
+    """Test that the matrix snapshot cannot be mutated."""
+    with pytest.raises(ValueError):
+        food_db.matrix.values[0, 0] = 1.0
+
+
+def test_from_sqlite_indexes_id_and_name():
+    """Test building from data/food.sqlite with id and canonical name lookup."""
+    matrix = NutrientMatrix.from_sqlite(os.path.join(DATA, "food.sqlite"))
+    assert len(matrix) > 0
+    assert "spinach_raw" in matrix
+    by_name = matrix.totals({"spinach_raw": 100})
+    by_id = matrix.totals({matrix.keys[matrix.index["spinach_raw"]]: 100})
+    assert by_name == by_id
+    assert by_name["kcal"] == pytest.approx(23.0)
+
+
+def test_recipe_nutrition_without_numpy(food_db, monkeypatch):
+    """Test that RecipeDB falls back to dict loops when numpy is missing."""
+    # A None entry makes importing core.nutrient_matrix raise ImportError
+    monkeypatch.setitem(sys.modules, "core.nutrient_matrix", None)
+    plain_db = FoodDB(os.path.join(DATA, "food_db_new.csv"))
+    assert plain_db.matrix is None
+
+    recipes_csv = os.path.join(DATA, "recipes_new.csv")
+    grams = {"oats": 60, "greek_yogurt": 150, "banana": 100}
+    fallback = RecipeDB(recipes_csv, plain_db)._nutrition_for(grams)
+    expected = RecipeDB(recipes_csv, food_db)._nutrition_for(grams)
+
+    assert fallback["kcal"] == pytest.approx(expected["kcal"], rel=1e-5)
+    for part in ("macros", "micros"):
+        assert fallback[part] == pytest.approx(expected[part], rel=1e-5)
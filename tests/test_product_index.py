@@ -0,0 +1,56 @@
+"""
+Product Index Tests
+
+RU: Тесты индекса нечеткого поиска: совпадение с полным перебором.
+EN: Fuzzy matching index tests: equality with a full scan.
+"""
+
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from core.product_index import ProductIndex, name_confidence
+
+WORDS = ["red", "bean", "beans", "oat", "oats", "milk", "soy", "a", "ab", "b_c", "Oat"]
+
+names = st.lists(st.sampled_from(WORDS), max_size=4).map(" ".join)
+
+
+def _scan(names, query, limit, min_confidence):
+    """The original lookup: score every name, first best wins."""
+    scored = []
+    for i, name in enumerate(dict.fromkeys(names)):
+        confidence = name_confidence(query, name)
+        if confidence > min_confidence:
+            scored.append((-confidence, i, name))
+    return [(name, -c) for c, _, name in sorted(scored)[:limit]]
+
+
+@settings(max_examples=300, deadline=None)
+@given(
+    st.lists(names, max_size=25),
+    names,
+    st.sampled_from([0.0, 0.3, 0.5]),
+)
+def test_index_matches_full_scan(catalogue, query, min_confidence):
+    index = ProductIndex()
+    for name in catalogue:
+        index.add(name)
+
+    matches = index.search(query, limit=3, min_confidence=min_confidence)
+
+    assert [(m.name, m.confidence) for m in matches] == _scan(
+        catalogue, query, 3, min_confidence
+    )
+
+
+def test_repeated_names_keep_first_item():
+    index = ProductIndex()
+    index.add("red lentils", "first")
+    index.add("red lentils", "second")
+    index.add("lentil", "third")
+
+    assert len(index) == 2
+    best = index.best("Red_Lentils")
+    assert (best.name, best.confidence, best.item) == ("red lentils", 1.0, "first")
+    assert [m.item for m in index.search("lentils red")] == ["first", "third"]
+    assert index.best("quinoa") is None
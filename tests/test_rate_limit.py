@@ -0,0 +1,268 @@
+"""
+Rate Limit Tests
+
+RU: Тесты ограничения частоты запросов и загрузки базовых продуктов.
+EN: Tests for token buckets, jittered retries and the common foods pipeline.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from core.food_apis import rate_limit
+from core.food_apis.cache_store import MemoryFoodCache
+from core.food_apis.openfoodfacts_client import OFFFoodItem
+from core.food_apis.rate_limit import (
+    RateLimitExceeded,
+    TokenBucket,
+    bucket_for,
+    retry_with_jitter,
+)
+from core.food_apis.unified_db import (
+    COMMON_FOOD_SEARCHES,
+    UnifiedFoodDatabase,
+    UnifiedFoodItem,
+)
+from core.food_apis.usda_client import USDAFoodItem
+
+
+def _item(fdc_id: int, name: str) -> USDAFoodItem:
+    return USDAFoodItem(
+        fdc_id=fdc_id,
+        description=name,
+        food_category=None,
+        nutrients_per_100g={"protein_g": 1.0},
+        data_type="Foundation",
+        publication_date=None,
+    )
+
+
+def _status_error(code: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "http://test")
+    response = httpx.Response(code, request=request)
+    return httpx.HTTPStatusError("error", request=request, response=response)
+
+
+def test_bucket_limits_depend_on_usda_key():
+    """Test that DEMO_KEY gets the stricter USDA limits."""
+    demo = bucket_for("usda", "DEMO_KEY")
+    keyed = bucket_for("usda", "personal-key")
+    assert demo.name == "usda_demo"
+    assert keyed.name == "usda"
+    assert demo.rate < keyed.rate
+    assert bucket_for("openfoodfacts").name == "openfoodfacts"
+
+
+def test_bucket_bursts_then_refuses_long_waits():
+    """Test burst capacity and RateLimitExceeded past max_wait."""
+    bucket = TokenBucket(rate=0.01, burst=2, name="test")
+
+    async def run():
+        await bucket.acquire()
+        await bucket.acquire()
+        with pytest.raises(RateLimitExceeded):
+            await bucket.acquire(max_wait=1)
+
+    asyncio.run(run())
+
+
+def test_retry_with_jitter_retries_transient_errors_only(monkeypatch):
+    """Test that 503s are retried and 404s are raised at once."""
+    monkeypatch.setattr(rate_limit.random, "uniform", lambda a, b: 0.0)
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise _status_error(503)
+        return "ok"
+
+    async def missing():
+        calls.append(1)
+        raise _status_error(404)
+
+    assert asyncio.run(retry_with_jitter(flaky, attempts=3)) == "ok"
+    assert len(calls) == 3
+
+    calls.clear()
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(retry_with_jitter(missing, attempts=3))
+    assert len(calls) == 1
+
+
+def test_common_foods_fetched_concurrently_with_progress(tmp_path, monkeypatch):
+    """Test bounded concurrency, retries and progress for a cold build."""
+    monkeypatch.setattr(rate_limit.random, "uniform", lambda a, b: 0.0)
+    db = UnifiedFoodDatabase(str(tmp_path), cache_backend=MemoryFoodCache())
+    db.off_client = None
+    active, peak, failed = [0], [0], set()
+
+    async def search_foods(query, page_size=25, *, raise_errors=False):
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        await asyncio.sleep(0.01)
+        active[0] -= 1
+        if query == COMMON_FOOD_SEARCHES["tofu"] and query not in failed:
+            failed.add(query)
+            raise _status_error(429)
+        return [_item(len(query), query)]
+
+    db.usda_client.search_foods = search_foods
+    progress = []
+
+    async def run():
+        try:
+            return await db.get_common_foods_database(
+                progress=lambda done, total, name: progress.append((done, total))
+            )
+        finally:
+            await db.close()
+
+    foods = asyncio.run(run())
+
+    assert list(foods) == list(COMMON_FOOD_SEARCHES)
+    assert 1 < peak[0] <= 4
+    assert failed == {COMMON_FOOD_SEARCHES["tofu"]}
+    assert [done for done, _ in progress] == list(range(1, 21))
+    assert (tmp_path / "common_foods.json").exists()
+
+
+def test_refresh_uses_usda_batch_endpoint(tmp_path):
+    """Test that known USDA ids are refreshed in one batch call."""
+    db = UnifiedFoodDatabase(str(tmp_path), cache_backend=MemoryFoodCache())
+    db.off_client = None
+    names = list(COMMON_FOOD_SEARCHES)
+    ids = {name: 1000 + i for i, name in enumerate(names)}
+    batches, searches = [], []
+
+    async def search_foods(query, page_size=25, *, raise_errors=False):
+        searches.append(query)
+        name = next(n for n, q in COMMON_FOOD_SEARCHES.items() if q == query)
+        return [_item(ids[name], query)]
+
+    async def get_multiple_foods(fdc_ids, *, raise_errors=False):
+        batches.append(list(fdc_ids))
+        return [_item(i, f"fresh {i}") for i in fdc_ids]
+
+    db.usda_client.search_foods = search_foods
+    db.usda_client.get_multiple_foods = get_multiple_foods
+
+    async def run():
+        try:
+            await db.get_common_foods_database()
+            return await db.get_common_foods_database(refresh=True)
+        finally:
+            await db.close()
+
+    foods = asyncio.run(run())
+
+    assert len(searches) == 20
+    assert batches == [[ids[name] for name in names]]
+    assert foods["salmon"].name == f"fresh {ids['salmon']}"
+
+
+def test_refresh_skips_cached_searches(tmp_path):
+    """Test that a refresh searches again instead of serving cached results."""
+    db = UnifiedFoodDatabase(str(tmp_path), cache_backend=MemoryFoodCache())
+    db.off_client = None
+    query = COMMON_FOOD_SEARCHES["tofu"]
+    stale = UnifiedFoodItem.from_usda_item(_item(1, "stale tofu"))
+    stale.source = "Open Food Facts"  # no USDA id to batch-refresh by
+    db._memory_cache[f"search_{query}"] = [stale]
+    searches = []
+
+    async def search_foods(query, page_size=25, *, raise_errors=False):
+        searches.append(query)
+        return [_item(len(searches), f"fresh {query}")]
+
+    db.usda_client.search_foods = search_foods
+
+    async def run():
+        try:
+            foods = await db.get_common_foods_database(refresh=True)
+            return foods, await db.search_food(query)
+        finally:
+            await db.close()
+
+    foods, cached = asyncio.run(run())
+
+    assert query in searches and len(searches) == 20
+    assert foods["tofu"].name == f"fresh {query}"
+    assert cached[0].name == f"fresh {query}"  # the cache holds fresh results
+
+
+def test_unreachable_source_is_skipped_for_rest_of_build(tmp_path, monkeypatch):
+    """Test that a dead upstream is not retried for every common food."""
+    monkeypatch.setattr(rate_limit.random, "uniform", lambda a, b: 0.0)
+    db = UnifiedFoodDatabase(str(tmp_path), cache_backend=MemoryFoodCache())
+    db.off_client = None
+    calls = []
+
+    async def search_foods(query, page_size=25, *, raise_errors=False):
+        calls.append(query)
+        raise httpx.ConnectError("Name or service not known")
+
+    db.usda_client.search_foods = search_foods
+    bucket = db._rate_limits["usda"] = TokenBucket(0.0, 100, name="usda")
+
+    async def run():
+        try:
+            return await db.get_common_foods_database()
+        finally:
+            await db.close()
+
+    assert asyncio.run(run()) == {}
+    # At most one retry series per concurrent worker, not 3 calls per food
+    assert len(calls) <= 3 * 4
+    # Requests that never connected cost no rate-limit tokens
+    assert bucket._tokens == 100
+
+
+def test_usda_outage_falls_back_to_off(tmp_path, monkeypatch):
+    """Test that a build during a USDA outage still collects OFF results."""
+    monkeypatch.setattr(rate_limit.random, "uniform", lambda a, b: 0.0)
+    db = UnifiedFoodDatabase(str(tmp_path), cache_backend=MemoryFoodCache())
+    usda_calls = []
+
+    async def search_foods(query, page_size=25, *, raise_errors=False):
+        usda_calls.append(query)
+        raise _status_error(503)
+
+    async def search_products(query, page_size=25, *, raise_errors=False):
+        return [
+            OFFFoodItem(
+                code=str(len(query)),
+                product_name=query,
+                categories=[],
+                nutrients_per_100g={"protein_g": 1.0},
+                ingredients_text=None,
+                brands=None,
+                labels=[],
+                countries=[],
+                packaging=[],
+                image_url=None,
+                last_modified_t=0,
+            )
+        ]
+
+    db.usda_client.search_foods = search_foods
+    db.off_client.search_products = search_products
+    # OFF's real limit (10 per minute) would make this test wait a minute
+    db._rate_limits["openfoodfacts"] = TokenBucket(1000, 100, name="openfoodfacts")
+    usda_bucket = db._rate_limits["usda"] = TokenBucket(0.0, 100, name="usda")
+
+    async def run():
+        try:
+            return await db.get_common_foods_database()
+        finally:
+            await db.close()
+
+    foods = asyncio.run(run())
+
+    assert list(foods) == list(COMMON_FOOD_SEARCHES)
+    assert {item.source for item in foods.values()} == {"Open Food Facts"}
+    # USDA is marked down after its first failed retry series
+    assert len(usda_calls) <= 3 * 4
+    # Retries reuse their call's token instead of queueing for more
+    assert 100 - usda_bucket._tokens <= 4
@@ -0,0 +1,123 @@
+"""
+Single-Flight Tests
+
+RU: Тесты объединения одновременных запросов к API продуктов.
+EN: Tests for coalescing concurrent upstream food lookups.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from core.food_apis.cache_store import MemoryFoodCache
+from core.food_apis.single_flight import SingleFlight
+from core.food_apis.unified_db import UnifiedFoodDatabase
+
+NUTRIENTS = [{"nutrientId": n, "value": 1.0} for n in (1003, 1004, 1005, 1008)]
+
+
+class _FakeUSDA(BaseHTTPRequestHandler):
+    """Slow fake FoodData Central: counts requests per (path, query)."""
+
+    calls: Counter = Counter()
+    lock = threading.Lock()
+
+    def do_GET(self):  # noqa: N802 - http.server API
+        url = urlparse(self.path)
+        query = parse_qs(url.query).get("query", [""])[0]
+        with self.lock:
+            self.calls[(url.path, query)] += 1
+        time.sleep(0.2)  # keep the call in flight while others arrive
+
+        food = {
+            "fdcId": 1,
+            "description": query or url.path,
+            "foodNutrients": NUTRIENTS,
+        }
+        body = {"foods": [food]} if url.path.endswith("/search") else food
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_usda():
+    _FakeUSDA.calls = Counter()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeUSDA)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/fdc/v1"
+    server.shutdown()
+    server.server_close()
+
+
+def test_500_concurrent_lookups_hit_upstream_once_per_key(fake_usda, tmp_path):
+    """Test one HTTP call per (source, query/id) under 500 concurrent requests."""
+    db = UnifiedFoodDatabase(str(tmp_path), cache_backend=MemoryFoodCache())
+    db.usda_client.BASE_URL = fake_usda
+    db.off_client = None
+    queries = [f"food {i}" for i in range(5)]
+    ids = [str(100 + i) for i in range(5)]
+
+    async def run():
+        calls = [db.search_food(queries[i % 5]) for i in range(250)]
+        calls += [db.get_food_by_id("usda", ids[i % 5]) for i in range(250)]
+        try:
+            return await asyncio.gather(*calls)
+        finally:
+            await db.close()
+
+    results = asyncio.run(run())
+
+    assert all(results[i][0].name == queries[i % 5] for i in range(250))
+    assert all(results[250 + i] is not None for i in range(250))
+    assert _FakeUSDA.calls == Counter(
+        {("/fdc/v1/foods/search", q): 1 for q in queries}
+        | {(f"/fdc/v1/food/{i}", ""): 1 for i in ids}
+    )
+    assert db._flights.stats == {"leader": 10, "shared": 490}
+    assert len(db._flights) == 0
+
+
+def test_errors_are_shared_and_cancellation_is_isolated():
+    """Test that followers see the leader's error and survive its cancel."""
+    flights = SingleFlight()
+    started = []
+
+    async def fail():
+        started.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def slow():
+        started.append(1)
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    async def run():
+        errors = await asyncio.gather(
+            *(flights.do("k", fail) for _ in range(3)), return_exceptions=True
+        )
+        assert [type(e) for e in errors] == [RuntimeError] * 3
+
+        leader = asyncio.ensure_future(flights.do("k", slow))
+        follower = asyncio.ensure_future(flights.do("k", slow))
+        await asyncio.sleep(0)
+        leader.cancel()
+        assert await follower == "ok"
+
+    asyncio.run(run())
+    assert len(started) == 2
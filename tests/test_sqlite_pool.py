@@ -0,0 +1,129 @@
+"""
+SQLite Pool Tests
+
+RU: Тесты пула соединений SQLite.
+EN: SQLite connection pool tests.
+"""
+
+import os
+import sqlite3
+import threading
+
+import pytest
+
+from core import sqlite_pool
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "pool.sqlite"
+    with sqlite_pool.writer(path) as con:
+        con.execute("CREATE TABLE t (id TEXT PRIMARY KEY, v REAL)")
+        con.execute("INSERT INTO t VALUES ('a', 1.0)")
+    yield path
+    sqlite_pool.close_thread_connections()
+    sqlite_pool.close_writers(path)
+
+
+def test_reader_reuses_connection_per_thread(db_path):
+    """Test that the same thread gets the same connection back (pool hit)."""
+    before = sqlite_pool.stats()
+    con1 = sqlite_pool.reader(db_path)
+    con2 = sqlite_pool.reader(db_path)
+    assert con1 is con2
+    after = sqlite_pool.stats()
+    assert after["misses"] - before["misses"] == 1
+    assert after["hits"] - before["hits"] == 1
+    assert dict(con1.execute("SELECT * FROM t").fetchone()) == {"id": "a", "v": 1.0}
+
+
+def test_reader_is_read_only(db_path):
+    """Test that pooled readers reject writes."""
+    con = sqlite_pool.reader(db_path)
+    with pytest.raises(sqlite3.OperationalError):
+        con.execute("INSERT INTO t VALUES ('b', 2.0)")
+
+
+def test_reader_per_thread_connections(db_path):
+    """Test that other threads get their own connection."""
+    main_con = sqlite_pool.reader(db_path)
+    seen = []
+
+    def worker():
+        seen.append(sqlite_pool.reader(db_path))
+        sqlite_pool.close_thread_connections()
+
+    t = threading.Thread(target=worker)
+    t.start()
+    t.join()
+    assert seen and seen[0] is not main_con
+
+
+def test_readers_see_committed_writes(db_path):
+    """Test that pooled readers see commits without being reopened."""
+    con1 = sqlite_pool.reader(db_path)
+    with sqlite_pool.writer(db_path) as w:
+        w.execute("INSERT INTO t VALUES ('b', 2.0)")
+    other = sqlite3.connect(db_path)
+    with other:
+        other.execute("INSERT INTO t VALUES ('c', 3.0)")
+    other.close()
+    con2 = sqlite_pool.reader(db_path)
+    assert con2 is con1
+    assert con2.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 3
+
+
+def test_overlapping_writers_do_not_fail(db_path):
+    """Test that concurrent writers all commit without lock errors."""
+    errors = []
+
+    def worker(i):
+        try:
+            for j in range(20):
+                with sqlite_pool.writer(db_path) as w:
+                    w.execute("INSERT INTO t VALUES (?, ?)", (f"w{i}-{j}", j))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    con = sqlite_pool.reader(db_path)
+    assert con.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 81
+
+
+def test_immutable_reader_reopens_replaced_file(tmp_path):
+    """Test that an immutable reader follows an os.replace of its file."""
+    path = tmp_path / "built.sqlite"
+    for version in (1, 2):
+        tmp = tmp_path / "built.sqlite.tmp"
+        con = sqlite3.connect(tmp)
+        con.execute("CREATE TABLE v (n INTEGER)")
+        con.execute("INSERT INTO v VALUES (?)", (version,))
+        con.commit()
+        con.close()
+        os.replace(tmp, path)
+        reader = sqlite_pool.reader(path, immutable=True)
+        assert reader.execute("SELECT n FROM v").fetchone()[0] == version
+    sqlite_pool.close_thread_connections()
+
+
+def test_writer_rolls_back_on_error(db_path):
+    """Test that a failing writer leaves the database unchanged."""
+    with pytest.raises(RuntimeError):
+        with sqlite_pool.writer(db_path) as w:
+            w.execute("INSERT INTO t VALUES ('c', 3.0)")
+            raise RuntimeError("boom")
+    con = sqlite_pool.reader(db_path)
+    assert con.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+
+
+def test_reader_missing_file(tmp_path):
+    """Test that a missing database raises OperationalError without creating it."""
+    missing = tmp_path / "missing.sqlite"
+    with pytest.raises(sqlite3.OperationalError):
+        sqlite_pool.reader(missing)
+    assert not missing.exists()
@@ -20,10 +20,14 @@ class _FakeOFFItem:
 
 
 class _FakeOFFClient:
-    async def search_products(self, query: str, page_size: int = 5):  # noqa: ARG002
+    async def search_products(
+        self, query: str, page_size: int = 5, *, raise_errors: bool = False
+    ):  # noqa: ARG002
         return [_FakeOFFItem()]
 
-    async def get_product_details(self, code: str):  # noqa: ARG002
+    async def get_product_details(
+        self, code: str, *, raise_errors: bool = False
+    ):  # noqa: ARG002
         return _FakeOFFItem()
 
 
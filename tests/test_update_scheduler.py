@@ -0,0 +1,124 @@
+"""
+Tests for the event-driven DatabaseUpdateScheduler: persisted per-source
+schedule, backoff and forced updates preempting scheduled ones.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock
+
+from core.food_apis.scheduler import DatabaseUpdateScheduler, backoff_delay
+from core.food_apis.update_manager import UpdateResult
+
+
+def _result(source, success=True):
+    return UpdateResult(
+        success=success,
+        source=source,
+        old_version=None,
+        new_version="v1" if success else None,
+        records_added=0,
+        records_updated=0,
+        records_removed=0,
+        errors=[] if success else ["boom"],
+        duration_seconds=0.0,
+    )
+
+
+def test_backoff_delay_doubles_with_jitter_and_cap():
+    """Test exponential growth, jitter bounds and the cap."""
+    base, cap = timedelta(minutes=30), timedelta(hours=3)
+    for attempt, full in ((1, base), (2, base * 2), (3, base * 4), (9, cap)):
+        for _ in range(20):
+            delay = backoff_delay(base, attempt, cap)
+            assert full / 2 <= delay <= full
+
+
+def test_schedule_survives_restart(tmp_path):
+    """Test a restart resumes the saved next run instead of updating at once."""
+    first = DatabaseUpdateScheduler(
+        cache_dir=str(tmp_path), source_interval_hours={"usda": 6}
+    )
+    first.update_manager.sources = lambda: ["usda"]
+    first._load_schedule()
+    # No version yet: due right away
+    assert first._should_check_for_updates(datetime.now())
+    first._schedule_next("usda")
+    next_run = first.schedule["usda"].next_run
+    assert next_run - datetime.now() <= timedelta(hours=6)
+
+    second = DatabaseUpdateScheduler(
+        cache_dir=str(tmp_path), source_interval_hours={"usda": 6}
+    )
+    second.update_manager.sources = lambda: ["usda"]
+    second._load_schedule()
+    assert second.schedule["usda"].next_run == next_run
+    assert not second._should_check_for_updates(datetime.now())
+
+
+def test_failure_backs_off_then_waits_a_full_interval(tmp_path):
+    """Test failed updates retry early until max_retries is reached."""
+    scheduler = DatabaseUpdateScheduler(
+        cache_dir=str(tmp_path), retry_interval_minutes=10, max_retries=2
+    )
+    scheduler.update_manager.update_database = AsyncMock(
+        return_value=_result("usda", success=False)
+    )
+
+    asyncio.run(scheduler._run_source_update("usda"))
+    retry_at = scheduler.schedule["usda"].next_run - datetime.now()
+    assert retry_at <= timedelta(minutes=10)
+    assert scheduler.schedule["usda"].failures == 1
+
+    asyncio.run(scheduler._run_source_update("usda"))
+    retry_at = scheduler.schedule["usda"].next_run - datetime.now()
+    assert retry_at > timedelta(hours=23)
+    assert scheduler.retry_counts["usda"] == 0
+
+
+def test_forced_update_preempts_running_scheduled_update(tmp_path):
+    """Test a forced update cancels a slow scheduled one, which is requeued."""
+    scheduler = DatabaseUpdateScheduler(cache_dir=str(tmp_path))
+    manager = scheduler.update_manager
+    order = []
+    cancelled = []
+
+    async def update_database(source, force=False):
+        order.append((source, force))
+        if len(order) == 1:
+            try:
+                await asyncio.Event().wait()  # slow scheduled update
+            except asyncio.CancelledError:
+                cancelled.append(source)
+                raise
+        return _result(source)
+
+    manager.sources = lambda: ["usda", "openfoodfacts"]
+    manager.check_for_updates = AsyncMock(
+        return_value={"usda": True, "openfoodfacts": True}
+    )
+    manager.update_database = update_database
+    manager.close = AsyncMock()
+
+    async def run():
+        await scheduler.start()
+        while not order:
+            await asyncio.sleep(0)
+        results = await scheduler.force_update("extra")
+        while len(order) < 4:
+            await asyncio.sleep(0)
+        await scheduler.stop()
+        return results
+
+    results = asyncio.run(run())
+    assert results["extra"].success is True
+    assert cancelled == ["usda"]
+    assert order == [
+        ("usda", False),
+        ("extra", True),
+        ("usda", False),
+        ("openfoodfacts", False),
+    ]
+    # Preemption is not a failure, and nothing is left due
+    assert scheduler.retry_counts["usda"] == 0
+    assert not scheduler._should_check_for_updates(datetime.now())
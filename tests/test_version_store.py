@@ -0,0 +1,216 @@
+"""
+Food Version Store Tests
+
+RU: Тесты хранилища версий: дельты по хэшам записей и откат.
+EN: Tests for per-record hash deltas and delta-replay rollback.
+"""
+
+import asyncio
+import os
+import sqlite3
+from datetime import datetime
+
+from core import sqlite_pool
+from core.food_apis import update_manager
+from core.food_apis.unified_db import UnifiedFoodItem
+from core.food_apis.update_manager import DatabaseUpdateManager
+from core.food_apis.version_store import (
+    FoodVersionStore,
+    RecordDelta,
+    diff_records,
+    record_hash,
+)
+
+
+def _food(name: str, protein: float) -> UnifiedFoodItem:
+    return UnifiedFoodItem(
+        name=name,
+        nutrients_per_100g={"protein_g": protein, "fat_g": 1.0, "carbs_g": 1.0},
+        cost_per_100g=1.0,
+        tags=[],
+        availability_regions=["US"],
+        source="USDA FoodData Central",
+        source_id="1",
+    )
+
+
+def test_diff_loads_only_changed_and_removed_records():
+    """Test added/changed/removed keys and lazy loading of old records."""
+    old = {"a": {"v": 1}, "b": {"v": 2}, "c": {"v": 3}}
+    new = {"a": {"v": 1}, "b": {"v": 20}, "d": {"v": 4}}
+    loaded = []
+
+    def load(keys):
+        loaded.extend(keys)
+        return {k: old[k] for k in keys}
+
+    delta, hashes = diff_records({k: record_hash(r) for k, r in old.items()}, new, load)
+
+    assert delta.added == {"d": {"v": 4}}
+    assert delta.changed == {"b": ({"v": 2}, {"v": 20})}
+    assert delta.removed == {"c": {"v": 3}}
+    assert sorted(loaded) == ["b", "c"]
+    assert set(hashes) == set(new)
+
+
+def test_delta_composition_round_trips():
+    """Test that a delta followed by its inverse is empty."""
+    delta = RecordDelta(
+        added={"d": {"v": 4}},
+        changed={"b": ({"v": 2}, {"v": 20})},
+        removed={"c": {"v": 3}},
+    )
+    assert not delta.then(delta.inverted())
+    assert RecordDelta.from_dict(delta.to_dict()) == delta
+
+
+def test_update_counts_and_rollback_replay_deltas(tmp_path, monkeypatch):
+    """Test accurate update counts and rollback across two versions."""
+    manager = DatabaseUpdateManager(cache_dir=str(tmp_path))
+    snapshots = [
+        {"oats": _food("Oats", 13.0), "rice": _food("Rice", 2.7)},
+        {"oats": _food("Oats", 13.5), "tofu": _food("Tofu", 8.0)},
+        {"oats": _food("Oats", 13.5), "tofu": _food("Tofu", 8.0)},
+    ]
+
+    async def fetch(refresh=False):
+        return snapshots.pop(0)
+
+    monkeypatch.setattr(manager.unified_db, "get_common_foods_database", fetch)
+
+    async def run():
+        try:
+            first = await manager.update_database("usda")
+            second = await manager.update_database("usda")
+            third = await manager.update_database("usda")
+            rolled_back = await manager.rollback_database("usda", first.new_version)
+            return first, second, third, rolled_back
+        finally:
+            await manager.close()
+
+    first, second, third, rolled_back = asyncio.run(run())
+
+    assert (first.records_added, first.records_updated) == (2, 0)
+    assert (second.records_added, second.records_updated) == (1, 1)
+    assert second.records_removed == 1
+    assert third.new_version == second.new_version  # unchanged
+    assert rolled_back is True
+
+    store = FoodVersionStore(tmp_path / "food_versions.sqlite")
+    records = store.records("usda")
+    assert set(records) == {"oats", "rice"}
+    assert records["oats"]["nutrients_per_100g"]["protein_g"] == 13.0
+    assert manager.versions["usda"].metadata["delta"] == {
+        "added": 1,
+        "changed": 1,
+        "removed": 1,
+    }
+
+
+def test_rollbacks_within_one_second_get_distinct_versions(tmp_path, monkeypatch):
+    """Test that repeated rollbacks in one second keep the manifest chain."""
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls(2026, 1, 1, 12, 0, 0)
+
+    monkeypatch.setattr(update_manager, "datetime", FrozenDatetime)
+    manager = DatabaseUpdateManager(cache_dir=str(tmp_path))
+    snapshots = [
+        {"oats": _food("Oats", 13.0)},
+        {"oats": _food("Oats", 13.5), "tofu": _food("Tofu", 8.0)},
+    ]
+
+    async def fetch(refresh=False):
+        return snapshots.pop(0)
+
+    monkeypatch.setattr(manager.unified_db, "get_common_foods_database", fetch)
+
+    async def run():
+        try:
+            first = await manager.update_database("usda")
+            second = await manager.update_database("usda")
+            rollbacks = []
+            for _ in range(2):
+                assert await manager.rollback_database("usda", first.new_version)
+                rollbacks.append(manager.versions["usda"].version)
+            # The chain still links back to the second update
+            assert await manager.rollback_database("usda", second.new_version)
+            return first, second, rollbacks
+        finally:
+            await manager.close()
+
+    first, second, rollbacks = asyncio.run(run())
+
+    versions = {first.new_version, second.new_version, *rollbacks}
+    assert len(versions) == 4
+    store = FoodVersionStore(tmp_path / "food_versions.sqlite")
+    assert versions < set(store.versions("usda"))
+    assert set(store.records("usda")) == {"oats", "tofu"}
+
+
+def test_blobs_are_shared_and_pruned(tmp_path):
+    """Test content-addressed sharing and garbage collection on prune."""
+    store = FoodVersionStore(tmp_path / "versions.sqlite")
+    v1 = {"a": {"v": 1}, "b": {"v": 2}}
+    store.seed("usda", v1)
+    store.seed("off", v1)
+    assert store.stats()["blobs"] == 2
+
+    for version, parent, value in (("v2", None, 20), ("v3", "v2", 200)):
+        delta, hashes = diff_records(
+            store.hashes("usda"),
+            {"a": {"v": 1}, "b": {"v": value}},
+            lambda keys: store.get_many("usda", keys),
+        )
+        refs = store.commit("usda", version, parent, delta, hashes)
+        assert set(refs.changed) == {"b"}
+    assert store.stats()["blobs"] == 4
+
+    # v3's manifest still rolls back to v2, so {"v": 20} stays until it goes
+    assert store.prune("usda", keep=1) == 1
+    assert store.stats()["blobs"] == 4
+    assert store.delta_between("usda", "v3", "v2").changed == {
+        "b": (record_hash({"v": 200}), record_hash({"v": 20}))
+    }
+    # {"v": 2} is still referenced by "off"
+    assert store.prune("usda", keep=0) == 1
+    assert store.stats()["blobs"] == 3
+    assert store.records("off") == v1
+
+    assert store.revert("usda", "v3", "v3_parent", "v4") is None
+    assert store.records("usda") == {"a": {"v": 1}, "b": {"v": 200}}
+
+
+def _checkpointed_size(path) -> int:
+    """File size once the WAL has been copied back into the database."""
+    con = sqlite3.connect(path)
+    con.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    con.close()
+    return os.path.getsize(path)
+
+
+def test_prune_returns_freed_pages_to_filesystem(tmp_path):
+    """Test that pruning shrinks the file, also one created without the mode."""
+    path = tmp_path / "versions.sqlite"
+    sqlite3.connect(path).execute("CREATE TABLE legacy (x)").connection.close()
+    store = FoodVersionStore(path)
+    con = sqlite_pool.reader(path)
+    assert con.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+    parent = None
+    for version in ("v1", "v2"):
+        records = {
+            str(i): {"v": version, "pad": os.urandom(2000).hex()} for i in range(200)
+        }
+        delta, hashes = diff_records(
+            store.hashes("usda"), records, lambda keys: store.get_many("usda", keys)
+        )
+        store.commit("usda", version, parent, delta, hashes)
+        parent = version
+    before = _checkpointed_size(path)
+
+    # v1's records are referenced by no version once its manifest is gone
+    assert store.prune("usda", keep=0) == 2
+    assert _checkpointed_size(path) < before * 0.6
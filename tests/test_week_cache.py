@@ -0,0 +1,89 @@
+"""
+Week Cache Tests
+
+RU: Тесты детерминированного RNG и кеша недельных планов.
+EN: Tests for the seeded RNG and the weekly plan cache.
+"""
+
+import os
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core.food_db_new import FoodDB
+from core.recipe_db_new import RecipeDB
+from core.week_cache import WeekCache, plan_request_key, rng_for_key
+from core.weekly_plan_new import build_week
+
+DATA = os.path.join(os.path.dirname(__file__), "..", "data")
+
+TARGETS = {
+    "kcal": 2200,
+    "macros": {"protein_g": 110, "fat_g": 70, "carbs_g": 260, "fiber_g": 30},
+    "micro": {"Fe_mg": 18.0, "Ca_mg": 1000.0, "VitD_IU": 600.0},
+}
+
+
+@pytest.fixture(scope="module")
+def dbs():
+    fooddb = FoodDB(os.path.join(DATA, "food_db_new.csv"))
+    return fooddb, RecipeDB(os.path.join(DATA, "recipes_new.csv"), fooddb)
+
+
+def test_request_key_is_canonical():
+    """Test that key ignores dict/flag order but tracks the data version."""
+    reordered = {"micro": TARGETS["micro"], "kcal": 2200, "macros": TARGETS["macros"]}
+    key = plan_request_key(TARGETS, ["VEG", "GF"], "en", "v1")
+    assert key == plan_request_key(reordered, ["GF", "VEG", "GF"], "en", "v1")
+    assert key != plan_request_key(TARGETS, ["VEG", "GF"], "ru", "v1")
+    assert key != plan_request_key(TARGETS, ["VEG", "GF"], "en", "v2")
+
+
+def test_seeded_week_is_reproducible(dbs):
+    """Test that the same request-scoped seed rebuilds the identical week."""
+    fooddb, recipedb = dbs
+    key = plan_request_key(TARGETS, [], "en", "v1")
+    first = build_week(TARGETS, [], "en", fooddb, recipedb, rng=rng_for_key(key))
+    second = build_week(TARGETS, [], "en", fooddb, recipedb, rng=rng_for_key(key))
+    assert first == second
+
+
+def test_lru_eviction_and_ttl():
+    """Test LRU order, eviction and expiry."""
+    cache = WeekCache(max_entries=2, ttl_seconds=10)
+    with patch("core.week_cache.time.monotonic", return_value=100.0):
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1  # "b" is now least recently used
+        cache.put("c", 3)
+    with patch("core.week_cache.time.monotonic", return_value=105.0):
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+    with patch("core.week_cache.time.monotonic", return_value=111.0):
+        assert cache.get("c") is None
+    assert cache.stats()["hits"] == 2
+    assert len(cache) == 1
+
+
+def test_week_endpoint_serves_repeats_from_cache():
+    """Test that identical requests build the week once."""
+    from app.routers import premium_week
+
+    app = FastAPI()
+    app.include_router(premium_week.router)
+    client = TestClient(app)
+    payload = {"targets": TARGETS, "diet_flags": ["VEG"], "lang": "en"}
+
+    with patch.object(
+        premium_week, "build_week", wraps=premium_week.build_week
+    ) as builder:
+        first = client.post("/api/v1/premium/plan/week", json=payload)
+        second = client.post("/api/v1/premium/plan/week", json=payload)
+        payload["lang"] = "ru"
+        third = client.post("/api/v1/premium/plan/week", json=payload)
+
+    assert first.status_code == second.status_code == third.status_code == 200
+    assert first.json() == second.json()
+    assert builder.call_count == 2
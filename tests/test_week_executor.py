@@ -0,0 +1,95 @@
+"""
+Week Executor Tests
+
+RU: Тесты параллельной генерации недельного плана.
+EN: Tests for parallel weekly plan generation.
+"""
+
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest.mock import patch
+
+from core.menu_engine import make_weekly_menu
+from core.recommendations import build_nutrition_targets
+from core.targets import UserProfile
+from core.week_executor import day_seed, run_days
+from core.weekly_plan import generate_weekly_plan
+
+
+def _profile():
+    return UserProfile(
+        sex="female",
+        age=30,
+        height_cm=165,
+        weight_kg=60,
+        activity="moderate",
+        goal="maintain",
+        diet_flags={"VEG"},
+    )
+
+
+def test_day_seeds_are_deterministic_and_distinct():
+    """Test that per-day seeds are stable and differ across days."""
+    seeds = [day_seed(42, i) for i in range(7)]
+    assert seeds == [day_seed(42, i) for i in range(7)]
+    assert len(set(seeds)) == 7
+    assert seeds != [day_seed(43, i) for i in range(7)]
+    assert day_seed(None, 3) is None
+
+
+def test_run_days_keeps_day_order_across_threads():
+    """Test that pooled results come back in day order with their seeds."""
+    threads = set()
+
+    def build(day, seed):
+        threads.add(threading.get_ident())
+        return (day, seed)
+
+    result = run_days(build, max_workers=4, seed=7)
+    assert result == [(i, day_seed(7, i)) for i in range(7)]
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        assert run_days(build, executor=pool, seed=7) == result
+
+    threads.clear()
+    run_days(build, max_workers=1)
+    assert threads == {threading.get_ident()}
+
+
+def test_run_days_defaults_to_inline():
+    """Test that without an executor or max_workers the days run inline."""
+    threads = set()
+
+    def build(day, seed):
+        threads.add(threading.get_ident())
+        return day
+
+    with patch("core.week_executor._shared_pool") as pool:
+        assert run_days(build) == list(range(7))
+    pool.assert_not_called()
+    assert threads == {threading.get_ident()}
+
+
+def test_weekly_plan_parallel_matches_sequential():
+    """Test that thread and process pools produce the sequential plan."""
+    targets = build_nutrition_targets(_profile())
+    sequential = generate_weekly_plan(targets, {"VEG"}, max_workers=1)
+    assert generate_weekly_plan(targets, {"VEG"}, max_workers=7) == sequential
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        assert generate_weekly_plan(targets, {"VEG"}, executor=pool) == sequential
+
+
+def test_weekly_menu_builds_targets_once():
+    """Test that make_weekly_menu derives targets once and matches sequential."""
+    profile = _profile()
+    sequential = make_weekly_menu(profile, max_workers=1)
+    with patch(
+        "core.menu_engine.build_nutrition_targets", wraps=build_nutrition_targets
+    ) as build:
+        parallel = make_weekly_menu(profile, max_workers=7)
+    assert build.call_count == 1
+    assert [d.meals for d in parallel.daily_menus] == [
+        d.meals for d in sequential.daily_menus
+    ]
+    assert parallel.weekly_coverage == sequential.weekly_coverage
+    assert parallel.total_cost == sequential.total_cost